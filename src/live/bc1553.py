@@ -4,6 +4,9 @@
 
 -bc1553.py — MIL-STD-1553 Bus Controller (BC) simülasyonu 
 - IMU (SA_IMU) ve EKF (SA_EKF) için sabit 14-word (FRAME_WORDS) okuma akışları kullanılır.
+- Hedef RT bus'a bağlıysa tx_to_rt / rx_from_rt işlem düzeyi yolu kullanır (Bus1553.transact): tek istek
+  çerçevesi (komut + veri), tek yanıt çerçevesi (durum + veri). transactions=False kelime düzeyi yolu
+  (ayrı komut/veri/durum mesajları) zorlar.
 """
 
 
@@ -16,7 +19,7 @@ from typing import List, Optional, Tuple
 
 from bus1553 import (
 
-    Bus1553, make_word, unpack_word,
+    Bus1553, recv_fields, BROADCAST_ADDR, STATUS_BCR,
 
     SYNC_CMD, SYNC_DATA, SYNC_STATUS,
 
@@ -83,31 +86,36 @@ def parse_status_field(field: int) -> Tuple[int, int]:
 
 class BC1553:
 
-    def __init__(self, bus: Bus1553):
+    def __init__(self, bus: Bus1553, transactions: bool = True):
 
         self.bus = bus
 
+        self.transactions = transactions
+
+        # son işlemin durum alanı (yanıt yoksa None); yakalama/izleme için
+
+        self.last_status: Optional[int] = None
+
 
 
     def _send_command(self, rt: int, tr: int, sa: int, wc: int):
 
         cmd_field = make_command_field(rt, tr, sa, wc)
 
-        self.bus.bc_send([make_word(SYNC_CMD, cmd_field)])
+        self.bus.bc_send(self.bus.pool.acquire(SYNC_CMD, (cmd_field,)))
 
 
 
     def _send_data_block(self, data_words: List[int]):
 
-        packet = [make_word(SYNC_DATA, (w & 0xFFFF)) for w in data_words]
+        # Havuzlu çerçeve: sync/field maskeleri vektörel, liste üretilmez
+        if len(data_words):
 
-        if packet:
+            self.bus.bc_send(self.bus.pool.acquire(SYNC_DATA, data_words))
 
-            self.bus.bc_send(packet)
 
 
-
-    def _recv_until(self, want_sync: int, n: int, timeout: float) -> Optional[List[int]]:
+    def _recv_until(self, want_sync: int, n: int, timeout: float, rt: Optional[int] = None) -> Optional[List[int]]:
 
         deadline = time() + timeout
 
@@ -115,43 +123,65 @@ class BC1553:
 
         while time() < deadline:
 
-            words = self.bus.bc_recv(timeout=0.05)
+            # rt verilirse yalnızca o RT'nin yanıt kuyruğu okunur
+            words = self.bus.bc_recv(timeout=0.05, addr=rt)
 
             if not words:
 
                 continue
 
-            for w in words:
+            # Frame ise alanlar maskeyle tek seferde çıkarılır ve çerçeve havuza döner
+            fields = recv_fields(words, want_sync)
 
-                sync, field = unpack_word(w)
+            if not collected and len(fields) == n:
 
-                if sync == want_sync:
+                return fields   # olağan durum: tamamı tek mesajda, liste yeniden kurulmaz
 
-                    collected.append(field)
+            collected.extend(fields)
 
-                    if len(collected) >= n:
+            if len(collected) >= n:
 
-                        return collected
+                return collected[:n]
 
         return None
 
 
 
-    def _recv_one_status(self, timeout: float) -> Optional[int]:
+    def _recv_one_status(self, timeout: float, rt: Optional[int] = None) -> Optional[int]:
 
-        fields = self._recv_until(SYNC_STATUS, 1, timeout)
+        fields = self._recv_until(SYNC_STATUS, 1, timeout, rt)
 
         return fields[0] if fields else None
 
 
 
-    def _recv_n_data(self, n: int, timeout: float) -> Optional[List[int]]:
+    def _recv_n_data(self, n: int, timeout: float, rt: Optional[int] = None) -> Optional[List[int]]:
 
         if n <= 0:
 
             return []
 
-        return self._recv_until(SYNC_DATA, n, timeout)
+        return self._recv_until(SYNC_DATA, n, timeout, rt)
+
+
+
+    def _transact(self, rt: int, tr: int, sa: int, wc: int, data_words=(), timeout: float = 1.0) -> Optional[List[int]]:
+
+        # İşlem düzeyi yol: yanıtın alanları [durum, veri...]; yanıt yoksa None
+
+        frame = self.bus.pool.acquire_msg(SYNC_CMD, make_command_field(rt, tr, sa, wc), SYNC_DATA, data_words)
+
+        reply = self.bus.transact(frame, timeout)
+
+        if reply is None:
+
+            return None
+
+        fields = reply.fields()
+
+        reply.release()
+
+        return fields or None
 
 
 
@@ -161,11 +191,40 @@ class BC1553:
 
         wc = len(data_words) & 0x1F
 
+        if self.transactions and self.bus.routed(rt):
+
+            fields = self._transact(rt, 0, sa, wc, data_words, timeout)
+
+            status = fields[0] if fields else None
+
+            self.last_status = status
+
+            if rt == BROADCAST_ADDR:
+
+                return True
+
+            if status is None:
+
+                return False
+
+            s_rt, s_bits = parse_status_field(status)
+
+            return (s_rt == rt) and (s_bits & ~STATUS_BCR == 0)
+
+
         self._send_command(rt, tr=0, sa=sa, wc=wc)
 
         self._send_data_block(data_words)
 
-        status = self._recv_one_status(timeout)
+        if rt == BROADCAST_ADDR:
+
+            self.last_status = None
+
+            return True   # yayına durum kelimesiyle yanıt verilmez
+
+        status = self._recv_one_status(timeout, rt)
+
+        self.last_status = status
 
         if status is None:
 
@@ -173,7 +232,7 @@ class BC1553:
 
         s_rt, s_bits = parse_status_field(status)
 
-        return (s_rt == rt) and (s_bits == 0)
+        return (s_rt == rt) and (s_bits & ~STATUS_BCR == 0)
 
 
 
@@ -183,9 +242,35 @@ class BC1553:
 
         wc &= 0x1F
 
+        if rt == BROADCAST_ADDR:
+
+            return None   # yayın adresinden okuma yapılamaz
+
+        if self.transactions and self.bus.routed(rt):
+
+            fields = self._transact(rt, 1, sa, wc, (), timeout)
+
+            self.last_status = fields[0] if fields else None
+
+            if fields is None:
+
+                return None
+
+            s_rt, s_bits = parse_status_field(fields[0])
+
+            n = wc if wc > 0 else 0
+
+            if (s_rt != rt) or (s_bits & ~STATUS_BCR != 0) or len(fields) - 1 < n:
+
+                return None
+
+            return fields[1:n + 1]
+
         self._send_command(rt, tr=1, sa=sa, wc=wc)
 
-        status = self._recv_one_status(timeout)
+        status = self._recv_one_status(timeout, rt)
+
+        self.last_status = status
 
         if status is None:
 
@@ -193,11 +278,11 @@ class BC1553:
 
         s_rt, s_bits = parse_status_field(status)
 
-        if (s_rt != rt) or (s_bits != 0):
+        if (s_rt != rt) or (s_bits & ~STATUS_BCR != 0):
 
             return None
 
-        data = self._recv_n_data(n=wc if wc > 0 else 0, timeout=timeout)
+        data = self._recv_n_data(n=wc if wc > 0 else 0, timeout=timeout, rt=rt)
 
         return data if (data is not None and len(data) == (wc if wc > 0 else 0)) else None
 
@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+"""
+bc_schedule.py — BC1553 için çevrimsel (major/minor frame) mesaj çizelgesi ve tek thread'li yürütücü
+
+- BusMessage: (RT, alt adres, kelime sayısı, yön, hız) satırı; okuma için decode, yazma için source.
+- BusSchedule: mesajları hız gruplarına göre minor frame'lere yerleştirir. Minor frame frekansı
+  (minor_hz) en hızlı gruptur; her mesaj stride = minor_hz / rate minor frame'de bir koşar ve
+  yükü (kelime sayısı) en dengeli faza (0..stride-1) oturtulur. Major frame = stride'ların EKOK'u.
+- BcScheduleRunner: bus'ın tek sahibi olan thread; minor frame'leri DeadlineScheduler ile mutlak
+  deadline'larda serbest bırakır, sıradaki minor frame'in mesajlarını tablo sırasıyla koşar.
+
+İstatistikler:
+  mesaj başına : işlem süresi (komut -> son veri kelimesi, Histogram), başarılı / başarısız / atlanan
+  minor frame : süre, overrun (süre > minor periyot), jitter / düşürülen (DeadlineScheduler)
+  bus         : kullanım = minor frame'lerde geçen süre / toplam süre
+                (bus.timing bir bus_timing.BusClock ise 1 Mbit/s modelinde minor frame başına da)
+
+Yakalama: capture (bus_capture.CaptureWriter) verilirse her işlemin ham kelimeleri (komut, durum,
+veri) bus sahibi thread'den yazılır; yanıtsız işlemler FLAG_NO_RESPONSE ile işaretlenir.
+
+Kullanım:
+    sch = BusSchedule([BusMessage("imu", 1, SA_IMU, FRAME_WORDS, 50, decode=unpack_imu_words),
+                       BusMessage("ekf", 1, SA_EKF, FRAME_WORDS, 10, decode=unpack_ekf_words)], minor_hz=50)
+    runner = BcScheduleRunner(bc, sch, on_message=lambda msg, sample, t: ...).start()
+    ...
+    runner.stop(); print(runner.summary())
+"""
+
+import math
+import time
+import argparse
+import threading
+from functools import reduce
+
+from profiling import Histogram
+from bc1553 import make_command_field
+from scheduler import DeadlineScheduler, POLICIES
+
+
+class BusMessage:
+    """
+    Çizelge satırı. tr=1: RT -> BC okuma (decode(words) -> örnek; verilmezse kelimeler döner).
+    tr=0: BC -> RT yazma (source() -> list[int] veri kelimeleri).
+    """
+    def __init__(self, name, rt, sa, wc, rate_hz, tr=1, decode=None, source=None, timeout=0.05):
+        if tr == 0 and source is None:
+            raise ValueError(f"{name}: BC -> RT mesajı için source gerekli")
+        self.name = name
+        self.rt = int(rt)
+        self.sa = int(sa)
+        self.wc = int(wc)
+        self.rate_hz = float(rate_hz)
+        self.tr = int(tr)
+        self.decode = decode
+        self.source = source
+        self.timeout = float(timeout)
+
+        self.stride = 1       # BusSchedule doldurur
+        self.phase = 0
+
+    def words_on_bus(self):
+        """Bir işlemdeki kelime sayısı: komut + durum + veri."""
+        return 2 + self.wc
+
+    def __repr__(self):
+        d = "RT->BC" if self.tr else "BC->RT"
+        return f"BusMessage({self.name}, RT{self.rt} SA{self.sa} WC{self.wc} {d} {self.rate_hz:g} Hz)"
+
+
+class BusSchedule:
+    def __init__(self, messages, minor_hz=None):
+        self.messages = list(messages)
+        if not self.messages:
+            raise ValueError("Çizelgede mesaj yok")
+        self.minor_hz = float(minor_hz or max(m.rate_hz for m in self.messages))
+        self.minor_period = 1.0 / self.minor_hz
+
+        for m in self.messages:
+            if m.rate_hz <= 0 or m.rate_hz > self.minor_hz:
+                raise ValueError(f"{m.name}: hız {m.rate_hz:g} Hz, minor frame frekansı {self.minor_hz:g} Hz")
+            m.stride = max(1, int(round(self.minor_hz / m.rate_hz)))
+        self.n_minor = reduce(lambda a, b: a * b // math.gcd(a, b), (m.stride for m in self.messages), 1)
+
+        # Yerleşim: hızlıdan yavaşa; her mesaj en yoğun slotu en az olan faza
+        self.load = [0] * self.n_minor
+        self.frames = [[] for _ in range(self.n_minor)]
+        for m in sorted(self.messages, key=lambda m: (m.stride, -m.words_on_bus())):
+            best = min(range(m.stride),
+                       key=lambda p: (max(self.load[p::m.stride]), sum(self.load[p::m.stride]), p))
+            m.phase = best
+            for k in range(best, self.n_minor, m.stride):
+                self.frames[k].append(m)
+                self.load[k] += m.words_on_bus()
+        order = {id(m): i for i, m in enumerate(self.messages)}
+        for f in self.frames:
+            f.sort(key=lambda m: order[id(m)])   # minor frame içinde tablo sırası
+
+    @property
+    def major_period(self):
+        return self.n_minor * self.minor_period
+
+    def effective_rate(self, m):
+        return self.minor_hz / m.stride
+
+    def table(self):
+        lines = [f"Çizelge: minor {self.minor_period * 1e3:.2f} ms ({self.minor_hz:g} Hz) x {self.n_minor} "
+                 f"= major {self.major_period * 1e3:.2f} ms"]
+        for m in self.messages:
+            lines.append(f"  {m.name:<8} RT{m.rt:<2} SA{m.sa:<2} WC{m.wc:<2} {'RT->BC' if m.tr else 'BC->RT'}  "
+                         f"{self.effective_rate(m):7.2f} Hz  (her {m.stride}. minor, faz {m.phase})")
+        for k, f in enumerate(self.frames):
+            lines.append(f"  minor {k:3d}: {self.load[k]:3d} kelime  " + " ".join(m.name for m in f))
+        return "\n".join(lines)
+
+
+class _MsgStats:
+    def __init__(self):
+        self.latency = Histogram()
+        self.ok = 0
+        self.failed = 0
+        self.skipped = 0   # düşürülen minor frame'lerde koşmayan
+
+
+class BcScheduleRunner:
+    """
+    Çizelgeyi tek thread'de (bus sahibi) koşturur. on_message(msg, sample, t) başarılı her
+    işlemden sonra aynı thread'den çağrılır; t = başlangıçtan beri geçen süre (s).
+    Politika DeadlineScheduler'ınkidir: catchup geç kalınan minor frame'leri arka arkaya koşar,
+    drop atlar (atlanan frame'lerin mesajları skipped sayılır).
+    """
+    def __init__(self, bc, schedule, on_message=None, policy="drop", max_catchup=3, capture=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Bilinmeyen politika: {policy} (seçenekler: {', '.join(POLICIES)})")
+        self.bc = bc
+        self.schedule = schedule
+        self.on_message = on_message
+        self.capture = capture
+        self.sched = DeadlineScheduler(schedule.minor_period, policy=policy, max_catchup=max_catchup)
+        self.stats = {m.name: _MsgStats() for m in schedule.messages}
+
+        self.minor_index = 0
+        self.busy_s = 0.0
+        self.errors = 0
+        self.t0 = None
+        self.t_end = None
+
+        self._stop_evt = threading.Event()
+        self._thread = None
+
+    # ---- yaşam döngüsü ----
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name="bc-schedule", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        self._stop_evt.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    def run(self):
+        self.t0 = time.monotonic()
+        sched = self.sched.start()
+        while not self._stop_evt.is_set():
+            dropped = sched.dropped
+            n = sched.due()
+            self._skip(sched.dropped - dropped)
+            for _ in range(n):
+                t = time.perf_counter()
+                k = self.minor_index
+                self._run_minor()
+                if self.bc.bus.timing is not None:
+                    self.bc.bus.timing.end_minor(k)
+                ex = time.perf_counter() - t
+                sched.note_step(ex)
+                self.busy_s += ex
+            sched.wait(max_wait=0.1)
+        self.t_end = time.monotonic()
+
+    # ---- minor frame ----
+    def _skip(self, k):
+        for _ in range(k):
+            for m in self.schedule.frames[self.minor_index]:
+                self.stats[m.name].skipped += 1
+            self.minor_index = (self.minor_index + 1) % self.schedule.n_minor
+
+    def _run_minor(self):
+        for m in self.schedule.frames[self.minor_index]:
+            if self._stop_evt.is_set():
+                break
+            self._transact(m)
+        self.minor_index = (self.minor_index + 1) % self.schedule.n_minor
+
+    def _transact(self, m):
+        st = self.stats[m.name]
+        t = time.perf_counter()
+        words = None
+        try:
+            if m.tr:
+                words = self.bc.rx_from_rt(m.rt, m.sa, m.wc, timeout=m.timeout)
+                sample = None
+                if self.capture is not None:
+                    self._capture(m, words)
+                if words is not None:
+                    sample = m.decode(words) if m.decode else words
+            else:
+                sample = words = m.source()
+                if not self.bc.tx_to_rt(m.rt, m.sa, sample, timeout=m.timeout):
+                    sample = None
+                if self.capture is not None:
+                    self._capture(m, words)
+        except Exception:
+            self.errors += 1
+            sample = None
+        st.latency.record(int((time.perf_counter() - t) * 1e9))
+        if sample is None:
+            st.failed += 1
+            return
+        st.ok += 1
+        if self.on_message is not None:
+            try:
+                self.on_message(m, sample, time.monotonic() - self.t0)
+            except Exception:
+                self.errors += 1
+
+    def _capture(self, m, words):
+        status = self.bc.last_status
+        self.capture.append(make_command_field(m.rt, m.tr, m.sa, m.wc), status, words or ())
+
+    # ---- raporlama ----
+    def elapsed(self):
+        if self.t0 is None:
+            return 0.0
+        return (self.t_end or time.monotonic()) - self.t0
+
+    def utilization(self):
+        el = self.elapsed()
+        return self.busy_s / el if el > 0 else 0.0
+
+    def hud_line(self):
+        parts = [f"BC {self.utilization() * 100:.0f}% bus"]
+        for name, st in self.stats.items():
+            parts.append(f"{name} {st.latency.percentile_ns(0.99) / 1e6:.1f} ms p99 ✗{st.failed + st.skipped}")
+        parts.append(f"overrun={self.sched.overruns}")
+        return "  | ".join(parts)
+
+    def summary(self):
+        el = self.elapsed()
+        lines = [
+            "BC çevrimsel çizelge",
+            "====================",
+            self.schedule.table(),
+            f"Süre: {el:.2f} s  |  minor frame: {self.sched.released} koşulan, {self.sched.dropped} düşürülen, "
+            f"{self.sched.late} geç  |  overrun: {self.sched.overruns}",
+            f"Bus kullanımı: {self.utilization() * 100:.1f}%  |  hata: {self.errors}",
+            "Mesaj      Hz(hedef/gerçek)  başarılı  başarısız  atlanan  süre[ms] ort/p50/p99/max",
+        ]
+        for m in self.schedule.messages:
+            st = self.stats[m.name]
+            s = st.latency.stats_us()
+            rate = st.ok / el if el > 0 else 0.0
+            lines.append(f"{m.name:<10} {self.schedule.effective_rate(m):6.1f}/{rate:6.1f}      "
+                         f"{st.ok:8d}  {st.failed:9d}  {st.skipped:7d}  "
+                         f"{s['mean_us'] / 1e3:.2f}/{s['p50_us'] / 1e3:.2f}/{s['p99_us'] / 1e3:.2f}/{s['max_us'] / 1e3:.2f}")
+        lines.append(self.sched.hud_line())
+        return "\n".join(lines)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="BC çevrimsel çizelgesini simüle RT'ye karşı koştur")
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--minor-hz", type=float, default=50.0)
+    ap.add_argument("--imu-hz", type=float, default=50.0)
+    ap.add_argument("--ekf-hz", type=float, default=10.0)
+    ap.add_argument("--policy", choices=POLICIES, default="drop")
+    ap.add_argument("--timing", action="store_true", help="Trafiği 1 Mbit/s zamanlama modeliyle (bus_timing) muhasebeleştir")
+    args = ap.parse_args()
+
+    from bus1553 import Bus1553
+    from bc1553 import BC1553
+    from rt1553 import RT1553
+    from sensor1553 import FRAME_WORDS, SA_IMU, SA_EKF, unpack_imu_words, unpack_ekf_words
+
+    bus = Bus1553()
+    rt = RT1553(bus, rt_addr=1)
+    rt_thread = threading.Thread(target=rt.run_forever, daemon=True)
+    rt_thread.start()
+
+    sch = BusSchedule([
+        BusMessage("imu", 1, SA_IMU, FRAME_WORDS, args.imu_hz, decode=unpack_imu_words),
+        BusMessage("ekf", 1, SA_EKF, FRAME_WORDS, args.ekf_hz, decode=unpack_ekf_words),
+    ], minor_hz=args.minor_hz)
+    if args.timing:
+        from bus_timing import BusClock
+        bus.timing = BusClock(minor_period_s=sch.minor_period)
+    runner = BcScheduleRunner(BC1553(bus), sch, policy=args.policy).start()
+    try:
+        time.sleep(args.seconds)
+    except KeyboardInterrupt:
+        pass
+    runner.stop()
+    text = runner.summary()
+    if bus.timing is not None:
+        text += "\n\n" + bus.timing.summary()
+    rt.stop()
+    rt_thread.join(timeout=2.0)
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
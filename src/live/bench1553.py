@@ -0,0 +1,1042 @@
+# -*- coding: utf-8 -*-
+"""
+bench1553.py — 1553 bus simülasyonu için ölçüm araçları
+
+Alt komutlar:
+  logging : Bus1553 mesaj hızı (mesaj/s); log kapalı / açık (tembel) / eski (hevesli) / DEBUG yayını / trace
+  frames  : 14 kelimelik okuma işlemi; eski list[int] yolu vs havuzlu Frame yolu (µs/işlem)
+  rt      : RT thread'i ile komut -> durum gecikmesi yüzdelikleri; eski (uyuyan) döngü vs olay güdümlü
+  rts     : adres yönlendirmeli bus'ta RT sayısına göre toplam işlem/s (sıralı ve boru hattı) + yayın
+  codec   : IMU/EKF kare kodlama/çözme; tekli (Python int) vs toplu (NumPy, (N, 14) uint16)
+  capture : ikili yakalama: yazma, indeks, zaman/seq dilimi, toplu çözme; kayıpsızlık kontrolü
+  monitor : pasif monitor (MT) bağlıyken işlem/s kaybı; yalnız tap vs tap + yeniden kurma thread'i
+  replay  : sabit iş yükü (2 RT; okuma, yazma, yayın) BusTrace'e kaydedilip bc ve rt kiplerinde
+            olabildiğince hızlı yeniden oynatılır; işlem/s ve gecikme yüzdelikleri (bus_replay)
+  writer  : köprü akış yazımı; satır satır CSV (bus thread'inde çöz + writerow) vs StreamWriter
+            (ham kare bloğa, yazıcı thread'i); minor frame süresi, jitter, bus thread'i maliyeti
+  transact: BC okuma/yazma işlemi; kelime düzeyi mesajlar vs işlem düzeyi istek/yanıt (Bus1553.transact):
+            işlem/s, gecikme ve işlem başına kuyruk / kilit işlemi sayısı
+  shm     : süreç içi Bus1553 (RT thread'i) vs shared memory halkaları (bus_shm, RT ayrı süreçte);
+            BC okuma işlemi/s ve gecikme, boşta ve BC sürecinde GIL'i tutan yük thread'i varken
+  fusion  : RT yanıt gecikmesi; transmit yolunda anında üretim (sim + paketleme, isteğe bağlı EKF adımı)
+            vs RT füzyon döngüsü + çift tampon (hazır çerçeve), ek filtre yükü ile
+
+Kullanım:
+  python bench1553.py logging --n 50000 --rounds 3
+  python bench1553.py frames --n 20000 --rounds 5
+  python bench1553.py rt --n 2000
+  python bench1553.py rts --seconds 1
+  python bench1553.py codec --n 1000000
+  python bench1553.py capture --n 1000000
+  python bench1553.py monitor --seconds 0.5 --rounds 15
+  python bench1553.py replay --n 2000 --rounds 5
+  python bench1553.py writer --seconds 3 --rounds 3 --imu-hz 500
+  python bench1553.py transact --n 20000 --rounds 5
+  python bench1553.py shm --seconds 1 --rounds 5
+  python bench1553.py fusion --seconds 2 --rounds 3 --filter-ms 2
+"""
+
+import io
+import os
+import sys
+import queue
+import tempfile
+import time
+import logging
+import argparse
+import threading
+
+import numpy as np
+
+import bus1553
+from bus1553 import Bus1553, BusTrace, WAKE, BROADCAST_ADDR, make_word, unpack_word, recv_fields, SYNC_CMD, SYNC_DATA, SYNC_STATUS
+from bc1553 import BC1553, make_command_field, parse_command_field
+from rt1553 import RT1553, make_status_field
+from sensor1553 import (FRAME_WORDS, SA_IMU, SA_EKF, IMU_COLS, EKF_COLS, pack_imu_words, unpack_imu_words,
+                        pack_ekf_words, unpack_ekf_words, pack_imu_batch, unpack_imu_batch,
+                        pack_ekf_batch, unpack_ekf_batch)
+from profiling import Histogram
+from bus_monitor import BusMonitor, MonitorTap, TX_OK
+from bus_replay import ReplayTrace, BusReplay
+from bc_schedule import BusMessage, BusSchedule, BcScheduleRunner
+from bus_shm import ShmBus, ShmRtProcess
+from stream_writer import StreamWriter
+
+
+def _transaction_words(rt=1, sa=2):
+    """RT->BC okuma işleminin kelimeleri: komut, durum, 14 kelimelik veri bloğu."""
+    cmd = [make_word(SYNC_CMD, (rt << 11) | (1 << 10) | (sa << 5) | FRAME_WORDS)]
+    status = [make_word(SYNC_STATUS, rt << 11)]
+    data = [make_word(SYNC_DATA, i) for i in range(FRAME_WORDS)]
+    return cmd, status, data
+
+
+def _run_bus(bus, n):
+    """Tek thread'de n işlem: 3 mesaj/işlem (komut, durum, veri). Dönüş: mesaj/s."""
+    cmd, status, data = _transaction_words()
+    t0 = time.perf_counter()
+    for _ in range(n):
+        bus.bc_send(cmd)
+        bus.rt_recv(timeout=0.1)
+        bus.rt_send(status)
+        bus.rt_send(data)
+        bus.bc_recv(timeout=0.1)
+        bus.bc_recv(timeout=0.1)
+    return 3 * n / (time.perf_counter() - t0)
+
+
+class _EagerBus(Bus1553):
+    """Karşılaştırma için eski davranış: seviyeden bağımsız her mesajı çözüp biçimlendirir."""
+    def bc_recv(self, timeout=0.1):
+        words = self.q_to_bc.get(timeout=timeout)
+        if bus1553.VERBOSE:
+            bus1553.LOGGER.debug(bus1553._decode_words(words, "RT->BC"))
+        return words
+
+    def rt_recv(self, timeout=0.1):
+        words = self.q_to_rt.get(timeout=timeout)
+        if bus1553.VERBOSE:
+            bus1553.LOGGER.debug(bus1553._decode_words(words, "BC->RT"))
+        return words
+
+
+def bench_logging(n=50000, rounds=3):
+    logger = bus1553.LOGGER
+    saved = (bus1553.VERBOSE, logger.level, list(logger.handlers), logger.propagate)
+    sink = io.StringIO()
+    debug_handler = logging.StreamHandler(sink)
+    debug_handler.setFormatter(logging.Formatter("[%(levelname)s] %(message)s"))
+    info_handler = logging.StreamHandler(sink)
+    info_handler.setLevel(logging.INFO)
+
+    def setup(verbose, level, handler):
+        bus1553.VERBOSE = verbose
+        logger.setLevel(level)
+        logger.handlers = [handler]
+        logger.propagate = False
+
+    cases = [
+        ("log kapalı (BUS1553_LOG=0)", False, logging.INFO, debug_handler, Bus1553),
+        ("log açık, seviye INFO (tembel)", True, logging.INFO, debug_handler, Bus1553),
+        ("log açık, seviye INFO (eski: hevesli)", True, logging.INFO, debug_handler, _EagerBus),
+        ("logger DEBUG, handler INFO (tembel)", True, logging.DEBUG, info_handler, Bus1553),
+        ("logger DEBUG, handler INFO (eski)", True, logging.DEBUG, info_handler, _EagerBus),
+        ("DEBUG yayını (StringIO'ya)", True, logging.DEBUG, debug_handler, Bus1553),
+    ]
+    lines = [f"Bus1553 mesaj hızı, {n} işlem x 3 mesaj (tek thread, kuyruk bekleme yok), "
+             f"{rounds} turun medyanı (turlar durumlar arasında dönüşümlü)"]
+    trace = BusTrace(capacity=1 << 16)
+    cases.append(("log kapalı + BusTrace kaydı", False, logging.INFO, debug_handler,
+                  lambda: Bus1553(trace=trace)))
+    try:
+        rates = [[] for _ in cases]
+        for _ in range(max(1, int(rounds))):
+            for i, (label, verbose, level, handler, cls) in enumerate(cases):
+                setup(verbose, level, handler)
+                rates[i].append(_run_bus(cls(), n))
+        base = float(np.median(rates[0]))
+        for (label, *_), r in zip(cases, rates):
+            rate = float(np.median(r))
+            lines.append(f"  {label:<40}: {rate:10.0f} mesaj/s  ({rate / base:5.2f}x)")
+        setup(False, logging.INFO, debug_handler)
+        t0 = time.perf_counter()
+        dumped = trace.dump(last=1000)
+        ms = (time.perf_counter() - t0) * 1e3
+        lines.append(f"  trace: {trace.count} kayıt, son 1000 kaydın çözümü {ms:.1f} ms")
+        lines.append("  örnek: " + dumped[-1].strip())
+    finally:
+        bus1553.VERBOSE, level, handlers, propagate = saved
+        logger.setLevel(level)
+        logger.handlers = handlers
+        logger.propagate = propagate
+    return "\n".join(lines)
+
+
+def _imu_payload():
+    return pack_imu_words({"roll": 0.01, "pitch": -0.02, "yaw": 0.3, "p": 0.001, "q": 0.002, "r": 0.1,
+                           "ax": 0.2, "ay": 0.9, "az": 9.7, "temp_c": 30.0}, 7)
+
+
+class _LegacyBC(BC1553):
+    """Karşılaştırma için eski BC yardımcıları: her mesaj list[int], alıcı kelime kelime çözer."""
+    def _send_command(self, rt, tr, sa, wc):
+        self.bus.bc_send([make_word(SYNC_CMD, make_command_field(rt, tr, sa, wc))])
+
+    def _send_data_block(self, data_words):
+        packet = [make_word(SYNC_DATA, (w & 0xFFFF)) for w in data_words]
+        if packet:
+            self.bus.bc_send(packet)
+
+    def _recv_until(self, want_sync, n, timeout, rt=None):
+        deadline = time.time() + timeout
+        collected = []
+        while time.time() < deadline:
+            words = self.bus.bc_recv(timeout=0.05, addr=rt)
+            if not words:
+                continue
+            for w in words:
+                sync, field = unpack_word(w)
+                if sync == want_sync:
+                    collected.append(field)
+                    if len(collected) >= n:
+                        return collected
+        return None
+
+
+class _LegacyRT(RT1553):
+    def _send_status(self, bits=0):
+        self.bus.rt_send([make_word(SYNC_STATUS, make_status_field(self.addr, bits))], self.addr)
+
+    def _send_data_block(self, data_words):
+        packet = [make_word(SYNC_DATA, (w & 0xFFFF)) for w in data_words]
+        if packet:
+            self.bus.rt_send(packet, self.addr)
+
+
+def _legacy_commands(obj):
+    return [field for sync, field in map(unpack_word, obj) if sync == SYNC_CMD]
+
+
+def _transaction(bus, bc, rt, payload, commands):
+    """BC komut -> RT komut çözümü -> durum + 14 veri kelimesi -> BC alımı (eski run_forever adımları)."""
+    bc._send_command(rt.addr, 1, SA_IMU, FRAME_WORDS)
+    for field in commands(bus.rt_recv(timeout=0.1, addr=rt.addr)):
+        parse_command_field(field)
+    rt._send_status(0)
+    rt._send_data_block(payload)
+    bc._recv_one_status(0.1, rt.addr)
+    return bc._recv_n_data(FRAME_WORDS, 0.1, rt.addr)
+
+
+def _time_per_call(fn, n):
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - t0) / n * 1e6
+
+
+def bench_frames(n=50000, rounds=5):
+    saved = bus1553.VERBOSE
+    bus1553.VERBOSE = False
+    payload = _imu_payload()
+    expect = [w & 0xFFFF for w in payload]
+    try:
+        bus_l = Bus1553()
+        bc_l, rt_l = _LegacyBC(bus_l), _LegacyRT(bus_l, rt_addr=1)
+        tx_list = lambda: _transaction(bus_l, bc_l, rt_l, payload, _legacy_commands)
+        assert tx_list() == expect
+
+        bus = Bus1553()
+        bc, rt = BC1553(bus), RT1553(bus, rt_addr=1)
+        cmds = lambda obj: recv_fields(obj, SYNC_CMD)
+        tx_frame = lambda: _transaction(bus, bc, rt, payload, cmds)
+        assert tx_frame() == expect
+
+        # Yalnız kodlama + çözme (kuyruk ve BC/RT yardımcıları hariç)
+        def codec_list():
+            packet = [make_word(SYNC_DATA, (w & 0xFFFF)) for w in payload]
+            return [field for sync, field in map(unpack_word, packet) if sync == SYNC_DATA]
+        pool = bus.pool
+        codec_frame = lambda: recv_fields(pool.acquire(SYNC_DATA, payload), SYNC_DATA)
+        assert codec_list() == codec_frame() == expect
+
+        # Turlar yollar arasında dönüşümlü; tur medyanı (tek VM'de ölçüm gürültüsüne karşı)
+        fns = (tx_list, tx_frame, codec_list, codec_frame)
+        times = [[] for _ in fns]
+        for _ in range(max(1, int(rounds))):
+            for t, fn in zip(times, fns):
+                t.append(_time_per_call(fn, n))
+        us_list, us_frame, us_codec_list, us_codec_frame = (float(np.median(t)) for t in times)
+        wins = sum(a > b for a, b in zip(times[0], times[1]))
+    finally:
+        bus1553.VERBOSE = saved
+    return "\n".join([
+        f"IMU okuma işlemi (komut + durum + {FRAME_WORDS} veri kelimesi), {n} tekrar x {rounds} tur "
+        f"(medyan), tek thread",
+        f"  işlem, list[int] (eski)  : {us_list:7.2f} µs/işlem",
+        f"  işlem, havuzlu Frame     : {us_frame:7.2f} µs/işlem  ({us_list / us_frame:4.2f}x, "
+        f"Frame daha hızlı: {wins}/{len(times[0])} tur)",
+        f"  {FRAME_WORDS} kelime kodla+çöz, list   : {us_codec_list:7.2f} µs",
+        f"  {FRAME_WORDS} kelime kodla+çöz, Frame  : {us_codec_frame:7.2f} µs  ({us_codec_list / us_codec_frame:4.2f}x)",
+        f"  havuz: {pool.size} çerçeve, alınan {pool.acquired}, havuz dışı ayırma {pool.misses}, boşta {pool.available()}",
+    ])
+
+
+class _SleepyRT(RT1553):
+    """Karşılaştırma için eski servis döngüsü: 0.5 s bloklu bekleme + her mesajdan sonra sabit uyku."""
+    def run_forever(self, sleep=0.01, idle_timeout=0.5):
+        self._stop = getattr(self, "_stop", False)
+        while not self._stop:
+            obj = self.bus.rt_recv(timeout=idle_timeout, addr=self.addr)
+            if obj is WAKE:
+                continue
+            if not obj:
+                time.sleep(sleep)
+                continue
+            self._handle(obj)
+            if sleep > 0:
+                time.sleep(sleep)
+
+    def stop(self):
+        self._stop = True
+
+
+def _rt_latency(rt_cls, n, burst):
+    """
+    n okuma işlemi: komut -> durum gecikmesi (Histogram) ve işlem/s. burst > 1 ise komutlar
+    burst'lük gruplar halinde arka arkaya gönderilir (RT'nin kuyruğu boşaltması ölçülür).
+    Dönüş: (Histogram, işlem/s, durdurma süresi ms).
+    """
+    bus = Bus1553()
+    bc = BC1553(bus)
+    rt = rt_cls(bus, rt_addr=1)
+    th = threading.Thread(target=rt.run_forever, daemon=True)
+    th.start()
+    hist = Histogram()
+    done = 0
+    t0 = time.perf_counter()
+    while done < n:
+        k = min(burst, n - done)
+        sent = []
+        for _ in range(k):
+            sent.append(time.perf_counter())
+            bc._send_command(1, 1, SA_IMU, FRAME_WORDS)
+        for ts in sent:
+            if bc._recv_one_status(1.0, 1) is None:
+                raise RuntimeError("RT yanıt vermedi")
+            hist.record(int((time.perf_counter() - ts) * 1e9))
+            bc._recv_n_data(FRAME_WORDS, 1.0, 1)
+        done += k
+    rate = n / (time.perf_counter() - t0)
+    time.sleep(0.05)   # RT boşta, rt_recv'de bloklu
+    t = time.perf_counter()
+    rt.stop()
+    th.join(timeout=2.0)
+    return hist, rate, (time.perf_counter() - t) * 1e3
+
+
+def bench_rt(n=2000, burst=8):
+    saved = bus1553.VERBOSE
+    bus1553.VERBOSE = False
+    lines = [f"RT komut -> durum gecikmesi, {n} okuma işlemi (ayrı RT thread'i)"]
+    try:
+        for label, cls, b in [("eski (10 ms uyku), ardışık", _SleepyRT, 1),
+                              ("olay güdümlü, ardışık", RT1553, 1),
+                              (f"eski (10 ms uyku), {burst}'li grup", _SleepyRT, burst),
+                              (f"olay güdümlü, {burst}'li grup", RT1553, burst)]:
+            m = n if cls is RT1553 else max(1, min(n, 200))   # eski döngü ~100 işlem/s
+            h, rate, stop_ms = _rt_latency(cls, m, b)
+            s = h.stats_us()
+            lines.append(f"  {label:<28}: p50/p90/p99/max = {s['p50_us'] / 1e3:6.3f}/{h.percentile_ns(0.9) / 1e6:6.3f}/"
+                         f"{s['p99_us'] / 1e3:6.3f}/{s['max_us'] / 1e3:6.3f} ms  |  {rate:8.0f} işlem/s  "
+                         f"|  durdurma {stop_ms:6.1f} ms  (n={m})")
+    finally:
+        bus1553.VERBOSE = saved
+    return "\n".join(lines)
+
+
+def _multi_rt(n_rt, seconds, pipelined):
+    """
+    n_rt RT (adres 1..n_rt, her biri kendi thread'inde) ile süre boyunca okuma işlemleri.
+    Sıralı: BC her RT'yi sırayla tek tek okur. Boru hattı: önce tüm RT'lere komut gönderilir,
+    sonra yanıtlar RT başına yanıt kuyruklarından toplanır. Dönüş: (işlem/s, RT başına işlem).
+    """
+    bus = Bus1553(pool_size=4 * n_rt + 16)
+    bc = BC1553(bus)
+    rts = [RT1553(bus, rt_addr=a) for a in range(1, n_rt + 1)]
+    threads = [threading.Thread(target=rt.run_forever, daemon=True) for rt in rts]
+    for th in threads:
+        th.start()
+    addrs = [rt.addr for rt in rts]
+    per_rt = dict.fromkeys(addrs, 0)
+    t0 = time.perf_counter()
+    t_end = t0 + seconds
+    while time.perf_counter() < t_end:
+        if pipelined:
+            for a in addrs:
+                bc._send_command(a, 1, SA_IMU, FRAME_WORDS)
+            for a in addrs:
+                if bc._recv_one_status(1.0, a) is not None and bc._recv_n_data(FRAME_WORDS, 1.0, a):
+                    per_rt[a] += 1
+        else:
+            for a in addrs:
+                if bc.rx_from_rt(a, SA_IMU, FRAME_WORDS, timeout=1.0):
+                    per_rt[a] += 1
+    rate = sum(per_rt.values()) / (time.perf_counter() - t0)
+
+    bc.tx_to_rt(BROADCAST_ADDR, 5, list(range(FRAME_WORDS)))
+    deadline = time.time() + 1.0
+    while time.time() < deadline and any(rt.broadcasts == 0 for rt in rts):
+        time.sleep(0.001)
+    got = sum(rt.broadcasts for rt in rts)
+    for rt in rts:
+        rt.stop()
+    for th in threads:
+        th.join(timeout=2.0)
+    return rate, per_rt, got
+
+
+def bench_rts(seconds=1.0, counts=(1, 2, 4, 8, 16, 30)):
+    saved = bus1553.VERBOSE
+    bus1553.VERBOSE = False
+    lines = [f"Adres yönlendirmeli bus: RT sayısına göre toplam okuma işlemi/s ({seconds:g} s, her RT ayrı thread)",
+             "  RT   sıralı işlem/s   boru hattı işlem/s   RT başına min/max (boru hattı)   yayın alan"]
+    try:
+        for n in counts:
+            seq, _, _ = _multi_rt(n, seconds, False)
+            pipe, per_rt, got = _multi_rt(n, seconds, True)
+            lo, hi = min(per_rt.values()), max(per_rt.values())
+            lines.append(f"  {n:2d}   {seq:14.0f}   {pipe:18.0f}   {lo:14d}/{hi:<14d}   {got:2d}/{n}")
+    finally:
+        bus1553.VERBOSE = saved
+    return "\n".join(lines)
+
+
+def bench_codec(n=1_000_000, n_scalar=50_000):
+    """Toplu codec'i n karede, tekli codec'i n_scalar karede ölçer (kare başına maliyet karşılaştırılır)."""
+    rng = np.random.default_rng(0)
+    imu = {k: rng.normal(0.0, 2.0, n) for k in IMU_COLS}
+    imu["az"] += 9.8
+    imu["temp_c"] = rng.uniform(20.0, 60.0, n)
+    ekf = {k: rng.normal(0.0, 20.0, n) for k in EKF_COLS}
+    m = min(n, n_scalar)
+    lines = [f"Kare codec'i: toplu {n} kare, tekli {m} kare (ns/kare)"]
+    for label, cols, pack1, unpack1, packN, unpackN in [
+            ("IMU", imu, pack_imu_words, unpack_imu_words, pack_imu_batch, unpack_imu_batch),
+            ("EKF", ekf, pack_ekf_words, unpack_ekf_words, pack_ekf_batch, unpack_ekf_batch)]:
+        rows = [{k: float(v[i]) for k, v in cols.items()} for i in range(m)]
+        t0 = time.perf_counter()
+        frames = [pack1(r, i) for i, r in enumerate(rows)]
+        t1 = time.perf_counter()
+        for f in frames:
+            unpack1(f)
+        t2 = time.perf_counter()
+        words, ok = packN(cols, 0)
+        t3 = time.perf_counter()
+        out, valid = unpackN(words)
+        t4 = time.perf_counter()
+        assert words[:m].tolist() == frames and ok.all() and valid.all()
+        sp, su = (t1 - t0) / m * 1e9, (t2 - t1) / m * 1e9
+        bp, bu = (t3 - t2) / n * 1e9, (t4 - t3) / n * 1e9
+        lines.append(f"  {label} kodla : tekli {sp:8.0f}  toplu {bp:6.1f}  ({sp / bp:5.0f}x)")
+        lines.append(f"  {label} çöz   : tekli {su:8.0f}  toplu {bu:6.1f}  ({su / bu:5.0f}x)  "
+                     f"-> {n} kare {(t4 - t3) * 1e3:.0f} ms")
+    return "\n".join(lines)
+
+
+def bench_capture(n=1_000_000):
+    """n IMU karesi (500 Hz) yakalamaya yazılır, sonra memmap okuyucuyla dilimlenip çözülür."""
+    from bus_capture import CaptureWriter, CaptureReader, INDEX_SUFFIX
+    rng = np.random.default_rng(0)
+    cols = {k: rng.normal(0.0, 2.0, n) for k in IMU_COLS}
+    frames, _ = pack_imu_batch(cols, seq=0)
+    t_ns = np.arange(n, dtype=np.int64) * 2_000_000
+    cmd = make_command_field(1, 1, SA_IMU, FRAME_WORDS)
+    path = os.path.join(tempfile.mkdtemp(prefix="cap1553_"), "bench.b1553")
+    lines = [f"İkili yakalama, {n} IMU karesi (500 Hz, {n / 500 / 3600:.2f} saat)"]
+    try:
+        t0 = time.perf_counter()
+        with CaptureWriter(path) as w:
+            for i in range(0, n, 1 << 16):
+                w.append_batch(t_ns[i:i + (1 << 16)], cmd, 1 << 11, frames[i:i + (1 << 16)])
+        t1 = time.perf_counter()
+        r = CaptureReader(path)
+        t2 = time.perf_counter()
+        r = CaptureReader(path)
+        t3 = time.perf_counter()
+        mid = n / 500 / 2
+        sl = r.time_slice(mid, mid + 60.0)
+        t4 = time.perf_counter()
+        sq = r.seq_slice(1, SA_IMU, n // 2, n // 2 + 30000)
+        t5 = time.perf_counter()
+        out, valid = r.decode_imu()
+        t6 = time.perf_counter()
+        ref, _ = unpack_imu_batch(frames)
+        lossless = all(np.array_equal(ref[k], out[k]) for k in ref)
+        size = os.path.getsize(path)
+        lines += [
+            f"  yazma          : {(t1 - t0) * 1e3:8.1f} ms  ({size / 1e6:.1f} MB, {size / n:.0f} B/kare)",
+            f"  açma + indeks  : {(t2 - t1) * 1e3:8.1f} ms  (ilk açılış, indeks kurulur)",
+            f"  yeniden açma   : {(t3 - t2) * 1e3:8.1f} ms  (indeks yan dosyadan)",
+            f"  zaman dilimi   : {(t4 - t3) * 1e3:8.3f} ms  (60 s, {len(sl)} kayıt)",
+            f"  seq dilimi     : {(t5 - t4) * 1e3:8.3f} ms  ({len(sq)} kayıt)",
+            f"  toplu çözme    : {(t6 - t5) * 1e3:8.1f} ms  ({int(valid.sum())} geçerli kare)",
+            f"  kayıpsız       : {'evet' if lossless else 'HAYIR'}",
+        ]
+    finally:
+        for p in (path, path + INDEX_SUFFIX):
+            if os.path.exists(p):
+                os.remove(p)
+        os.rmdir(os.path.dirname(path))
+    return "\n".join(lines)
+
+
+def _monitored_rate(bus, bc, mode, seconds):
+    """
+    Çalışan RT thread'ine karşı BC rx_from_rt döngüsü, süre boyunca işlem/s. mode: "off" (tap yok),
+    "tap" (yalnız halkaya kopyalama, okuyan yok), "monitor" (tap + yeniden kurma thread'i). Monitor
+    bloğun sonunda durdurulur; kalan partinin işlenmesi de bloğun CPU'suna yazılır.
+    Dönüş: (işlem/s, süreç CPU µs/işlem, BC'nin saydığı işlem, monitor ya da None).
+    """
+    mon = None
+    if mode == "tap":
+        bus.tap = MonitorTap(1 << 20)
+    elif mode == "monitor":
+        mon = BusMonitor(bus).start()
+    n = 0
+    c0 = time.process_time()
+    t0 = time.perf_counter()
+    t_end = t0 + seconds
+    while time.perf_counter() < t_end:
+        if bc.rx_from_rt(1, SA_IMU, FRAME_WORDS, timeout=1.0):
+            n += 1
+    rate = n / (time.perf_counter() - t0)
+    if mon is not None:
+        mon.stop()
+    cpu_us = (time.process_time() - c0) / max(1, n) * 1e6
+    bus.tap = None
+    return rate, cpu_us, n, mon
+
+
+def bench_monitor(seconds=0.5, rounds=15):
+    saved = bus1553.VERBOSE
+    bus1553.VERBOSE = False
+    rates = {"off": [], "tap": [], "monitor": []}
+    cpus = {k: [] for k in rates}
+    checks = []
+    # Tek bus + tek RT thread'i: modlar aynı süreçte, bloklar halinde iç içe ölçülür (thread başlatma
+    # ve ısınma farkı ölçüme girmez; ısınma/frekans kayması modlara eşit dağılır)
+    bus = Bus1553()
+    bc = BC1553(bus)
+    rt = RT1553(bus, rt_addr=1)
+    th = threading.Thread(target=rt.run_forever, daemon=True)
+    th.start()
+    try:
+        for _ in range(rounds):
+            for mode in rates:
+                rate, cpu_us, n, mon = _monitored_rate(bus, bc, mode, seconds)
+                rates[mode].append(rate)
+                cpus[mode].append(cpu_us)
+                if mon is not None:
+                    checks.append((n, mon.results[TX_OK], mon.transactions, mon.tap.dropped, mon.cpu_ns))
+    finally:
+        rt.stop()
+        th.join(timeout=2.0)
+        bus1553.VERBOSE = saved
+    med = {k: float(np.median(v)) for k, v in rates.items()}
+    cpu = {k: float(np.median(v)) for k, v in cpus.items()}
+    lines = [f"Pasif monitor maliyeti: BC rx_from_rt döngüsü + RT thread'i, {rounds} tur x {seconds:g} s (medyan)",
+             "  (süreç CPU'su / işlem: thread zamanlama gürültüsünden bağımsız maliyet; kayıp/artış aynı turdaki",
+             "   'monitor yok' ölçümüne oranların medyanı: turlar arası makine kayması oranda sadeleşir)"]
+    for label, k in [("monitor yok", "off"), ("yalnız tap (halka)", "tap"), ("tap + MT thread'i", "monitor")]:
+        line = (f"  {label:<20}: {med[k]:8.0f} işlem/s  (min {min(rates[k]):8.0f}, max {max(rates[k]):8.0f})  "
+                f"CPU {cpu[k]:6.2f} µs/işlem")
+        if k != "off":
+            loss = np.median(1.0 - np.array(rates[k]) / np.array(rates["off"])) * 100
+            extra = np.median(np.array(cpus[k]) / np.array(cpus["off"]) - 1.0) * 100
+            line += f"  |  işlem/s kaybı {loss:5.1f}%  CPU artışı {extra:5.1f}%"
+        lines.append(line)
+    bc_n = sum(c[0] for c in checks)
+    ok = sum(c[1] for c in checks)
+    lines.append(f"  MT yeniden kurma: BC {bc_n} işlem, MT {ok} ok / {sum(c[2] for c in checks)} toplam, "
+                 f"halka kaybı {sum(c[3] for c in checks)}")
+    lines.append(f"  MT thread CPU: {sum(c[4] for c in checks) / 1e3 / max(1, sum(c[2] for c in checks)):.2f} µs/işlem "
+                 f"({sum(c[4] for c in checks) / 1e9 / (rounds * seconds) * 100:.1f}% CPU)")
+    return "\n".join(lines)
+
+
+def _replay_workload(path, n):
+    """n turluk sabit iş yükünü (RT1/RT2 okuma, RT2 yazma, yayın) BusTrace olarak path'e kaydeder."""
+    bus = Bus1553(trace=BusTrace(capacity=n * 12 + 16))
+    bc = BC1553(bus)
+    rts = [RT1553(bus, rt_addr=a) for a in (1, 2)]
+    threads = [threading.Thread(target=rt.run_forever, daemon=True) for rt in rts]
+    for th in threads:
+        th.start()
+    for i in range(n):
+        bc.rx_from_rt(1, SA_IMU, FRAME_WORDS)
+        bc.tx_to_rt(2, 5, [i & 0xFFFF] * 7)
+        bc.rx_from_rt(2, SA_IMU, FRAME_WORDS)
+        if i % 10 == 0:
+            bc.tx_to_rt(BROADCAST_ADDR, 6, [i & 0xFFFF] * 4)
+    for rt in rts:
+        rt.stop()
+    for th in threads:
+        th.join(timeout=2.0)
+    bus.trace.save(path)
+
+
+def bench_replay(n=2000, rounds=5):
+    saved = bus1553.VERBOSE
+    bus1553.VERBOSE = False
+    path = os.path.join(tempfile.mkdtemp(prefix="bench1553_"), "workload.npz")
+    try:
+        _replay_workload(path, n)
+        trace = ReplayTrace.load(path)
+        runs = {"bc": [], "rt": []}
+        for _ in range(rounds):
+            for mode in runs:
+                runs[mode].append(BusReplay(trace, mode, speed=0.0).run())
+    finally:
+        bus1553.VERBOSE = saved
+        if os.path.exists(path):
+            os.remove(path)
+        os.rmdir(os.path.dirname(path))
+    lines = [f"Yeniden oynatma: {len(trace)} işlem (2 RT; okuma, yazma, yayın), {rounds} tur, olabildiğince hızlı (medyan)"]
+    for mode, label in (("bc", "bc (kayıtlı RT, canlı BC)"), ("rt", "rt (kayıtlı BC, canlı RT)")):
+        rs = runs[mode]
+        st = [r.stats() for r in rs]
+        lines.append(f"  {label:<26}: {np.median([s['rate_tps'] for s in st]):8.0f} işlem/s  "
+                     f"p50 {np.median([s['p50_us'] for s in st]):6.1f} µs  p99 {np.median([s['p99_us'] for s in st]):7.1f} µs  "
+                     f"kayıttan fark {sum(s['status_mismatch'] + s['data_mismatch'] + s['missing'] for s in st)}")
+    return "\n".join(lines)
+
+
+def _legacy_row_writer(outdir):
+    """Eski köprü yolu: örnek başına f-string'ler + csv.writer.writerow (bus sahibi thread'inde)."""
+    import csv
+    fps = {k: open(os.path.join(outdir, f"{k}_stream.csv"), "w", newline="") for k in ("imu", "ekf")}
+    w = {k: csv.writer(fp) for k, fp in fps.items()}
+    w["imu"].writerow(['t', 'seq', 'yaw', 'p', 'q', 'r', 'ax', 'ay', 'az', 'temp_c'])
+    w["ekf"].writerow(['t', 'seq', 'x', 'y', 'z', 'vx', 'vy', 'vz', 'roll', 'pitch', 'yaw'])
+
+    def on_message(msg, sample, now):
+        if msg.name == 'imu':
+            w["imu"].writerow([f'{now:.3f}', sample.get('seq', 0),
+                               f"{sample.get('yaw', 0.0):.6f}", f"{sample.get('p', 0.0):.6f}", f"{sample.get('q', 0.0):.6f}",
+                               f"{sample.get('r', 0.0):.6f}", f"{sample.get('ax', 0.0):.6f}", f"{sample.get('ay', 0.0):.6f}",
+                               f"{sample.get('az', 0.0):.6f}", f"{sample.get('temp_c', 0.0):.2f}"])
+        else:
+            w["ekf"].writerow([f'{now:.3f}', sample.get('seq', 0),
+                               f"{sample.get('x', 0.0):.6f}", f"{sample.get('y', 0.0):.6f}", f"{sample.get('z', 0.0):.6f}",
+                               f"{sample.get('vx', 0.0):.6f}", f"{sample.get('vy', 0.0):.6f}", f"{sample.get('vz', 0.0):.6f}",
+                               f"{sample.get('roll', 0.0):.6f}", f"{sample.get('pitch', 0.0):.6f}", f"{sample.get('yaw', 0.0):.6f}"])
+    return on_message, lambda: [fp.close() for fp in fps.values()]
+
+
+def _writer_run(mode, seconds, imu_hz, ekf_hz, outdir):
+    """
+    Köprünün çizelgesini mode ("rows" | "block") yazımıyla koşturur. Dönüş: (runner, örnek başına
+    bus thread'i maliyeti: rows'ta çözme + satır yazma, block'ta push).
+    """
+    from sensor1553 import SA_EKF
+    bus = Bus1553()
+    rt = RT1553(bus, rt_addr=1)
+    th = threading.Thread(target=rt.run_forever, daemon=True)
+    th.start()
+    sch = BusSchedule([BusMessage("imu", 1, SA_IMU, FRAME_WORDS, imu_hz),
+                       BusMessage("ekf", 1, SA_EKF, FRAME_WORDS, ekf_hz)])
+    cost = Histogram()
+    if mode == "rows":
+        # çözme de bus thread'inde (eski yolda BusMessage.decode): maliyete dahil edilir
+        decode = {"imu": unpack_imu_words, "ekf": unpack_ekf_words}
+        row, close = _legacy_row_writer(outdir)
+        write = lambda msg, words, now: row(msg, decode[msg.name](words), now)
+    else:
+        sw = StreamWriter(outdir).start()
+        write, close = (lambda msg, words, now: sw.push(msg.name, now, words)), sw.stop
+
+    def on_message(msg, sample, now):
+        t = time.perf_counter_ns()
+        write(msg, sample, now)
+        cost.record(time.perf_counter_ns() - t)
+
+    runner = BcScheduleRunner(BC1553(bus), sch, on_message=on_message).start()
+    time.sleep(seconds)
+    runner.stop()
+    close()
+    rt.stop()
+    th.join(timeout=2.0)
+    return runner, cost
+
+
+def bench_writer(seconds=3.0, rounds=3, imu_hz=500.0, ekf_hz=100.0):
+    saved = bus1553.VERBOSE
+    bus1553.VERBOSE = False
+    outdir = tempfile.mkdtemp(prefix="bench1553_")
+    res = {"rows": [], "block": []}
+    try:
+        for _ in range(rounds):
+            for mode in res:
+                res[mode].append(_writer_run(mode, seconds, imu_hz, ekf_hz, outdir))
+    finally:
+        bus1553.VERBOSE = saved
+        for root, dirs, files in os.walk(outdir, topdown=False):
+            for fn in files:
+                os.remove(os.path.join(root, fn))
+            for d in dirs:
+                os.rmdir(os.path.join(root, d))
+        os.rmdir(outdir)
+
+    def med(xs):
+        return float(np.median(xs))
+
+    lines = [f"Akış yazımı: IMU {imu_hz:g} Hz + EKF {ekf_hz:g} Hz çizelgesi, {rounds} tur x {seconds:g} s (medyan)",
+             f"  {'yol':<30}{'çöz+yaz µs p50/p99':>18}{'minor µs p50/p99':>20}{'jitter µs p50/p99':>20}{'başarılı':>10}"]
+    for mode, label in (("rows", "satır satır CSV (bus thread'i)"), ("block", "StreamWriter (blok, thread)")):
+        rs = res[mode]
+        c = [cost.stats_us() for _, cost in rs]
+        e = [r.sched.exec.stats_us() for r, _ in rs]
+        j = [r.sched.jitter.stats_us() for r, _ in rs]
+        ok = sum(st.ok for r, _ in rs for st in r.stats.values())
+        lines.append(f"  {label:<30}{med([x['p50_us'] for x in c]):8.1f}/{med([x['p99_us'] for x in c]):<9.1f}"
+                     f"{med([x['p50_us'] for x in e]):10.1f}/{med([x['p99_us'] for x in e]):<9.1f}"
+                     f"{med([x['p50_us'] for x in j]):10.1f}/{med([x['p99_us'] for x in j]):<9.1f}{ok:10d}")
+    return "\n".join(lines)
+
+
+_QUEUE_OPS = frozenset(("put", "get", "put_nowait", "get_nowait"))
+_LOCK_OPS = frozenset(("acquire", "release", "__enter__", "__exit__"))
+_LOCK_TYPES = (type(threading.Lock()), type(threading.RLock()))
+
+
+def _count_sync_ops(fn):
+    """
+    fn() süresince tüm thread'lerde kuyruk işlemleri (queue.Queue ve SimpleQueue put/get) ve kilit
+    işlemleri (Lock/RLock acquire/release, Condition içindekiler dahil) sayılır (sys.setprofile).
+    Dönüş: (kuyruk, kilit).
+    """
+    counts = {}
+
+    def prof(frame, event, arg):
+        if event == "call":
+            code = frame.f_code
+            if code.co_name in _QUEUE_OPS and code.co_filename == queue.__file__:
+                c = counts.setdefault(threading.get_ident(), [0, 0])
+                c[0] += 1
+        elif event == "c_call":
+            name = getattr(arg, "__name__", "")
+            owner = getattr(arg, "__self__", None)
+            if name in _QUEUE_OPS and isinstance(owner, queue.SimpleQueue):
+                counts.setdefault(threading.get_ident(), [0, 0])[0] += 1
+            elif name in _LOCK_OPS and isinstance(owner, _LOCK_TYPES):
+                counts.setdefault(threading.get_ident(), [0, 0])[1] += 1
+
+    threading.setprofile(prof)
+    sys.setprofile(prof)
+    try:
+        fn()
+    finally:
+        sys.setprofile(None)
+        threading.setprofile(None)
+    return sum(c[0] for c in counts.values()), sum(c[1] for c in counts.values())
+
+
+def _transact_run(transactions, n, write=False, count=False, hist=None):
+    """
+    Ayrı RT thread'ine karşı n BC işlemi (okuma: rx_from_rt IMU, write=True: tx_to_rt 14 kelime).
+    Gecikmeler hist'e (verilmezse yeni Histogram) yazılır. count=True: süre yerine kuyruk/kilit sayımı.
+    Dönüş: (Histogram, işlem/s, işlem başına (kuyruk, kilit) ya da None).
+    """
+    bus = Bus1553()
+    bc = BC1553(bus, transactions=transactions)
+    rt = RT1553(bus, rt_addr=1)
+    payload = list(range(FRAME_WORDS))
+    if write:
+        op = lambda: bc.tx_to_rt(1, 5, payload, timeout=1.0)
+    else:
+        op = lambda: bc.rx_from_rt(1, SA_IMU, FRAME_WORDS, timeout=1.0) is not None
+    hist = hist if hist is not None else Histogram()
+    ops = None
+
+    def loop():
+        for _ in range(n):
+            t = time.perf_counter_ns()
+            if not op():
+                raise RuntimeError("RT yanıt vermedi")
+            hist.record(time.perf_counter_ns() - t)
+
+    if count:
+        # RT thread'i profil kancası kurulduktan sonra başlar; boşta bekleyen rt_recv sayılmaz
+        ops = _count_sync_ops(lambda: (_start_rt(rt), loop()))
+        rate = 0.0
+    else:
+        _start_rt(rt)
+        t0 = time.perf_counter()
+        loop()
+        rate = n / (time.perf_counter() - t0)
+    rt.stop()
+    time.sleep(0.01)
+    if ops is not None:
+        ops = (ops[0] / n, ops[1] / n)
+    return hist, rate, ops
+
+
+def _start_rt(rt):
+    th = threading.Thread(target=rt.run_forever, daemon=True)
+    th.start()
+    return th
+
+
+def bench_transact(n=20000, rounds=5, n_count=2000):
+    saved = bus1553.VERBOSE
+    bus1553.VERBOSE = False
+    cases = [("okuma, kelime düzeyi", False, False), ("okuma, işlem düzeyi", True, False),
+             ("yazma, kelime düzeyi", False, True), ("yazma, işlem düzeyi", True, True)]
+    rates = {c: [] for c in cases}
+    hists = {c: Histogram() for c in cases}
+    ops = {}
+    try:
+        for c in cases:
+            ops[c] = _transact_run(c[1], n_count, c[2], count=True)[2]
+        for _ in range(rounds):
+            for c in cases:   # turlar iç içe: ısınma/frekans kayması durumlara eşit dağılır
+                rates[c].append(_transact_run(c[1], n, c[2], hist=hists[c])[1])
+    finally:
+        bus1553.VERBOSE = saved
+    lines = [f"BC işlemi (RT ayrı thread'de, 14 kelime), {rounds} tur x {n} işlem (medyan işlem/s); "
+             f"kuyruk/kilit sayımı {n_count} işlem, tüm thread'ler",
+             "  durum                      işlem/s     gecikme p50/p99 [µs]   kuyruk/işlem  kilit/işlem"]
+    for c in cases:
+        s = hists[c].stats_us()
+        q, k = ops[c]
+        lines.append(f"  {c[0]:<24} {np.median(rates[c]):9.0f}     {s['p50_us']:8.1f}/{s['p99_us']:<8.1f}     "
+                     f"{q:8.2f}     {k:8.2f}")
+    for i in (0, 2):
+        w, t = cases[i], cases[i + 1]
+        lines.append(f"  {w[0].split(',')[0]}: işlem/s {np.median(rates[t]) / np.median(rates[w]):4.2f}x, "
+                     f"kuyruk işlemi {ops[w][0] / ops[t][0]:4.2f}x, kilit işlemi {ops[w][1] / ops[t][1]:4.2f}x az")
+    return "\n".join(lines)
+
+
+def _gil_load(stop):
+    """Çizim döngüsü benzeri saf Python yükü: GIL'i yalnızca switch aralığında bırakır."""
+    while not stop.is_set():
+        sum(i * i for i in range(2000))
+
+
+def _shm_run(transport, seconds, load, sim, hist):
+    """
+    BC rx_from_rt (IMU) döngüsü; transport "queue": Bus1553 + RT thread'i (aynı süreç), "shm": ShmBus +
+    ShmRtProcess. load=True: BC sürecinde GIL yükü thread'i. Gecikmeler hist'e. Dönüş: (işlem/s, yanıtsız).
+    """
+    if transport == "shm":
+        bus = ShmBus(addrs=(1,))
+        rtp = ShmRtProcess(bus, addr=1, sim=sim).start()
+        stop_rt = rtp.stop
+    else:
+        from bus_shm import make_rt
+        bus = Bus1553()
+        rt = make_rt(bus, 1, sim)
+        th = _start_rt(rt)
+        stop_rt = lambda: (rt.stop(), th.join(timeout=2.0))
+    bc = BC1553(bus)
+    stop = threading.Event()
+    loader = threading.Thread(target=_gil_load, args=(stop,), daemon=True) if load else None
+    if loader is not None:
+        loader.start()
+    n = fail = 0
+    try:
+        t0 = time.perf_counter()
+        t_end = t0 + seconds
+        while time.perf_counter() < t_end:
+            t = time.perf_counter_ns()
+            if bc.rx_from_rt(1, SA_IMU, FRAME_WORDS, timeout=1.0) is None:
+                fail += 1
+            hist.record(time.perf_counter_ns() - t)
+            n += 1
+        rate = n / (time.perf_counter() - t0)
+    finally:
+        stop.set()
+        if loader is not None:
+            loader.join(timeout=2.0)
+        stop_rt()
+        if transport == "shm":
+            bus.close()
+    return rate, fail
+
+
+def bench_shm(seconds=1.0, rounds=5, sim=True):
+    saved = bus1553.VERBOSE
+    bus1553.VERBOSE = False
+    cases = [(t, load) for load in (False, True) for t in ("queue", "shm")]
+    rates = {c: [] for c in cases}
+    hists = {c: Histogram() for c in cases}
+    fails = dict.fromkeys(cases, 0)
+    try:
+        for _ in range(rounds):
+            for c in cases:   # turlar iç içe: ısınma/frekans kayması durumlara eşit dağılır
+                rate, fail = _shm_run(c[0], seconds, c[1], sim, hists[c])
+                rates[c].append(rate)
+                fails[c] += fail
+    finally:
+        bus1553.VERBOSE = saved
+    lines = [f"BC IMU okuma işlemi (işlem düzeyi), RT {'IMU sim + EKF ile' if sim else 'boş'}, "
+             f"{rounds} tur x {seconds:g} s (medyan işlem/s), CPU: {os.cpu_count()}",
+             "  taşıma                         yük            işlem/s   gecikme p50/p99/max [µs]   yanıtsız"]
+    names = {"queue": "süreç içi kuyruk (RT thread'i)", "shm": "shared memory (RT süreci)"}
+    for c in cases:
+        s = hists[c].stats_us()
+        lines.append(f"  {names[c[0]]:<30} {'GIL yükü' if c[1] else 'boşta':<12} {np.median(rates[c]):9.0f}   "
+                     f"{s['p50_us']:8.1f}/{s['p99_us']:8.1f}/{s['max_us']:9.1f}   {fails[c]:6d}")
+    return "\n".join(lines)
+
+
+class _CostlyEKF:
+    """EKF + her adımda extra_ms saf Python yükü (daha pahalı bir filtrenin benzeri)."""
+    def __init__(self, extra_ms):
+        from ekf import EKF
+        self._ekf = EKF()
+        self.extra_s = extra_ms / 1e3
+
+    @property
+    def X(self):
+        return self._ekf.X
+
+    def step(self, dt, gz, v_odo, w_odo):
+        out = self._ekf.step(dt, gz, v_odo, w_odo)
+        t_end = time.perf_counter() + self.extra_s
+        while time.perf_counter() < t_end:
+            pass
+        return out
+
+
+class _InlineFusionRT(RT1553):
+    """Karşılaştırma: filtre transmit yanıt yolunda adımlanır (füzyon döngüsü yok)."""
+    def _payload_ekf(self):
+        self.ekf.step(0.01, self.last_gz, self.last_v_odo, self.last_gz)
+        return super()._payload_ekf()
+
+
+def _fusion_run(mode, seconds, extra_ms, read_hz, fusion_hz, hist):
+    """
+    mode: "inline_old" (eski: anında sim + paketleme, EKF adımlanmaz), "inline_ekf" (EKF de yanıt yolunda),
+    "fusion" (füzyon döngüsü + çift tampon). BC read_hz hızında IMU/EKF okur; gecikmeler hist'e.
+    Dönüş: (okuma sayısı, yanıtsız, RT).
+    """
+    from imu_sim import ImuSim
+    bus = Bus1553()
+    bc = BC1553(bus)
+    ekf = _CostlyEKF(extra_ms)
+    if mode == "inline_ekf":
+        rt = _InlineFusionRT(bus, rt_addr=1, sim=ImuSim(), ekf=ekf)
+    else:
+        rt = RT1553(bus, rt_addr=1, sim=ImuSim(), ekf=ekf, fusion_hz=fusion_hz if mode == "fusion" else None)
+    th = _start_rt(rt)
+    n = fail = 0
+    period = 1.0 / read_hz
+    t_next = time.perf_counter()
+    t_end = t_next + seconds
+    while t_next < t_end:
+        sa = SA_IMU if n % 2 == 0 else SA_EKF
+        t = time.perf_counter_ns()
+        if bc.rx_from_rt(1, sa, FRAME_WORDS, timeout=1.0) is None:
+            fail += 1
+        hist.record(time.perf_counter_ns() - t)
+        n += 1
+        t_next += period
+        delay = t_next - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    rt.stop()
+    th.join(timeout=2.0)
+    return n, fail, rt
+
+
+def bench_fusion(seconds=2.0, rounds=3, extra_ms=2.0, read_hz=200.0, fusion_hz=100.0):
+    saved = bus1553.VERBOSE
+    bus1553.VERBOSE = False
+    cases = [("anında (eski; EKF adımlanmaz)", "inline_old", 0.0),
+             ("anında, EKF yanıt yolunda", "inline_ekf", 0.0),
+             (f"anında, EKF + {extra_ms:g} ms yanıt yolunda", "inline_ekf", extra_ms),
+             (f"füzyon {fusion_hz:g} Hz + çift tampon", "fusion", 0.0),
+             (f"füzyon {fusion_hz:g} Hz, EKF + {extra_ms:g} ms", "fusion", extra_ms)]
+    hists = {c: Histogram() for c in cases}
+    counts = dict.fromkeys(cases, 0)
+    fails = dict.fromkeys(cases, 0)
+    lines_rt = {}
+    try:
+        for _ in range(rounds):
+            for c in cases:   # turlar iç içe: ısınma/frekans kayması durumlara eşit dağılır
+                n, fail, rt = _fusion_run(c[1], seconds, c[2], read_hz, fusion_hz, hists[c])
+                counts[c] += n
+                fails[c] += fail
+                if rt.sched is not None:
+                    lines_rt[c] = rt.fusion_line()
+    finally:
+        bus1553.VERBOSE = saved
+    lines = [f"RT transmit yanıt gecikmesi (BC rx_from_rt, IMU/EKF dönüşümlü, {read_hz:g} okuma/s), "
+             f"{rounds} tur x {seconds:g} s",
+             "  durum                                   okuma   gecikme p50/p90/p99/max [µs]          yanıtsız"]
+    for c in cases:
+        h = hists[c]
+        s = h.stats_us()
+        lines.append(f"  {c[0]:<38} {counts[c]:6d}   {s['p50_us']:7.1f}/{h.percentile_ns(0.9) / 1e3:7.1f}/"
+                     f"{s['p99_us']:7.1f}/{s['max_us']:8.1f}     {fails[c]:4d}")
+    for c, line in lines_rt.items():
+        lines.append(f"  son tur, {c[0]}: {line}")
+    return "\n".join(lines)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="1553 bus simülasyonu ölçümleri")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("logging", help="Log ayarlarına göre Bus1553 mesaj hızı")
+    p.add_argument("--n", type=int, default=50000, help="İşlem sayısı")
+    p.add_argument("--rounds", type=int, default=3, help="Tur sayısı (medyan)")
+    p = sub.add_parser("frames", help="list[int] vs havuzlu Frame taşıma maliyeti")
+    p.add_argument("--n", type=int, default=50000, help="İşlem sayısı")
+    p.add_argument("--rounds", type=int, default=5, help="Tur sayısı (medyan)")
+    p = sub.add_parser("rt", help="RT komut -> durum gecikmesi: eski uyuyan döngü vs olay güdümlü")
+    p.add_argument("--n", type=int, default=2000, help="İşlem sayısı (eski döngü en fazla 200)")
+    p.add_argument("--burst", type=int, default=8, help="Grup halinde gönderilen komut sayısı")
+    p = sub.add_parser("rts", help="RT sayısına göre toplam işlem/s (adres yönlendirme)")
+    p.add_argument("--seconds", type=float, default=1.0, help="Her ölçüm için süre (s)")
+    p = sub.add_parser("codec", help="Tekli vs toplu IMU/EKF kare codec'i")
+    p.add_argument("--n", type=int, default=1_000_000, help="Toplu codec kare sayısı")
+    p = sub.add_parser("capture", help="İkili yakalama yazma/dilimleme/çözme")
+    p.add_argument("--n", type=int, default=1_000_000, help="Kare sayısı")
+    p = sub.add_parser("monitor", help="Pasif monitor bağlıyken işlem/s kaybı")
+    p.add_argument("--seconds", type=float, default=0.5, help="Tur başına mod süresi")
+    p.add_argument("--rounds", type=int, default=15)
+    p = sub.add_parser("replay", help="Sabit iş yükünü bc/rt kiplerinde yeniden oynat")
+    p.add_argument("--n", type=int, default=2000, help="İş yükü tur sayısı (tur başına ~3 işlem)")
+    p.add_argument("--rounds", type=int, default=5)
+    p = sub.add_parser("writer", help="Satır satır CSV vs blok halinde StreamWriter (bus thread'i maliyeti)")
+    p.add_argument("--seconds", type=float, default=3.0)
+    p.add_argument("--rounds", type=int, default=3)
+    p.add_argument("--imu-hz", type=float, default=500.0)
+    p.add_argument("--ekf-hz", type=float, default=100.0)
+    p = sub.add_parser("transact", help="Kelime düzeyi vs işlem düzeyi BC/RT işlemi (işlem/s, kuyruk/kilit sayısı)")
+    p.add_argument("--n", type=int, default=20000, help="Tur başına işlem sayısı")
+    p.add_argument("--rounds", type=int, default=5)
+    p = sub.add_parser("shm", help="Süreç içi kuyruk vs shared memory halkası (RT ayrı süreçte)")
+    p.add_argument("--seconds", type=float, default=1.0, help="Tur başına durum süresi")
+    p.add_argument("--rounds", type=int, default=5)
+    p.add_argument("--no-sim", action="store_true", help="RT IMU sim + EKF olmadan (boş yanıt)")
+    p = sub.add_parser("fusion", help="RT yanıt gecikmesi: anında üretim vs füzyon döngüsü + çift tampon")
+    p.add_argument("--seconds", type=float, default=2.0, help="Tur başına durum süresi")
+    p.add_argument("--rounds", type=int, default=3)
+    p.add_argument("--filter-ms", type=float, default=2.0, help="Filtre adımına eklenen yük (ms)")
+    p.add_argument("--read-hz", type=float, default=200.0, help="BC okuma hızı")
+    p.add_argument("--fusion-hz", type=float, default=100.0, help="RT füzyon döngüsü frekansı")
+    args = ap.parse_args()
+
+    if args.cmd == "logging":
+        print(bench_logging(args.n, args.rounds))
+    elif args.cmd == "frames":
+        print(bench_frames(args.n, args.rounds))
+    elif args.cmd == "rt":
+        print(bench_rt(args.n, args.burst))
+    elif args.cmd == "rts":
+        print(bench_rts(args.seconds))
+    elif args.cmd == "codec":
+        print(bench_codec(args.n))
+    elif args.cmd == "capture":
+        print(bench_capture(args.n))
+    elif args.cmd == "monitor":
+        print(bench_monitor(args.seconds, args.rounds))
+    elif args.cmd == "replay":
+        print(bench_replay(args.n, args.rounds))
+    elif args.cmd == "writer":
+        print(bench_writer(args.seconds, args.rounds, args.imu_hz, args.ekf_hz))
+    elif args.cmd == "transact":
+        print(bench_transact(args.n, args.rounds))
+    elif args.cmd == "shm":
+        print(bench_shm(args.seconds, args.rounds, not args.no_sim))
+    elif args.cmd == "fusion":
+        print(bench_fusion(args.seconds, args.rounds, args.filter_ms, args.read_hz, args.fusion_hz))
+
+
+if __name__ == "__main__":
+    main()
@@ -14,16 +14,39 @@ Env değişkenleri:
 
   BUS1553_LOG_FILE=/path.log-> dosyaya da log yaz
 
+  BUS1553_TRACE=65536       -> her Bus1553 için bu kapasitede ikili trace halkası aç (varsayılan: 0 = kapalı)
+
+Paket logları tembeldir: seviye DEBUG değilse hiç iş yapılmaz, DEBUG ise kelimeler yalnızca bir
+handler kaydı gerçekten biçimlendirdiğinde çözülür (havuzlu çerçevelerin kelimeleri o an kopyalanır).
+Ucuz kalıcı iz için BusTrace (ham kelime + zaman damgası, sınırlı halka) kullanılır; numpy'a çevirme
+ve çözme yalnızca snapshot()/dump() sırasında yapılır.
+
 """
 
 
 
 import os
 
+import sys
+
 import queue
 
+import time
+
 import logging
 
+import array
+
+import itertools
+
+import threading
+
+import collections
+
+import numpy as np
+
+perf_counter_ns = time.perf_counter_ns
+
 
 
 # 1553 Word tipleri
@@ -76,6 +99,8 @@ LOGGER = _mk_logger()
 
 VERBOSE = os.getenv("BUS1553_LOG", "1").lower() in ("1", "true", "on", "yes")
 
+TRACE_CAPACITY = int(os.getenv("BUS1553_TRACE", "0") or 0)
+
 
 
 
@@ -179,8 +204,356 @@ def _decode_words(words, direction):
 
 
 
+class _LazyDecode:
+    """LOGGER.debug("%s", _LazyDecode(...)): metin yalnızca handler kaydı biçimlendirirse üretilir."""
+    __slots__ = ("words", "direction")
+
+    def __init__(self, words, direction):
+        self.words = words
+        self.direction = direction
+
+    def __str__(self):
+        return _decode_words(self.words, self.direction)
+
+
+
+def _log_words(words, direction):
+    if VERBOSE and LOGGER.isEnabledFor(logging.DEBUG):
+        # Havuzlu çerçeve çağrıdan hemen sonra iade edilip yeniden kullanılır; kaydı sonradan
+        # biçimlendiren handler'lar (QueueHandler/QueueListener) için kelimeler şimdi kopyalanır.
+        if isinstance(words, BusRequest):
+            words = words.frame
+        if isinstance(words, Frame):
+            words = words.tolist()
+        LOGGER.debug("%s", _LazyDecode(words, direction))
+
+
+
+# -------------------- Havuzlu kelime çerçeveleri --------------------
+
+MAX_FRAME_WORDS = 33   # komut/durum + 32 veri kelimesi
+
+# uint32 kelimenin bayt düzeni: field düşük 16 bit, sync 3. bayt (bit 16-17)
+_FIELD_H = 0 if sys.byteorder == "little" else 1
+_SYNC_B = 2 if sys.byteorder == "little" else 1
+_SYNC_FILL = {s: bytes([s]) * MAX_FRAME_WORDS for s in (0, 1, 2, 3)}
+
+
+class Frame:
+    """
+    Havuzdan alınan array('I') kelime tamponu (sync << 16 | field). Bus kuyruğunda liste yerine
+    referansla taşınır; field/sync, tampon üzerindeki adımlı memoryview'lerle (16-bit yarılar ve
+    sync baytları) kelime döngüsü olmadan yazılır/okunur. Tüketen taraf işi bitince release()
+    ile havuza geri verir. Liste gibi de okunabilir (len/iter/indeks).
+    Tek kelimelik çerçeveler (komut/durum) doğrudan yazılır. _sync/_sn: 1.._sn-1 kelimelerinde zaten
+    _sync tipi yazılı; aynı tipte yeniden doldurmada sync baytları tekrar yazılmaz. Tampona dışarıdan
+    ham kelime yazan taraf load() kullanır.
+    """
+    __slots__ = ("buf", "n", "pool", "free", "_h", "_b", "_sync", "_sn")
+
+    def __init__(self, max_words, pool):
+        self.buf = array.array("I", bytes(4 * max_words))
+        self._b = memoryview(self.buf).cast("B")
+        self._h = self._b.cast("H")
+        self.n = 0
+        self.pool = pool
+        self.free = True
+        self._sync = -1
+        self._sn = 0
+
+    def fill(self, sync, fields):
+        n = len(fields)
+        if n == 1:
+            # Tek kelime (komut/durum): adımlı memoryview dilimleri yerine doğrudan yazım
+            self.buf[0] = (sync << 16) | (fields[0] & 0xFFFF)
+            self.n = 1
+            return self
+        if n > len(self.buf):
+            raise ValueError(f"Çerçeve kapasitesi aşıldı: {n} > {len(self.buf)}")
+        if fields.__class__ is array.array and fields.typecode == "H":
+            h = fields                 # önceden paketlenmiş alanlar (ör. RT füzyon tamponu)
+        else:
+            try:
+                h = array.array("H", fields)
+            except OverflowError:
+                h = array.array("H", [w & 0xFFFF for w in fields])
+        self._h[_FIELD_H:_FIELD_H + 2 * n:2] = h
+        if sync != self._sync or n > self._sn:
+            self._b[_SYNC_B:_SYNC_B + 4 * n:4] = _SYNC_FILL[sync][:n]
+            self._sync, self._sn = sync, n
+        else:
+            self._b[_SYNC_B] = sync
+        self.n = n
+        return self
+
+    def load(self, words, n):
+        """Ham kelimeleri (uint32 tampon/memoryview) kopyalar."""
+        memoryview(self.buf)[:n] = words
+        self.n = n
+        self._sn = 0
+        return self
+
+    def syncs(self):
+        return self._b[_SYNC_B:_SYNC_B + 4 * self.n:4].tolist()
+
+    def fields(self, sync=None):
+        """16-bit alanlar (list[int]); sync verilirse yalnızca o tipteki kelimeler."""
+        n = self.n
+        if n == 1:
+            w = self.buf[0]
+            return [w & 0xFFFF] if sync is None or (w >> 16) & 0b11 == sync else []
+        out = self._h[_FIELD_H:_FIELD_H + 2 * n:2].tolist()
+        if sync is None or (sync == self._sync and n <= self._sn and self._b[_SYNC_B] == sync):
+            return out   # tüm kelimeler bu tipte (fill ile yazıldı): sync baytları taranmaz
+        s = self._b[_SYNC_B:_SYNC_B + 4 * n:4]
+        if s == _SYNC_FILL[sync][:n]:
+            return out   # tek tip çerçeve (olağan durum): süzme gerekmez
+        return list(itertools.compress(out, [x == sync for x in s.tolist()]))
+
+    def tolist(self):
+        return self.buf[:self.n].tolist()
+
+    def __len__(self):
+        return self.n
+
+    def __iter__(self):
+        return iter(self.buf[:self.n].tolist())
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return self.buf[:self.n][i].tolist()
+        if i < 0:
+            i += self.n
+        if not 0 <= i < self.n:
+            raise IndexError("Frame indeksi aralık dışında")
+        return self.buf[i]
+
+    def fill_msg(self, head_sync, head, sync=SYNC_DATA, fields=()):
+        """
+        Tek mesajlık işlem çerçevesi: başlık kelimesi (komut ya da durum) + aynı tipte gövde
+        kelimeleri (ör. komut + BC -> RT veri, durum + RT -> BC veri).
+        """
+        n = len(fields) + 1
+        if n > len(self.buf):
+            raise ValueError(f"Çerçeve kapasitesi aşıldı: {n} > {len(self.buf)}")
+        if n > 1:
+            if fields.__class__ is array.array and fields.typecode == "H":
+                h = fields
+            else:
+                try:
+                    h = array.array("H", fields)
+                except OverflowError:
+                    h = array.array("H", [w & 0xFFFF for w in fields])
+            self._h[_FIELD_H + 2:_FIELD_H + 2 * n:2] = h
+            if sync != self._sync or n > self._sn:
+                self._b[_SYNC_B + 4:_SYNC_B + 4 * n:4] = _SYNC_FILL[sync][:n - 1]
+                self._sync, self._sn = sync, n
+        self.buf[0] = (head_sync << 16) | (head & 0xFFFF)
+        self.n = n
+        return self
+
+    def release(self):
+        if self.pool is not None:
+            self.pool.release(self)
+
+
+class FramePool:
+    """
+    Önceden ayrılmış size adet çerçeve (her biri max_words kelimelik array('I')). acquire/release
+    thread-safe (deque append/pop atomik). Havuz boşsa yeni çerçeve ayrılır (misses), dolu
+    havuza iade edilen fazlalık bırakılır (deque maxlen).
+    """
+    def __init__(self, size=64, max_words=MAX_FRAME_WORDS):
+        self.size = int(size)
+        self.max_words = int(max_words)
+        self._free = collections.deque((Frame(self.max_words, self) for _ in range(self.size)),
+                                       maxlen=self.size)
+        self.acquired = 0
+        self.misses = 0
+
+    def acquire(self, sync=None, fields=None):
+        try:
+            f = self._free.pop()
+        except IndexError:
+            self.misses += 1
+            f = Frame(self.max_words, self)
+        f.free = False
+        self.acquired += 1
+        if fields is not None:
+            f.fill(sync, fields)
+        return f
+
+    def acquire_msg(self, head_sync, head, sync=SYNC_DATA, fields=()):
+        """Başlık + gövde kelimeli işlem çerçevesi (Frame.fill_msg)."""
+        return self.acquire().fill_msg(head_sync, head, sync, fields)
+
+    def clone(self, frame):
+        """Aynı kelimelerle yeni çerçeve (yayın kopyaları için)."""
+        return self.acquire().load(memoryview(frame.buf)[:frame.n], frame.n)
+
+    def release(self, f):
+        if f.free:
+            return
+        f.free = True
+        f.n = 0
+        self._free.append(f)
+
+    def available(self):
+        return len(self._free)
+
+
+
+def recv_fields(obj, sync):
+    """
+    Bus'tan gelen nesnedeki (Frame ya da list[int]) istenen tipteki 16-bit alanlar (list[int]).
+    Frame ise havuza iade edilir.
+    """
+    if isinstance(obj, Frame):
+        out = obj.fields(sync)
+        obj.release()
+        return out
+    if not isinstance(obj, list):
+        obj = [obj]
+    return [w & 0xFFFF for w in obj if ((w >> 16) & 0b11) == sync]
+
+
+
+# -------------------- İkili trace halkası --------------------
+
+DIR_BC_TO_RT = 0
+DIR_RT_TO_BC = 1
+_DIR_NAMES = ("BC->RT", "RT->BC")
+
+
+class BusTrace:
+    """
+    Bus mesajlarının ham kelimeleri + perf_counter_ns zaman damgası (son capacity kayıt).
+    record() yalnızca (zaman, yön, kelime kopyası) demetini sınırlı bir deque'ya ekler: append GIL
+    altında atomiktir (kilit/sayaç yok), en eski kayıt kendiliğinden düşer. numpy dizilerine çevirme
+    snapshot(), çözme/biçimlendirme dump() çağrılınca yapılır.
+    """
+    def __init__(self, capacity=65536, max_words=33):
+        self.capacity = int(capacity)
+        self.max_words = int(max_words)
+        self._ring = collections.deque(maxlen=self.capacity)
+
+    @property
+    def count(self):
+        """Halkadaki kayıt sayısı (en fazla capacity)."""
+        return len(self._ring)
+
+    def record(self, direction, words):
+        # Frame havuza dönünce yeniden yazılır: kelimeler kopyalanır (array dilimi / tuple)
+        self._ring.append((time.perf_counter_ns(), direction,
+                           words.buf[:words.n] if words.__class__ is Frame else tuple(words)))
+
+    def clear(self):
+        self._ring.clear()
+
+    def _records(self):
+        # list(deque) C düzeyinde kopyalar; araya bir append girerse (deque değişti) yeniden dene
+        while True:
+            try:
+                return list(self._ring)
+            except RuntimeError:
+                continue
+
+    def snapshot(self, last=None):
+        """Eskiden yeniye (t_ns, dir, nw, words) numpy dizileri."""
+        recs = self._records()
+        if last is not None:
+            recs = recs[max(len(recs) - int(last), 0):]
+        n, mw = len(recs), self.max_words
+        t_ns = np.fromiter((r[0] for r in recs), dtype=np.int64, count=n)
+        d = np.fromiter((r[1] for r in recs), dtype=np.uint8, count=n)
+        lens = np.fromiter((len(r[2]) for r in recs), dtype=np.int64, count=n)
+        flat = np.fromiter(itertools.chain.from_iterable(r[2] for r in recs), dtype=np.uint32,
+                           count=int(lens.sum()))
+        # Düz kelime dizisini satırlara dağıt (max_words'ten uzun mesajlar kırpılır)
+        rows = np.repeat(np.arange(n), lens)
+        cols = np.arange(len(flat)) - np.repeat(np.cumsum(lens) - lens, lens)
+        keep = cols < mw
+        words = np.zeros((n, mw), dtype=np.uint32)
+        words[rows[keep], cols[keep]] = flat[keep]
+        return t_ns, d, np.minimum(lens, mw).astype(np.uint8), words
+
+    def dump(self, last=None):
+        """Kayıtları çözülmüş metin satırları olarak döndürür (t: ilk kayda göre ms)."""
+        t_ns, d, nw, words = self.snapshot(last)
+        if not len(t_ns):
+            return []
+        t0 = t_ns[0]
+        return [f"{(t - t0) / 1e6:12.3f} ms " + _decode_words(words[i, :nw[i]].tolist(), _DIR_NAMES[d[i]])
+                for i, t in enumerate(t_ns)]
+
+    def save(self, path):
+        t_ns, d, nw, words = self.snapshot()
+        np.savez(path, t_ns=t_ns, dir=d, nw=nw, words=words)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as z:
+            tr = cls(capacity=max(1, len(z["t_ns"])), max_words=z["words"].shape[1])
+            tr._ring.extend(zip(z["t_ns"].tolist(), z["dir"].tolist(),
+                                (tuple(w[:k]) for w, k in zip(z["words"].tolist(), z["nw"].tolist()))))
+        return tr
+
+
+
 # -------------------- Bus Sınıfı --------------------
 
+# rt_wake() ile RT kuyruğuna konan uyandırma işareti (bus mesajı değildir)
+WAKE = object()
+
+
+
+class BusRequest:
+    """
+    İşlem düzeyi istek (Bus1553.transact): frame tek çerçevede komut kelimesi + BC -> RT veri
+    kelimeleri. RT, rt_reply ile yanıt çerçevesini (durum + RT -> BC veri) reply'a yazar ve isteği
+    tamamlar; BC tek kilit beklemesiyle uyanır. Zaman aşımından sonra gelen yanıt atılır ve
+    çerçevesi havuza döner (Bus1553.stale).
+    tag: süreçler arası taşımada (bus_shm) yanıtı isteğe eşleyen numara. t_reply: tap bağlıyken
+    rt_reply'ın zaman damgası (perf_counter_ns).
+    """
+    __slots__ = ("frame", "addr", "reply", "tag", "t_reply", "_done")
+
+    def __init__(self, frame, addr, tag=None):
+        self.frame = frame
+        self.addr = addr
+        self.tag = tag
+        self.reply = None
+        self.t_reply = 0
+        self._done = threading.Lock()
+        self._done.acquire()
+
+    @property
+    def command(self):
+        return self.frame.buf[0] & 0xFFFF
+
+BROADCAST_ADDR = 31   # tüm bağlı RT'lere; RT'ler durum kelimesiyle yanıt vermez
+STATUS_BCR = 0x10     # durum kelimesi: son geçerli komut yayındı (Broadcast Command Received)
+
+
+
+def _command_addr(words):
+    """Mesaj komut kelimesiyle başlıyorsa hedef RT adresi, değilse None (veri kelimeleri)."""
+    if isinstance(words, Frame):
+        if words.n == 0:
+            return None
+        w = words.buf[0]
+    elif isinstance(words, list):
+        if not words:
+            return None
+        w = words[0]
+    else:
+        w = words
+    if (w >> 16) & 0b11 != SYNC_CMD:
+        return None
+    return (w >> 11) & 0x1F
+
+
+
 class Bus1553:
 
     """
@@ -191,35 +564,131 @@ class Bus1553:
 
       - q_to_bc : RT'nin gönderdiği, BC'nin okuyacağı
 
+    Mesajlar pool'dan alınmış Frame ya da (geriye uyum için) list[int] olabilir.
+
+    Adres yönlendirme: attach_rt(addr) ile bağlanan her RT'nin kendi komut ve yanıt kuyruğu olur.
+    bc_send komut kelimesinden hedefi okur ve mesajı doğrudan o RT'nin kuyruğuna koyar (dict, O(1));
+    ardından gelen veri mesajları son komutun hedefine gider. Adres 31 (yayın) tüm bağlı RT'lere
+    kopyalanır. Bağlı olmayan adreslere giden mesajlar ve addr verilmeyen çağrılar paylaşılan
+    q_to_rt / q_to_bc kuyruklarını kullanır (tek RT'li eski kullanım aynen çalışır).
+
+    İşlem düzeyi yol: transact(frame) bir komut/durum/veri değişimini tek istek nesnesiyle (BusRequest)
+    hedef RT'nin kuyruğuna koyar, RT rt_reply ile tek yanıt çerçevesi döndürür. Kelime düzeyi
+    semantik korunur: trace, zamanlama ve tap istek ve yanıtı birer mesaj olarak görür (komut + veri,
+    durum + veri). Aynı RT kuyruğu kelime düzeyi mesajları da taşır; iki yol birlikte kullanılabilir.
+
+    Pasif dinleme: tap (put(direction, addr, words) sunan nesne, ör. bus_monitor.MonitorTap) verilirse
+    her gönderilen mesaj çözülmüş hedef adresiyle birlikte ona da verilir; tap kopyalar ve beklemez.
+    transact'ta istek ve yanıt tek kayıt olarak BC thread'inde yazılır (tap.put_tx).
+
     """
 
-    def __init__(self):
+    def __init__(self, trace=None, pool_size=64, timing=None, tap=None):
 
         self.q_to_rt = queue.Queue()
 
         self.q_to_bc = queue.Queue()
 
+        # adres -> RT'ye giden komut/veri kuyruğu, adres -> RT'nin BC'ye yanıt kuyruğu
+        self._rt_in = {}
+        self._rt_out = {}
+        self._dest = None   # son komutun adresi (ardından gelen veri mesajları için)
+
+        # BC ve RT çerçeveleri bu havuzdan alır; tüketen taraf iade eder
+        self.pool = FramePool(pool_size)
+
+        if trace is None and TRACE_CAPACITY > 0:
+            trace = BusTrace(TRACE_CAPACITY)
+        self.trace = trace
+
+        # İsteğe bağlı bus_timing.BusClock: gönderilen kelimeler benzetim bus saatine yazılır
+        self.timing = timing
+
+        # İsteğe bağlı pasif monitor ucu (bus_monitor.BusMonitor.start() bağlar)
+        self.tap = tap
+
+        # transact zaman aşımından sonra gelen (atılan) yanıtlar
+        self.stale = 0
+
+
+
+    # ---- RT bağlantıları ----
+
+    def attach_rt(self, addr):
+
+        """addr (0..30) için ayrı kuyruklar açar; adres çakışması ValueError"""
+
+        if not 0 <= addr < BROADCAST_ADDR:
+            raise ValueError(f"Geçersiz RT adresi: {addr} (0..30)")
+        if addr in self._rt_in:
+            raise ValueError(f"RT adresi kullanımda: {addr}")
+        self._rt_in[addr] = queue.SimpleQueue()
+        self._rt_out[addr] = queue.Queue()
+
+
+
+    def detach_rt(self, addr):
+
+        self._rt_in.pop(addr, None)
+        self._rt_out.pop(addr, None)
+
+
+
+    def attached(self):
+
+        return sorted(self._rt_in)
+
+
+
+    def routed(self, addr):
+
+        """addr'e giden istekler bağlı bir RT'ye (yayında en az bir RT'ye) ulaşır mı (transact kullanılabilir mi)"""
+
+        return addr in self._rt_in or (addr == BROADCAST_ADDR and bool(self._rt_in))
+
 
 
     # ---- BC perspektifi ----
 
     def bc_send(self, words):
 
-        self.q_to_rt.put(words)
+        if self.trace is not None:
+            self.trace.record(DIR_BC_TO_RT, words)
 
+        if self.timing is not None:
+            self.timing.on_bc(words)
 
+        addr = _command_addr(words)
+        if addr is not None:
+            self._dest = addr
+        else:
+            addr = self._dest
 
-    def bc_recv(self, timeout=0.1):
+        if self.tap is not None:
+            self.tap.put(DIR_BC_TO_RT, addr, words)
+
+        if addr == BROADCAST_ADDR and self._rt_in:
+            for q in list(self._rt_in.values()):
+                q.put(self.pool.clone(words) if isinstance(words, Frame) else words)
+            if isinstance(words, Frame):
+                words.release()
+            return
+
+        self._rt_in.get(addr, self.q_to_rt).put(words)
 
-        """BC'nin RT'den gelen kelimeleri alması"""
 
-        try:
 
-            words = self.q_to_bc.get(timeout=timeout)
+    def bc_recv(self, timeout=0.1, addr=None):
 
-            if VERBOSE:
+        """BC'nin RT'den gelen kelimeleri alması (addr: o RT'nin yanıt kuyruğu)"""
 
-                LOGGER.debug(_decode_words(words, "RT->BC"))
+        q = self._rt_out.get(addr, self.q_to_bc) if addr is not None else self.q_to_bc
+
+        try:
+
+            words = q.get(timeout=timeout)
+
+            _log_words(words, "RT->BC")
 
             return words
 
@@ -229,30 +698,155 @@ class Bus1553:
 
 
 
+    def transact(self, frame, timeout=0.1):
+
+        """
+        İşlem düzeyi BC çağrısı: frame = komut (+ veri) kelimeleri (FramePool.acquire_msg). İstek hedef
+        RT'nin kuyruğuna tek nesne olarak konur ve RT'nin yanıt çerçevesi (durum + veri) döndürülür;
+        çağıran iade eder. Yayın, bağlı olmayan adres ya da zaman aşımı: None.
+        """
+
+        if self.trace is not None:
+            self.trace.record(DIR_BC_TO_RT, frame)
+
+        if self.timing is not None:
+            self.timing.on_bc(frame)
+
+        cmd = frame.buf[0]
+        addr = (cmd >> 11) & 0x1F
+        self._dest = addr
+
+        tap = self.tap
+        q = self._rt_in.get(addr)
+        if addr == BROADCAST_ADDR or q is None:
+            if tap is not None:
+                tap.put(DIR_BC_TO_RT, addr, frame)
+            if addr == BROADCAST_ADDR:
+                # RT'ler yayına yanıt vermez: her birine kendi kopyası, beklenmez
+                for q in list(self._rt_in.values()):
+                    q.put(BusRequest(self.pool.clone(frame), addr))
+            frame.release()
+            return None
+
+        # tap: istek RT'ye verilmeden kopyalanır, işlem bitince istek + yanıt tek kayıt olarak yazılır
+        if tap is not None:
+            t_rq, rq, n_rq = perf_counter_ns(), frame.buf.tobytes(), frame.n
+        req = BusRequest(frame, addr)
+        q.put(req)
+        if not req._done.acquire(timeout=-1 if timeout is None else max(0.0, timeout)):
+            # Vazgeçme ile yanıt yarışır: kilidi ilk açan kazanır (açık kilidi açmak RuntimeError).
+            # BC açarsa geç gelen rt_reply yanıtı havuza iade eder; RT önce açtıysa yanıt geçerlidir.
+            try:
+                req._done.release()
+            except RuntimeError:
+                pass
+            else:
+                if tap is not None:
+                    tap.put_tx(addr, t_rq, cmd, rq, n_rq, 0, None)
+                return None
+        if tap is not None:
+            tap.put_tx(addr, t_rq, cmd, rq, n_rq, req.t_reply, req.reply)
+        _log_words(req.reply, "RT->BC")
+        return req.reply
+
+
+
     # ---- RT perspektifi ----
 
-    def rt_send(self, words):
+    def rt_reply(self, req, frame):
 
-        self.q_to_bc.put(words)
+        """İşlem düzeyi RT yanıtı: frame = durum (+ veri) kelimeleri; transact'ta bekleyen BC'ye tek adımda verilir"""
 
+        if self.trace is not None:
+            self.trace.record(DIR_RT_TO_BC, frame)
 
+        if self.timing is not None:
+            self.timing.on_rt(frame)
+
+        if self.tap is not None:
+            req.t_reply = perf_counter_ns()   # kaydı transact yazar (put_tx)
+
+        req.reply = frame
+        try:
+            req._done.release()
+        except RuntimeError:
+            # BC zaman aşımıyla vazgeçti (transact kilidi açtı): geç yanıt atılır, çerçeve havuza döner
+            req.reply = None
+            frame.release()
+            self.stale += 1
+
+
+    def rt_send(self, words, addr=None):
+
+        if self.trace is not None:
+            self.trace.record(DIR_RT_TO_BC, words)
+
+        if self.timing is not None:
+            self.timing.on_rt(words)
+
+        if self.tap is not None:
+            self.tap.put(DIR_RT_TO_BC, addr, words)
+
+        q = self._rt_out.get(addr, self.q_to_bc) if addr is not None else self.q_to_bc
+
+        q.put(words)
 
-    def rt_recv(self, timeout=0.1):
 
-        """RT'nin BC'den gelen kelimeleri alması"""
+
+    def _rt_queue(self, addr):
+
+        return self._rt_in.get(addr, self.q_to_rt) if addr is not None else self.q_to_rt
+
+
+
+    def rt_recv(self, timeout=0.1, addr=None):
+
+        """RT'nin BC'den gelen kelimeleri alması (timeout=None: mesaj ya da WAKE gelene kadar bekler)"""
 
         try:
 
-            words = self.q_to_rt.get(timeout=timeout)
+            words = self._rt_queue(addr).get(timeout=timeout)
 
-            if VERBOSE:
+        except queue.Empty:
 
-                LOGGER.debug(_decode_words(words, "BC->RT"))
+            return None
 
-            return words
+        if words is not WAKE:
+
+            _log_words(words, "BC->RT")
+
+        return words
+
+
+
+    def rt_recv_nowait(self, addr=None):
+
+        """Kuyrukta bekleyen varsa hemen döndürür, yoksa None (boşaltma döngüsü için)"""
+
+        q = self._rt_queue(addr)
+
+        if q.empty():
+
+            return None   # tek istekli değişimde olağan durum: get_nowait + Empty istisnası yerine boyut okuması
+
+        try:
+
+            words = q.get_nowait()
 
         except queue.Empty:
 
             return None
 
+        if words is not WAKE:
+
+            _log_words(words, "BC->RT")
+
+        return words
+
+
+
+    def rt_wake(self, addr=None):
+
+        """rt_recv'de bekleyen RT'yi uyandırır (durdurma için); trace'e yazılmaz"""
 
+        self._rt_queue(addr).put(WAKE)
@@ -0,0 +1,433 @@
+# -*- coding: utf-8 -*-
+"""
+bus_capture.py — Ham 1553 trafiği için ikili yakalama biçimi (yalnız ekleme) + memmap okuyucu + seyrek indeks
+
+Köprünün CSV'si çözülmüş ve %.6f ile kırpılmış değer yazar; bu dosya ise her işlemin ham kelimelerini
+saklar, böylece sonradan kayıpsız yeniden çözülebilir (sensor1553.unpack_*_batch).
+
+Dosya:
+  başlık (64 bayt) : magic "B1553CAP", sürüm, max_words, kayıt boyu, epoch_ns (yakalama başlangıcı, time_ns)
+  kayıtlar         : sabit boy; t_ns (epoch'tan beri, monotonic) i8, cmd u2 (komut alanı: RT/TR/SA/WC),
+                     status u2, nw u1 (veri kelimesi), flags u1, data u2[max_words]
+  Yarım kalmış son kayıt okuyucu tarafından yok sayılır, yazıcı yeniden açarken keser.
+
+Seyrek indeks (<dosya>.idx.npz, yan dosya, artımlı):
+  t      : her INDEX_STRIDE kayıtta bir t_ns -> zaman aralığı dilimleme
+  akışlar: (RT, TR, SA) başına her INDEX_STRIDE kayıtta bir (kayıt no, açılmış seq) -> seq aralığı
+  Dosya büyüdükçe yalnızca yeni kayıtlar indekslenir; son indekslenen kaydın baytları (çapa)
+  değişmişse indeks baştan kurulur.
+
+Kullanım:
+    with CaptureWriter("data/streams/bus_capture.b1553") as w:
+        w.append(cmd, status, words)
+    r = CaptureReader("data/streams/bus_capture.b1553")
+    imu, valid = r.decode_imu(r.time_slice(10.0, 20.0))
+    recs = r.seq_slice(1, SA_IMU, 1000, 5000)
+
+  python bus_capture.py info data/streams/bus_capture.b1553
+  python bus_capture.py decode data/streams/bus_capture.b1553 --sa 2 --t0 10 --t1 20
+"""
+
+import os
+import time
+import struct
+import argparse
+
+import numpy as np
+
+from sensor1553 import FRAME_WORDS, SA_IMU, SA_EKF, unpack_imu_batch, unpack_ekf_batch
+from stream_align import unwrap_seq
+
+MAGIC = b"B1553CAP"
+VERSION = 1
+HEADER_BYTES = 64
+MAX_WORDS = 32
+INDEX_SUFFIX = ".idx.npz"
+INDEX_STRIDE = 1024
+_INDEX_VERSION = 1
+
+FLAG_NO_RESPONSE = 0x01   # durum/veri gelmedi (zaman aşımı ya da hata)
+
+
+def record_dtype(max_words=MAX_WORDS):
+    return np.dtype([("t_ns", "<i8"), ("cmd", "<u2"), ("status", "<u2"), ("nw", "u1"),
+                     ("flags", "u1"), ("data", "<u2", (max_words,))])
+
+
+def cmd_fields(cmd):
+    """Komut alanı(ları) -> (rt, tr, sa, wc); skaler ya da dizi."""
+    cmd = np.asarray(cmd).astype(np.int64)
+    return (cmd >> 11) & 0x1F, (cmd >> 10) & 1, (cmd >> 5) & 0x1F, cmd & 0x1F
+
+
+def _stream_key(rt, tr, sa):
+    return (int(rt) << 6) | (int(tr) << 5) | int(sa)
+
+
+def _pack_header(max_words, epoch_ns):
+    head = struct.pack("<8sHHIq", MAGIC, VERSION, max_words, record_dtype(max_words).itemsize, epoch_ns)
+    return head.ljust(HEADER_BYTES, b"\0")
+
+
+def read_header(path):
+    """Dönüş: (max_words, epoch_ns). Biçim tanınmazsa ValueError."""
+    with open(path, "rb") as f:
+        raw = f.read(HEADER_BYTES)
+    if len(raw) < HEADER_BYTES:
+        raise ValueError(f"Yakalama başlığı eksik: {path}")
+    magic, version, max_words, itemsize, epoch_ns = struct.unpack_from("<8sHHIq", raw)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Tanınmayan yakalama biçimi: {path}")
+    if record_dtype(max_words).itemsize != itemsize:
+        raise ValueError(f"Kayıt boyu uyuşmuyor: {path}")
+    return max_words, epoch_ns
+
+
+# ---------------- Yazıcı ----------------
+
+class CaptureWriter:
+    """
+    Kayıtları bellekte buffer_records'luk blokta biriktirip dosyanın sonuna ekler. Var olan dosyaya
+    devam eder (max_words aynı olmalı); zaman damgaları başlıktaki epoch'a göredir.
+    Tek thread'den kullanılır (BcScheduleRunner / bus sahibi thread).
+    """
+    def __init__(self, path, max_words=MAX_WORDS, buffer_records=512):
+        self.path = path
+        if os.path.exists(path) and os.path.getsize(path) >= HEADER_BYTES:
+            self.max_words, self.epoch_ns = read_header(path)
+            self.dtype = record_dtype(self.max_words)
+            size = os.path.getsize(path)
+            whole = HEADER_BYTES + (size - HEADER_BYTES) // self.dtype.itemsize * self.dtype.itemsize
+            self._fp = open(path, "r+b")
+            if whole != size:
+                self._fp.truncate(whole)   # yarım kalmış son kayıt
+            self._fp.seek(0, os.SEEK_END)
+        else:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.max_words = int(max_words)
+            self.epoch_ns = time.time_ns()
+            self.dtype = record_dtype(self.max_words)
+            self._fp = open(path, "wb")
+            self._fp.write(_pack_header(self.max_words, self.epoch_ns))
+        # monotonic saat, epoch'a (duvar saati) hizalanır
+        self._mono0 = time.monotonic_ns() - (time.time_ns() - self.epoch_ns)
+        self._buf = np.zeros(max(1, int(buffer_records)), dtype=self.dtype)
+        self._n = 0
+        self.records = 0
+
+    def now_ns(self):
+        return time.monotonic_ns() - self._mono0
+
+    def append(self, cmd, status, data, flags=0, t_ns=None):
+        n = len(data) if data is not None else 0
+        if n > self.max_words:
+            raise ValueError(f"Kayıt kapasitesi aşıldı: {n} > {self.max_words}")
+        r = self._buf[self._n]
+        r["t_ns"] = self.now_ns() if t_ns is None else t_ns
+        r["cmd"] = cmd
+        r["status"] = status or 0
+        r["nw"] = n
+        r["flags"] = flags | (FLAG_NO_RESPONSE if status is None else 0)
+        d = r["data"]
+        d[:n] = data
+        d[n:] = 0
+        self._n += 1
+        if self._n == len(self._buf):
+            self._drain()
+
+    def append_batch(self, t_ns, cmd, status, data, flags=None):
+        """Vektörel ekleme: t_ns/cmd/status (N,), data (N, k<=max_words)."""
+        self._drain()
+        data = np.asarray(data)
+        n, k = data.shape
+        if k > self.max_words:
+            raise ValueError(f"Kayıt kapasitesi aşıldı: {k} > {self.max_words}")
+        rec = np.zeros(n, dtype=self.dtype)
+        rec["t_ns"] = t_ns
+        rec["cmd"] = cmd
+        rec["status"] = status
+        rec["nw"] = k
+        if flags is not None:
+            rec["flags"] = flags
+        rec["data"][:, :k] = data
+        self._fp.write(rec.tobytes())
+        self.records += n
+
+    def _drain(self):
+        if self._n:
+            self._fp.write(self._buf[:self._n].tobytes())
+            self.records += self._n
+            self._n = 0
+
+    def flush(self, fsync=False):
+        self._drain()
+        self._fp.flush()
+        if fsync:
+            os.fsync(self._fp.fileno())
+
+    def close(self):
+        if self._fp is not None:
+            self.flush()
+            self._fp.close()
+            self._fp = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ---------------- Seyrek indeks ----------------
+
+class _StreamIndex:
+    __slots__ = ("pos", "seq", "count", "last_seq")
+
+    def __init__(self, pos=None, seq=None, count=0, last_seq=None):
+        self.pos = np.empty(0, np.int64) if pos is None else pos
+        self.seq = np.empty(0, np.int64) if seq is None else seq
+        self.count = count          # bu akışın indekslenen kayıt sayısı
+        self.last_seq = last_seq    # son kaydın açılmış seq'i (artımlı devam için)
+
+
+class CaptureIndex:
+    def __init__(self, stride=INDEX_STRIDE):
+        self.stride = int(stride)
+        self.n = 0
+        self.t = np.empty(0, np.int64)
+        self.streams = {}
+        self.anchor = b""
+
+    def extend(self, rec, start):
+        """rec[start:] kayıtlarını indekse ekler (yalnız ekleme)."""
+        new = rec[start:]
+        if not len(new):
+            return
+        k0 = -(-start // self.stride) * self.stride   # start'tan sonraki ilk stride katı
+        self.t = np.concatenate([self.t, np.asarray(rec["t_ns"][k0::self.stride], dtype=np.int64)])
+
+        cmd = np.asarray(new["cmd"])
+        ok = np.asarray(new["nw"]) >= 2
+        rt, tr, sa, _ = cmd_fields(cmd)
+        keys = (rt << 6) | (tr << 5) | sa
+        seq_all = np.asarray(new["data"][:, 1])
+        for key in np.unique(keys[ok]):
+            m = ok & (keys == key)
+            idx = np.nonzero(m)[0]
+            st = self.streams.get(int(key))
+            if st is None:
+                st = self.streams[int(key)] = _StreamIndex()
+            uw = unwrap_seq(seq_all[idx], prev=st.last_seq)
+            sel = (st.count + np.arange(len(idx))) % self.stride == 0
+            st.pos = np.concatenate([st.pos, idx[sel] + start])
+            st.seq = np.concatenate([st.seq, uw[sel]])
+            st.count += len(idx)
+            st.last_seq = int(uw[-1])
+        self.n = len(rec)
+        self.anchor = rec[self.n - 1:self.n].tobytes()
+
+    def save(self, path):
+        payload = {"meta": np.array([_INDEX_VERSION, self.n, self.stride], dtype=np.int64),
+                   "anchor": np.frombuffer(self.anchor, dtype=np.uint8), "t": self.t}
+        keys = sorted(self.streams)
+        payload["keys"] = np.array(keys, dtype=np.int64)
+        payload["stream_meta"] = np.array([[self.streams[k].count, self.streams[k].last_seq] for k in keys],
+                                          dtype=np.int64).reshape(-1, 2)
+        for k in keys:
+            payload[f"pos_{k}"] = self.streams[k].pos
+            payload[f"seq_{k}"] = self.streams[k].seq
+        tmp = path + ".tmp.npz"
+        try:
+            np.savez(tmp, **payload)
+            os.replace(tmp, path)
+        except OSError:
+            pass   # salt-okunur klasör: indeks yalnız bellekte
+
+    @classmethod
+    def load(cls, path):
+        try:
+            with np.load(path, allow_pickle=False) as z:
+                meta = z["meta"]
+                if int(meta[0]) != _INDEX_VERSION:
+                    return None
+                ix = cls(int(meta[2]))
+                ix.n = int(meta[1])
+                ix.anchor = z["anchor"].tobytes()
+                ix.t = z["t"]
+                for k, (count, last) in zip(z["keys"], z["stream_meta"]):
+                    ix.streams[int(k)] = _StreamIndex(z[f"pos_{k}"], z[f"seq_{k}"], int(count), int(last))
+            return ix
+        except Exception:
+            return None
+
+
+# ---------------- Okuyucu ----------------
+
+class CaptureReader:
+    def __init__(self, path, index=True, stride=INDEX_STRIDE):
+        self.path = path
+        self.max_words, self.epoch_ns = read_header(path)
+        self.dtype = record_dtype(self.max_words)
+        self._use_index = index
+        self._stride = stride
+        self.index = None
+        self.refresh()
+
+    def refresh(self):
+        """Dosya büyüdüyse yeniden eşler ve indeksi artımlı günceller."""
+        n = (os.path.getsize(self.path) - HEADER_BYTES) // self.dtype.itemsize
+        if n > 0:
+            self.rec = np.memmap(self.path, dtype=self.dtype, mode="r", offset=HEADER_BYTES, shape=(n,))
+        else:
+            self.rec = np.zeros(0, dtype=self.dtype)
+        if self._use_index:
+            self._update_index()
+        return self
+
+    def _update_index(self):
+        ipath = self.path + INDEX_SUFFIX
+        ix = self.index or CaptureIndex.load(ipath)
+        n = len(self.rec)
+        if ix is not None and (ix.stride != self._stride or ix.n > n
+                               or (ix.n and self.rec[ix.n - 1:ix.n].tobytes() != ix.anchor)):
+            ix = None   # dosya yeniden yazılmış: baştan kur
+        if ix is None:
+            ix = CaptureIndex(self._stride)
+        if ix.n < n:
+            ix.extend(self.rec, ix.n)
+            ix.save(ipath)
+        self.index = ix
+
+    def __len__(self):
+        return len(self.rec)
+
+    def seconds(self, recs=None):
+        """Kayıt zamanları (s, yakalama başlangıcından)."""
+        recs = self.rec if recs is None else recs
+        return np.asarray(recs["t_ns"]) / 1e9
+
+    def streams(self):
+        """[(rt, tr, sa, kayıt sayısı), ...] (yanıt alınmış kayıtlar)."""
+        if self.index is not None:
+            return [((k >> 6) & 0x1F, (k >> 5) & 1, k & 0x1F, st.count) for k, st in sorted(self.index.streams.items())]
+        rt, tr, sa, _ = cmd_fields(self.rec["cmd"])
+        keys, counts = np.unique(((rt << 6) | (tr << 5) | sa)[np.asarray(self.rec["nw"]) >= 2], return_counts=True)
+        return [((k >> 6) & 0x1F, (k >> 5) & 1, k & 0x1F, int(c)) for k, c in zip(keys, counts)]
+
+    # ---- dilimleme ----
+    def time_slice(self, t0=None, t1=None):
+        """[t0, t1) saniye aralığındaki kayıtlar (memmap görünümü, kopya yok)."""
+        t = self.rec["t_ns"]
+        lo, hi = 0, len(self.rec)
+        if t0 is not None:
+            lo = self._search(t, int(t0 * 1e9))
+        if t1 is not None:
+            hi = self._search(t, int(t1 * 1e9))
+        return self.rec[lo:max(lo, hi)]
+
+    def _search(self, t, x):
+        """t'de x'in sol ekleme noktası; seyrek indeksle önce INDEX_STRIDE'lık pencere bulunur."""
+        if self.index is None or not len(self.index.t):
+            return int(np.searchsorted(t, x))
+        s = self.index.stride
+        b = int(np.searchsorted(self.index.t, x))
+        lo = max(0, (b - 1) * s)
+        hi = min(len(t), b * s + 1)
+        return lo + int(np.searchsorted(t[lo:hi], x))
+
+    def select(self, recs, rt, sa, tr=1):
+        """Kayıtlardan tek akış (yanıt alınmış)."""
+        cmd = np.asarray(recs["cmd"])
+        r, t, s, _ = cmd_fields(cmd)
+        return recs[(r == rt) & (s == sa) & (t == tr) & (np.asarray(recs["nw"]) >= 2)]
+
+    def seq_slice(self, rt, sa, seq0, seq1, tr=1):
+        """
+        (RT, SA) akışında açılmış seq'i [seq0, seq1] olan kayıtlar. seq, veri kelimesi 1'dir
+        (sensor1553 kareleri); sarma açılmış değerlerle çalışılır (ilk kaydın seq'inden başlar).
+        """
+        st = self.index.streams.get(_stream_key(rt, tr, sa)) if self.index is not None else None
+        if st is None or not len(st.pos):
+            recs = self.select(self.rec, rt, sa, tr)
+            uw = unwrap_seq(recs["data"][:, 1])
+            return recs[(uw >= seq0) & (uw <= seq1)]
+        i0 = max(0, int(np.searchsorted(st.seq, seq0, side="right")) - 1)
+        i1 = int(np.searchsorted(st.seq, seq1, side="right"))
+        lo = int(st.pos[i0])
+        hi = int(st.pos[i1]) if i1 < len(st.pos) else len(self.rec)
+        win = self.rec[lo:hi]
+        r, t, s, _ = cmd_fields(win["cmd"])
+        idx = np.nonzero((r == rt) & (s == sa) & (t == tr) & (np.asarray(win["nw"]) >= 2))[0]
+        uw = unwrap_seq(win["data"][idx, 1], prev=int(st.seq[i0]))
+        keep = idx[(uw >= seq0) & (uw <= seq1)]
+        return win[keep]
+
+    # ---- çözme ----
+    @staticmethod
+    def frames(recs, wc=FRAME_WORDS):
+        """(N, wc) uint16 veri kelimeleri (toplu çözücüler için)."""
+        return recs["data"][:, :wc]
+
+    def decode(self, recs, sa):
+        """SA_IMU / SA_EKF kayıtlarını toplu çözer: ({t, seq, ...}, geçerlilik maskesi)."""
+        unpack = {SA_IMU: unpack_imu_batch, SA_EKF: unpack_ekf_batch}[sa]
+        out, valid = unpack(self.frames(recs))
+        out["t"] = self.seconds(recs)
+        return out, valid
+
+    def decode_imu(self, recs=None, rt=1):
+        recs = self.select(self.rec if recs is None else recs, rt, SA_IMU)
+        return self.decode(recs, SA_IMU)
+
+    def decode_ekf(self, recs=None, rt=1):
+        recs = self.select(self.rec if recs is None else recs, rt, SA_EKF)
+        return self.decode(recs, SA_EKF)
+
+    def summary(self):
+        t = self.seconds()
+        span = f"{t[0]:.3f}..{t[-1]:.3f} s" if len(t) else "-"
+        failed = int(np.count_nonzero(np.asarray(self.rec["flags"]) & FLAG_NO_RESPONSE)) if len(self.rec) else 0
+        lines = [f"{self.path}: {len(self.rec)} kayıt ({self.dtype.itemsize} B/kayıt), {span}, yanıtsız {failed}",
+                 f"  başlangıç (epoch): {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.epoch_ns / 1e9))}"]
+        for rt, tr, sa, count in self.streams():
+            lines.append(f"  RT{rt:<2} SA{sa:<2} {'RT->BC' if tr else 'BC->RT'}  {count} kayıt")
+        return "\n".join(lines)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="İkili 1553 yakalama dosyası araçları")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("info", help="Kayıt sayısı, zaman aralığı, akışlar")
+    p.add_argument("path")
+    p = sub.add_parser("decode", help="Zaman/seq aralığını toplu çöz, isteğe bağlı CSV'ye yaz")
+    p.add_argument("path")
+    p.add_argument("--rt", type=int, default=1)
+    p.add_argument("--sa", type=int, default=SA_IMU, choices=(SA_IMU, SA_EKF))
+    p.add_argument("--t0", type=float, default=None)
+    p.add_argument("--t1", type=float, default=None)
+    p.add_argument("--seq", type=int, nargs=2, default=None, metavar=("SEQ0", "SEQ1"))
+    p.add_argument("--csv", default=None, help="Çıktı CSV (tam hassasiyet, %%.17g)")
+    args = ap.parse_args()
+
+    r = CaptureReader(args.path)
+    if args.cmd == "info":
+        print(r.summary())
+        return
+
+    t0 = time.perf_counter()
+    if args.seq is not None:
+        recs = r.seq_slice(args.rt, args.sa, args.seq[0], args.seq[1])
+    else:
+        recs = r.select(r.time_slice(args.t0, args.t1), args.rt, args.sa)
+    out, valid = r.decode(recs, args.sa)
+    ms = (time.perf_counter() - t0) * 1e3
+    print(f"{len(recs)} kayıt çözüldü ({int(valid.sum())} geçerli) {ms:.1f} ms")
+    if args.csv:
+        names = ["t"] + [k for k in out if k != "t"]
+        cols = np.column_stack([out[k][valid] for k in names])
+        np.savetxt(args.csv, cols, delimiter=",", header=",".join(names), comments="", fmt="%.17g")
+        print("✅ Yazıldı:", args.csv)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,656 @@
+# -*- coding: utf-8 -*-
+"""
+bus_monitor.py — pasif 1553 monitor terminali (MT): bus dinleme ucu + işlem yeniden kurma + canlı istatistik
+
+Bus1553.tap'e bağlanan MonitorTap, bc_send/rt_send'de gönderilen her mesajın kelimelerini kilitsiz bir
+halkaya kopyalar; BusMonitor kendi thread'inde halkayı boşaltıp (komut, durum, veri) işlemlerini
+yeniden kurar. Bus tarafında bekleme, kilit ya da Event yoktur:
+
+  MonitorTap.put : sıra numarası (itertools.count, GIL altında atomik) + zaman damgası + kelime kopyası
+                   (Frame tamponu -> bytes) tek tuple olarak halka yuvasına yazılır (liste ataması atomik).
+  MonitorTap.put_tx : işlem düzeyi yol (Bus1553.transact): istek ve yanıt BC thread'inde, işlem bitince
+                   tek yuvaya yazılır (mesaj başına değil işlem başına bir sıra numarası/tuple); RT
+                   thread'i yalnızca yanıt zamanını damgalar. İki mesaja ayırma process()'te yapılır.
+  boşaltma       : okuyucu beklenen sıra numarasını yuvada görene kadar ilerler; yazar henüz yazmadıysa
+                   durur, halka tur attıysa (okuyucu geride kaldı) kaybolan yuvalar 'dropped' sayılır.
+                   Yazarlar hiçbir zaman okuyucuyu beklemez.
+
+Yeniden kurma parti halinde ve sütunsaldır (mesaj başına Python döngüsü yok): partinin kelimeleri tek
+uint32 dizisine birleştirilir, mesajlar RT adresine göre gruplanır; her BC komut kelimesi o adreste yeni
+işlem açar, ardından gelen BC veri kelimeleri ve RT durum/veri kelimeleri bu işleme yazılır (çok RT'li,
+iç içe geçen trafik de çözülür). Partinin sonunda tamamlanmamış son işlem bir sonraki partiye taşınır.
+İşlem sonucu:
+    ok            : durum (yayında yok) ve wc veri kelimesi tamam
+    status_error  : durum kelimesinde BCR dışında bit var
+    no_response   : durum gelmeden zaman aşımı / aynı RT'ye yeni komut
+    short         : durum geldi, veri eksik kaldı
+
+İstatistik: işlem sonuçları, (RT, T/R, SA) başına işlem/kelime/hata, komut -> durum yanıt süresi ve
+işlem süresi (Histogram), kayıp mesaj, monitor thread CPU süresi, son işlemlerin çözülmüş dökümü (dump).
+
+Kullanım:
+    mon = BusMonitor(bus).start()       # bus.tap = mon.tap
+    ...
+    print(mon.hud_line()); mon.stop(); print(mon.summary())
+    python bus_monitor.py --seconds 5 --imu-hz 50 --ekf-hz 10
+"""
+
+import time
+import array
+import argparse
+import threading
+import operator
+import itertools
+import collections
+
+import numpy as np
+
+from profiling import Histogram
+from bus1553 import (
+    Frame, DIR_BC_TO_RT, DIR_RT_TO_BC, SYNC_CMD, SYNC_DATA, SYNC_STATUS,
+    BROADCAST_ADDR, STATUS_BCR, _parse_command_field, _parse_status_field,
+)
+
+perf_counter_ns = time.perf_counter_ns
+
+TX_OK = "ok"
+TX_STATUS_ERROR = "status_error"
+TX_NO_RESPONSE = "no_response"
+TX_SHORT = "short"
+TX_RESULTS = (TX_OK, TX_STATUS_ERROR, TX_NO_RESPONSE, TX_SHORT)
+
+_EMPTY = np.zeros(0, dtype=np.uint32)
+_DIR_TX = 2     # put_tx yuvası: istek + yanıt (process iki mesaja açar)
+_NO_REPLY = (0, b"", 0)
+_SEQ = operator.itemgetter(0)
+
+
+class MonitorTap:
+    """
+    Çok yazarlı, tek okuyuculu, üzerine yazan halka (kapasite 2'nin kuvveti). put() bus thread'lerinde
+    çalışır; drain() yalnızca monitor thread'inden çağrılır. Kelimeler bytes (uint32) + geçerli kelime
+    sayısı olarak saklanır: Frame'in tüm tamponu tek tobytes() ile kopyalanır (dilim yok; bytes GC
+    tarafından izlenmez), okuyucu partiyi tek bayt birleştirmesiyle diziye çevirir. Adres yoksa -1.
+    """
+    def __init__(self, capacity=1 << 14):
+        cap = 1 << max(4, (int(capacity) - 1).bit_length())
+        self.capacity = cap
+        self._mask = cap - 1
+        self._slots = [None] * cap
+        self._ctr = itertools.count()
+        self._read = 0
+        self.dropped = 0
+
+    def put(self, direction, addr, words):
+        i = next(self._ctr)
+        if words.__class__ is Frame:
+            c, n = words.buf.tobytes(), words.n
+        else:
+            c = array.array("I", words if words.__class__ is list else (words,))
+            c, n = c.tobytes(), len(c)
+        self._slots[i & self._mask] = (i, perf_counter_ns(), direction, -1 if addr is None else addr, c, n)
+
+    def put_tx(self, addr, t_ns, cmd, req, n, t_reply_ns, reply):
+        """
+        Biten işlem tek yuvada: transact'ın RT'ye vermeden kopyaladığı istek (req: tampon bytes, n kelime;
+        cmd: ilk kelimesi) + yanıt çerçevesi (reply None: yanıt yok). İstek ve yanıt ayrı put() yerine
+        tek sıra numarası/tuple ile yazılır; iki mesaja process() ayırır. Komut ve durum kelimesi
+        tamsayı olarak da yazılır: işlem partisi tamponları birleştirmeden sınıflandırılır.
+        """
+        i = next(self._ctr)
+        if reply is None:
+            self._slots[i & self._mask] = (i, t_ns, _DIR_TX, addr, req, n, 0, b"", 0, cmd, -1)
+        else:
+            self._slots[i & self._mask] = (i, t_ns, _DIR_TX, addr, req, n,
+                                           t_reply_ns, reply.buf.tobytes(), reply.n, cmd, reply.buf[0])
+
+    def drain(self, max_items=8192):
+        """
+        Sıradaki yazılmış yuvalar, en fazla max_items: mesaj (seq, t_ns, yön, adres, tampon, n) ya da
+        işlem (seq, t_ns, _DIR_TX, adres, istek tamponu, n, t_yanıt_ns, yanıt tamponu, n_yanıt, komut
+        kelimesi, durum kelimesi ya da -1).
+        Yazılmış ardışık yuvalar önce dilim olarak alınır (sınır ikili aramayla; sıra numaraları C
+        düzeyinde karşılaştırılır); sıra bozuksa (yarım yazım, tur atma) yuva yuva ilerlenir.
+        """
+        out = []
+        slots, mask, cap = self._slots, self._mask, self.capacity
+        r = self._read
+        fast = True
+        while len(out) < max_items:
+            if fast:
+                k = self._written(r, min(max_items - len(out), cap - (r & mask)))
+                if k:
+                    seg = slots[r & mask:(r & mask) + k]
+                    try:
+                        fast = list(map(_SEQ, seg)) == list(range(r, r + k))
+                    except TypeError:       # ilk turda araya giren yarım yazım (None)
+                        fast = False
+                    if fast:
+                        out += seg
+                        r += k
+                        continue
+            e = slots[r & mask]
+            if e is None or e[0] < r:
+                break                       # henüz yazılmadı
+            if e[0] > r:
+                oldest = e[0] - cap + 1     # halka tur attı: bu yuvadan eski olanlar kayboldu
+                self.dropped += oldest - r
+                r = oldest
+                continue
+            out.append(e)
+            r += 1
+        self._read = r
+        return out
+
+    def _written(self, r, kmax):
+        """r'den başlayıp yazılmış görünen ardışık yuva sayısı (yuva r+k-1'in sıra numarasına göre)."""
+        slots, mask = self._slots, self._mask
+        lo, hi = 0, kmax
+        while lo < hi:
+            mid = (lo + hi + 1) >> 1
+            e = slots[(r + mid - 1) & mask]
+            if e is not None and e[0] == r + mid - 1:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo
+
+
+class Transaction:
+    """Yeniden kurulmuş tek 1553 işlemi (callback ve döküm için; sayaçlar sütunsal tutulur)."""
+    __slots__ = ("t_ns", "t_status_ns", "t_end_ns", "rt", "tr", "sa", "wc", "command", "status",
+                 "n_data", "words", "result")
+
+    def __init__(self, t_ns, command, status, t_status_ns, t_end_ns, n_data, words, result):
+        self.t_ns = t_ns
+        self.t_status_ns = t_status_ns
+        self.t_end_ns = t_end_ns
+        self.command = command
+        self.rt, self.tr, self.sa, self.wc = _parse_command_field(command)
+        self.status = status
+        self.n_data = n_data
+        self.words = words          # ham veri kelimeleri (uint32, sync << 16 | field)
+        self.result = result
+
+    @property
+    def broadcast(self):
+        return self.rt == BROADCAST_ADDR
+
+    @property
+    def expected(self):
+        return self.wc if self.wc > 0 else 32
+
+    def data(self):
+        """Veri kelimelerinin 16-bit alanları (list[int])."""
+        w = self.words
+        return (w[((w >> 16) & 0b11) == SYNC_DATA] & 0xFFFF).tolist()
+
+    def response_us(self):
+        return (self.t_status_ns - self.t_ns) / 1e3 if self.t_status_ns is not None else None
+
+    def __str__(self):
+        s = "-" if self.status is None else f"0b{_parse_status_field(self.status)[1]:08b}"
+        d = self.data()
+        head = " ".join(f"{w:04X}" for w in d[:4]) + (" …" if len(d) > 4 else "")
+        return (f"RT{self.rt:02d} {'T' if self.tr else 'R'} SA{self.sa:02d} wc={self.wc:2d} "
+                f"status={s} data={len(d)}/{self.expected} [{head}] {self.result}")
+
+
+# Partiler arasında taşınan yarım işlem: [t, komut, durum, t_durum, t_son, veri sayısı, veri parçaları]
+_P_T, _P_CMD, _P_STATUS, _P_T_STATUS, _P_T_END, _P_N, _P_CHUNKS = range(7)
+
+_S_COUNT, _S_WORDS, _S_ERRORS, _S_FIRST, _S_LAST = range(5)
+_NSTREAMS = 1 << 11         # komut alanı >> 5: (rt, tr, sa)
+
+
+class BusMonitor:
+    """
+    Pasif monitor: start() bus.tap'e MonitorTap bağlar ve boşaltma thread'ini başlatır. Halka boşken
+    thread poll_s kadar uyur (bus tarafı hiçbir şeyi uyandırmaz); uyanınca birikmiş mesajlar tek parti
+    olarak numpy ile işlenir. process() thread olmadan da çağrılabilir (kayıtlı trafiğin çevrimdışı
+    çözümü). keep: dump()/last() için saklanan son işlem sayısı (yalnızca bunların verisi kopyalanır).
+    """
+    def __init__(self, bus=None, capacity=1 << 14, poll_s=0.05, response_timeout_s=0.1,
+                 on_transaction=None, keep=64):
+        self.bus = bus
+        self.tap = MonitorTap(capacity)
+        self.poll_s = float(poll_s)
+        self.timeout_ns = int(response_timeout_s * 1e9)
+        self.on_transaction = on_transaction
+
+        self.messages = 0
+        self.words = 0
+        self.orphans = 0            # işleme bağlanamayan mesajlar (komutsuz veri / bekleyeni olmayan yanıt)
+        self.results = dict.fromkeys(TX_RESULTS, 0)
+        self.transactions = 0
+        self.broadcasts = 0
+        self.streams = {}           # komut alanı & 0xFFE0 (rt, tr, sa) -> [işlem, kelime, hata, ilk t_ns, son t_ns]
+        self.response = Histogram()
+        self.duration = Histogram()
+        self.recent = collections.deque(maxlen=int(keep))   # son işlemler (Transaction'a last() ile çevrilir)
+        self.cpu_ns = 0             # monitor thread'inin CPU süresi
+
+        self._pending = {}          # rt -> partiler arası yarım işlem
+        self._bc_dest = -1          # adres verilmeyen (eski) çağrılar için son komut hedefi
+        self._rt_last = -1
+        self._t0 = None
+        self._hud_prev = (time.perf_counter(), 0)
+        self._stop_evt = threading.Event()
+        self._thread = None
+
+    # ---- yaşam döngüsü ----
+    def start(self):
+        if self.bus is not None:
+            self.bus.tap = self.tap
+        self._stop_evt.clear()
+        self._thread = threading.Thread(target=self._run, name="bus-monitor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self.bus is not None and self.bus.tap is self.tap:
+            self.bus.tap = None
+        self._stop_evt.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        self.process(self.tap.drain(max_items=self.tap.capacity))
+        self.flush()
+
+    def _run(self):
+        last_sweep = time.perf_counter_ns()
+        cpu0 = time.thread_time_ns()
+        while not self._stop_evt.is_set():
+            batch = self.tap.drain()
+            if batch:
+                self.process(batch)
+            if len(batch) < 8192:
+                self._stop_evt.wait(self.poll_s)
+            now = time.perf_counter_ns()
+            if now - last_sweep > self.timeout_ns:
+                self.sweep(now)
+                last_sweep = now
+            self.cpu_ns = time.thread_time_ns() - cpu0
+
+    # ---- yeniden kurma ----
+    def process(self, batch):
+        """drain() çıktısını (mesaj ve işlem yuvaları) işler."""
+        if not batch:
+            return
+        cols = tuple(zip(*batch))           # ilk 6 sütun her iki yuva türünde ortak
+        n_tx = cols[2].count(_DIR_TX)
+        if n_tx == len(batch) and not self._pending and self._process_pairs(cols):
+            return
+        if n_tx:
+            # İşlem yuvası iki mesaj satırıdır (istek, yanıt); mesaj yuvalarının ikinci satırı boş kalır
+            if n_tx < len(batch):
+                cols = tuple(zip(*[e if e[2] is _DIR_TX else e + _NO_REPLY for e in batch]))
+            _, ts, ds, addrs, ws, ns, t2s, w2s, n2s = cols[:9]
+            ws = [w for pair in zip(ws, w2s) for w in pair]
+            n = len(ts)
+            t = np.empty(2 * n, dtype=np.int64)
+            t[0::2] = np.fromiter(ts, dtype=np.int64, count=n)
+            t[1::2] = np.fromiter(t2s, dtype=np.int64, count=n)
+            lens = np.empty(2 * n, dtype=np.int64)
+            lens[0::2] = np.fromiter(ns, dtype=np.int64, count=n)
+            lens[1::2] = np.fromiter(n2s, dtype=np.int64, count=n)
+            bc = np.zeros(2 * n, dtype=bool)
+            bc[0::2] = np.fromiter(ds, dtype=np.int64, count=n) != DIR_RT_TO_BC
+            addr = np.repeat(np.fromiter(addrs, dtype=np.int64, count=n), 2)
+        else:
+            _, ts, ds, addrs, ws, ns = cols
+            t = np.array(ts, dtype=np.int64)
+            lens = np.array(ns, dtype=np.int64)
+            bc = np.array(ds, dtype=np.int64) == DIR_BC_TO_RT
+            addr = np.array(addrs, dtype=np.int64)
+        # Tamponlar art arda: mesajın kelimeleri tamponunun başındaki lens kelime (kalanı kullanılmaz)
+        size = np.fromiter(map(len, ws), dtype=np.int64, count=len(ws)) >> 2
+        words = np.frombuffer(b"".join(ws), dtype=np.uint32)
+        starts = np.cumsum(size) - size
+        if not lens.all():
+            keep = lens > 0
+            t, bc, addr, lens, starts = t[keep], bc[keep], addr[keep], lens[keep], starts[keep]
+            if not len(lens):
+                return
+        first = words[starts].astype(np.int64)
+        self.messages += len(lens)
+        self.words += int(lens.sum())
+        if self._t0 is None:
+            self._t0 = int(t[0])
+
+        sync = (first >> 16) & 0b11
+        is_cmd = bc & (sync == SYNC_CMD)
+        is_st = ~bc & (sync == SYNC_STATUS)
+        addr = np.where(is_cmd, (first >> 11) & 0x1F, addr)
+        if (addr < 0).any():
+            addr = self._resolve_addr(addr, bc, is_cmd, is_st, first)
+        else:
+            if is_cmd.any():
+                self._bc_dest = int(addr[np.flatnonzero(is_cmd)[-1]])
+            if not bc.all():
+                self._rt_last = int(addr[np.flatnonzero(~bc)[-1]])
+
+        # Satırlar: önce önceki partiden taşınan yarım işlemler (sanal komut satırı), sonra mesajlar
+        skip = (is_cmd | is_st).astype(np.int64)
+        pend = list(self._pending.values())
+        nv = len(pend)
+        self._pending = {}
+        if nv:
+            key = np.concatenate([[(p[_P_CMD] >> 11) & 0x1F for p in pend], addr])
+            start = np.concatenate([np.ones(nv, dtype=bool), is_cmd])
+            r_t = np.concatenate([[p[_P_T] for p in pend], t])
+            r_cmd = np.concatenate([[p[_P_CMD] for p in pend], first & 0xFFFF])
+            r_st = np.concatenate([[-1 if p[_P_STATUS] is None else p[_P_STATUS] for p in pend],
+                                   np.where(is_st, first & 0xFFFF, -1)])
+            r_tst = np.concatenate([[-1 if p[_P_T_STATUS] is None else p[_P_T_STATUS] for p in pend],
+                                    np.where(is_st, t, -1)])
+            r_tend = np.concatenate([[p[_P_T_END] for p in pend], t])
+            r_n = np.concatenate([[p[_P_N] for p in pend], lens - skip])
+            w0 = np.concatenate([np.zeros(nv, dtype=np.int64), starts + skip])
+            w1 = np.concatenate([np.zeros(nv, dtype=np.int64), starts + lens])
+        else:
+            key, start, r_t, r_cmd, r_tend = addr, is_cmd, t, first & 0xFFFF, t
+            r_st = np.where(is_st, first & 0xFFFF, -1)
+            r_tst = np.where(is_st, t, -1)
+            r_n = lens - skip
+            w0, w1 = starts + skip, starts + lens
+
+        # Adrese göre kararlı sıralama: her adresin satırları geliş sırasında; her komut yeni işlem
+        order = np.argsort(key, kind="stable")
+        k = key[order]
+        st = start[order]
+        tid = np.cumsum(st) - 1
+        gid = np.cumsum(np.r_[True, k[1:] != k[:-1]]) - 1
+        spos = np.flatnonzero(st)                       # işlem başlangıçları (sıralı konum)
+        valid = tid >= 0
+        valid[valid] = gid[spos[tid[valid]]] == gid[valid]
+        self.orphans += int(len(valid) - valid.sum())
+        rows = order[valid]
+        tv = tid[valid]
+        n_tx = len(spos)
+        if not n_tx:
+            return
+        brk = np.flatnonzero(tv[1:] != tv[:-1]) + 1
+        lo = np.r_[0, brk]                              # işlem başına satır aralığı (rows içinde)
+        hi = np.r_[brk, len(tv)]
+
+        s_rows = order[spos]
+        tx_t = r_t[s_rows]
+        tx_cmd = r_cmd[s_rows]
+        tx_n = np.bincount(tv, weights=r_n[rows], minlength=n_tx).astype(np.int64)
+        tx_tend = r_tend[rows[hi - 1]]
+        has = r_st[rows] >= 0
+        ut, ui = np.unique(tv[has], return_index=True)
+        tx_st = np.full(n_tx, -1, dtype=np.int64)
+        tx_tst = np.full(n_tx, -1, dtype=np.int64)
+        tx_st[ut] = r_st[rows][has][ui]
+        tx_tst[ut] = r_tst[rows][has][ui]
+
+        # Adresin son işlemi tamamlanmadıysa bir sonraki partiye taşınır
+        want = np.where(tx_cmd & 0x1F, tx_cmd & 0x1F, 32)
+        tr = (tx_cmd >> 10) & 1
+        bcast = ((tx_cmd >> 11) & 0x1F) == BROADCAST_ADDR
+        got_st = tx_st >= 0
+        err = got_st & ((tx_st & 0xFF & ~STATUS_BCR) != 0)
+        done = err | (bcast & (tx_n >= want)) | (got_st & ((tr == 0) | (tx_n >= want)))
+        g = gid[spos]
+        last = np.r_[g[1:] != g[:-1], True]
+
+        def chunks(j):
+            out = []
+            for r in rows[lo[j]:hi[j]].tolist():
+                if r < nv:
+                    out.extend(pend[r][_P_CHUNKS])
+                elif w1[r] > w0[r]:
+                    out.append(words[w0[r]:w1[r]])
+            return out
+
+        for j in np.flatnonzero(last & ~done).tolist():
+            p = [int(tx_t[j]), int(tx_cmd[j]), None if tx_st[j] < 0 else int(tx_st[j]),
+                 None if tx_tst[j] < 0 else int(tx_tst[j]), int(tx_tend[j]), int(tx_n[j]), chunks(j)]
+            self._pending[(p[_P_CMD] >> 11) & 0x1F] = p
+
+        fin = np.flatnonzero(~(last & ~done))
+        fin = fin[np.argsort(tx_t[fin], kind="stable")]   # zaman sırası (döküm/callback için)
+        self._account(tx_t[fin], tx_cmd[fin], tx_st[fin], tx_tst[fin], tx_tend[fin], tx_n[fin],
+                      lambda i: chunks(int(fin[i])))
+
+    def _process_pairs(self, cols):
+        """
+        Yalnız işlem yuvalarından oluşan parti (transact yolu), bekleyen yarım işlem yokken: her yuva
+        zaten tam bir işlemdir (istek + yanıt ya da yanıtsız istek), adres gruplaması ve partiler arası
+        taşıma gerekmez; sütunlar doğrudan _account'a verilir. Durum kelimesi yuvada tamsayı olarak
+        gelir; tamponlar yalnızca veri kelimesi istenen işlemler için (döküm/callback) açılır. Komut/durum
+        kelimesi beklenen tipte değilse False (genel yol işler).
+        """
+        _, ts, _, addrs, ws, ns, t2s, w2s, n2s, f1s, f2s = cols
+        n = len(ts)
+        f_rq = np.fromiter(f1s, dtype=np.int64, count=n)
+        f_rp = np.fromiter(f2s, dtype=np.int64, count=n)
+        l_rq = np.fromiter(ns, dtype=np.int64, count=n)
+        l_rp = np.fromiter(n2s, dtype=np.int64, count=n)
+        has = l_rp > 0
+        if (((f_rq >> 16) & 0b11) != SYNC_CMD).any() or (has & (((f_rp >> 16) & 0b11) != SYNC_STATUS)).any():
+            return False
+        t_rq = np.fromiter(ts, dtype=np.int64, count=n)
+        t_rp = np.fromiter(t2s, dtype=np.int64, count=n)
+        self.messages += n + int(has.sum())
+        self.words += int(l_rq.sum() + l_rp.sum())
+        if self._t0 is None:
+            self._t0 = int(t_rq[0])
+        self._bc_dest = int((f_rq[-1] >> 11) & 0x1F)
+        if has.any():
+            self._rt_last = addrs[int(np.flatnonzero(has)[-1])]
+        o = np.argsort(t_rq, kind="stable")
+
+        def chunks(i):
+            j = int(o[i])
+            out = []
+            if l_rq[j] > 1:
+                out.append(np.frombuffer(ws[j], dtype=np.uint32, count=int(l_rq[j]))[1:])
+            if l_rp[j] > 1:
+                out.append(np.frombuffer(w2s[j], dtype=np.uint32, count=int(l_rp[j]))[1:])
+            return out
+
+        self._account(t_rq[o], (f_rq & 0xFFFF)[o], np.where(has, f_rp & 0xFFFF, -1)[o],
+                      np.where(has, t_rp, -1)[o], np.where(has, t_rp, t_rq)[o],
+                      (l_rq - 1 + np.where(has, l_rp - 1, 0))[o], chunks)
+        return True
+
+    def _resolve_addr(self, addr, bc, is_cmd, is_st, first):
+        """Adres verilmeden (eski tek RT'li kullanım) gönderilen mesajlar: BC verisi son komutun hedefine,
+        RT mesajı durum kelimesindeki adrese ya da son yanıt veren RT'ye."""
+        out = addr.tolist()
+        dest, last = self._bc_dest, self._rt_last
+        for i, (b, c, s, f) in enumerate(zip(bc.tolist(), is_cmd.tolist(), is_st.tolist(), first.tolist())):
+            if c:
+                dest = out[i]
+            elif out[i] < 0:
+                out[i] = dest if b else ((f >> 11) & 0x1F if s else last)
+            if not b:
+                last = out[i]
+        self._bc_dest, self._rt_last = dest, last
+        return np.array(out, dtype=np.int64)
+
+    def sweep(self, now_ns=None):
+        """Yanıt süresi aşılmış bekleyen işlemleri kapatır."""
+        now_ns = time.perf_counter_ns() if now_ns is None else now_ns
+        old = [rt for rt, p in self._pending.items() if now_ns - p[_P_T_END] > self.timeout_ns]
+        self._close([self._pending.pop(rt) for rt in old])
+
+    def flush(self):
+        ps = list(self._pending.values())
+        self._pending = {}
+        self._close(ps)
+
+    def _close(self, ps):
+        if not ps:
+            return
+        ps.sort(key=lambda p: p[_P_T])
+        col = lambda i: np.array([-1 if p[i] is None else p[i] for p in ps], dtype=np.int64)
+        self._account(col(_P_T), col(_P_CMD), col(_P_STATUS), col(_P_T_STATUS), col(_P_T_END), col(_P_N),
+                      lambda i: ps[i][_P_CHUNKS])
+
+    def _account(self, t, cmd, status, t_st, t_end, n, chunks):
+        """Biten işlemler (zaman sıralı sütunlar): sonuç sınıflandırma, sayaçlar, histogramlar, döküm."""
+        rt = (cmd >> 11) & 0x1F
+        tr = (cmd >> 10) & 1
+        want = np.where(cmd & 0x1F, cmd & 0x1F, 32)
+        bcast = rt == BROADCAST_ADDR
+        has_st = status >= 0
+        err = has_st & ((status & 0xFF & ~STATUS_BCR) != 0)
+        noresp = ~has_st & ~bcast
+        short = ~err & ~noresp & (n < want) & ((tr == 1) | bcast)
+        code = np.zeros(len(t), dtype=np.int64)         # TX_RESULTS sırası
+        code[short] = 3
+        code[noresp] = 2
+        code[err] = 1
+
+        for name, c in zip(TX_RESULTS, np.bincount(code, minlength=len(TX_RESULTS)).tolist()):
+            self.results[name] += c
+        self.transactions += len(t)
+        self.broadcasts += int(bcast.sum())
+
+        # Akış anahtarı (rt, tr, sa) 11 bit: sıralama (np.unique) yerine doğrudan kova sayımı
+        key = (cmd >> 5) & 0x7FF
+        cnt = np.bincount(key, minlength=_NSTREAMS)
+        used = np.flatnonzero(cnt)
+        wsum = np.bincount(key, weights=n, minlength=_NSTREAMS)[used].tolist()
+        bad = code != 0
+        esum = np.bincount(key, weights=bad, minlength=_NSTREAMS)[used].tolist() if bad.any() else None
+        last = np.zeros(_NSTREAMS, dtype=np.int64)
+        last[key] = t                                   # zaman sıralı: son yazılan en yenisi
+        last = last[used].tolist()
+        for j, k in enumerate(used.tolist()):
+            s = self.streams.get(k << 5)
+            if s is None:
+                s = self.streams[k << 5] = [0, 0, 0, int(t[np.argmax(key == k)]), 0]
+            s[_S_COUNT] += int(cnt[k])
+            s[_S_WORDS] += int(wsum[j])
+            if esum is not None:
+                s[_S_ERRORS] += int(esum[j])
+            s[_S_LAST] = max(s[_S_LAST], last[j])
+
+        self.response.record_many((t_st - t)[has_st])
+        self.duration.record_many(t_end - t)
+
+        cb = self.on_transaction
+        if cb is not None:
+            for row in zip(t.tolist(), cmd.tolist(), status.tolist(), t_st.tolist(), t_end.tolist(),
+                           n.tolist(), code.tolist(), range(len(t))):
+                tx = self._transaction(row + (chunks,))
+                self.recent.append(tx)
+                cb(tx)
+            return
+        # Döküm için yalnızca son keep işlemin sütunları saklanır; veri kelimeleri last()'ta toplanır
+        lo = max(0, len(t) - self.recent.maxlen)
+        self.recent.extend(zip(t[lo:].tolist(), cmd[lo:].tolist(), status[lo:].tolist(), t_st[lo:].tolist(),
+                               t_end[lo:].tolist(), n[lo:].tolist(), code[lo:].tolist(),
+                               range(lo, len(t)), itertools.repeat(chunks)))
+
+    @staticmethod
+    def _transaction(row):
+        if row.__class__ is Transaction:
+            return row
+        t, cmd, status, t_st, t_end, n, code, i, chunks = row
+        parts = chunks(i)
+        return Transaction(t, cmd, None if status < 0 else status, None if t_st < 0 else t_st, t_end, n,
+                           np.concatenate(parts) if parts else _EMPTY, TX_RESULTS[code])
+
+    # ---- raporlama ----
+    def last(self, n=20):
+        """Son n işlem (Transaction)."""
+        return [self._transaction(r) for r in list(self.recent)[-n:]]
+
+    def dump(self, last=20):
+        return [str(tx) for tx in self.last(last)]
+
+    def stream_stats(self):
+        """{(rt, tr, sa): {"count", "words", "errors", "rate_hz"}}"""
+        out = {}
+        for key, s in self.streams.items():
+            dt = (s[_S_LAST] - s[_S_FIRST]) / 1e9
+            out[((key >> 11) & 0x1F, (key >> 10) & 1, (key >> 5) & 0x1F)] = {
+                "count": s[_S_COUNT], "words": s[_S_WORDS], "errors": s[_S_ERRORS],
+                "rate_hz": (s[_S_COUNT] - 1) / dt if dt > 0 else 0.0}
+        return out
+
+    def hud_line(self):
+        now = time.perf_counter()
+        t_prev, n_prev = self._hud_prev
+        n = self.transactions
+        rate = (n - n_prev) / (now - t_prev) if now > t_prev else 0.0
+        self._hud_prev = (now, n)
+        bad = n - self.results[TX_OK]
+        return (f"MT {rate:6.0f} işlem/s  hata {bad}  kayıp {self.tap.dropped}  "
+                f"yanıt p99 {self.response.percentile_ns(0.99) / 1e3:.0f} µs")
+
+    def summary(self):
+        span = ((max((s[_S_LAST] for s in self.streams.values()), default=0) - self._t0) / 1e9
+                if self._t0 is not None else 0.0)
+        lines = [
+            "1553 monitor (MT)",
+            "=================",
+            f"Mesaj: {self.messages}  kelime: {self.words}  kayıp (halka taşması): {self.tap.dropped}  "
+            f"sahipsiz: {self.orphans}",
+            f"İşlem: {self.transactions}  (" + ", ".join(f"{k} {v}" for k, v in self.results.items())
+            + f")  yayın: {self.broadcasts}",
+        ]
+        if self.response.count:
+            s = self.response.stats_us()
+            lines.append(f"Yanıt süresi (komut -> durum): p50 {s['p50_us']:.1f} µs  p99 {s['p99_us']:.1f} µs  "
+                         f"max {s['max_us']:.1f} µs")
+        if self.duration.count:
+            s = self.duration.stats_us()
+            lines.append(f"İşlem süresi (komut -> son kelime): p50 {s['p50_us']:.1f} µs  p99 {s['p99_us']:.1f} µs  "
+                         f"max {s['max_us']:.1f} µs")
+        lines.append("  RT T/R SA     işlem      kelime    hata     hız[1/s]")
+        for (rt, tr, sa), s in sorted(self.stream_stats().items()):
+            lines.append(f"  {rt:2d}  {'T' if tr else 'R'}  {sa:2d}  {s['count']:8d}  {s['words']:10d}  "
+                         f"{s['errors']:6d}  {s['rate_hz']:10.1f}")
+        if span > 0:
+            lines.append(f"Süre: {span:.2f} s  |  {self.transactions / span:.0f} işlem/s"
+                         + (f"  |  monitor CPU {self.cpu_ns / 1e6:.0f} ms" if self.cpu_ns else ""))
+        return "\n".join(lines)
+
+
+def main():
+    from bus1553 import Bus1553
+    from bc1553 import BC1553
+    from rt1553 import RT1553
+    from bc_schedule import BusMessage, BusSchedule, BcScheduleRunner
+    from sensor1553 import FRAME_WORDS, SA_IMU, SA_EKF
+
+    ap = argparse.ArgumentParser(description="Simüle BC/RT trafiğini pasif monitor ile izle")
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--imu-hz", type=float, default=50.0)
+    ap.add_argument("--ekf-hz", type=float, default=10.0)
+    ap.add_argument("--dump", type=int, default=10, help="Son N işlemi çözülmüş yazdır")
+    args = ap.parse_args()
+
+    bus = Bus1553()
+    rt = RT1553(bus, rt_addr=1)
+    rt_thread = threading.Thread(target=rt.run_forever, daemon=True)
+    rt_thread.start()
+    mon = BusMonitor(bus).start()
+    sch = BusSchedule([BusMessage("imu", 1, SA_IMU, FRAME_WORDS, args.imu_hz),
+                       BusMessage("ekf", 1, SA_EKF, FRAME_WORDS, args.ekf_hz)])
+    runner = BcScheduleRunner(BC1553(bus), sch).start()
+    try:
+        t_end = time.perf_counter() + args.seconds
+        while time.perf_counter() < t_end:
+            time.sleep(1.0)
+            print(mon.hud_line())
+    except KeyboardInterrupt:
+        pass
+    runner.stop()
+    rt.stop()
+    rt_thread.join(timeout=2.0)
+    mon.stop()
+    print(mon.summary())
+    for line in mon.dump(args.dump):
+        print("  " + line)
+
+
+if __name__ == "__main__":
+    main()
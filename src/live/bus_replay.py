@@ -0,0 +1,441 @@
+# -*- coding: utf-8 -*-
+"""
+bus_replay.py — Kayıtlı 1553 trafiğini BC/RT koduna karşı yeniden oynatma (regresyon ölçümü)
+
+Kayıt, işlem listesine (zaman, komut alanı, durum alanı, veri) çevrilir:
+  *.b1553 : bus_capture yakalaması (CaptureWriter; köprü capture=True ya da `record` alt komutu)
+  *.npz   : BusTrace.save() ham kelime izi (işlemler bus_monitor.BusMonitor ile yeniden kurulur)
+
+İki kip:
+  bc : kayıttaki RT tarafı (TraceRT: her (RT, T/R, SA) için kayıtlı durum + veri sırayla) canlı
+       BC1553'e yanıt verir; BC, kayıttaki komutları rx_from_rt / tx_to_rt ile koşar. BC + bus ölçülür.
+  rt : kayıttaki BC komutları (ham bc_send) canlı RT1553'ü sürer; durum ve veri kayıtla karşılaştırılır.
+       RT + bus ölçülür.
+Zamanlama: speed=1 kayıttaki aralıklarla (replay.Pacer), speed=N N× hızlı, speed=0 olabildiğince hızlı.
+
+Simülatörün rastgeleliği olmadan aynı iş yükü tekrar tekrar koşulur: işlem başına gecikme (Histogram,
+akış başına da), işlem/s, kayıttan farklı sonuç sayısı. stats() JSON'a yazılıp sonraki koşuların taban
+çizgisi olur; compare() p50/p99/işlem/s için tolerans aşımlarını ve yeni farkları listeler.
+
+Kullanım:
+  python bus_replay.py record data/streams/bus_capture.b1553 --seconds 10
+  python bus_replay.py bc data/streams/bus_capture.b1553 --max --save-stats base_bc.json
+  python bus_replay.py rt data/streams/bus_capture.b1553 --speed 1
+  python bus_replay.py bc data/streams/bus_capture.b1553 --max --baseline base_bc.json --tolerance 0.25
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import collections
+
+import numpy as np
+
+from bus1553 import (
+    Bus1553, BusRequest, BusTrace, Frame, WAKE, recv_fields,
+    SYNC_CMD, SYNC_DATA, SYNC_STATUS, BROADCAST_ADDR, STATUS_BCR, _parse_command_field,
+)
+from bc1553 import BC1553
+from rt1553 import RT1553
+from bus_capture import CaptureReader, FLAG_NO_RESPONSE
+from bus_monitor import BusMonitor
+from profiling import Histogram
+from replay import Pacer
+
+MODES = ("bc", "rt")
+
+
+class ReplayTrace:
+    """Oynatılacak işlemler: t_ns (ilk işleme göre), komut alanı, durum alanı (yanıtsızsa None), veri."""
+    def __init__(self, t_ns, cmd, status, data):
+        t_ns = np.asarray(t_ns, dtype=np.int64)
+        self.t_ns = t_ns - t_ns[0] if len(t_ns) else t_ns
+        self.cmd = list(cmd)
+        self.status = list(status)
+        self.data = list(data)
+
+    @classmethod
+    def from_capture(cls, path, t0=None, t1=None):
+        recs = CaptureReader(path).time_slice(t0, t1)
+        flags = np.asarray(recs["flags"])
+        status = [None if f & FLAG_NO_RESPONSE else s
+                  for f, s in zip(flags.tolist(), np.asarray(recs["status"]).tolist())]
+        nw = np.asarray(recs["nw"]).tolist()
+        data = [row[:n] for row, n in zip(np.asarray(recs["data"]).tolist(), nw)]
+        return cls(np.asarray(recs["t_ns"]), np.asarray(recs["cmd"]).tolist(), status, data)
+
+    @classmethod
+    def from_bus_trace(cls, path):
+        t_ns, d, nw, words = BusTrace.load(path).snapshot()
+        txs = []
+        mon = BusMonitor(on_transaction=txs.append)
+        mon.process([(i, t, di, -1, row.tobytes(), n) for i, (t, di, n, row)
+                     in enumerate(zip(t_ns.tolist(), d.tolist(), nw.tolist(), words.astype(np.uint32, copy=False)))
+                     if n])
+        mon.flush()
+        txs.sort(key=lambda tx: tx.t_ns)
+        return cls([tx.t_ns for tx in txs], [tx.command for tx in txs], [tx.status for tx in txs],
+                   [tx.data() for tx in txs])
+
+    @classmethod
+    def load(cls, path, t0=None, t1=None):
+        if path.endswith(".npz"):
+            return cls.from_bus_trace(path)
+        return cls.from_capture(path, t0, t1)
+
+    def __len__(self):
+        return len(self.cmd)
+
+    def seconds(self):
+        return float(self.t_ns[-1]) / 1e9 if len(self.t_ns) else 0.0
+
+    def rt_addrs(self):
+        """Kayıtta en az bir kez yanıt vermiş RT adresleri (hiç yanıt vermeyen adres bağlanmaz)."""
+        return sorted({(c >> 11) & 0x1F for c, s in zip(self.cmd, self.status) if s is not None})
+
+
+class TraceRT:
+    """
+    Kayıttaki RT tarafı: kayıttaki her adres bus'a bağlanır ve kendi thread'inde komutlara kayıtlı
+    yanıtla (aynı (RT, T/R, SA) akışının sıradaki durum + verisi) karşılık verir. Kayıtta yanıt yoksa
+    sessiz kalır; akışın kaydı tükenmişse komut 'missing' sayılır ve yanıtlanmaz.
+    Kelime düzeyi mesajlara da işlem düzeyi isteklere (BusRequest, BC1553 varsayılanı) da yanıt verir.
+    """
+    def __init__(self, bus, trace, timeout=1.0):
+        self.bus = bus
+        self.timeout = float(timeout)
+        self._replies = collections.defaultdict(collections.deque)
+        for cmd, status, data in zip(trace.cmd, trace.status, trace.data):
+            rt, tr, sa, _ = _parse_command_field(cmd)
+            if rt != BROADCAST_ADDR:
+                self._replies[(rt, tr, sa)].append((status, data))
+        self.addrs = trace.rt_addrs()
+        self.missing = 0
+        self._stop = False
+        self._threads = []
+
+    def start(self):
+        self._stop = False
+        for a in self.addrs:
+            self.bus.attach_rt(a)
+            th = threading.Thread(target=self._serve, args=(a,), name=f"trace-rt{a}", daemon=True)
+            th.start()
+            self._threads.append(th)
+        return self
+
+    def stop(self):
+        self._stop = True
+        for a in self.addrs:
+            self.bus.rt_wake(a)
+        for th in self._threads:
+            th.join(timeout=2.0)
+        self._threads = []
+        for a in self.addrs:
+            self.bus.detach_rt(a)
+
+    def _serve(self, addr):
+        bus = self.bus
+        while not self._stop:
+            obj = bus.rt_recv(timeout=0.5, addr=addr)
+            if obj is WAKE:
+                break
+            if obj is None:
+                continue
+            if obj.__class__ is BusRequest:
+                self._serve_request(addr, obj)
+                continue
+            for field in recv_fields(obj, SYNC_CMD):
+                rt, tr, sa, wc = _parse_command_field(field)
+                if tr == 0 and not self._recv_data(addr, wc if wc > 0 else 32):
+                    continue
+                if rt != addr:
+                    continue    # yayın: durum kelimesi yok
+                q = self._replies.get((rt, tr, sa))
+                if not q:
+                    self.missing += 1
+                    continue
+                status, data = q.popleft()
+                if status is None:
+                    continue
+                bus.rt_send(bus.pool.acquire(SYNC_STATUS, (status,)), addr)
+                if tr == 1 and data:
+                    bus.rt_send(bus.pool.acquire(SYNC_DATA, data), addr)
+
+    def _serve_request(self, addr, req):
+        """İşlem düzeyi istek (BusRequest): kayıtlı durum + veri tek yanıt çerçevesiyle döner."""
+        rt, tr, sa, _ = _parse_command_field(req.command)
+        req.frame.release()
+        if rt != addr:
+            return              # yayın: durum kelimesi yok
+        q = self._replies.get((rt, tr, sa))
+        if not q:
+            self.missing += 1
+            return
+        status, data = q.popleft()
+        if status is None:
+            return
+        self.bus.rt_reply(req, self.bus.pool.acquire_msg(SYNC_STATUS, status, SYNC_DATA, data if tr == 1 else ()))
+
+    def _recv_data(self, addr, n):
+        """BC -> RT veri kelimelerini tüketir (içerik kayıttan bilinir, yalnızca sayılır)."""
+        deadline = time.monotonic() + self.timeout
+        got = 0
+        while got < n:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                return False
+            obj = self.bus.rt_recv(timeout=left, addr=addr)
+            if obj is WAKE or obj is None:
+                return False
+            got += len(recv_fields(obj, SYNC_DATA))
+        return True
+
+
+def _words(obj):
+    if isinstance(obj, Frame):
+        w = obj.tolist()
+        obj.release()
+        return w
+    return obj if isinstance(obj, list) else [obj]
+
+
+class BusReplay:
+    """
+    Kaydı seçilen kipte bir kez oynatır. timeout: yanıt bekleme üst sınırı (kayıtta yanıtsız
+    işlemler bu kadar bekletir). rt_factory(bus, addr): rt kipinde canlı RT (varsayılan RT1553);
+    run_forever() ve stop() sunmalıdır.
+    """
+    def __init__(self, trace, mode="bc", speed=0.0, timeout=0.05, rt_factory=None):
+        if mode not in MODES:
+            raise ValueError(f"Bilinmeyen kip: {mode} (seçenekler: {', '.join(MODES)})")
+        self.trace = trace
+        self.mode = mode
+        self.speed = float(speed) if speed else 0.0
+        self.timeout = float(timeout)
+        self.rt_factory = rt_factory or (lambda bus, addr: RT1553(bus, rt_addr=addr))
+
+        self.latency = Histogram()
+        self.streams = {}           # (rt, tr, sa) -> Histogram
+        self.transactions = 0
+        self.status_mismatch = 0    # rt kipi: durum kelimesi kayıttan farklı (yanıtsızlık dahil)
+        self.data_mismatch = 0      # bc kipi: BC sonucu kayıttan farklı; rt kipi: veri kayıttan farklı
+        self.missing = 0            # bc kipi: kaydı tükenmiş akışa gelen komut
+        self.late_ns = Histogram()  # zamanlı kipte işlemin kayıttaki zamanına göre gecikmesi
+        self.wall_s = 0.0
+
+    def run(self):
+        bus = Bus1553()
+        if self.mode == "bc":
+            rts = TraceRT(bus, self.trace, timeout=max(1.0, self.timeout)).start()
+            step = self._bc_step(BC1553(bus))
+        else:
+            rts = [self.rt_factory(bus, a) for a in self.trace.rt_addrs()]
+            threads = [threading.Thread(target=rt.run_forever, daemon=True) for rt in rts]
+            for th in threads:
+                th.start()
+            step = self._rt_step(bus)
+        pacer = Pacer(self.speed)
+        hists = self.streams
+        try:
+            t_start = time.perf_counter_ns()
+            for t_ns, cmd, status, data in zip(self.trace.t_ns.tolist(), self.trace.cmd,
+                                               self.trace.status, self.trace.data):
+                if not pacer.unpaced:
+                    pacer.wait(t_ns / 1e9)
+                    self.late_ns.record(time.perf_counter_ns() - t_start - int(t_ns / self.speed))
+                t = time.perf_counter_ns()
+                step(cmd, status, data)
+                dt = time.perf_counter_ns() - t
+                self.latency.record(dt)
+                key = (cmd >> 11) & 0x1F, (cmd >> 10) & 1, (cmd >> 5) & 0x1F
+                h = hists.get(key)
+                if h is None:
+                    h = hists[key] = Histogram()
+                h.record(dt)
+                self.transactions += 1
+            self.wall_s = (time.perf_counter_ns() - t_start) / 1e9
+        finally:
+            if self.mode == "bc":
+                rts.stop()
+                self.missing = rts.missing
+            else:
+                for rt in rts:
+                    rt.stop()
+                for th in threads:
+                    th.join(timeout=2.0)
+        return self
+
+    # ---- kip başına tek işlem ----
+    def _bc_step(self, bc):
+        timeout = self.timeout
+
+        def step(cmd, status, data):
+            rt, tr, sa, wc = _parse_command_field(cmd)
+            ok = status is not None and (status & 0xFF & ~STATUS_BCR) == 0
+            if tr == 1:
+                got = bc.rx_from_rt(rt, sa, wc, timeout=timeout)
+                if got != (data if ok else None):
+                    self.data_mismatch += 1
+            elif bc.tx_to_rt(rt, sa, data, timeout=timeout) != (ok or rt == BROADCAST_ADDR):
+                self.data_mismatch += 1
+        return step
+
+    def _rt_step(self, bus):
+        timeout = self.timeout
+        pool = bus.pool
+
+        def step(cmd, status, data):
+            rt, tr, sa, wc = _parse_command_field(cmd)
+            bus.bc_send(pool.acquire(SYNC_CMD, (cmd,)))
+            if tr == 0 and data:
+                bus.bc_send(pool.acquire(SYNC_DATA, data))
+            if rt == BROADCAST_ADDR:
+                return
+            want = (wc if wc > 0 else 32) if tr else 0
+            got_status, got = None, []
+            deadline = time.perf_counter() + timeout
+            while True:
+                left = deadline - time.perf_counter()
+                obj = bus.bc_recv(timeout=left, addr=rt) if left > 0 else None
+                if obj is None:
+                    break
+                for w in _words(obj):
+                    sync = (w >> 16) & 0b11
+                    if sync == SYNC_STATUS and got_status is None:
+                        got_status = w & 0xFFFF
+                    elif sync == SYNC_DATA:
+                        got.append(w & 0xFFFF)
+                if got_status is not None and (len(got) >= want or got_status & 0xFF & ~STATUS_BCR):
+                    break
+            if got_status != status:
+                self.status_mismatch += 1
+            if tr == 1 and got[:len(data)] != data:
+                self.data_mismatch += 1
+        return step
+
+    # ---- raporlama ----
+    def rate(self):
+        return self.transactions / self.wall_s if self.wall_s > 0 else 0.0
+
+    def stats(self):
+        s = self.latency.stats_us()
+        return {"mode": self.mode, "speed": self.speed, "transactions": self.transactions,
+                "rate_tps": self.rate(), "p50_us": s["p50_us"], "p99_us": s["p99_us"], "max_us": s["max_us"],
+                "status_mismatch": self.status_mismatch, "data_mismatch": self.data_mismatch,
+                "missing": self.missing}
+
+    def compare(self, baseline, tolerance=0.25):
+        """Taban çizgisine (stats() sözlüğü) göre gerilemeler: açıklama satırları listesi (boş = geçti)."""
+        cur = self.stats()
+        if (baseline.get("mode"), baseline.get("speed")) != (cur["mode"], cur["speed"]):
+            raise ValueError(f"Taban çizgisi farklı koşudan: kip/hız {baseline.get('mode')}/{baseline.get('speed')} "
+                             f"!= {cur['mode']}/{cur['speed']}")
+        out = []
+        for k in ("p50_us", "p99_us"):
+            if baseline.get(k) and cur[k] > baseline[k] * (1.0 + tolerance):
+                out.append(f"{k}: {baseline[k]:.1f} -> {cur[k]:.1f} (+{(cur[k] / baseline[k] - 1) * 100:.0f}%)")
+        if baseline.get("rate_tps") and cur["rate_tps"] < baseline["rate_tps"] * (1.0 - tolerance):
+            out.append(f"rate_tps: {baseline['rate_tps']:.0f} -> {cur['rate_tps']:.0f} "
+                       f"({(cur['rate_tps'] / baseline['rate_tps'] - 1) * 100:.0f}%)")
+        for k in ("status_mismatch", "data_mismatch", "missing"):
+            if cur[k] > baseline.get(k, 0):
+                out.append(f"{k}: {baseline.get(k, 0)} -> {cur[k]}")
+        return out
+
+    def summary(self):
+        s = self.latency.stats_us()
+        pace = "olabildiğince hızlı" if not self.speed else f"{self.speed:g}× zamanlı"
+        lines = [
+            f"1553 yeniden oynatma ({self.mode} kipi, {pace})",
+            "==================================",
+            f"İşlem: {self.transactions}  süre: {self.wall_s:.3f} s (kayıt {self.trace.seconds():.3f} s)  "
+            f"|  {self.rate():.0f} işlem/s",
+            f"Gecikme: ort {s['mean_us']:.1f}  p50 {s['p50_us']:.1f}  p99 {s['p99_us']:.1f}  max {s['max_us']:.1f} µs",
+            f"Kayıttan fark: durum {self.status_mismatch}  veri/sonuç {self.data_mismatch}  "
+            f"kaydı tükenen {self.missing}",
+        ]
+        if self.late_ns.count:
+            ls = self.late_ns.stats_us()
+            lines.append(f"Zamanlama kayması: p50 {ls['p50_us']:.0f}  p99 {ls['p99_us']:.0f}  max {ls['max_us']:.0f} µs")
+        lines.append("  RT T/R SA     işlem   p50[µs]   p99[µs]")
+        for (rt, tr, sa), h in sorted(self.streams.items()):
+            hs = h.stats_us()
+            lines.append(f"  {rt:2d}  {'T' if tr else 'R'}  {sa:2d}  {hs['count']:8d}  {hs['p50_us']:8.1f}  {hs['p99_us']:8.1f}")
+        return "\n".join(lines)
+
+
+def record(path, seconds=10.0, imu_hz=50.0, ekf_hz=10.0):
+    """Simüle BC çizelgesi + RT1553 trafiğini path'e yakalar (oynatma için sabit iş yükü)."""
+    from bc_schedule import BusMessage, BusSchedule, BcScheduleRunner
+    from bus_capture import CaptureWriter
+    from sensor1553 import FRAME_WORDS, SA_IMU, SA_EKF
+
+    if os.path.exists(path):
+        os.remove(path)
+    bus = Bus1553()
+    rt = RT1553(bus, rt_addr=1)
+    rt_thread = threading.Thread(target=rt.run_forever, daemon=True)
+    rt_thread.start()
+    sch = BusSchedule([BusMessage("imu", 1, SA_IMU, FRAME_WORDS, imu_hz),
+                       BusMessage("ekf", 1, SA_EKF, FRAME_WORDS, ekf_hz)])
+    with CaptureWriter(path) as cap:
+        runner = BcScheduleRunner(BC1553(bus), sch, capture=cap).start()
+        time.sleep(seconds)
+        runner.stop()
+    rt.stop()
+    rt_thread.join(timeout=2.0)
+    return path
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Kayıtlı 1553 trafiğini BC/RT koduna karşı yeniden oynat")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p = sub.add_parser("record", help="Simüle trafiği yakalama dosyasına kaydet")
+    p.add_argument("path")
+    p.add_argument("--seconds", type=float, default=10.0)
+    p.add_argument("--imu-hz", type=float, default=50.0)
+    p.add_argument("--ekf-hz", type=float, default=10.0)
+    for mode, help_ in (("bc", "Kayıtlı RT tarafı canlı BC1553'e yanıt verir"),
+                        ("rt", "Kayıtlı BC komutları canlı RT1553'ü sürer")):
+        p = sub.add_parser(mode, help=help_)
+        p.add_argument("path", help="*.b1553 yakalama ya da BusTrace *.npz")
+        p.add_argument("--speed", type=float, default=1.0, help="Oynatma hızı çarpanı (1=kayıttaki zamanlama)")
+        p.add_argument("--max", action="store_true", help="Bekleme yok, olabildiğince hızlı")
+        p.add_argument("--t0", type=float, default=None, help="Yakalamada başlangıç (s)")
+        p.add_argument("--t1", type=float, default=None, help="Yakalamada bitiş (s)")
+        p.add_argument("--timeout", type=float, default=0.05, help="Yanıt bekleme üst sınırı (s)")
+        p.add_argument("--save-stats", default=None, help="Sonuçları JSON taban çizgisi olarak yaz")
+        p.add_argument("--baseline", default=None, help="Bu JSON taban çizgisiyle karşılaştır")
+        p.add_argument("--tolerance", type=float, default=0.25, help="İzin verilen göreli kötüleşme")
+    args = ap.parse_args()
+
+    if args.cmd == "record":
+        record(args.path, args.seconds, args.imu_hz, args.ekf_hz)
+        print(CaptureReader(args.path).summary())
+        return
+
+    trace = ReplayTrace.load(args.path, args.t0, args.t1)
+    if not len(trace):
+        raise SystemExit(f"Oynatılacak işlem yok: {args.path}")
+    rep = BusReplay(trace, args.cmd, speed=0.0 if args.max else args.speed, timeout=args.timeout).run()
+    print(rep.summary())
+    if args.save_stats:
+        with open(args.save_stats, "w") as f:
+            json.dump(rep.stats(), f, indent=2)
+        print("✅ Yazıldı:", args.save_stats)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = rep.compare(json.load(f), args.tolerance)
+        if regressions:
+            print(f"❌ Taban çizgisine göre gerileme (tolerans %{args.tolerance * 100:.0f}):")
+            for line in regressions:
+                print("  " + line)
+            sys.exit(1)
+        print(f"✅ Taban çizgisi içinde (tolerans %{args.tolerance * 100:.0f})")
+
+
+if __name__ == "__main__":
+    main()
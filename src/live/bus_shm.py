@@ -0,0 +1,483 @@
+# -*- coding: utf-8 -*-
+"""
+bus_shm.py — Süreçler arası 1553 bus taşıması: shared memory üzerinde tek üretici/tek tüketici halkaları
+
+Bus1553 kuyrukları tek yorumlayıcı içindedir; BC, RT (IMU sim + EKF) ve çizim döngüsü aynı GIL'i
+paylaşır. Burada her RT adresi için iki halka (BC -> RT ve RT -> BC) multiprocessing.shared_memory
+bloğunda tutulur; RT kendi sürecinde koşar (ShmRtProcess), BC tarafı aynı arayüzü kullanır:
+
+  ShmBus    (BC süreci) : bc_send / bc_recv / transact / routed / attached + pool, trace, timing, tap
+  ShmRtBus  (RT süreci) : rt_send / rt_recv / rt_recv_nowait / rt_wake / rt_reply / attach_rt + pool
+                          (RT1553 ve bus_replay.TraceRT değişmeden çalışır)
+
+Halka (ShmRing) yerleşimi:
+  sayaçlar int64  : head (yalnız üretici yazar), tail (yalnız tüketici yazar); ayrı 64 baytlık satırlarda
+  yuvalar uint32  : [tür, etiket, kelime sayısı, -, kelimeler[33], ...] (yuva başına 40 kelime)
+Üretici yuvayı yazar, head'i ilerletir ve sayan semafora (mp.Semaphore, POSIX) bir jeton bırakır;
+tüketici jetonu alınca yuvayı havuzdan bir Frame'e kopyalar ve tail'i ilerletir. Semafor hem bekleme
+(uyku, meşgul döngü yok) hem bellek bariyeridir. Veri yolu pickle kullanmaz. Jetonu olup yuvası
+olmayan alım WAKE'tir (rt_wake yalnızca jeton bırakır; halkaya ikinci üretici yazmaz). Halka doluysa
+üretici put_timeout kadar bekler, yer açılmazsa mesaj atılır ('dropped'); BC yanıtsız işlem görür.
+
+İşlem düzeyi istekler (transact) etiketle taşınır: RT yanıtı aynı etiketle döner, zaman aşımına uğramış
+isteğin geç yanıtı BC tarafında atılır ('stale'). Trace/zamanlama/tap BC sürecinde yazılır: RT -> BC
+mesajları BC'ye ulaştığı anda kaydedilir.
+
+Kullanım:
+    bus = ShmBus(addrs=(1,))
+    rtp = ShmRtProcess(bus, addr=1, sim=True).start()     # RT1553 + ImuSim + EKF ayrı süreçte
+    bc = BC1553(bus); bc.rx_from_rt(1, SA_IMU, FRAME_WORDS)
+    rtp.stop(); bus.close()
+    python bus_shm.py --seconds 2
+"""
+
+import time
+import array
+import argparse
+import itertools
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+from bus1553 import (
+    Frame, FramePool, BusRequest, WAKE, BROADCAST_ADDR, MAX_FRAME_WORDS,
+    DIR_BC_TO_RT, DIR_RT_TO_BC, _command_addr, _log_words,
+)
+
+K_MSG, K_REQ, K_REPLY, K_WAKE = 1, 2, 3, 4
+
+_HEAD, _TAIL = 0, 8                 # int64 indeksleri (ayrı önbellek satırları)
+_HDR_BYTES = 128
+_SLOT = 40                          # yuva başına uint32: 4 başlık + 33 kelime (+ hizalama)
+_S_KIND, _S_TAG, _S_N = 0, 1, 2
+_S_WORDS = 4
+
+
+class ShmRing:
+    """
+    Tek üretici / tek tüketici mesaj halkası (yuva sayısı 2'nin kuvveti). put() yalnızca bir süreçteki
+    bir thread'den, get() yalnızca karşı taraftaki bir thread'den çağrılır.
+    """
+    def __init__(self, shm, slots, items, owner):
+        self.shm = shm
+        self.slots = int(slots)
+        self._mask = self.slots - 1
+        self._items = items
+        self.owner = owner
+        self._ctr = shm.buf[:_HDR_BYTES].cast("q")
+        self._w = shm.buf[_HDR_BYTES:_HDR_BYTES + 4 * _SLOT * self.slots].cast("I")
+        self._head = self._ctr[_HEAD]
+        self._tail = self._ctr[_TAIL]
+        self.dropped = 0
+
+    @staticmethod
+    def nbytes(slots):
+        return _HDR_BYTES + 4 * _SLOT * int(slots)
+
+    @classmethod
+    def create(cls, slots, ctx):
+        slots = 1 << max(1, (int(slots) - 1).bit_length())
+        shm = shared_memory.SharedMemory(create=True, size=cls.nbytes(slots))
+        shm.buf[:_HDR_BYTES] = bytes(_HDR_BYTES)
+        return cls(shm, slots, ctx.Semaphore(0), owner=True)
+
+    @classmethod
+    def attach(cls, spec):
+        # Not: TrajRing'deki gibi segmenti yalnızca create eden taraf (owner) unlink eder.
+        name, slots, items = spec
+        return cls(shared_memory.SharedMemory(name=name), slots, items, owner=False)
+
+    def spec(self):
+        """Çocuk sürece verilecek tanım (semafor yalnızca süreç başlatılırken aktarılabilir)."""
+        return (self.shm.name, self.slots, self._items)
+
+    # ---- üretici ----
+    def put(self, kind, tag=0, words=None, timeout=1.0):
+        head = self._head
+        if head - self._ctr[_TAIL] >= self.slots and not self._wait_space(head, timeout):
+            self.dropped += 1
+            return False
+        w = self._w
+        o = (head & self._mask) * _SLOT
+        n = 0
+        if words is not None:
+            if words.__class__ is Frame:
+                n = words.n
+                w[o + _S_WORDS:o + _S_WORDS + n] = memoryview(words.buf)[:n]
+            else:
+                a = array.array("I", words if words.__class__ is list else (words,))
+                n = len(a)
+                if n > MAX_FRAME_WORDS:
+                    raise ValueError(f"Mesaj yuvaya sığmıyor: {n} > {MAX_FRAME_WORDS}")
+                w[o + _S_WORDS:o + _S_WORDS + n] = a
+        w[o + _S_KIND] = kind
+        w[o + _S_TAG] = tag & 0xFFFFFFFF
+        w[o + _S_N] = n
+        self._head = head + 1
+        self._ctr[_HEAD] = head + 1
+        self._items.release()
+        return True
+
+    def _wait_space(self, head, timeout):
+        deadline = time.monotonic() + timeout
+        delay = 0.0
+        while head - self._ctr[_TAIL] >= self.slots:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(delay)
+            delay = min(0.001, delay * 2 or 20e-6)
+        return True
+
+    def wake(self):
+        """Yuvasız jeton: bekleyen get() WAKE ile döner."""
+        self._items.release()
+
+    # ---- tüketici ----
+    def get(self, pool, timeout=None):
+        """
+        (tür, etiket, Frame ya da None) ya da zaman aşımında None. timeout=0: beklemez, None: süresiz.
+        Frame pool'dan alınır; tüketen iade eder.
+        """
+        if timeout is None:
+            self._items.acquire()
+        elif not self._items.acquire(timeout > 0, timeout if timeout > 0 else None):
+            return None
+        tail = self._tail
+        if tail == self._ctr[_HEAD]:
+            return K_WAKE, 0, None
+        w = self._w
+        o = (tail & self._mask) * _SLOT
+        kind, tag, n = w[o + _S_KIND], w[o + _S_TAG], w[o + _S_N]
+        f = None
+        if n:
+            f = pool.acquire().load(w[o + _S_WORDS:o + _S_WORDS + n], n)
+        self._tail = tail + 1
+        self._ctr[_TAIL] = tail + 1
+        return kind, tag, f
+
+    def depth(self):
+        return self._ctr[_HEAD] - self._ctr[_TAIL]
+
+    def close(self):
+        # memoryview'lar bırakılmadan SharedMemory.close() BufferError verir
+        self._ctr.release()
+        self._w.release()
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+class ShmBus:
+    """
+    BC sürecindeki uç: addrs'deki her RT adresi için BC -> RT ve RT -> BC halkaları. Bus1553'ün BC
+    tarafı arayüzü (BC1553, BcScheduleRunner, Live1553Bridge, BusMonitor bu nesneyle çalışır).
+    Bağlı olmayan adreslere giden mesajlar atılır (paylaşılan kuyruk yoktur). put_timeout: halka
+    doluyken yer açılması için üst sınır.
+    """
+    def __init__(self, addrs=(1,), slots=256, trace=None, pool_size=64, timing=None, tap=None,
+                 put_timeout=1.0, ctx=None):
+        self.ctx = ctx or mp.get_context("spawn")
+        self.put_timeout = float(put_timeout)
+        self._to_rt = {}
+        self._to_bc = {}
+        for a in addrs:
+            if not 0 <= a < BROADCAST_ADDR:
+                raise ValueError(f"Geçersiz RT adresi: {a} (0..30)")
+            if a in self._to_rt:
+                raise ValueError(f"RT adresi kullanımda: {a}")
+            self._to_rt[a] = ShmRing.create(slots, self.ctx)
+            self._to_bc[a] = ShmRing.create(slots, self.ctx)
+        self._dest = None
+        self._tags = itertools.count(1)
+        self.pool = FramePool(pool_size)
+        self.trace = trace
+        self.timing = timing
+        self.tap = tap
+        self.stale = 0
+
+    def rt_spec(self, addr):
+        """ShmRtBus(spec) için adresin halka tanımları (ShmRtProcess çocuğa aktarır)."""
+        return (addr, self._to_rt[addr].spec(), self._to_bc[addr].spec())
+
+    # ---- RT bağlantıları ----
+    def attached(self):
+        return sorted(self._to_rt)
+
+    def routed(self, addr):
+        return addr in self._to_rt or (addr == BROADCAST_ADDR and bool(self._to_rt))
+
+    def dropped(self):
+        return sum(r.dropped for r in self._to_rt.values()) + sum(r.dropped for r in self._to_bc.values())
+
+    # ---- muhasebe (Bus1553 ile aynı sıra) ----
+    def _account_bc(self, words, addr):
+        if self.trace is not None:
+            self.trace.record(DIR_BC_TO_RT, words)
+        if self.timing is not None:
+            self.timing.on_bc(words)
+        if self.tap is not None:
+            self.tap.put(DIR_BC_TO_RT, addr, words)
+
+    def _account_rt(self, words, addr):
+        if self.trace is not None:
+            self.trace.record(DIR_RT_TO_BC, words)
+        if self.timing is not None:
+            self.timing.on_rt(words)
+        if self.tap is not None:
+            self.tap.put(DIR_RT_TO_BC, addr, words)
+        _log_words(words, "RT->BC")
+
+    def _link(self, addr):
+        if addr is None and len(self._to_bc) == 1:
+            return next(iter(self._to_bc))
+        return addr
+
+    # ---- BC perspektifi ----
+    def bc_send(self, words):
+        addr = _command_addr(words)
+        if addr is not None:
+            self._dest = addr
+        else:
+            addr = self._dest
+        self._account_bc(words, addr)
+        if addr == BROADCAST_ADDR:
+            for ring in list(self._to_rt.values()):
+                ring.put(K_MSG, 0, words, self.put_timeout)
+        else:
+            ring = self._to_rt.get(addr)
+            if ring is not None:
+                ring.put(K_MSG, 0, words, self.put_timeout)
+        if isinstance(words, Frame):
+            words.release()
+
+    def bc_recv(self, timeout=0.1, addr=None):
+        """BC'nin addr'deki RT'den gelen kelimeleri (Frame) alması; zaman aşımında None."""
+        addr = self._link(addr)
+        ring = self._to_bc.get(addr)
+        if ring is None:
+            if timeout:
+                time.sleep(timeout)
+            return None
+        deadline = time.monotonic() + (timeout or 0.0)
+        while True:
+            item = ring.get(self.pool, max(0.0, deadline - time.monotonic()) if timeout else 0)
+            if item is None:
+                return None
+            kind, _, f = item
+            if kind == K_MSG and f is not None:
+                self._account_rt(f, addr)
+                return f
+            if f is not None:
+                f.release()
+                self.stale += 1   # zaman aşımına uğramış isteğin geç yanıtı
+
+    def transact(self, frame, timeout=0.1):
+        """Bus1553.transact ile aynı: yanıt çerçevesi (durum + veri) ya da None."""
+        addr = (frame.buf[0] >> 11) & 0x1F
+        self._dest = addr
+        self._account_bc(frame, addr)
+        if addr == BROADCAST_ADDR:
+            for ring in list(self._to_rt.values()):
+                ring.put(K_REQ, 0, frame, self.put_timeout)
+            frame.release()
+            return None
+        ring = self._to_rt.get(addr)
+        if ring is None:
+            frame.release()
+            return None
+        tag = next(self._tags) & 0xFFFFFFFF
+        ok = ring.put(K_REQ, tag, frame, self.put_timeout)
+        frame.release()
+        if not ok:
+            return None
+        back = self._to_bc[addr]
+        deadline = None if timeout is None else time.monotonic() + max(0.0, timeout)
+        while True:
+            left = None if deadline is None else max(0.0, deadline - time.monotonic())
+            item = back.get(self.pool, left)
+            if item is None:
+                return None
+            kind, t, f = item
+            if kind == K_REPLY and t == tag and f is not None:
+                self._account_rt(f, addr)
+                return f
+            if f is not None:
+                f.release()
+            self.stale += 1
+            if left == 0.0:
+                return None
+
+    def close(self):
+        for r in list(self._to_rt.values()) + list(self._to_bc.values()):
+            r.close()
+        self._to_rt = {}
+        self._to_bc = {}
+
+
+class ShmRtBus:
+    """
+    RT sürecindeki uç (tek adres): Bus1553'ün RT tarafı arayüzü. RT1553(ShmRtBus(spec), rt_addr=addr)
+    değişmeden çalışır; BusRequest'lere rt_reply ile verilen yanıt etiketle BC'ye döner.
+    """
+    def __init__(self, spec, pool_size=64):
+        addr, to_rt, to_bc = spec
+        self.addr = addr
+        self._in = ShmRing.attach(to_rt)
+        self._out = ShmRing.attach(to_bc)
+        self.pool = FramePool(pool_size)
+        self.trace = None
+        self.timing = None
+        self.tap = None
+        self.put_timeout = 1.0
+
+    def attach_rt(self, addr):
+        if addr != self.addr:
+            raise ValueError(f"Bu uç yalnızca RT {self.addr} içindir: {addr}")
+
+    def detach_rt(self, addr):
+        pass
+
+    def attached(self):
+        return [self.addr]
+
+    # ---- RT perspektifi ----
+    def rt_send(self, words, addr=None):
+        self._out.put(K_MSG, 0, words, self.put_timeout)
+        if isinstance(words, Frame):
+            words.release()
+
+    def rt_reply(self, req, frame):
+        self._out.put(K_REPLY, req.tag or 0, frame, self.put_timeout)
+        frame.release()
+
+    def _wrap(self, item):
+        if item is None:
+            return None
+        kind, tag, f = item
+        if kind == K_WAKE:
+            return WAKE
+        if f is None:
+            return None
+        _log_words(f, "BC->RT")
+        if kind == K_REQ:
+            return BusRequest(f, self.addr, tag)
+        return f
+
+    def rt_recv(self, timeout=0.1, addr=None):
+        """RT'nin BC'den gelen mesajı (Frame ya da BusRequest) alması; timeout=None: WAKE'e kadar bekler."""
+        return self._wrap(self._in.get(self.pool, timeout))
+
+    def rt_recv_nowait(self, addr=None):
+        return self._wrap(self._in.get(self.pool, 0))
+
+    def rt_wake(self, addr=None):
+        self._in.wake()
+
+    def close(self):
+        self._in.close()
+        self._out.close()
+
+
+# -------------------- RT süreci --------------------
+
+def make_rt(bus, addr, sim, fusion_hz=None):
+    """Varsayılan RT: sim=True ise RT1553 + ImuSim + EKF (canlı köprüdeki gibi); fusion_hz: RT füzyon döngüsü."""
+    from rt1553 import RT1553
+    if not sim:
+        return RT1553(bus, rt_addr=addr, fusion_hz=fusion_hz)
+    from imu_sim import ImuSim
+    from ekf import EKF
+    return RT1553(bus, rt_addr=addr, sim=ImuSim(), ekf=EKF(), fusion_hz=fusion_hz)
+
+
+def rt_process_main(spec, sim, rt_factory, ready, stop, fusion_hz=None):
+    # Süreç içi: uç bağlanır, RT kendi thread'inde koşar, ana thread durdurma olayını bekler
+    bus = ShmRtBus(spec)
+    rt = (rt_factory or make_rt)(bus, spec[0], sim, fusion_hz)
+    th = threading.Thread(target=rt.run_forever, daemon=True)
+    th.start()
+    ready.set()
+    try:
+        stop.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        rt.stop()
+        th.join(timeout=2.0)
+        bus.close()
+
+
+class ShmRtProcess:
+    """
+    ShmBus'ın addr ucuna bağlı RT'yi ayrı süreçte koşturur. rt_factory(bus, addr, sim, fusion_hz) modül düzeyinde
+    (spawn ile aktarılabilir) olmalı ve run_forever() / stop() sunan bir RT döndürmelidir.
+    """
+    def __init__(self, bus, addr=1, sim=False, rt_factory=None, fusion_hz=None):
+        ctx = bus.ctx
+        self._ready = ctx.Event()
+        self._stop = ctx.Event()
+        self.proc = ctx.Process(target=rt_process_main, name=f"rt{addr}",
+                                args=(bus.rt_spec(addr), sim, rt_factory, self._ready, self._stop, fusion_hz),
+                                daemon=True)
+
+    def start(self, timeout=10.0):
+        self.proc.start()
+        if not self._ready.wait(timeout):
+            self.stop()
+            raise RuntimeError("RT süreci başlamadı")
+        return self
+
+    def alive(self):
+        return self.proc.is_alive()
+
+    def stop(self, timeout=3.0):
+        self._stop.set()
+        self.proc.join(timeout=timeout)
+        if self.proc.is_alive():
+            self.proc.terminate()
+            self.proc.join(timeout=1.0)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Ayrı süreçteki RT'ye karşı shared memory bus denemesi")
+    ap.add_argument("--seconds", type=float, default=2.0)
+    ap.add_argument("--sim", action="store_true", help="RT süreci IMU sim + EKF ile")
+    args = ap.parse_args()
+
+    from bc1553 import BC1553
+    from sensor1553 import SA_IMU, SA_EKF, FRAME_WORDS, unpack_imu_words
+    from profiling import Histogram
+
+    bus = ShmBus(addrs=(1,))
+    rtp = ShmRtProcess(bus, addr=1, sim=args.sim).start()
+    bc = BC1553(bus)
+    hist = Histogram()
+    n = fail = 0
+    last = None
+    t_end = time.perf_counter() + args.seconds
+    try:
+        while time.perf_counter() < t_end:
+            t = time.perf_counter_ns()
+            words = bc.rx_from_rt(1, SA_IMU, FRAME_WORDS, timeout=0.5)
+            hist.record(time.perf_counter_ns() - t)
+            if words is None:
+                fail += 1
+            else:
+                last = words
+            n += 1
+            bc.rx_from_rt(1, SA_EKF, FRAME_WORDS, timeout=0.5)
+    finally:
+        rtp.stop()
+        bus.close()
+    s = hist.stats_us()
+    print(f"IMU okuma: {n} işlem, {n / args.seconds:.0f} işlem/s, yanıtsız {fail}, "
+          f"p50/p99 {s['p50_us']:.1f}/{s['p99_us']:.1f} µs, geç yanıt {bus.stale}")
+    if last is not None:
+        print("Son IMU:", unpack_imu_words(last))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+"""
+bus_timing.py — 1 Mbit/s MIL-STD-1553 zamanlama modeli: benzetim bus saati + kullanım muhasebesi
+
+Bus1553 kelimeleri kuyruklarla anında taşır; bir IMU/EKF çizelgesinin gerçek bus'a sığıp
+sığmayacağını görmek için her mesaj benzetim saatine (µs) yazılır:
+
+  kelime          : word_us (20 µs = 20 bit @ 1 Mbit/s; sync + 16 bit + parite)
+  RT yanıt süresi : response_us (komut/veri sonu -> durum kelimesi; 4..12 µs), isteğe bağlı ± jitter
+  mesajlar arası  : gap_us (BC'nin iki mesaj arasındaki boşluğu, >= 4 µs)
+
+  BC -> RT (T/R=0): gap + (1 + wc) kelime + yanıt + 1 durum kelimesi
+  RT -> BC (T/R=1): gap + 1 kelime + yanıt + (1 + wc) kelime
+  yayın (RT 31)   : durum kelimesi ve yanıt süresi yok
+
+İki kullanım:
+  - Canlı muhasebe: Bus1553(timing=BusClock(...)) -> bc_send/rt_send kelimeleri saate yazar;
+    BcScheduleRunner her minor frame sonunda clock.end_minor() çağırır.
+  - Ayrık olay modu: simulate(schedule, timing, seconds) thread/uyku olmadan minor frame'leri
+    benzetim saatinde koşar; saatlerce trafik saniyeler içinde. Taşan minor frame bir sonrakinin
+    başlangıcını kaydırır (geç başlangıç), overrun = meşgul süre > minor periyot.
+
+Muhasebe: minor frame indeksi başına (ort/max kullanım, overrun) ve (RT, alt adres) başına
+(mesaj, kelime, meşgul süre, bus payı).
+
+Kullanım:
+  python bus_timing.py --hours 1 --imu-hz 50 --ekf-hz 10
+  python bus_timing.py --hours 1 --extra-rts 12 --extra-wc 32 --extra-hz 50   # doygunluk
+"""
+
+import time
+import argparse
+
+import numpy as np
+
+from bus1553 import Frame, SYNC_CMD, SYNC_STATUS, BROADCAST_ADDR
+
+WORD_US = 20.0
+
+
+class BusTiming:
+    def __init__(self, word_us=WORD_US, response_us=8.0, gap_us=4.0, response_jitter_us=0.0, seed=0):
+        self.word_us = float(word_us)
+        self.response_us = float(response_us)
+        self.gap_us = float(gap_us)
+        self.response_jitter_us = float(response_jitter_us)
+        self._rng = np.random.default_rng(seed)
+        self._jit = np.empty(0)
+        self._ji = 0
+
+    def response(self):
+        """Bir RT yanıt süresi (µs); jitter varsa ±jitter düzgün dağılım (bloklar halinde üretilir)."""
+        if self.response_jitter_us <= 0:
+            return self.response_us
+        if self._ji >= len(self._jit):
+            self._jit = self._rng.uniform(-self.response_jitter_us, self.response_jitter_us, 4096)
+            self._ji = 0
+        j = self._jit[self._ji]
+        self._ji += 1
+        return max(0.0, self.response_us + j)
+
+    def message_us(self, tr, wc, rt=0):
+        """Tam bir mesajın bus süresi (µs); wc=0 -> 32 kelime."""
+        n = wc if wc > 0 else 32
+        if rt == BROADCAST_ADDR:
+            return self.gap_us + (1 + n) * self.word_us
+        return self.gap_us + (2 + n) * self.word_us + self.response()
+
+
+class _SlotStats:
+    __slots__ = ("count", "busy_us", "max_us", "overruns")
+
+    def __init__(self):
+        self.count = 0
+        self.busy_us = 0.0
+        self.max_us = 0.0
+        self.overruns = 0
+
+
+class BusClock:
+    """
+    Benzetim bus saati (µs) ve kullanım muhasebesi. Minor frame sınırları end_minor(k) ile
+    işaretlenir; minor_period_s verilmezse yalnızca (RT, SA) muhasebesi tutulur.
+    """
+    def __init__(self, timing=None, minor_period_s=None):
+        self.timing = timing or BusTiming()
+        self.minor_us = minor_period_s * 1e6 if minor_period_s else None
+
+        self.now_us = 0.0
+        self.busy_us = 0.0
+        self.by_sa = {}          # (rt, sa) -> [mesaj, kelime, meşgul µs]
+        self.slots = {}          # minor indeksi -> _SlotStats
+        self.late_starts = 0     # önceki frame taştığı için geç başlayan minor frame
+        self.minors = 0
+
+        self._frame_start = 0.0
+        self._frame_busy = 0.0
+        self._cur = None         # son komutun (rt, sa) anahtarı
+
+    # ---- muhasebe ----
+    def charge(self, rt, sa, us, words=0, message=False):
+        self.now_us += us
+        self.busy_us += us
+        self._frame_busy += us
+        e = self.by_sa.get((rt, sa))
+        if e is None:
+            e = self.by_sa[(rt, sa)] = [0, 0, 0.0]
+        e[0] += 1 if message else 0
+        e[1] += words
+        e[2] += us
+
+    def charge_message(self, rt, sa, tr, wc):
+        """Ayrık olay modu: tüm mesajı tek seferde yaz."""
+        n = wc if wc > 0 else 32
+        words = 1 + n + (0 if rt == BROADCAST_ADDR else 1)
+        self.charge(rt, sa, self.timing.message_us(tr, wc, rt), words, message=True)
+
+    def end_minor(self, k):
+        """k. minor frame bitti: kullanımını kaydet, saati bir sonraki minor başlangıcına ilerlet."""
+        st = self.slots.get(k)
+        if st is None:
+            st = self.slots[k] = _SlotStats()
+        busy = self._frame_busy
+        st.count += 1
+        st.busy_us += busy
+        if busy > st.max_us:
+            st.max_us = busy
+        self.minors += 1
+        if self.minor_us:
+            if busy > self.minor_us:
+                st.overruns += 1
+            nxt = self._frame_start + self.minor_us
+            if self.now_us > nxt:
+                self.late_starts += 1
+                nxt = self.now_us       # taşan frame bir sonrakini kaydırır
+            self.now_us = nxt
+            self._frame_start = nxt
+        self._frame_busy = 0.0
+
+    # ---- Bus1553 kancaları (canlı muhasebe) ----
+    def on_bc(self, words):
+        first, n = _first_and_len(words)
+        if n == 0:
+            return
+        t = self.timing
+        if (first >> 16) & 0b11 == SYNC_CMD:
+            rt, sa = (first >> 11) & 0x1F, (first >> 5) & 0x1F
+            self._cur = (rt, sa)
+            self.charge(rt, sa, t.gap_us + n * t.word_us, n, message=True)
+        else:
+            # BC -> RT veri kelimeleri; RT'nin yanıt süresi durum kelimesiyle (on_rt) yazılır
+            rt, sa = self._cur or (None, None)
+            self.charge(rt, sa, n * t.word_us, n)
+
+    def on_rt(self, words):
+        first, n = _first_and_len(words)
+        if n == 0:
+            return
+        t = self.timing
+        us = n * t.word_us
+        if (first >> 16) & 0b11 == SYNC_STATUS:
+            us += t.response()
+        rt, sa = self._cur or (None, None)
+        self.charge(rt, sa, us, n)
+
+    # ---- raporlama ----
+    def utilization(self):
+        return self.busy_us / self.now_us if self.now_us > 0 else 0.0
+
+    def summary(self):
+        t = self.timing
+        lines = [
+            "1553 bus zamanlama modeli",
+            "=========================",
+            f"Model: kelime {t.word_us:g} µs, RT yanıt {t.response_us:g}±{t.response_jitter_us:g} µs, "
+            f"mesaj arası {t.gap_us:g} µs",
+            f"Benzetim süresi: {self.now_us / 1e6:.3f} s  |  meşgul: {self.busy_us / 1e6:.3f} s  "
+            f"|  kullanım: {self.utilization() * 100:.2f}%",
+        ]
+        if self.minor_us:
+            over = sum(s.overruns for s in self.slots.values())
+            lines.append(f"Minor frame: {self.minor_us / 1e3:.2f} ms x {self.minors}  |  overrun: {over}  "
+                         f"|  geç başlayan: {self.late_starts}")
+            lines.append("  minor   adet      kullanım ort/max   overrun")
+            for k in sorted(self.slots):
+                s = self.slots[k]
+                mean = s.busy_us / s.count / self.minor_us if s.count else 0.0
+                lines.append(f"  {k:5d} {s.count:7d}   {mean * 100:7.2f}%/{s.max_us / self.minor_us * 100:7.2f}%   {s.overruns:7d}")
+        lines.append("  RT  SA     mesaj       kelime    meşgul[s]   bus payı")
+        for (rt, sa), (msgs, words, us) in sorted(self.by_sa.items(), key=lambda kv: (kv[0][0] is None, kv[0])):
+            share = us / self.now_us if self.now_us > 0 else 0.0
+            lines.append(f"  {rt if rt is not None else '-':>2}  {sa if sa is not None else '-':>2}  "
+                         f"{msgs:8d}  {words:11d}  {us / 1e6:10.3f}   {share * 100:7.2f}%")
+        return "\n".join(lines)
+
+
+def _first_and_len(words):
+    if isinstance(words, Frame):
+        return (words.buf[0] if words.n else 0), words.n
+    if isinstance(words, list):
+        return (words[0] if words else 0), len(words)
+    return words, 1
+
+
+def simulate(schedule, timing=None, seconds=3600.0):
+    """
+    Ayrık olay modu: çizelgeyi benzetim saatinde seconds boyunca koşturur (uyku/thread yok).
+    Dönüş: BusClock (summary() ile raporlanır).
+    """
+    clock = BusClock(timing, schedule.minor_period)
+    n_frames = int(round(seconds * schedule.minor_hz))
+    frames = [[(m.rt, m.sa, m.tr, m.wc) for m in f] for f in schedule.frames]
+    n_minor = schedule.n_minor
+    charge = clock.charge_message
+    end = clock.end_minor
+    for i in range(n_frames):
+        k = i % n_minor
+        for rt, sa, tr, wc in frames[k]:
+            charge(rt, sa, tr, wc)
+        end(k)
+    return clock
+
+
+def main():
+    from bc_schedule import BusMessage, BusSchedule
+    from sensor1553 import FRAME_WORDS, SA_IMU, SA_EKF
+
+    ap = argparse.ArgumentParser(description="1553 çizelgesini benzetim bus saatinde (ayrık olay) koştur")
+    ap.add_argument("--hours", type=float, default=1.0)
+    ap.add_argument("--minor-hz", type=float, default=None)
+    ap.add_argument("--imu-hz", type=float, default=50.0)
+    ap.add_argument("--ekf-hz", type=float, default=10.0)
+    ap.add_argument("--extra-rts", type=int, default=0, help="Ek RT sayısı (adres 2..), her biri tek okuma mesajı")
+    ap.add_argument("--extra-wc", type=int, default=32)
+    ap.add_argument("--extra-hz", type=float, default=10.0)
+    ap.add_argument("--word-us", type=float, default=WORD_US)
+    ap.add_argument("--response-us", type=float, default=8.0)
+    ap.add_argument("--jitter-us", type=float, default=0.0)
+    ap.add_argument("--gap-us", type=float, default=4.0)
+    args = ap.parse_args()
+    if not 0 <= args.extra_rts <= 29:
+        ap.error("--extra-rts 0..29 olmalı (adres 2..30)")
+
+    msgs = [BusMessage("imu", 1, SA_IMU, FRAME_WORDS, args.imu_hz),
+            BusMessage("ekf", 1, SA_EKF, FRAME_WORDS, args.ekf_hz)]
+    for i in range(args.extra_rts):
+        msgs.append(BusMessage(f"rt{i + 2}", i + 2, 1, args.extra_wc, args.extra_hz))
+    sch = BusSchedule(msgs, minor_hz=args.minor_hz)
+    timing = BusTiming(args.word_us, args.response_us, args.gap_us, args.jitter_us)
+
+    t0 = time.perf_counter()
+    clock = simulate(sch, timing, args.hours * 3600.0)
+    wall = time.perf_counter() - t0
+    print(sch.table())
+    print(clock.summary())
+    print(f"Gerçek süre: {wall:.2f} s  ({clock.now_us / 1e6 / wall:.0f}x gerçek zaman)")
+
+
+if __name__ == "__main__":
+    main()
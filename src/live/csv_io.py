@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+"""
+csv_io.py — Sayısal CSV dosyaları için ortak okuma yardımcıları
+
+- iter_csv_chunks: dosyayı parça parça okuyup her parçayı {kolon: np.ndarray} olarak verir.
+  Bellek kullanımı dosya boyundan bağımsızdır (chunk_rows satır kadar).
+- load_columns: dosyanın tamamını kolon bazlı float64 dizilere okur (np.loadtxt, C ayrıştırıcı)
+  ve yanına ikili önbellek (<csv>.cache.npz) yazar. Önbellek anahtarı: boyut + mtime + blake2b;
+  boyut/mtime tutarsa doğrudan, yalnızca mtime değiştiyse içerik özeti tutarsa yine önbellekten
+  okunur. Tekrar çizim/analizde CSV ayrıştırılmaz. Metin kolonlar NaN olur; satır atlanan
+  (yazımı süren) dosyanın sonucu önbelleğe yazılmaz.
+- load_sidecar: aynı anahtarla CSV'den türetilen başka diziler (ör. lod.py piramidi) için yan dosya.
+"""
+
+import os
+import csv
+import hashlib
+import warnings
+import itertools
+
+import numpy as np
+
+CACHE_SUFFIX = ".cache.npz"
+_CACHE_VERSION = 2   # 2: metin kolonlar NaN (v1 bunları boş sonuç olarak saklayabiliyordu)
+
+
+def read_header(path):
+    """CSV'nin ilk satırındaki kolon adlarını döndürür."""
+    with open(path, "r", newline="") as f:
+        header = next(csv.reader(f), None)
+    if not header:
+        raise ValueError(f"CSV başlığı boş: {path}")
+    return [h.strip() for h in header]
+
+
+def _parse_block(lines, ncol, idx):
+    """Satır listesini (k, len(idx)) diziye çevirir; bozuk satırlar atlanır."""
+    try:
+        arr = np.loadtxt(lines, delimiter=",", ndmin=2, dtype=float)
+        if arr.shape[1] == ncol:
+            return arr[:, idx]
+    except ValueError:
+        pass
+    rows = []
+    for line in lines:
+        r = line.split(",")
+        if len(r) != ncol:
+            continue
+        try:
+            rows.append([float(r[i]) for i in idx])
+        except ValueError:
+            continue
+    return np.array(rows, dtype=float).reshape(-1, len(idx))
+
+
+def iter_csv_chunks(path, chunk_rows=4096, columns=None):
+    """
+    CSV'yi chunk_rows satırlık parçalar halinde okur.
+    Her parça {kolon: float64 dizisi} sözlüğüdür; columns verilirse yalnızca o kolonlar döner.
+    Eksik/bozuk (kolon sayısı tutmayan) satırlar atlanır.
+    Parçalar np.loadtxt (C ayrıştırıcı) ile çözülür; yalnızca bozuk satır içeren parça
+    satır satır yavaş yola düşer.
+    """
+    chunk_rows = max(1, int(chunk_rows))
+    with open(path, "r", newline="") as f:
+        header = next(csv.reader([f.readline()]), None)
+        if not header:
+            return
+        header = [h.strip() for h in header]
+        if columns is not None:
+            missing = [c for c in columns if c not in header]
+            if missing:
+                raise ValueError(f"CSV kolon eksik: {', '.join(missing)}")
+            idx = [header.index(c) for c in columns]
+            names = list(columns)
+        else:
+            idx = list(range(len(header)))
+            names = header
+
+        ncol = len(header)
+        while True:
+            raw = list(itertools.islice(f, chunk_rows))
+            if not raw:
+                return
+            lines = [ln for ln in raw if ln.strip()]
+            if not lines:
+                continue
+            arr = _parse_block(lines, ncol, idx)
+            if len(arr):
+                yield {n: np.ascontiguousarray(arr[:, i]) for i, n in enumerate(names)}
+
+
+# ---------------- Kolon bazlı hızlı yükleyici + ikili önbellek ----------------
+
+def file_digest(path, bufsize=1 << 20):
+    """Dosya içeriğinin blake2b özeti (hex)."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(bufsize), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cache_path_for(path, suffix=CACHE_SUFFIX):
+    return path + suffix
+
+
+def _empty_columns(header):
+    return {h: np.empty(0) for h in header}
+
+
+def _float_column(vals):
+    """Metin değerleri float64 diziye çevirir; sayı olmayan hücreler NaN olur."""
+    try:
+        return np.array(vals, dtype=float)
+    except ValueError:
+        out = np.full(len(vals), np.nan)
+        for k, v in enumerate(vals):
+            try:
+                out[k] = float(v)
+            except ValueError:
+                pass
+        return out
+
+
+def _numeric_columns(path, ncol):
+    """İlk veri satırında metin olmayan kolonların indeksleri (satır yoksa/bozuksa None)."""
+    with open(path, "r", newline="") as f:
+        f.readline()
+        for line in f:
+            r = line.rstrip("\r\n").split(",")
+            if not line.strip():
+                continue
+            if len(r) != ncol:
+                return None
+            idx = []
+            for i, v in enumerate(r):
+                try:
+                    float(v)
+                except ValueError:
+                    if v.strip():
+                        continue
+                idx.append(i)      # boş hücre: kolonu sayısal say, karar yavaş yola kalsın
+            return idx
+    return None
+
+
+def _parse_columns(path):
+    """
+    CSV'yi {kolon: float64} olarak ayrıştırır; (veri, atlanan_satır) döndürür.
+    Sayı olmayan kolonlar (ör. metin 'mode') NaN ile dolar, satırları düşürmez; yalnızca
+    kolon sayısı tutmayan (yarım kalmış) satırlar atlanır ve sayılır.
+    """
+    header = read_header(path)
+    ncol = len(header)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", UserWarning)   # yalnızca başlık: "input contained no data"
+            arr = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2, dtype=float)
+    except ValueError:
+        return _parse_columns_mixed(path, header)
+    if arr.size == 0:
+        # Yalnızca başlık (ör. akış yazıcısı ilk bloğu henüz yazmadı): loadtxt (0, 1) döndürür
+        return _empty_columns(header), 0
+    if arr.shape[1] != ncol:
+        raise ValueError(f"CSV kolon sayısı başlıkla uyuşmuyor: {path}")
+    return {h: np.ascontiguousarray(arr[:, i]) for i, h in enumerate(header)}, 0
+
+
+def _parse_columns_mixed(path, header):
+    """loadtxt'in reddettiği dosya: metin kolon ve/veya bozuk satır içerir."""
+    ncol = len(header)
+    num = _numeric_columns(path, ncol)
+    if num:
+        # Yalnızca metin kolon varsa sayısal kolonlar yine C ayrıştırıcıdan geçer
+        try:
+            arr = np.loadtxt(path, delimiter=",", skiprows=1, ndmin=2, dtype=float, usecols=num)
+        except ValueError:
+            pass
+        else:
+            n = len(arr)
+            data = {h: np.full(n, np.nan) for h in header}
+            for j, i in enumerate(num):
+                data[header[i]] = np.ascontiguousarray(arr[:, j])
+            return data, 0
+    # Toleranslı yavaş yol: kolon sayısı tutmayan satırlar atlanır, hücreler kolon kolon çevrilir
+    cols = [[] for _ in header]
+    dropped = 0
+    with open(path, "r", newline="") as f:
+        f.readline()
+        for line in f:
+            if not line.strip():
+                continue
+            r = line.rstrip("\r\n").split(",")
+            if len(r) != ncol:
+                dropped += 1
+                continue
+            for c, v in zip(cols, r):
+                c.append(v)
+    return {h: _float_column(c) for h, c in zip(header, cols)}, dropped
+
+
+def _read_cache(cpath, size, mtime_ns, path):
+    try:
+        with np.load(cpath, allow_pickle=False) as z:
+            meta = z["__meta__"]
+            if int(meta[0]) != _CACHE_VERSION or int(meta[1]) != size:
+                return None
+            fresh = int(meta[2]) == mtime_ns
+            if not fresh and str(z["__digest__"]) != file_digest(path):
+                return None
+            names = [str(n) for n in z["__columns__"]]
+            data = {n: z["c_" + n] for n in names}
+    except Exception:
+        return None
+    if not fresh:
+        # İçerik aynı, yalnızca mtime değişmiş: anahtarı tazele
+        _write_cache(cpath, data, size, mtime_ns, path)
+    return data
+
+
+def _write_cache(cpath, data, size, mtime_ns, path):
+    try:
+        digest = file_digest(path)
+        names = list(data.keys())
+        payload = {"c_" + n: data[n] for n in names}
+        payload["__columns__"] = np.array(names)
+        payload["__meta__"] = np.array([_CACHE_VERSION, size, mtime_ns], dtype=np.int64)
+        payload["__digest__"] = np.array(digest)
+        tmp = cpath + ".tmp.npz"
+        np.savez(tmp, **payload)
+        os.replace(tmp, cpath)
+    except OSError:
+        pass  # salt-okunur klasör vb.: önbelleksiz devam
+
+
+def _load_sidecar(path, suffix, build, cache):
+    """load_sidecar gövdesi; build (veri, saklanabilir) döndürür, eksik sonuç önbelleğe yazılmaz."""
+    st = os.stat(path)
+    cpath = cache_path_for(path, suffix)
+    data = None
+    if cache and os.path.exists(cpath):
+        data = _read_cache(cpath, st.st_size, st.st_mtime_ns, path)
+    if data is None:
+        data, storable = build()
+        if cache and storable:
+            _write_cache(cpath, data, st.st_size, st.st_mtime_ns, path)
+    return data
+
+
+def load_sidecar(path, suffix, build, cache=True):
+    """
+    path'ten türetilen {ad: dizi} sözlüğünü <path><suffix> yan dosyasından okur; yoksa/bayatsa
+    build() ile üretip yazar. Tazelik anahtarı load_columns ile aynıdır (boyut + mtime + blake2b).
+    """
+    return _load_sidecar(path, suffix, lambda: (build(), True), cache)
+
+
+def load_columns(path, columns=None, cache=True):
+    """
+    CSV'yi {kolon: float64 dizisi} olarak yükler.
+    columns verilirse yalnızca o kolonlar döner (eksikse ValueError).
+    Sayı olmayan hücreler NaN olur; kolon sayısı tutmayan satırlar atlanır.
+    cache=True iken <csv>.cache.npz yan dosyası kullanılır/güncellenir; satır atlanan
+    (ör. yazımı süren) dosyanın sonucu önbelleğe yazılmaz.
+    """
+    def build():
+        data, dropped = _parse_columns(path)
+        return data, dropped == 0
+
+    data = _load_sidecar(path, CACHE_SUFFIX, build, cache)
+    if columns is not None:
+        missing = [c for c in columns if c not in data]
+        if missing:
+            raise ValueError(f"CSV kolon eksik: {', '.join(missing)}")
+        data = {c: data[c] for c in columns}
+    return data
@@ -96,7 +96,7 @@ class EKF:
 
         Rv = np.array([[self.r_v**2]])
 
-        if abs(float(innov_v)) > self.th_v:
+        if abs(float(innov_v[0, 0])) > self.th_v:
 
             Rv *= self.scale_v
 
@@ -117,7 +117,7 @@ class EKF:
 
         Rw = np.array([[self.r_w**2]])
 
-        if abs(float(innov_w)) > self.th_w:
+        if abs(float(innov_w[0, 0])) > self.th_w:
 
             Rw *= self.scale_w
 
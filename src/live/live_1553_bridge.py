@@ -3,19 +3,36 @@
 live_1553_bridge.py — 1553 RT (IMU+EKF) ↔ BC köprüsü (callback + ayrı CSV akışları)
 
 Bu sürüm:
-- IMU ve EKF stream'lerini AYRI CSV dosyalarına yazar (data/streams/imu_stream.csv, ekf_stream.csv)
+- IMU ve EKF stream'lerini AYRI dosyalara yazar (data/streams/imu_stream.csv, ekf_stream.csv; ya da
+  stream_format='col' ile ikili sütunsal imu_stream.col/, ekf_stream.col/). Bus sahibi thread yalnızca
+  ham kareyi önceden ayrılmış bloğa kopyalar; çözme/biçimlendirme/G/Ç stream_writer.StreamWriter'ın
+  thread'inde blok halinde yapılır (flush_s'de bir flush, fsync_s'de bir fsync, isteğe bağlı
+  rotate_mb / rotate_s ile segment döndürme)
+- Okumalar tek bus-sahibi thread'de çevrimsel çizelgeyle (bc_schedule) mutlak deadline'larda yapılır;
+  IMU/EKF hızları sabittir (imu_hz / ekf_hz, varsayılan 1/period_s), birbirine karışmaz
 - Temiz kapanış için Event tabanlı stop() ve join() uygular
-- İsteğe bağlı on_sample(dict) callback'i çağırır (kaynak: "src" alanı "imu" veya "ekf")
+- Çözülmüş örnekler bus sahibi thread'den sample_hub.SampleHub ile abonelere dağıtılır; on_sample(dict)
+  callback'i ("on_sample", drop_oldest) bir abonedir, subscribe() ile başka tüketiciler (ör. EKF)
+  eklenir. Her abonenin kendi sınırlı kuyruğu ve thread'i vardır; yavaş bir abone bus işlemlerini
+  geciktirmez (örnek dict'inde "src": "imu"/"ekf" ve "t"). Abone yoksa kareler hiç tek tek çözülmez
+- summary() / hud_line(): mesaj başına süre, overrun ve bus kullanımı; abone başına gecikme/kayıp
+- capture=True ise ham 1553 kelimeleri ikili yakalama dosyasına da yazılır (outdir/bus_capture.b1553;
+  kayıpsız, bus_capture.CaptureReader ile zaman/seq dilimlenip toplu çözülür)
+- monitor=True ise pasif bus monitor (bus_monitor.BusMonitor) trafiği dinler; işlem sonuçları ve
+  yanıt süreleri HUD satırına ve özete eklenir
 """
 
 import os
-import csv
-import time
-import threading
 from typing import Callable, Optional
 
 from bus1553 import Bus1553
 from bc1553 import BC1553
+from bc_schedule import BusMessage, BusSchedule, BcScheduleRunner
+from bus_capture import CaptureWriter, INDEX_SUFFIX
+from bus_monitor import BusMonitor
+from sample_hub import SampleHub
+from stream_writer import StreamWriter
+from sensor1553 import FRAME_WORDS, SA_IMU, SA_EKF, unpack_imu_words, unpack_ekf_words
 
 class Live1553Bridge:
     def __init__(self,
@@ -24,83 +41,98 @@ class Live1553Bridge:
                  rt_addr: int = 1,
                  period_s: float = 0.02,
                  on_sample: Optional[Callable[[dict], None]] = None,
-                 outdir: str = 'data/streams'):
+                 outdir: str = 'data/streams',
+                 imu_hz: Optional[float] = None,
+                 ekf_hz: Optional[float] = None,
+                 policy: str = 'drop',
+                 capture: bool = False,
+                 monitor: bool = False,
+                 sample_queue: int = 64,
+                 stream_format: str = 'csv',
+                 flush_s: float = 1.0,
+                 fsync_s: float = 5.0,
+                 rotate_mb: Optional[float] = None,
+                 rotate_s: Optional[float] = None):
         self.bus = bus
         self.bc = bc or BC1553(self.bus)
         self.rt_addr = int(rt_addr)
         self.period_s = float(period_s)
         self.on_sample = on_sample
         self.outdir = outdir
+        self.capture_path = os.path.join(outdir, 'bus_capture.b1553') if capture else None
+        self._capture = None
+        self.monitor = BusMonitor(self.bus) if monitor else None
 
-        self._stop_evt = threading.Event()
-        self._threads = []
+        self.writer = StreamWriter(outdir, fmt=stream_format, flush_s=flush_s, fsync_s=fsync_s,
+                                   rotate_bytes=int(rotate_mb * (1 << 20)) if rotate_mb else None,
+                                   rotate_s=rotate_s)
+        self._decode = {'imu': unpack_imu_words, 'ekf': unpack_ekf_words}
+        self.hub = SampleHub()
+        if on_sample is not None:
+            self.hub.subscribe('on_sample', self._call_on_sample, maxlen=sample_queue, policy='drop_oldest')
 
-        self._imu_fp = None
-        self._imu_w  = None
-        self._ekf_fp = None
-        self._ekf_w  = None
+        # decode yok: on_message ham kareyi alır (yazıcı toplu çözer, aboneler için tek tek çözülür)
+        rate = 1.0 / self.period_s
+        self.schedule = BusSchedule([
+            BusMessage('imu', self.rt_addr, SA_IMU, FRAME_WORDS, imu_hz or rate),
+            BusMessage('ekf', self.rt_addr, SA_EKF, FRAME_WORDS, ekf_hz or rate),
+        ])
+        self.runner = BcScheduleRunner(self.bc, self.schedule, on_message=self._on_message, policy=policy)
 
     def start(self):
         os.makedirs(self.outdir, exist_ok=True)
-        # IMU stream CSV
-        self._imu_fp = open(os.path.join(self.outdir, 'imu_stream.csv'), 'w', newline='')
-        self._imu_w = csv.writer(self._imu_fp)
-        self._imu_w.writerow(['t','seq','yaw','p','q','r','ax','ay','az','temp_c'])
-        # EKF stream CSV
-        self._ekf_fp = open(os.path.join(self.outdir, 'ekf_stream.csv'), 'w', newline='')
-        self._ekf_w = csv.writer(self._ekf_fp)
-        self._ekf_w.writerow(['t','seq','x','y','z','vx','vy','vz','roll','pitch','yaw'])
+        self.writer.start()
 
-        t1 = threading.Thread(target=self._loop_poll_imu, daemon=True)
-        t2 = threading.Thread(target=self._loop_poll_ekf, daemon=True)
-        t1.start(); t2.start()
-        self._threads = [t1, t2]
+        if self.capture_path:
+            # köprü her başlatıldığında yeni yakalama (CSV'ler gibi); eski indeks de silinir
+            for p in (self.capture_path, self.capture_path + INDEX_SUFFIX):
+                if os.path.exists(p):
+                    os.remove(p)
+            self._capture = CaptureWriter(self.capture_path)
+            self.runner.capture = self._capture
+
+        if self.monitor is not None:
+            self.monitor.start()
+        self.hub.start()
+        self.runner.start()
         return self
 
+    def subscribe(self, name, handler, maxlen=256, policy='drop_oldest', topics=None):
+        """Ek abone: handler(topic, sample); topic "imu" ya da "ekf". Bkz. SampleHub.subscribe."""
+        return self.hub.subscribe(name, handler, maxlen=maxlen, policy=policy, topics=topics)
+
     def stop(self):
-        self._stop_evt.set()
-        for t in self._threads:
-            t.join(timeout=2.0)
-        for fp in (self._imu_fp, self._ekf_fp):
-            if fp:
-                fp.flush()
-                fp.close()
+        self.runner.stop()
+        self.hub.stop()      # kuyruklarda kalan örnekler iletilir
+        self.writer.stop()   # kalan bloklar yazılır, fsync
+        if self._capture is not None:
+            self._capture.close()
+        if self.monitor is not None:
+            self.monitor.stop()
+
+    def summary(self):
+        text = self.runner.summary() + "\n\n" + self.writer.summary()
+        if self.hub.subscribers:
+            text += "\n\n" + self.hub.summary()
+        if self.monitor is not None:
+            text += "\n\n" + self.monitor.summary()
+        return text
+
+    def hud_line(self):
+        line = self.runner.hud_line() + "  |  " + self.writer.hud_line()
+        if self.hub.subscribers:
+            line += "  |  " + self.hub.hud_line()
+        if self.monitor is not None:
+            line += "  |  " + self.monitor.hud_line()
+        return line
 
-    # ---------- internal loops ----------
-    def _loop_poll_imu(self):
-        t0 = time.time()
-        while not self._stop_evt.is_set():
-            try:
-                sample = self.bc.poll_imu(self.rt_addr, timeout=0.5)  # dict bekler
-                if sample:
-                    now = time.time() - t0
-                    row = [f'{now:.3f}', sample.get('seq',0),
-                           f"{sample.get('yaw',0.0):.6f}", f"{sample.get('p',0.0):.6f}", f"{sample.get('q',0.0):.6f}",
-                           f"{sample.get('r',0.0):.6f}", f"{sample.get('ax',0.0):.6f}", f"{sample.get('ay',0.0):.6f}",
-                           f"{sample.get('az',0.0):.6f}", f"{sample.get('temp_c',0.0):.2f}"]
-                    self._imu_w.writerow(row)
-                    if self.on_sample:
-                        d = dict(sample); d['src']='imu'; d['t']=now
-                        self.on_sample(d)
-            except Exception:
-                pass
-            time.sleep(self.period_s)
+    # ---------- çizelge callback'i (bus-sahibi thread) ----------
+    def _on_message(self, msg, words, now):
+        self.writer.push(msg.name, now, words)
+        if self.hub.subscribers:
+            d = self._decode[msg.name](words); d['src'] = msg.name; d['t'] = now
+            self.hub.publish(msg.name, d)
 
-    def _loop_poll_ekf(self):
-        t0 = time.time()
-        while not self._stop_evt.is_set():
-            try:
-                sample = self.bc.poll_ekf(self.rt_addr, timeout=0.5)  # dict bekler
-                if sample:
-                    now = time.time() - t0
-                    row = [f'{now:.3f}', sample.get('seq',0),
-                           f"{sample.get('x',0.0):.6f}", f"{sample.get('y',0.0):.6f}", f"{sample.get('z',0.0):.6f}",
-                           f"{sample.get('vx',0.0):.6f}", f"{sample.get('vy',0.0):.6f}", f"{sample.get('vz',0.0):.6f}",
-                           f"{sample.get('roll',0.0):.6f}", f"{sample.get('pitch',0.0):.6f}", f"{sample.get('yaw',0.0):.6f}"]
-                    self._ekf_w.writerow(row)
-                    if self.on_sample:
-                        d = dict(sample); d['src']='ekf'; d['t']=now
-                        self.on_sample(d)
-            except Exception:
-                pass
-            time.sleep(self.period_s)
+    # ---------- aboneler (kendi thread'lerinde) ----------
+    def _call_on_sample(self, topic, d):
+        self.on_sample(d)
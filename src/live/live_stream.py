@@ -15,11 +15,27 @@ Kısayollar:
 
   q: pencereyi kapat
 
+  f: zoom/pan sonrası otomatik görünüm takibine dön (zoom'da çizgiler LOD piramidinden gelir)
+
+Replay: --replay <csv> [--speed N | --max] ile kayıtlı sensör verisi aynı Naive+EKF yolundan oynatılır.
+Zamanlama: simülasyon adımları mutlak deadline'larla koşar (--sched catchup|drop); jitter/overrun HUD'da.
+Profil: --profile ile LiveSim.step faz süreleri HUD'da gösterilir.
+Çıkışta zamanlayıcı + profil + 1553 BC çizelgesi özeti data/runs/live_summary.txt dosyasına yazılır.
+1553: köprü IMU/EKF okumalarını tek thread'de çevrimsel çizelgeyle (bc_schedule) yapar.
+Ayrık süreç: --split ile simülasyon+füzyon ayrı süreçte koşar, veriler shared memory halkasıyla
+(shm_ring.TrajRing) çizim sürecine aktarılır; p/r/c/q tuşları kontrol kanalıyla iletilir.
+1553 RT süreci: --rt-process ile RT (IMU sim + EKF) ayrı süreçte koşar; bus shared memory halkalarıdır
+(bus_shm.ShmBus), köprü ve BC çizim sürecinde kalır.
+RT füzyonu: RT kendi thread'inde --rt-fusion-hz hızında IMU sim + EKF koşar ve çerçeveleri çift tampona
+paketler; BC okumaları hazır çerçeveyle yanıtlanır (0: eski davranış, her okumada anında üretim).
+
 """
 
 
 
+import os
 import time
+import argparse
 
 import numpy as np
 
@@ -27,6 +43,10 @@ import matplotlib.pyplot as plt
 
 from sim_core import LiveSim
 
+from scheduler import DeadlineScheduler, POLICIES
+
+from render import LiveRenderer
+
 
 
 # --- Opsiyonel 1553 entegrasyonu ---
@@ -47,9 +67,31 @@ except Exception:
 
 
 
-def run_live(dt: float = 0.05, use_1553: bool = True):
+def run_live(dt: float = 0.05, use_1553: bool = True,
+             replay: str = None, speed: float = 1.0, profile: bool = False,
+             sched_policy: str = "catchup", split: bool = False, keep: int = 3000,
+             capture_1553: bool = False, monitor_1553: bool = False,
+             stream_format_1553: str = "csv", rotate_mb_1553: float = None,
+             rt_process_1553: bool = False, rt_fusion_hz_1553: float = 50.0):
 
-    sim = LiveSim(dt=dt)
+    base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    summary_path = os.path.join(base_dir, "data", "runs", "live_summary.txt")
+
+    sim = None    # süreç içi mod
+    simp = None   # --split: ayrı süreçteki simülasyonun tutamacı
+    if split:
+        from sim_proc import SimProcess
+        simp = SimProcess(dt=dt, keep=keep, sched_policy=sched_policy, profile=profile,
+                          replay=replay, speed=speed, summary_path=summary_path).start()
+        print("🧩 Simülasyon ayrı süreçte; veri shared memory halkasından okunuyor.")
+    elif replay:
+        from replay import ReplaySource
+        sim = LiveSim(dt=dt, total_keep=keep, profile=profile,
+                      source=ReplaySource(replay, speed=speed, default_dt=dt))
+    else:
+        sim = LiveSim(dt=dt, total_keep=keep, profile=profile)
+    if replay:
+        print(f"▶️  Replay: {replay} (hız: {'max' if not speed or speed <= 0 else f'{speed:g}x'})")
 
 
 
@@ -60,6 +102,7 @@ def run_live(dt: float = 0.05, use_1553: bool = True):
     bridge = None
     rt = None
     _rt_thread = None
+    rt_proc = None   # --rt-process: ayrı süreçteki RT'nin tutamacı
 
 
 
@@ -80,10 +123,16 @@ def run_live(dt: float = 0.05, use_1553: bool = True):
                     imu_latest["ok"] = True
 
             # Bus + RT (IMU sim + EKF) başlat
-            bus = Bus1553()
-            rt = RT1553(bus, rt_addr=1, sim=ImuSim(), ekf=EKF())
-            _rt_thread = threading.Thread(target=rt.run_forever, daemon=True)
-            _rt_thread.start()
+            if rt_process_1553:
+                from bus_shm import ShmBus, ShmRtProcess
+                bus = ShmBus(addrs=(1,))
+                rt_proc = ShmRtProcess(bus, addr=1, sim=True, fusion_hz=rt_fusion_hz_1553 or None).start()
+                print("🧩 1553 RT ayrı süreçte; bus shared memory halkaları.")
+            else:
+                bus = Bus1553()
+                rt = RT1553(bus, rt_addr=1, sim=ImuSim(), ekf=EKF(), fusion_hz=rt_fusion_hz_1553 or None)
+                _rt_thread = threading.Thread(target=rt.run_forever, daemon=True)
+                _rt_thread.start()
 
             # Köprü: csv_path YOK — yerine outdir var
             bridge = Live1553Bridge(
@@ -92,6 +141,10 @@ def run_live(dt: float = 0.05, use_1553: bool = True):
                 period_s=max(0.01, dt),
                 on_sample=_on_sample,
                 outdir="data/streams",
+                capture=capture_1553,
+                monitor=monitor_1553,
+                stream_format=stream_format_1553,
+                rotate_mb=rotate_mb_1553,
             ).start()
 
             print("✅ 1553 köprüsü aktif. IMU HUD açık.")
@@ -142,6 +195,18 @@ def run_live(dt: float = 0.05, use_1553: bool = True):
 
     def on_key(event):
 
+        if event.key == 'f':
+            renderer.follow_view()
+            return
+
+        # Ayrık süreç: tuşları kontrol kanalına ilet
+        if simp is not None:
+            if event.key in ('p', 'r', 'c', 'q'):
+                simp.send(event.key)
+            if event.key == 'q':
+                plt.close(fig)
+            return
+
         if event.key == 'p':
 
             sim.paused = not sim.paused
@@ -152,6 +217,12 @@ def run_live(dt: float = 0.05, use_1553: bool = True):
 
             sim.reset()
 
+            if sim.prof is not None:
+                sim.prof.reset()
+            if sched is not None:
+                sched.reset_stats()
+                sched.start()
+
             print("🔄 Reset")
 
         elif event.key == 'c':
@@ -176,156 +247,137 @@ def run_live(dt: float = 0.05, use_1553: bool = True):
 
 
 
-    # --- Ana döngü ---
-
-    last_draw = time.time()
-
-    try:
-
-        while plt.fignum_exists(fig.number):
-
-            if not sim.paused:
-
-                sim.step()
-
-
-
-            # ~20 Hz çizim
-
-            now = time.time()
-
-            if now - last_draw > 0.05:
-
-                if sim.gt:
-
-                    # Trajectory dizileri
-
-                    gt = np.array(sim.gt)
-
-                    nv = np.array(sim.nv) if sim.nv else np.empty((0, 2))
-
-                    ek = np.array(sim.ek) if sim.ek else np.empty((0, 2))
-
-
-
-                    # Çizgiler
-
-                    ln_gt.set_data(gt[:, 0], gt[:, 1])
-
-                    if nv.size:
-
-                        ln_nv.set_data(nv[:, 0], nv[:, 1])
-
-                    if ek.size:
-
-                        ln_ek.set_data(ek[:, 0], ek[:, 1])
-
-
-
-                    # Son nokta
-
-                    pt_cur.set_data([gt[-1, 0]], [gt[-1, 1]])
-
-
-
-                    # Otomatik limit
-
-                    pts_x = [gt[:, 0]]
-
-                    pts_y = [gt[:, 1]]
-
-                    if nv.size:
-
-                        pts_x.append(nv[:, 0])
-
-                        pts_y.append(nv[:, 1])
-
-                    if ek.size:
+    # --- Çizim (trajektori + HUD) ---
+    # LiveRenderer: yalnızca yeni noktalar eklenir, çizgiler seyreltilir (piksel sütunu başına
+    # min/max), çizgiler + HUD blit edilir; tam çizim sadece eksen limitleri büyüyünce yapılır.
 
-                        pts_x.append(ek[:, 0])
+    renderer = LiveRenderer(fig, ax, (ln_gt, ln_nv, ln_ek), pt_cur, txt)
 
-                        pts_y.append(ek[:, 1])
+    def draw_frame(rmse_nv, rmse_ek, extra_lines=()):
 
+        # HUD metni
+        hud = f"RMSE Naive: {rmse_nv:.2f} m  |  RMSE EKF: {rmse_ek:.2f} m"
 
+        # (Varsa) 1553 IMU özeti
+        if imu_latest.get("ok", False):
+            try:
+                hud += (
+                    f"\nIMU (1553): seq={int(imu_latest['seq']):5d}  "
+                    f"roll={imu_latest['roll']:+.3f}  pitch={imu_latest['pitch']:+.3f}  yaw={imu_latest['yaw']:+.3f} rad  |  "
+                    f"pqr=({imu_latest['p']:+.3f},{imu_latest['q']:+.3f},{imu_latest['r']:+.3f}) rad/s  |  "
+                    f"ax,ay,az=({imu_latest['ax']:+.2f},{imu_latest['ay']:+.2f},{imu_latest['az']:+.2f}) m/s²  |  "
+                    f"T={imu_latest['temp_c']:+.2f}°C"
+                )
+            except Exception:
+                pass
 
-                    allx = np.concatenate(pts_x)
-
-                    ally = np.concatenate(pts_y)
-
-                    pad = 3.0
-
-                    ax.set_xlim(allx.min() - pad, allx.max() + pad)
-
-                    ax.set_ylim(ally.min() - pad, ally.max() + pad)
-
-
-
-                    # RMSE hesapları (liste boşsa 0.0)
-
-                    try:
-
-                        rmse_nv = float(np.sqrt(np.mean(np.square(sim.err_naive)))) if sim.err_naive else 0.0
-
-                    except Exception:
-
-                        rmse_nv = 0.0
-
-                    try:
-
-                        rmse_ek = float(np.sqrt(np.mean(np.square(sim.err_ekf)))) if sim.err_ekf else 0.0
-
-                    except Exception:
-
-                        rmse_ek = 0.0
-
-
-
-                    # HUD metni
-
-                    hud = f"RMSE Naive: {rmse_nv:.2f} m  |  RMSE EKF: {rmse_ek:.2f} m"
-
-
-
-                    # (Varsa) 1553 IMU özeti
-
-                    if imu_latest.get("ok", False):
-
-                        try:
-
-                            hud += (
-
-                                f"\nIMU (1553): seq={int(imu_latest['seq']):5d}  "
-
-                                f"roll={imu_latest['roll']:+.3f}  pitch={imu_latest['pitch']:+.3f}  yaw={imu_latest['yaw']:+.3f} rad  |  "
-
-                                f"pqr=({imu_latest['p']:+.3f},{imu_latest['q']:+.3f},{imu_latest['r']:+.3f}) rad/s  |  "
-
-                                f"ax,ay,az=({imu_latest['ax']:+.2f},{imu_latest['ay']:+.2f},{imu_latest['az']:+.2f}) m/s²  |  "
-
-                                f"T={imu_latest['temp_c']:+.2f}°C"
-
-                            )
-
-                        except Exception:
-                            pass
+        for line in extra_lines:
+            if line:
+                hud += "\n" + line
 
+        renderer.frame(hud)
 
+    consumed = 0   # süreç içi mod: renderer'a aktarılan adım sayısı
+    seen_gen = 0   # renderer'ın çizdiği LiveSim reset kuşağı (--split'teki ring generation'ı gibi)
 
-                    txt.set_text(hud)
+    def draw_local():
+        """Süreç içi mod: LiveSim'in son çizimden beri ürettiği adımları ekle ve çiz."""
+        nonlocal consumed, seen_gen
+        if sim.generation != seen_gen:    # reset: eski ve yeni koşu karışmasın
+            renderer.clear()
+            consumed = 0
+            seen_gen = sim.generation
+        k = min(sim.steps - consumed, len(sim.gt))
+        if k > 0:
+            renderer.append(sim.gt[-k:], sim.nv[-k:], sim.ek[-k:])
+        consumed = sim.steps
 
+        # RMSE hesapları (liste boşsa 0.0)
+        try:
+            rmse_nv = float(np.sqrt(np.mean(np.square(sim.err_naive)))) if sim.err_naive else 0.0
+        except Exception:
+            rmse_nv = 0.0
+        try:
+            rmse_ek = float(np.sqrt(np.mean(np.square(sim.err_ekf)))) if sim.err_ekf else 0.0
+        except Exception:
+            rmse_ek = 0.0
+
+        extra = []
+        if sched is not None:
+            extra.append(sched.hud_line())
+        if sim.prof is not None:
+            extra.append(sim.prof.hud_line())
+        if bridge is not None:
+            extra.append(bridge.hud_line())
+        draw_frame(rmse_nv, rmse_ek, extra)
 
 
-                fig.canvas.draw_idle()
 
-                fig.canvas.flush_events()
+    # --- Ana döngü ---
+    # Canlı simülasyon mutlak deadline'larla (DeadlineScheduler) serbest bırakılır.
+    # Çizim yalnızca sıradaki deadline'a kadar yeterli boşluk (slack) varsa yapılır; böylece
+    # çizim bir adımı geciktirmez. Uzun süre hiç boşluk kalmazsa (>1 s) pencere donmasın diye
+    # yine de çizilir; bu durumda kaçan deadline'lar late/drop istatistiğinde görünür.
+    # Replay'de zamanlamayı kaynağın Pacer'ı yapar (kayıttaki t düzensiz olabilir).
 
-                last_draw = now
+    # --split: çizim süreci yalnızca halkayı okur; deadline'lar çocuk süreçte tutulur.
 
+    sched = None
+    if sim is not None and sim.source is None:
+        sched = DeadlineScheduler(dt, policy=sched_policy).start()
+    frame_period = 0.05   # ~20 Hz çizim
+    draw_est = 0.0        # çizim süresi tahmini (s); tepe izleyici, yavaş söner
+    last_draw = time.monotonic()
 
+    try:
 
-            time.sleep(dt * 0.6)
+        if simp is not None:
+            from shm_ring import M_RMSE_N, M_RMSE_E
+            ring = simp.ring
+            last_count, gen = 0, 0
+            metrics, text = None, ""
+            while plt.fignum_exists(fig.number) and simp.alive():
+                rows, last_count, g, met, tx = ring.read_since(last_count, gen)
+                if g != gen:
+                    renderer.clear()
+                    gen = g
+                if len(rows):
+                    renderer.append(rows[:, 1:3], rows[:, 3:5], rows[:, 5:7])
+                if met is not None:
+                    metrics, text = met, tx
+                rmse_nv = float(metrics[M_RMSE_N]) if metrics is not None else 0.0
+                rmse_ek = float(metrics[M_RMSE_E]) if metrics is not None else 0.0
+                draw_frame(rmse_nv, rmse_ek, text.split("\n") if text else ())
+                time.sleep(frame_period)
+
+        while sim is not None and plt.fignum_exists(fig.number):
+
+            idle = sim.paused or sim.finished
+
+            if sched is not None:
+                if idle:
+                    sched.rebase()
+                else:
+                    for _ in range(sched.due()):
+                        t0 = time.perf_counter()
+                        sim.step()
+                        sched.note_step(time.perf_counter() - t0)
+            elif not idle:
+                sim.step()
 
+            now = time.monotonic()
+            if now - last_draw > frame_period:
+                starving = now - last_draw > 1.0
+                if sched is None or idle or starving or sched.slack() > draw_est:
+                    t0 = time.perf_counter()
+                    draw_local()
+                    draw_est = max(time.perf_counter() - t0, 0.9 * draw_est)
+                    last_draw = now
 
+            if idle:
+                time.sleep(min(dt, frame_period))
+            elif sched is not None:
+                sched.wait()
 
     except KeyboardInterrupt:
 
@@ -333,6 +385,31 @@ def run_live(dt: float = 0.05, use_1553: bool = True):
 
     finally:
 
+        # Ayrık süreç: çocuk özetini kendisi yazar
+        if simp is not None:
+            simp.stop()
+
+        # Koşu özeti (zamanlayıcı + faz profili)
+        sections = []
+        if sched is not None:
+            sections.append(sched.summary())
+        if sim is not None and sim.prof is not None:
+            sections.append(sim.prof.summary())
+        if bridge is not None:
+            sections.append(bridge.summary())
+        if rt is not None and rt.sched is not None:
+            sections.append(rt.fusion_line())
+        if sections:
+            text = "\n\n".join(sections)
+            print(text)
+            try:
+                os.makedirs(os.path.dirname(summary_path), exist_ok=True)
+                with open(summary_path, "w") as f:
+                    f.write(text + "\n")
+                print("📈 Özet:", summary_path)
+            except Exception as e:
+                print("⚠️ Koşu özeti yazılamadı:", e)
+
         # Köprüyü temiz kapat
 
         if bridge is not None:
@@ -344,6 +421,9 @@ def run_live(dt: float = 0.05, use_1553: bool = True):
                     rt.stop()
                 if _rt_thread:
                     _rt_thread.join(timeout=2.0)
+                if rt_proc:
+                    rt_proc.stop()
+                    bridge.bus.close()
             except Exception:
                 pass
 
@@ -354,6 +434,34 @@ def run_live(dt: float = 0.05, use_1553: bool = True):
 if __name__ == "__main__":
 
     # use_1553=True ise ve live_1553_bridge.py mevcutsa IMU HUD görünür
-
-    run_live(dt=0.05, use_1553=True)
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--dt", type=float, default=0.05)
+    ap.add_argument("--no-1553", action="store_true", help="1553 köprüsünü başlatma")
+    ap.add_argument("--replay", default=None, help="Kayıtlı CSV'yi oynat (run_latest.csv / imu_stream.csv)")
+    ap.add_argument("--speed", type=float, default=1.0, help="Replay hız çarpanı (1=gerçek zaman)")
+    ap.add_argument("--max", action="store_true", help="Replay'i beklemeden oynat")
+    ap.add_argument("--profile", action="store_true", help="LiveSim.step faz profilini HUD'da göster")
+    ap.add_argument("--sched", choices=POLICIES, default="catchup", help="Kaçan deadline politikası")
+    ap.add_argument("--split", action="store_true", help="Simülasyonu ayrı süreçte koştur (shared memory)")
+    ap.add_argument("--keep", type=int, default=3000, help="Tarihçe (ring buffer) uzunluğu")
+    ap.add_argument("--capture", action="store_true",
+                    help="Ham 1553 kelimelerini data/streams/bus_capture.b1553 dosyasına yakala")
+    ap.add_argument("--monitor", action="store_true",
+                    help="Pasif 1553 bus monitor: işlem sonuçları ve yanıt süreleri HUD'da")
+    ap.add_argument("--stream-format", choices=("csv", "col"), default="csv",
+                    help="1553 akış dosyaları: CSV ya da ikili sütunsal (data/streams/*.col/)")
+    ap.add_argument("--rotate-mb", type=float, default=None, help="Akış dosyasını bu boyutta döndür (MB)")
+    ap.add_argument("--rt-process", action="store_true",
+                    help="1553 RT'yi (IMU sim + EKF) ayrı süreçte koştur (shared memory bus)")
+    ap.add_argument("--rt-fusion-hz", type=float, default=50.0,
+                    help="RT füzyon döngüsü frekansı (0: her okumada anında üretim)")
+    args = ap.parse_args()
+
+    run_live(dt=args.dt, use_1553=not args.no_1553,
+             replay=args.replay, speed=0.0 if args.max else args.speed,
+             profile=args.profile, sched_policy=args.sched,
+             split=args.split, keep=args.keep, capture_1553=args.capture,
+             monitor_1553=args.monitor, stream_format_1553=args.stream_format,
+             rotate_mb_1553=args.rotate_mb, rt_process_1553=args.rt_process,
+             rt_fusion_hz_1553=args.rt_fusion_hz)
 
@@ -0,0 +1,546 @@
+# -*- coding: utf-8 -*-
+"""
+lod.py — Uzun koşular için çok çözünürlüklü (level-of-detail) yörünge piramidi
+
+- Seviye 0 ham örneklerdir; seviye k (k>=1) FIRST_BUCKET * 2^(k-1) örneklik kovalarda her kolonun
+  min/max/ortalamasını tutar. Her seviye bir öncekinin komşu kova çiftlerinden türetilir.
+  Ekleme (append) artımlıdır: yalnızca yeni dolan kovalar hesaplanır (canlı çizim için).
+- Görünüme göre seviye seçimi:
+    pick_xy     : (x, y) yörüngesi; görünür kovalar bbox kesişimiyle bulunur. Kaba seviyeden inceye
+                  inilir; görünür kova sayısı bütçeyi aşmadan kova boyutu piksele inene kadar.
+                  Kova ortalamalarından çizgi, kopuk görünür parçalar arasında NaN.
+    pick_series : zaman serisi; görünür zaman aralığındaki kovalar, min/max zikzak zarfı.
+  Son (henüz dolmamış) kova bölgesi daha ince seviyelerden ve ham örneklerden tamamlanır.
+- keep (canlı çizim): her seviye (ham örnekler dahil) yalnızca son ~keep kaydını tutar. İnce seviyeler
+  yakın geçmişi, kaba seviyeler tüm koşuyu kapsar; bellek O(keep * seviye sayısı) ile sınırlıdır.
+  Ufkun gerisine zoom yapılınca görünümü hâlâ kapsayan en ince seviye çizilir.
+- Yan dosya: <csv>.lod.npz (ham seviye CSV önbelleğindedir, burada yalnızca kovalar; float32).
+  Tazelik anahtarı csv_io.load_sidecar ile CSV'ye bağlıdır.
+- LodAxes: matplotlib eksenine bağlanır; xlim/ylim değişince çizgileri seçilen seviyeden yeniler.
+
+Kullanım:
+  python lod.py --csv ../data/runs/run_latest.csv      # piramidi üret/yan dosyaya yaz
+  python lod.py --bench 10000000                        # sentetik 10^7 noktada görünüm süreleri
+"""
+
+import time
+import argparse
+
+import numpy as np
+
+from csv_io import load_columns, load_sidecar
+
+LOD_SUFFIX = ".lod.npz"
+_LOD_VERSION = 1
+FIRST_BUCKET = 16        # seviye 1 kova boyu (örnek)
+MIN_POINTS = 100_000     # bundan kısa koşularda doğrudan çizim yeterli
+STATS = ("min", "max", "mean")
+
+
+class _Col:
+    """Kapasitesi ikiye katlanarak büyüyen 1B dizi; off: saklanan ilk kaydın mantıksal indeksi."""
+    def __init__(self, dtype=float, arr=None):
+        if arr is not None:
+            self.a = np.asarray(arr, dtype=dtype)
+            self.n = len(self.a)
+        else:
+            self.a = np.empty(1024, dtype=dtype)
+            self.n = 0
+        self.off = 0
+
+    def extend(self, v):
+        k = len(v)
+        if self.n + k > len(self.a):
+            cap = max(2 * len(self.a), self.n + k, 1024)
+            a = np.empty(cap, dtype=self.a.dtype)
+            a[:self.n] = self.a[:self.n]
+            self.a = a
+        self.a[self.n:self.n + k] = v
+        self.n += k
+
+    def view(self):
+        return self.a[:self.n]
+
+    def trim(self, keep):
+        """Yalnızca son keep kaydı tutar; kaydırma maliyeti amortize olsun diye 2*keep aşılınca kırpar."""
+        if self.n <= 2 * keep:
+            return
+        drop = self.n - keep
+        self.a[:keep] = self.a[drop:self.n]
+        self.off += drop
+        self.n = keep
+
+
+class _Level:
+    def __init__(self, columns, bucket, dtype):
+        self.bucket = bucket
+        self.n = 0           # mantıksal kova sayısı (kırpılanlar dahil)
+        self.off = 0         # saklanan ilk kovanın indeksi
+        self.s = {st: {c: _Col(dtype) for c in columns} for st in STATS}
+
+    def extend(self, mins, maxs, means):
+        for c in mins:
+            self.s["min"][c].extend(mins[c])
+            self.s["max"][c].extend(maxs[c])
+            self.s["mean"][c].extend(means[c])
+        self.n += len(next(iter(mins.values())))
+
+    def get(self, stat, col):
+        """Saklanan kovalar (mantıksal indeks i -> [i - off])."""
+        return self.s[stat][col].view()
+
+    def trim(self, keep):
+        for cols in self.s.values():
+            for col in cols.values():
+                col.trim(keep)
+                self.off = col.off
+
+
+def _pair_mean(a, b):
+    m = 0.5 * (a + b)
+    na, nb = np.isnan(a), np.isnan(b)
+    m[na] = b[na]
+    m[nb] = a[nb]
+    return m
+
+
+class LodPyramid:
+    """
+    keep: seviye başına tutulan en fazla kayıt (ham örnek ya da kova); None: sınırsız (CSV/yan dosya).
+    Kırpılmış piramitte indeksler mantıksaldır; n toplam eklenen örnek sayısıdır.
+    """
+    def __init__(self, columns, first_bucket=FIRST_BUCKET, dtype=np.float32, keep=None):
+        self.columns = list(columns)
+        self.first = int(first_bucket)
+        self.dtype = dtype
+        self.keep = max(int(keep), 2 * self.first) if keep else None
+        self.clear()
+
+    def clear(self):
+        self.n = 0
+        self.raw = {c: _Col() for c in self.columns}
+        self.levels = []     # levels[j] -> seviye j+1
+
+    @classmethod
+    def from_columns(cls, data, columns=None, first_bucket=FIRST_BUCKET):
+        p = cls(columns or list(data.keys()), first_bucket)
+        n = len(data[p.columns[0]])
+        p.raw = {c: _Col(arr=data[c]) for c in p.columns}   # kopyasız sarmalama
+        p.n = n
+        p._update_levels()
+        return p
+
+    def _raw_off(self):
+        return self.raw[self.columns[0]].off
+
+    # ---------------- üretim ----------------
+    def append(self, data):
+        """data: {kolon: dizi}, tüm kolonlar aynı uzunlukta."""
+        k = len(data[self.columns[0]])
+        if not k:
+            return
+        for c in self.columns:
+            self.raw[c].extend(np.asarray(data[c], dtype=float))
+        self.n += k
+        self._update_levels()
+
+    def _update_levels(self):
+        B = self.first
+        if not self.levels:
+            self.levels.append(_Level(self.columns, B, self.dtype))
+        L = self.levels[0]
+        nb = self.n // B
+        if nb > L.n:
+            r0 = self._raw_off()
+            seg = {c: self.raw[c].view()[L.n * B - r0:nb * B - r0].reshape(-1, B) for c in self.columns}
+            with np.errstate(invalid="ignore"):
+                cnt = {c: np.sum(~np.isnan(v), axis=1) for c, v in seg.items()}
+                L.extend({c: np.fmin.reduce(v, axis=1) for c, v in seg.items()},
+                         {c: np.fmax.reduce(v, axis=1) for c, v in seg.items()},
+                         {c: np.where(cnt[c] > 0, np.nansum(v, axis=1) / np.maximum(cnt[c], 1), np.nan)
+                          for c, v in seg.items()})
+        j = 0
+        while self.levels[j].n >= 2:
+            child = self.levels[j]
+            if j + 1 == len(self.levels):
+                self.levels.append(_Level(self.columns, child.bucket * 2, self.dtype))
+            parent = self.levels[j + 1]
+            nb = child.n // 2
+            if nb > parent.n:
+                sl = slice(2 * parent.n - child.off, 2 * nb - child.off)
+                lo = {c: child.get("min", c)[sl].reshape(-1, 2) for c in self.columns}
+                hi = {c: child.get("max", c)[sl].reshape(-1, 2) for c in self.columns}
+                mu = {c: child.get("mean", c)[sl].reshape(-1, 2) for c in self.columns}
+                parent.extend({c: np.fmin(v[:, 0], v[:, 1]) for c, v in lo.items()},
+                              {c: np.fmax(v[:, 0], v[:, 1]) for c, v in hi.items()},
+                              {c: _pair_mean(v[:, 0], v[:, 1]) for c, v in mu.items()})
+            j += 1
+        # En üstte tek kovalı seviyede dur; boş kalmış üst seviyeyi tutma
+        while len(self.levels) > 1 and self.levels[-1].n == 0:
+            self.levels.pop()
+        if self.keep:
+            # Tüketilmemiş kayıtlar (< bir kova) her zaman son keep içindedir; en üst seviye tek kovalıdır
+            for c in self.columns:
+                self.raw[c].trim(self.keep)
+            for L in self.levels:
+                L.trim(self.keep)
+
+    # ---------------- yan dosya ----------------
+    def to_arrays(self):
+        if self._raw_off() or any(L.off for L in self.levels):
+            raise ValueError("Kırpılmış (keep) piramit yan dosyaya yazılamaz")
+        out = {"__lod__": np.array([_LOD_VERSION, self.first, self.n], dtype=np.int64)}
+        for j, L in enumerate(self.levels):
+            for st in STATS:
+                for c in self.columns:
+                    out[f"L{j + 1}:{st}:{c}"] = L.get(st, c)
+        return out
+
+    @classmethod
+    def from_arrays(cls, raw, arrays, columns):
+        """raw: ham kolonlar (CSV'den), arrays: to_arrays() çıktısı. Uyumsuzsa None."""
+        meta = arrays.get("__lod__")
+        n = len(raw[columns[0]])
+        if meta is None or int(meta[0]) != _LOD_VERSION or int(meta[2]) != n:
+            return None
+        p = cls(columns, int(meta[1]))
+        p.raw = {c: _Col(arr=raw[c]) for c in columns}
+        p.n = n
+        j = 1
+        while f"L{j}:min:{columns[0]}" in arrays:
+            L = _Level(columns, p.first * 2 ** (j - 1), p.dtype)
+            for st in STATS:
+                for c in columns:
+                    key = f"L{j}:{st}:{c}"
+                    if key not in arrays:
+                        return None
+                    L.s[st][c] = _Col(p.dtype, arrays[key])
+            L.n = L.s["min"][columns[0]].n
+            p.levels.append(L)
+            j += 1
+        return p if p.levels else None
+
+    # ---------------- seçim ----------------
+    def _raw_idx(self, buckets, B):
+        """Seviye-1 kova indeksleri -> ham örnek indeksleri."""
+        return (buckets[:, None] * B + np.arange(B)).ravel()
+
+    def _tail(self, j):
+        """
+        Seviye j+1'in kapsamadığı son bölge: daha ince seviyelerden birer kova + ham kalan.
+        Dönüş: [(seviye indeksi ya da -1 (ham), indeksler)]
+        """
+        parts = []
+        pos = self.levels[j].n * self.levels[j].bucket if j >= 0 else self.n
+        for i in range(j - 1, -1, -1):
+            L = self.levels[i]
+            if L.n * L.bucket > pos:
+                b0 = pos // L.bucket
+                parts.append((i, np.arange(b0, L.n)))
+                pos = L.n * L.bucket
+        if pos < self.n:
+            parts.append((-1, np.arange(pos, self.n)))
+        return parts
+
+    def _values(self, lvl, idx, col, stat="mean"):
+        """Mantıksal indekslerdeki değerler (lvl=-1: ham örnek)."""
+        if lvl < 0:
+            return self.raw[col].view()[idx - self._raw_off()]
+        L = self.levels[lvl]
+        return L.get(stat, col)[idx - L.off].astype(float)
+
+    def _time_index(self, tcol, tv, side):
+        """Zaman -> mantıksal örnek indeksi; ham örnekler kırpıldıysa kapsayan en ince seviyeden (kova çözünürlüğü)."""
+        t = self.raw[tcol].view()
+        r0 = self._raw_off()
+        if r0 == 0 or (len(t) and tv >= t[0]):
+            return int(np.searchsorted(t, tv, side=side)) + r0
+        for L in self.levels:
+            tm = L.get("mean", tcol)
+            if L.off == 0 or (len(tm) and tv >= tm[0]):
+                return (int(np.searchsorted(tm, tv, side=side)) + L.off) * L.bucket
+        return 0
+
+    def _vis(self, j, view, xcol, ycol):
+        """Seviye j'nin saklanan kovalarından bbox'ı görünümle kesişenler (bool)."""
+        x0, x1, y0, y1 = view
+        L = self.levels[j]
+        return ((L.get("max", xcol) >= x0) & (L.get("min", xcol) <= x1) &
+                (L.get("max", ycol) >= y0) & (L.get("min", ycol) <= y1))
+
+    @staticmethod
+    def _with_neighbours(vis):
+        # Görünür kovaların komşularını da al: çizgi görünümden düzgün çıksın
+        keep = vis.copy()
+        keep[1:] |= vis[:-1]
+        keep[:-1] |= vis[1:]
+        return keep
+
+    def _older(self, j, start, view, xcol, ycol, budget):
+        """
+        Seviye j'nin ufkundan (start örneği) eski bölge: onu hâlâ kapsayan daha kaba seviyelerin
+        görünür kovaları. Dönüş: [(seviye indeksi, kova indeksleri)], eskiden yeniye.
+        """
+        segs = []
+        k = j + 1
+        while start > 0 and k < len(self.levels):
+            Lk = self.levels[k]
+            end = min(-(-start // Lk.bucket), Lk.n)
+            vis = self._vis(k, view, xcol, ycol)[:max(end - Lk.off, 0)]
+            if np.count_nonzero(vis) > budget and k + 1 < len(self.levels):
+                k += 1
+                continue
+            b = np.flatnonzero(self._with_neighbours(vis)) + Lk.off
+            if len(b):
+                segs.insert(0, (k, b))
+            start = min(start, Lk.off * Lk.bucket)
+            k += 1
+        return segs
+
+    def pick_xy(self, xcol, ycol, view, px, budget=4000):
+        """
+        view=(x0, x1, y0, y1), px: bir pikselin veri birimi karşılığı.
+        Dönüş: (x, y, seviye) — seviye 0 ham örnek, k>=1 kova seviyesi.
+        Kırpılmış piramitte seçilen seviyenin ufkundan eski kısım daha kaba seviyelerden eklenir.
+        """
+        if self.n == 0:
+            return np.empty(0), np.empty(0), 0
+        chosen = None
+        for j in range(len(self.levels) - 1, -1, -1):         # kabadan inceye
+            L = self.levels[j]
+            if L.n == 0:
+                continue
+            vis = self._vis(j, view, xcol, ycol)
+            cnt = int(np.count_nonzero(vis))
+            if cnt > budget and chosen is not None:
+                break
+            chosen = (j, vis)
+            # Görünür kova yoksa görünüm bu seviyenin kuyruğunda olabilir: inceye devam
+            if cnt:
+                ext = np.maximum(L.get("max", xcol)[vis] - L.get("min", xcol)[vis],
+                                 L.get("max", ycol)[vis] - L.get("min", ycol)[vis])
+                if np.nanmax(ext) <= px:
+                    break                                       # kova zaten piksel altında
+
+        if chosen is None:                                      # henüz tam kova yok
+            return self.raw[xcol].view().copy(), self.raw[ycol].view().copy(), 0
+
+        j, vis = chosen
+        L = self.levels[j]
+        buckets = np.flatnonzero(self._with_neighbours(vis)) + L.off
+        segs = self._older(j, L.off * L.bucket, view, xcol, ycol, budget)
+        if j == 0 and len(buckets) * L.bucket <= budget:
+            # Ham örnekleri kırpılmış kovalar seviye 1'de kalır
+            cut = int(np.searchsorted(buckets, -(-self._raw_off() // L.bucket)))
+            if cut:
+                segs.append((0, buckets[:cut]))
+            lvl = -1
+            segs.append((lvl, self._raw_idx(buckets[cut:], L.bucket)))
+        else:
+            lvl = j
+            segs.append((lvl, buckets))
+
+        xs, ys = [], []
+        for sl, si in segs:
+            if not len(si):
+                continue
+            if xs:
+                xs.append(np.array([np.nan]))
+                ys.append(np.array([np.nan]))
+            brk = np.flatnonzero(np.diff(si) > 1) + 1
+            xs.append(np.insert(self._values(sl, si, xcol), brk, np.nan))
+            ys.append(np.insert(self._values(sl, si, ycol), brk, np.nan))
+        joined = len(buckets) and buckets[-1] == L.n - 1
+        tail = self._tail(j)
+        if tail and xs and not joined:
+            xs.append(np.array([np.nan]))
+            ys.append(np.array([np.nan]))
+        for tl, ti in tail:
+            xs.append(self._values(tl, ti, xcol))
+            ys.append(self._values(tl, ti, ycol))
+        if not xs:
+            return np.empty(0), np.empty(0), (0 if lvl < 0 else j + 1)
+        return np.concatenate(xs), np.concatenate(ys), (0 if lvl < 0 else j + 1)
+
+    def pick_series(self, tcol, col, t0, t1, budget=4000):
+        """
+        Zaman serisi (t artan). Dönüş: (t, y, seviye); kova seviyesinde her kova için
+        (t_ort, min), (t_ort, max) noktaları -> min/max zarfı.
+        """
+        if self.n == 0:
+            return np.empty(0), np.empty(0), 0
+        t = self.raw[tcol].view()
+        r0 = self._raw_off()
+        i0 = max(self._time_index(tcol, t0, "left") - 1, 0)
+        i1 = min(self._time_index(tcol, t1, "right") + 1, self.n)
+        if (i1 - i0 <= budget and i0 >= r0) or not self.levels or self.levels[0].n == 0:
+            i0 = max(i0, r0)
+            return t[i0 - r0:i1 - r0], self.raw[col].view()[i0 - r0:i1 - r0], 0
+
+        j = 0
+        while j + 1 < len(self.levels) and ((i1 - i0) // self.levels[j].bucket > budget // 2
+                                            or i0 // self.levels[j].bucket < self.levels[j].off):
+            j += 1
+        L = self.levels[j]
+        b0 = max(i0 // L.bucket, L.off)
+        b1 = min(-(-i1 // L.bucket), L.n)
+        idx = np.arange(b0, b1)
+        ts = [np.repeat(self._values(j, idx, tcol), 2)]
+        ys = [np.column_stack([self._values(j, idx, col, "min"), self._values(j, idx, col, "max")]).ravel()]
+        if b1 == L.n:
+            for tl, ti in self._tail(j):
+                if tl < 0:
+                    ts.append(self._values(tl, ti, tcol))
+                    ys.append(self._values(tl, ti, col))
+                else:
+                    ts.append(np.repeat(self._values(tl, ti, tcol), 2))
+                    ys.append(np.column_stack([self._values(tl, ti, col, "min"),
+                                               self._values(tl, ti, col, "max")]).ravel())
+        return np.concatenate(ts), np.concatenate(ys), j + 1
+
+    def bounds(self, col):
+        """Kolonun tüm koşu boyunca min/max'ı (en kaba seviyeden + kuyruk)."""
+        vals = []
+        if self.levels and self.levels[-1].n:
+            L = self.levels[-1]
+            vals += [L.get("min", col), L.get("max", col)]
+            for tl, ti in self._tail(len(self.levels) - 1):
+                vals.append(self._values(tl, ti, col, "min"))
+                vals.append(self._values(tl, ti, col, "max"))
+        else:
+            vals.append(self.raw[col].view())
+        v = np.concatenate([np.asarray(a, dtype=float) for a in vals])
+        return float(np.nanmin(v)), float(np.nanmax(v))
+
+
+def load_pyramid(csv_path, data, columns, cache=True):
+    """CSV'ye bağlı piramit: <csv>.lod.npz varsa yükler, yoksa üretip yazar."""
+    arrays = load_sidecar(csv_path, LOD_SUFFIX,
+                          lambda: LodPyramid.from_columns(data, columns).to_arrays(), cache)
+    p = LodPyramid.from_arrays(data, arrays, list(columns))
+    return p if p is not None else LodPyramid.from_columns(data, columns)
+
+
+# ---------------- matplotlib bağlantısı ----------------
+
+class LodAxes:
+    """
+    Bir eksendeki çizgileri piramitten besler; zoom/pan (xlim/ylim değişimi) sonrası yeniden seçer.
+    Not: matplotlib geri çağrıları zayıf referans tutar; nesne eksene iliştirilir (ax._lod).
+    """
+    def __init__(self, ax, pyr, budget=None):
+        self.ax = ax
+        self.pyr = pyr
+        self.budget = budget
+        self.xy = []       # (line, xcol, ycol)
+        self.series = []   # (line, tcol, col)
+        self.last_levels = {}
+        ax._lod = self
+        ax.callbacks.connect("xlim_changed", self._on_lims)
+        ax.callbacks.connect("ylim_changed", self._on_lims)
+
+    def add_xy(self, line, xcol, ycol):
+        self.xy.append((line, xcol, ycol))
+
+    def add_series(self, line, tcol, col):
+        self.series.append((line, tcol, col))
+
+    def fit_view(self):
+        """Veri sınırlarını piramitten ver (boş çizgiler autoscale edilemez); limitleri autoscale seçer."""
+        if self.xy:
+            xs = [self.pyr.bounds(xc) for _, xc, _ in self.xy]
+            ys = [self.pyr.bounds(yc) for _, _, yc in self.xy]
+        else:
+            xs = [self.pyr.bounds(tc) for _, tc, _ in self.series]
+            ys = [self.pyr.bounds(c) for _, _, c in self.series]
+        x0, x1 = np.nanmin([a for a, _ in xs]), np.nanmax([b for _, b in xs])
+        y0, y1 = np.nanmin([a for a, _ in ys]), np.nanmax([b for _, b in ys])
+        self.ax.update_datalim([(x0, y0), (x1, y1)])
+        self.ax.autoscale_view()
+        self.update()
+
+    def _budget(self):
+        if self.budget:
+            return self.budget
+        try:
+            return max(1000, 2 * int(self.ax.get_window_extent().width))
+        except Exception:
+            return 4000
+
+    def _on_lims(self, ax):
+        self.update()
+
+    def update(self):
+        x0, x1 = self.ax.get_xlim()
+        y0, y1 = self.ax.get_ylim()
+        budget = self._budget()
+        try:
+            bb = self.ax.get_window_extent()
+            px = max(abs(x1 - x0) / max(bb.width, 1.0), abs(y1 - y0) / max(bb.height, 1.0))
+        except Exception:
+            px = max(abs(x1 - x0), abs(y1 - y0)) / 1000.0
+        view = (min(x0, x1), max(x0, x1), min(y0, y1), max(y0, y1))
+        for line, xc, yc in self.xy:
+            x, y, lvl = self.pyr.pick_xy(xc, yc, view, px, budget)
+            line.set_data(x, y)
+            self.last_levels[line] = lvl
+        for line, tc, c in self.series:
+            t, y, lvl = self.pyr.pick_series(tc, c, view[0], view[1], budget)
+            line.set_data(t, y)
+            self.last_levels[line] = lvl
+
+
+# ---------------- ölçüm ----------------
+
+def _synthetic(n, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) * 0.01
+    yaw = np.cumsum(rng.normal(0.0, 0.002, n))
+    x = np.cumsum(np.cos(yaw) * 0.01)
+    y = np.cumsum(np.sin(yaw) * 0.01)
+    return {"t": t, "x": x, "y": y, "err": np.abs(rng.normal(0.0, 0.1, n)).cumsum() / np.arange(1, n + 1)}
+
+
+def bench(n):
+    data = _synthetic(n)
+    t0 = time.perf_counter()
+    p = LodPyramid.from_columns(data, ["t", "x", "y", "err"])
+    lines = [f"{n} nokta: piramit {len(p.levels)} seviye, üretim {(time.perf_counter() - t0) * 1e3:.0f} ms"]
+    (x0, x1), (y0, y1) = p.bounds("x"), p.bounds("y")
+    T = data["t"][-1]
+    for frac in (1.0, 0.1, 0.01, 0.001, 1e-4):
+        cx, cy = data["x"][n // 2], data["y"][n // 2]
+        hw, hh = (x1 - x0) * frac / 2, (y1 - y0) * frac / 2
+        view = (cx - hw, cx + hw, cy - hh, cy + hh)
+        t0 = time.perf_counter()
+        x, y, lvl = p.pick_xy("x", "y", view, max(2 * hw, 2 * hh) / 800, 4000)
+        ms_xy = (time.perf_counter() - t0) * 1e3
+        t0 = time.perf_counter()
+        ts, ys, lvl_s = p.pick_series("t", "err", T / 2 - T * frac / 2, T / 2 + T * frac / 2, 4000)
+        ms_s = (time.perf_counter() - t0) * 1e3
+        lines.append(f"görünüm {frac:>7g}: xy {ms_xy:6.2f} ms ({len(x)} nokta, seviye {lvl})  |  "
+                     f"seri {ms_s:6.2f} ms ({len(ts)} nokta, seviye {lvl_s})")
+    return "\n".join(lines)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Koşu CSV'si için LOD piramidi üret / ölç")
+    ap.add_argument("--csv", default=None, help="Piramidi üretilecek koşu CSV'si")
+    ap.add_argument("--bench", type=int, default=0, help="N noktalı sentetik koşuda görünüm süreleri")
+    args = ap.parse_args()
+
+    if args.bench:
+        print(bench(args.bench))
+        return
+    if not args.csv:
+        raise SystemExit("--csv ya da --bench verin")
+    t0 = time.perf_counter()
+    data = load_columns(args.csv)
+    cols = [c for c in data if c != "t"]
+    p = load_pyramid(args.csv, data, ["t"] + cols)
+    print(f"✅ {args.csv}{LOD_SUFFIX}: {p.n} örnek, {len(p.levels)} seviye "
+          f"({(time.perf_counter() - t0) * 1e3:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,17 @@
 # -*- coding: utf-8 -*-
 
-import os, argparse, csv, math, datetime
+import os, argparse, math, datetime, glob
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 import numpy as np
 
 import matplotlib.pyplot as plt
 
+from csv_io import load_columns, file_digest
+
+from lod import LodAxes, load_pyramid, MIN_POINTS as LOD_MIN_POINTS
+
 
 
 REQ_COLS = ["t",
@@ -22,27 +28,16 @@ REQ_COLS = ["t",
 
 
 
-def read_csv(path):
-
-    with open(path, "r") as f:
-
-        reader = csv.DictReader(f)
+# Uzun koşularda çizim LOD piramidinden (<csv>.lod.npz) yapılır; zoom/pan görünüme göre seviye seçer
+LOD_COLS = ["t", "gt_x", "gt_y", "naive_x", "naive_y", "ekf_x", "ekf_y", "err_naive", "err_ekf"]
 
-        cols = reader.fieldnames
 
-        for c in REQ_COLS:
 
-            if c not in cols:
+def read_csv(path, cache=True):
 
-                raise ValueError(f"CSV kolon eksik: {c}")
+    # Kolon bazlı yükleyici + <csv>.cache.npz önbelleği (bkz. csv_io.load_columns)
 
-        rows = [r for r in reader]
-
-    def col(name): return np.array([float(r[name]) for r in rows], dtype=float)
-
-    data = {k: col(k) for k in REQ_COLS}
-
-    return data
+    return load_columns(path, columns=REQ_COLS, cache=cache)
 
 
 
@@ -70,173 +65,276 @@ def default_figs_dir():
 
 
 
-def main():
+def compute_metrics(data):
 
-    ap = argparse.ArgumentParser()
+    gt_x, gt_y = data["gt_x"], data["gt_y"]
+    nv_x, nv_y = data["naive_x"], data["naive_y"]
+    ek_x, ek_y = data["ekf_x"], data["ekf_y"]
 
-    ap.add_argument("--csv", help="CSV yolu (vermezsen run_latest.csv kullanılır)")
+    return {
+        "n": len(data["t"]),
+        # Hata serileri
+        "err_naive": np.hypot(nv_x - gt_x, nv_y - gt_y),
+        "err_ekf": np.hypot(ek_x - gt_x, ek_y - gt_y),
+        # Metrikler
+        "rmse_n": rmse(nv_x, nv_y, gt_x, gt_y),
+        "rmse_e": rmse(ek_x, ek_y, gt_x, gt_y),
+        "loop_gt": np.hypot(gt_x[-1]-gt_x[0], gt_y[-1]-gt_y[0]),
+        "loop_nv": np.hypot(nv_x[-1]-nv_x[0], nv_y[-1]-nv_y[0]),
+        "loop_ek": np.hypot(ek_x[-1]-ek_x[0], ek_y[-1]-ek_y[0]),
+    }
 
-    ap.add_argument("--latest", action="store_true", help="Zorla run_latest.csv kullan")
 
-    ap.add_argument("--save_dir", default=None, help="PNG'lerin kaydedileceği klasör (varsayılan: ../data/figs)")
 
-    ap.add_argument("--show", action="store_true", help="Grafikleri ekranda göster")
+def build_lod(csv_path, data, m, cache=True):
 
-    args = ap.parse_args()
+    """Koşu MIN_POINTS'ten uzunsa piramidi yükle/üret, değilse None (doğrudan çizim)."""
+    if m["n"] < LOD_MIN_POINTS:
+        return None
+    cols = dict(data, err_naive=m["err_naive"], err_ekf=m["err_ekf"])
+    return load_pyramid(csv_path, cols, LOD_COLS, cache=cache)
 
 
 
-    # CSV yolunu belirle
+def new_figures():
 
-    csv_path = args.csv
+    return plt.figure(figsize=(6,6)), plt.figure(figsize=(8,3.5))
 
-    if args.latest or not csv_path:
 
-        csv_path = default_csv_path()
 
+def draw_figures(data, m, fig_traj, fig_err, lod=None):
 
+    gt_x, gt_y = data["gt_x"], data["gt_y"]
+    nv_x, nv_y = data["naive_x"], data["naive_y"]
+    ek_x, ek_y = data["ekf_x"], data["ekf_y"]
 
-    if not os.path.exists(csv_path):
+    # lod verilirse çizgiler boş açılır, veriyi görünüme göre LodAxes doldurur
+    def xy(x, y):
+        return ([], []) if lod is not None else (x, y)
 
-        runs_dir = os.path.dirname(csv_path)
+    # 1) Trajectory
+    fig_traj.clear()
+    ax = fig_traj.add_subplot(111)
+    ln_gt, = ax.plot(*xy(gt_x, gt_y), color="black", label="Ground Truth")
+    ln_nv, = ax.plot(*xy(nv_x, nv_y), "--", color="red",  label="Filtresiz Füzyon")
+    ln_ek, = ax.plot(*xy(ek_x, ek_y), "-.", color="teal", label="Kalman (IMU+Odo)")
+    ax.scatter(gt_x[0], gt_y[0], c="green", marker="o", label="Başlangıç")
+    ax.scatter(gt_x[-1], gt_y[-1], c="blue", marker="x", label="GT Bitiş")
+    ax.scatter(nv_x[-1], nv_y[-1], c="red", marker="x", label="Naive Bitiş")
+    ax.scatter(ek_x[-1], ek_y[-1], c="teal", marker="x", label="EKF Bitiş")
+    ax.axis("equal"); ax.grid(True)
+    ax.set_xlabel("X [m]"); ax.set_ylabel("Y [m]")
+    ax.set_title("Yörüngeler: GT vs Naive vs EKF")
+    ax.legend()
+    if lod is not None:
+        ctl = LodAxes(ax, lod)
+        ctl.add_xy(ln_gt, "gt_x", "gt_y")
+        ctl.add_xy(ln_nv, "naive_x", "naive_y")
+        ctl.add_xy(ln_ek, "ekf_x", "ekf_y")
+        ctl.fit_view()
+    fig_traj.tight_layout()
+
+    # 2) Error vs time (LOD: kova başına min/max zarfı)
+    fig_err.clear()
+    ax = fig_err.add_subplot(111)
+    ln_en, = ax.plot(*xy(data["t"], m["err_naive"]), "--", label="Naive konum hatası [m]")
+    ln_ee, = ax.plot(*xy(data["t"], m["err_ekf"]), "-.", label="EKF konum hatası [m]")
+    ax.grid(True); ax.set_xlabel("Zaman [s]"); ax.set_ylabel("Hata [m]")
+    ax.set_title("Konum Hatası (GT referans)")
+    ax.legend()
+    if lod is not None:
+        ctl = LodAxes(ax, lod)
+        ctl.add_series(ln_en, "t", "err_naive")
+        ctl.add_series(ln_ee, "t", "err_ekf")
+        ctl.fit_view()
+    fig_err.tight_layout()
+
+
+
+def write_summary(path, m):
+
+    with open(path, "w") as f:
+        f.write("Özet metrikler\n")
+        f.write("================\n")
+        f.write(f"Örnek sayısı: {m['n']}\n")
+        f.write(f"RMSE Naive [m]: {m['rmse_n']:.3f}\n")
+        f.write(f"RMSE EKF   [m]: {m['rmse_e']:.3f}\n")
+        f.write(f"Loop-closure GT [m]: {m['loop_gt']:.3f}\n")
+        f.write(f"Loop-closure Naive [m]: {m['loop_nv']:.3f}\n")
+        f.write(f"Loop-closure EKF [m]: {m['loop_ek']:.3f}\n")
 
-        raise SystemExit(
 
-            f"CSV bulunamadı: {csv_path}\n"
 
-            f"- Önce live_stream.py çalıştırıp 'c' veya 'q' ile kaydedin.\n"
+# ---------------- Batch modu ----------------
+# Her koşu bir süreç havuzu işçisinde Agg backend ile çizilir. İşçi figürleri bir kez açar ve
+# sonraki koşularda temizleyip yeniden kullanır. Çıktı adları CSV içerik özetini taşır
+# (<ad>_<özet8>_traj.png ...); üç çıktı da varsa koşu atlanır, yani aynı içerik bir daha çizilmez.
 
-            f"- Beklenen klasör: {runs_dir}"
+_WORKER_FIGS = None
 
-        )
 
 
+def _batch_init():
 
-    # Kayıt klasörü
+    plt.switch_backend("Agg")
+    # Çok uzun koşularda Agg hücre limiti aşılmasın
+    plt.rcParams["agg.path.chunksize"] = 10000
 
-    save_dir = args.save_dir or default_figs_dir()
 
-    os.makedirs(save_dir, exist_ok=True)
 
+def batch_outputs(csv_path, save_dir, digest):
 
+    base = os.path.splitext(os.path.basename(csv_path))[0]
+    stem = os.path.join(save_dir, f"{base}_{digest[:8]}")
+    return stem + "_traj.png", stem + "_errors.png", stem + "_summary.txt"
 
-    data = read_csv(csv_path)
 
-    t = data["t"]
 
-    gt_x, gt_y = data["gt_x"], data["gt_y"]
+def render_one(csv_path, save_dir, force=False, cache=True):
 
-    nv_x, nv_y = data["naive_x"], data["naive_y"]
+    """Batch işçisi: (durum, csv_path, çıktılar) döndürür; durum 'ok' | 'skip' | 'error: ...'."""
+    global _WORKER_FIGS
+    try:
+        outs = batch_outputs(csv_path, save_dir, file_digest(csv_path))
+        if not force and all(os.path.exists(o) for o in outs):
+            return "skip", csv_path, outs
 
-    ek_x, ek_y = data["ekf_x"], data["ekf_y"]
+        data = read_csv(csv_path, cache=cache)
+        m = compute_metrics(data)
+        if _WORKER_FIGS is None:
+            _WORKER_FIGS = new_figures()
+        fig_traj, fig_err = _WORKER_FIGS
+        draw_figures(data, m, fig_traj, fig_err, lod=build_lod(csv_path, data, m, cache))
+        fig_traj.savefig(outs[0], dpi=150)
+        fig_err.savefig(outs[1], dpi=150)
+        write_summary(outs[2], m)
+        return "ok", csv_path, outs
+    except Exception as e:
+        return f"error: {e}", csv_path, ()
 
 
 
-    # Hata serileri
+def run_batch(pattern, save_dir, jobs=None, force=False, cache=True):
 
-    err_naive = np.hypot(nv_x - gt_x, nv_y - gt_y)
+    paths = sorted(p for p in glob.glob(pattern, recursive=True) if p.endswith(".csv"))
+    if not paths:
+        raise SystemExit(f"Eşleşen CSV yok: {pattern}")
+    os.makedirs(save_dir, exist_ok=True)
+    jobs = jobs or min(len(paths), os.cpu_count() or 1)
+
+    counts = {"ok": 0, "skip": 0, "error": 0}
+    if jobs <= 1:
+        _batch_init()
+        results = (render_one(p, save_dir, force, cache) for p in paths)
+        for status, path, outs in results:
+            counts[status.split(":")[0]] += 1
+            print(f"[{status}] {path}")
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_batch_init) as ex:
+            futs = [ex.submit(render_one, p, save_dir, force, cache) for p in paths]
+            for fut in as_completed(futs):
+                status, path, outs = fut.result()
+                counts[status.split(":")[0]] += 1
+                print(f"[{status}] {path}")
+    print(f"✅ Batch: {len(paths)} koşu  |  çizilen: {counts['ok']}  atlanan: {counts['skip']}  "
+          f"hata: {counts['error']}  ->  {save_dir}")
+    return counts
 
-    err_ekf   = np.hypot(ek_x - gt_x, ek_y - gt_y)
 
 
+def main():
 
-    # Metrikler
+    ap = argparse.ArgumentParser()
 
-    rmse_n = rmse(nv_x, nv_y, gt_x, gt_y)
+    ap.add_argument("--csv", help="CSV yolu (vermezsen run_latest.csv kullanılır)")
 
-    rmse_e = rmse(ek_x, ek_y, gt_x, gt_y)
+    ap.add_argument("--latest", action="store_true", help="Zorla run_latest.csv kullan")
 
-    loop_gt   = np.hypot(gt_x[-1]-gt_x[0], gt_y[-1]-gt_y[0])
+    ap.add_argument("--save_dir", default=None, help="PNG'lerin kaydedileceği klasör (varsayılan: ../data/figs)")
 
-    loop_nv   = np.hypot(nv_x[-1]-nv_x[0], nv_y[-1]-nv_y[0])
+    ap.add_argument("--show", action="store_true", help="Grafikleri ekranda göster")
 
-    loop_ek   = np.hypot(ek_x[-1]-ek_x[0], ek_y[-1]-ek_y[0])
+    ap.add_argument("--no-cache", action="store_true", help="İkili önbelleği (.cache.npz) kullanma")
 
+    ap.add_argument("--batch", default=None, help="Glob ile çoklu koşu (ör. '../data/runs/*.csv'); değişmeyenler atlanır")
 
+    ap.add_argument("--jobs", type=int, default=None, help="Batch süreç sayısı (varsayılan: CPU sayısı)")
 
-    ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    ap.add_argument("--force", action="store_true", help="Batch: çıktısı olan koşuları da yeniden çiz")
 
-    base = os.path.splitext(os.path.basename(csv_path))[0]
+    args = ap.parse_args()
 
-    out_traj = os.path.join(save_dir, f"{base}_traj_{ts}.png")
 
-    out_err  = os.path.join(save_dir, f"{base}_errors_{ts}.png")
 
-    out_txt  = os.path.join(save_dir, f"{base}_summary_{ts}.txt")
+    # Kayıt klasörü
 
+    save_dir = args.save_dir or default_figs_dir()
 
+    os.makedirs(save_dir, exist_ok=True)
 
-    # 1) Trajectory
 
-    plt.figure(figsize=(6,6))
 
-    plt.plot(gt_x, gt_y, color="black", label="Ground Truth")
+    if args.batch:
 
-    plt.plot(nv_x, nv_y, "--", color="red",  label="Filtresiz Füzyon")
+        run_batch(args.batch, save_dir, jobs=args.jobs, force=args.force, cache=not args.no_cache)
 
-    plt.plot(ek_x, ek_y, "-.", color="teal", label="Kalman (IMU+Odo)")
+        return
 
-    plt.scatter(gt_x[0], gt_y[0], c="green", marker="o", label="Başlangıç")
 
-    plt.scatter(gt_x[-1], gt_y[-1], c="blue", marker="x", label="GT Bitiş")
 
-    plt.scatter(nv_x[-1], nv_y[-1], c="red", marker="x", label="Naive Bitiş")
+    # CSV yolunu belirle
 
-    plt.scatter(ek_x[-1], ek_y[-1], c="teal", marker="x", label="EKF Bitiş")
+    csv_path = args.csv
 
-    plt.axis("equal"); plt.grid(True)
+    if args.latest or not csv_path:
 
-    plt.xlabel("X [m]"); plt.ylabel("Y [m]")
+        csv_path = default_csv_path()
 
-    plt.title("Yörüngeler: GT vs Naive vs EKF")
 
-    plt.legend()
 
-    plt.tight_layout()
+    if not os.path.exists(csv_path):
 
-    plt.savefig(out_traj, dpi=150)
+        runs_dir = os.path.dirname(csv_path)
 
+        raise SystemExit(
 
+            f"CSV bulunamadı: {csv_path}\n"
 
-    # 2) Error vs time
+            f"- Önce live_stream.py çalıştırıp 'c' veya 'q' ile kaydedin.\n"
 
-    plt.figure(figsize=(8,3.5))
+            f"- Beklenen klasör: {runs_dir}"
 
-    plt.plot(t, err_naive, "--", label="Naive konum hatası [m]")
+        )
 
-    plt.plot(t, err_ekf, "-.", label="EKF konum hatası [m]")
 
-    plt.grid(True); plt.xlabel("Zaman [s]"); plt.ylabel("Hata [m]")
 
-    plt.title("Konum Hatası (GT referans)")
+    data = read_csv(csv_path, cache=not args.no_cache)
 
-    plt.legend()
+    m = compute_metrics(data)
 
-    plt.tight_layout()
 
-    plt.savefig(out_err, dpi=150)
 
+    ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
 
+    base = os.path.splitext(os.path.basename(csv_path))[0]
 
-    # 3) Summary metin
+    out_traj = os.path.join(save_dir, f"{base}_traj_{ts}.png")
 
-    with open(out_txt, "w") as f:
+    out_err  = os.path.join(save_dir, f"{base}_errors_{ts}.png")
 
-        f.write("Özet metrikler\n")
+    out_txt  = os.path.join(save_dir, f"{base}_summary_{ts}.txt")
 
-        f.write("================\n")
 
-        f.write(f"Örnek sayısı: {len(t)}\n")
 
-        f.write(f"RMSE Naive [m]: {rmse_n:.3f}\n")
+    fig_traj, fig_err = new_figures()
 
-        f.write(f"RMSE EKF   [m]: {rmse_e:.3f}\n")
+    draw_figures(data, m, fig_traj, fig_err, lod=build_lod(csv_path, data, m, cache=not args.no_cache))
 
-        f.write(f"Loop-closure GT [m]: {loop_gt:.3f}\n")
+    fig_traj.savefig(out_traj, dpi=150)
 
-        f.write(f"Loop-closure Naive [m]: {loop_nv:.3f}\n")
+    fig_err.savefig(out_err, dpi=150)
 
-        f.write(f"Loop-closure EKF [m]: {loop_ek:.3f}\n")
+    write_summary(out_txt, m)
 
 
 
@@ -259,4 +357,3 @@ def main():
 if __name__ == "__main__":
 
     main()
-
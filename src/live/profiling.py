@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+profiling.py — LiveSim.step için düşük maliyetli faz profilleyici
+
+- Her faz süresi perf_counter_ns ile ölçülür ve sabit boyutlu log-lineer histograma yazılır
+  (her 2'nin kuvveti aralığı 4 alt kovaya bölünür, ~%25 çözünürlük).
+  Bellek kullanımı adım sayısından bağımsızdır.
+- Kapalıyken LiveSim tarafında faz başına tek bir `is not None` kontrolü kalır.
+- hud_line(): canlı HUD için tek satır; summary(): çıkışta yazılan tablo.
+- budget_s (genelde dt) verilirse toplam adım süresi bütçeyi aştığında overrun sayılır.
+"""
+
+import time
+
+import numpy as np
+
+perf_counter_ns = time.perf_counter_ns
+
+# LiveSim.step fazları (sıra önemli: indeksler hot path'te sabit olarak kullanılır)
+PHASES = ("command", "measure", "naive", "ekf", "metrics", "log")
+PH_COMMAND, PH_MEASURE, PH_NAIVE, PH_EKF, PH_METRICS, PH_LOG = range(len(PHASES))
+
+NBITS = 48                 # 2^47 ns ~ 39 saat; üstü son kovaya düşer
+NBINS = 4 * NBITS
+
+
+def _bucket(ns):
+    """ns -> kova indeksi: 4*bit_uzunluğu + (baştaki 1'den sonraki 2 bit)."""
+    b = ns.bit_length()
+    if b < 3:
+        return ns if ns > 0 else 0
+    if b >= NBITS:
+        return NBINS - 1
+    return 4 * b + ((ns >> (b - 3)) & 3)
+
+
+def _bucket_mid(idx):
+    """Kova indeksinin temsil ettiği aralığın orta değeri (ns)."""
+    b, m = divmod(idx, 4)
+    if b < 3:
+        return idx
+    lo = (m + 4) << (b - 3)
+    hi = (m + 5) << (b - 3)
+    return (lo + hi) // 2
+
+
+class Histogram:
+    """Tek bir büyüklük (ns) için aynı log-lineer kovalarla sabit boyutlu histogram."""
+    def __init__(self):
+        self.hist = [0] * NBINS
+        self.count = 0
+        self.sum = 0
+        self.max = 0
+
+    def record(self, ns):
+        if ns < 0:
+            ns = 0
+        self.hist[_bucket(ns)] += 1
+        self.count += 1
+        self.sum += ns
+        if ns > self.max:
+            self.max = ns
+
+    def record_many(self, values):
+        """Toplu kayıt (ns dizisi): kovalar numpy ile hesaplanır, sonuç tek tek record() ile aynıdır."""
+        ns = np.maximum(np.asarray(values, dtype=np.int64), 0)
+        if not len(ns):
+            return
+        b = np.frexp(ns.astype(np.float64))[1]          # bit_length (ns < 2^53 için tam)
+        sub = (ns >> np.maximum(b - 3, 0)) & 3
+        idx = np.where(b < 3, ns, np.where(b >= NBITS, NBINS - 1, 4 * b + sub))
+        counts = np.bincount(idx, minlength=NBINS)
+        hist = self.hist
+        for i in np.flatnonzero(counts).tolist():
+            hist[i] += int(counts[i])
+        self.count += len(ns)
+        self.sum += int(ns.sum())
+        m = int(ns.max())
+        if m > self.max:
+            self.max = m
+
+    def percentile_ns(self, q):
+        if self.count == 0:
+            return 0
+        target = q * self.count
+        acc = 0
+        for b, c in enumerate(self.hist):
+            acc += c
+            if acc >= target:
+                return min(_bucket_mid(b), self.max)
+        return self.max
+
+    def mean_ns(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def stats_us(self):
+        return {
+            "count": self.count,
+            "mean_us": self.mean_ns() / 1e3,
+            "p50_us": self.percentile_ns(0.50) / 1e3,
+            "p99_us": self.percentile_ns(0.99) / 1e3,
+            "max_us": self.max / 1e3,
+        }
+
+
+class PhaseProfiler:
+    """Faz başına bir Histogram (+ toplam adım); kova/yüzdelik mantığı Histogram'dadır."""
+    def __init__(self, phases=PHASES, budget_s=None):
+        self.phases = tuple(phases) + ("total",)
+        self.total_idx = len(self.phases) - 1
+        self.hists = [Histogram() for _ in self.phases]
+        self.budget_ns = int(budget_s * 1e9) if budget_s else 0
+        self.overruns = 0
+
+    def reset(self):
+        """Yeni koşu: histogramlar ve overrun sayacı sıfırlanır (HUD/özet eski koşuyla karışmaz)."""
+        self.hists = [Histogram() for _ in self.phases]
+        self.overruns = 0
+
+    # ---- hot path ----
+    def record(self, i, ns):
+        self.hists[i].record(ns)
+
+    def lap(self, i, t0):
+        """t0'dan bu yana geçen süreyi i fazına yazar; yeni başlangıç zamanını döndürür."""
+        now = perf_counter_ns()
+        self.hists[i].record(now - t0)
+        return now
+
+    def end_step(self, t_start):
+        ns = perf_counter_ns() - t_start
+        self.hists[self.total_idx].record(ns)
+        if self.budget_ns and ns > self.budget_ns:
+            self.overruns += 1
+
+    # ---- okuma ----
+    def _index(self, phase):
+        return self.phases.index(phase) if isinstance(phase, str) else int(phase)
+
+    def percentile_ns(self, i, q):
+        """Histogramdan q (0..1) yüzdeliği (kova ortası; ~%12 hata)."""
+        return self.hists[self._index(i)].percentile_ns(q)
+
+    def stats(self, phase):
+        return self.hists[self._index(phase)].stats_us()
+
+    def hud_line(self):
+        tot = self.stats(self.total_idx)
+        if tot["count"] == 0:
+            return "PROF: veri yok"
+        # En pahalı faz (adım başına toplam süreye göre; tüm fazlar her adımda koşmaz)
+        worst = max(range(self.total_idx), key=lambda i: self.hists[i].sum)
+        ws = self.stats(worst)
+        line = (f"PROF step p50/p99={tot['p50_us']:.0f}/{tot['p99_us']:.0f} us  "
+                f"| en pahalı: {self.phases[worst]} {ws['mean_us']:.0f} us")
+        if self.budget_ns:
+            line += f"  | overrun={self.overruns}/{tot['count']}"
+        return line
+
+    def summary(self):
+        lines = ["LiveSim.step faz profili",
+                 "========================",
+                 f"{'faz':<10}{'adet':>10}{'ort[us]':>10}{'p50[us]':>10}{'p99[us]':>10}{'max[us]':>10}"]
+        for i, name in enumerate(self.phases):
+            s = self.stats(i)
+            lines.append(f"{name:<10}{s['count']:>10d}{s['mean_us']:>10.1f}"
+                         f"{s['p50_us']:>10.1f}{s['p99_us']:>10.1f}{s['max_us']:>10.1f}")
+        if self.budget_ns:
+            n = self.hists[self.total_idx].count
+            pct = 100.0 * self.overruns / n if n else 0.0
+            lines.append(f"Bütçe (dt): {self.budget_ns / 1e6:.2f} ms  |  overrun: {self.overruns} ({pct:.2f}%)")
+        return "\n".join(lines)
+
+    def write_summary(self, path):
+        with open(path, "w") as f:
+            f.write(self.summary() + "\n")
+        return path
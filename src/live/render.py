@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*-
+"""
+render.py — live_stream için artımlı (incremental) çizim: blitting + seyreltme (decimation)
+
+- StreamDecimator: gelen (x,y) noktalarını sabit sayıda kovaya indirger. Her kova içindeki
+  x-min, x-max, y-min, y-max noktaları (indeks sırasıyla) saklanır; kova sayısı sınırı aşınca
+  komşu kovalar ikişer birleştirilir ve kova boyu 2 katına çıkar. Ekleme amortize O(1),
+  çizilecek nokta sayısı oturum uzunluğundan bağımsızdır (~4*max_buckets + kova boyu).
+- LiveRenderer: çizgiler + HUD metni 'animated' artist olarak blit edilir. Eksen limitleri
+  koşan min/max'tan, pay bırakılarak büyütülür; yalnızca limit değişince tam çizim yapılır.
+  Backend blit desteklemiyorsa draw_idle'a düşer. Ölçülen FPS HUD'a eklenir.
+- Zoom/pan: noktalar ayrıca artımlı bir LOD piramidine (lod.LodPyramid) eklenir. Kullanıcı eksen
+  limitlerini değiştirirse otomatik takip durur, çizgiler görünüme uyan seviyeden seçilir;
+  follow_view() takibe geri döner. Piramit seviye başına lod_keep kayıt tutar (ham örnekler dahil):
+  uzun koşularda bellek sınırlıdır, ufkun gerisi yalnızca kaba seviyelerden çizilir.
+"""
+
+import time
+
+import numpy as np
+
+from lod import LodPyramid
+
+LOD_COLS = ("gt_x", "gt_y", "nv_x", "nv_y", "ek_x", "ek_y")
+LOD_KEEP = 1 << 14       # seviye başına en az tutulan kayıt: 20 Hz'de ham ~14 dk, seviye 1 ~3.6 saat
+
+
+def _reduce_extremes(idx, x, y):
+    """
+    (m,k) kova matrislerinden kova başına 4 uç nokta seçer: argmin/argmax x ve y.
+    Dönüş (m,4) idx/x/y; satır içinde indeks sırasına dizili.
+    NaN değerli noktalar uç nokta olarak seçilmez (tümü NaN ise ilk nokta kalır).
+    """
+    m = idx.shape[0]
+    rows = np.arange(m)[:, None]
+    xs = np.where(np.isnan(x), np.inf, x)
+    ys = np.where(np.isnan(y), np.inf, y)
+    pick = np.stack([
+        np.argmin(xs, axis=1),
+        np.argmax(np.where(np.isinf(xs), -np.inf, xs), axis=1),
+        np.argmin(ys, axis=1),
+        np.argmax(np.where(np.isinf(ys), -np.inf, ys), axis=1),
+    ], axis=1)
+    ri = idx[rows, pick]
+    order = np.argsort(ri, axis=1, kind="stable")
+    pick = pick[rows, order]
+    return idx[rows, pick], x[rows, pick], y[rows, pick]
+
+
+class StreamDecimator:
+    def __init__(self, max_buckets=2048):
+        self.max_buckets = max(2, int(max_buckets) // 2 * 2)
+        self.clear()
+
+    def clear(self):
+        self.n = 0                 # şimdiye kadar eklenen toplam nokta
+        self.bucket = 1            # kova başına ham nokta sayısı
+        self._b_idx = np.empty((0, 4), dtype=np.int64)
+        self._b_x = np.empty((0, 4))
+        self._b_y = np.empty((0, 4))
+        self._pend_x = []          # henüz dolmamış kovanın ham noktaları
+        self._pend_y = []
+        self._pend_i0 = 0
+
+    def append(self, xy):
+        """xy: (k,2) dizi."""
+        xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+        if not len(xy):
+            return
+        self._pend_x.extend(xy[:, 0].tolist())
+        self._pend_y.extend(xy[:, 1].tolist())
+        self.n += len(xy)
+        self._flush_full_buckets()
+
+    def _flush_full_buckets(self):
+        B = self.bucket
+        nfull = len(self._pend_x) // B
+        if nfull == 0:
+            return
+        cut = nfull * B
+        px = np.asarray(self._pend_x[:cut]).reshape(nfull, B)
+        py = np.asarray(self._pend_y[:cut]).reshape(nfull, B)
+        pi = (self._pend_i0 + np.arange(cut, dtype=np.int64)).reshape(nfull, B)
+        del self._pend_x[:cut]
+        del self._pend_y[:cut]
+        self._pend_i0 += cut
+        bi, bx, by = _reduce_extremes(pi, px, py)
+        self._b_idx = np.concatenate([self._b_idx, bi])
+        self._b_x = np.concatenate([self._b_x, bx])
+        self._b_y = np.concatenate([self._b_y, by])
+        while len(self._b_idx) > self.max_buckets:
+            self._merge_pairs()
+
+    def _merge_pairs(self):
+        m = len(self._b_idx) // 2 * 2
+        rest = slice(m, None)
+        bi, bx, by = _reduce_extremes(self._b_idx[:m].reshape(-1, 8),
+                                      self._b_x[:m].reshape(-1, 8),
+                                      self._b_y[:m].reshape(-1, 8))
+        self._b_idx = np.concatenate([bi, self._b_idx[rest]])
+        self._b_x = np.concatenate([bx, self._b_x[rest]])
+        self._b_y = np.concatenate([by, self._b_y[rest]])
+        self.bucket *= 2
+        # Bekleyen ham noktalar yeni kova boyunu doldurana kadar beklemede kalır
+
+    def xy(self):
+        """Çizilecek (x, y) dizileri: kova uç noktaları + bekleyen ham noktalar."""
+        x = np.concatenate([self._b_x.reshape(-1), np.asarray(self._pend_x)])
+        y = np.concatenate([self._b_y.reshape(-1), np.asarray(self._pend_y)])
+        return x, y
+
+    def last(self):
+        if self._pend_x:
+            return self._pend_x[-1], self._pend_y[-1]
+        if len(self._b_idx):
+            j = int(np.argmax(self._b_idx[-1]))
+            return float(self._b_x[-1, j]), float(self._b_y[-1, j])
+        return None
+
+
+class LiveRenderer:
+    """
+    lines: (ln_gt, ln_nv, ln_ek); pt_cur: son GT noktası; txt: HUD metni.
+    append(gt, nv, ek) ile yalnızca yeni noktalar verilir; frame(hud) ekrana basar.
+    """
+    def __init__(self, fig, ax, lines, pt_cur, txt, max_buckets=None, pad=3.0, headroom=0.25,
+                 lod_keep=LOD_KEEP):
+        self.fig = fig
+        self.ax = ax
+        self.lines = tuple(lines)
+        self.pt_cur = pt_cur
+        self.txt = txt
+        self.pad = float(pad)
+        self.headroom = float(headroom)
+
+        if max_buckets is None:
+            # Eksen genişliği (piksel) başına ~1 kova: her piksel sütunu için min/max korunur
+            try:
+                max_buckets = int(ax.get_window_extent().width)
+            except Exception:
+                max_buckets = 1024
+        self.max_buckets = max(256, int(max_buckets))
+        self.decs = [StreamDecimator(self.max_buckets) for _ in self.lines]
+        self.lod = LodPyramid(LOD_COLS, keep=lod_keep)
+        self.follow = True         # False: kullanıcı zoom/pan yaptı, limitlere dokunma
+        self.lod_level = 0
+
+        self.artists = list(self.lines) + [pt_cur, txt]
+        self.canvas = fig.canvas
+        self.use_blit = bool(getattr(type(self.canvas), "supports_blit", False))
+        if self.use_blit:
+            for a in self.artists:
+                a.set_animated(True)
+        self._bg = None
+        self._cid = self.canvas.mpl_connect("draw_event", self._on_draw)
+
+        self._lo = None            # koşan min (x, y)
+        self._hi = None            # koşan max (x, y)
+        self._lim = None           # aktif eksen limitleri (x0, x1, y0, y1)
+        self._need_full = True
+
+        self._t_last = None
+        self.fps = 0.0
+        self.frame_ms = 0.0
+        self.full_redraws = 0
+
+    # ---- veri ----
+    def clear(self):
+        for d in self.decs:
+            d.clear()
+        self.lod.clear()
+        self._lo = self._hi = self._lim = None
+        self._need_full = True
+
+    def append(self, *series):
+        if len(series) == 3 and all(xy is not None for xy in series):
+            arrs = [np.asarray(xy, dtype=float).reshape(-1, 2) for xy in series]
+            if len({len(a) for a in arrs}) == 1:
+                self.lod.append({LOD_COLS[2 * i + k]: arrs[i][:, k] for i in range(3) for k in range(2)})
+        for d, xy in zip(self.decs, series):
+            if xy is None or not len(xy):
+                continue
+            xy = np.asarray(xy, dtype=float).reshape(-1, 2)
+            d.append(xy)
+            with np.errstate(invalid="ignore"):
+                lo = np.nanmin(xy, axis=0) if np.isfinite(xy).any() else None
+                hi = np.nanmax(xy, axis=0) if lo is not None else None
+            if lo is None or not np.all(np.isfinite(lo)):
+                continue
+            self._lo = lo if self._lo is None else np.minimum(self._lo, lo)
+            self._hi = hi if self._hi is None else np.maximum(self._hi, hi)
+        self._update_limits()
+
+    def _update_limits(self):
+        if self._lo is None or not self.follow:
+            return
+        x0, y0 = self._lo - self.pad
+        x1, y1 = self._hi + self.pad
+        if self._lim is not None:
+            lx0, lx1, ly0, ly1 = self._lim
+            if lx0 <= x0 and x1 <= lx1 and ly0 <= y0 and y1 <= ly1:
+                return
+        # Limitleri pay bırakarak büyüt: tam çizim sayısı O(log(alan)) kalır
+        hx = (x1 - x0) * self.headroom
+        hy = (y1 - y0) * self.headroom
+        self._lim = (x0 - hx, x1 + hx, y0 - hy, y1 + hy)
+        self.ax.set_xlim(self._lim[0], self._lim[1])
+        self.ax.set_ylim(self._lim[2], self._lim[3])
+        self._need_full = True
+
+    # ---- çizim ----
+    def _on_draw(self, event):
+        if self.use_blit:
+            self._bg = self.canvas.copy_from_bbox(self.fig.bbox)
+            self._draw_artists()
+
+    def _draw_artists(self):
+        for a in self.artists:
+            self.fig.draw_artist(a)
+
+    def frame(self, hud=""):
+        t0 = time.perf_counter()
+        if self._t_last is not None:
+            dt = t0 - self._t_last
+            if dt > 0:
+                self.fps = 1.0 / dt if self.fps == 0.0 else 0.9 * self.fps + 0.1 / dt
+        self._t_last = t0
+
+        if self.follow and self._lim is not None:
+            cur = self.ax.get_xlim() + self.ax.get_ylim()
+            if not np.allclose(cur, self._lim):
+                self.follow = False        # toolbar zoom/pan
+        if self.follow:
+            for ln, d in zip(self.lines, self.decs):
+                x, y = d.xy()
+                ln.set_data(x, y)
+        else:
+            self._set_lod_data()
+        cur = self.decs[0].last()
+        if cur is not None:
+            self.pt_cur.set_data([cur[0]], [cur[1]])
+        npts = self.decs[0].n
+        view = f"kova={self.decs[0].bucket}" if self.follow else f"LOD seviye {self.lod_level}, f: takip"
+        self.txt.set_text(f"{hud}\nFPS: {self.fps:4.1f}  |  frame: {self.frame_ms:.1f} ms  "
+                          f"|  nokta: {npts}  ({view})")
+
+        if not self.use_blit:
+            self.canvas.draw_idle()
+        elif self._need_full or self._bg is None:
+            self.canvas.draw()           # draw_event -> arka plan + artist'ler
+            self.full_redraws += 1
+            self.canvas.blit(self.fig.bbox)
+        else:
+            self.canvas.restore_region(self._bg)
+            self._draw_artists()
+            self.canvas.blit(self.fig.bbox)
+        self._need_full = False
+        self.canvas.flush_events()
+        self.frame_ms = (time.perf_counter() - t0) * 1e3
+
+    def _set_lod_data(self):
+        x0, x1 = self.ax.get_xlim()
+        y0, y1 = self.ax.get_ylim()
+        bb = self.ax.get_window_extent()
+        px = max(abs(x1 - x0) / max(bb.width, 1.0), abs(y1 - y0) / max(bb.height, 1.0))
+        view = (min(x0, x1), max(x0, x1), min(y0, y1), max(y0, y1))
+        budget = 2 * self.max_buckets
+        for i, ln in enumerate(self.lines):
+            x, y, lvl = self.lod.pick_xy(LOD_COLS[2 * i], LOD_COLS[2 * i + 1], view, px, budget)
+            ln.set_data(x, y)
+            if i == 0:
+                self.lod_level = lvl
+
+    def follow_view(self):
+        """Zoom/pan sonrası otomatik limit takibine dön."""
+        self.follow = True
+        self._lim = None
+        self._update_limits()
+        self._need_full = True
+
+    def request_full_redraw(self):
+        self._need_full = True
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+"""
+replay.py — Kayıtlı sensör verisini LiveSim (Naive + EKF + metrikler) üzerinden tekrar oynatma
+
+Desteklenen kaynaklar:
+  - data/runs/run_latest.csv        (imu_gz, odo_v, odo_w + gt_x/gt_y/gt_yaw)
+  - data/streams/imu_stream.csv     (1553 köprüsü: r -> imu_gz; odometri yok)
+
+Kolon eşlemesi:
+  imu_gz : 'imu_gz' yoksa 'r'
+  odo_v  : 'odo_v'  yoksa 0.0
+  odo_w  : 'odo_w'  yoksa imu_gz ile aynı
+  GT     : 'gt_x','gt_y','gt_yaw' yoksa NaN (hata/RMSE NaN olur)
+
+Hız (pacing):
+  speed=1.0 -> gerçek zaman, speed=N -> N× hızlı, speed<=0 / None -> olabildiğince hızlı
+
+Kullanım:
+  python replay.py --csv ../data/runs/run_latest.csv --speed 4
+  python replay.py --csv data/streams/imu_stream.csv --max --out ../data/runs/run_replay.csv
+"""
+
+import os
+import math
+import time
+import argparse
+
+import numpy as np
+
+from csv_io import read_header, iter_csv_chunks
+
+
+class Pacer:
+    """Kayıt zamanını (t) duvar saatine göre N× hızda serbest bırakır (monotonic saat)."""
+    def __init__(self, speed=1.0):
+        self.speed = float(speed) if speed else 0.0
+        self._t0 = None
+        self._w0 = None
+
+    @property
+    def unpaced(self):
+        return not (self.speed > 0.0 and math.isfinite(self.speed))
+
+    def wait(self, t_sample):
+        if self.unpaced:
+            return
+        if self._t0 is None:
+            self._t0 = t_sample
+            self._w0 = time.monotonic()
+            return
+        target = self._w0 + (t_sample - self._t0) / self.speed
+        delay = target - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def reset(self):
+        self._t0 = None
+        self._w0 = None
+
+
+class ReplaySource:
+    """
+    Kayıtlı CSV'den örnek üretir; LiveSim(source=...) bunu SensorSim yerine kullanır.
+    Dosya chunk_rows satırlık parçalarla okunur, yani log boyu bellek sınırı değildir.
+
+    next_sample() -> dict(t, dt, gz, v_odo, w_odo, gt_x, gt_y, gt_yaw) veya dosya bittiyse None
+    """
+    def __init__(self, path, speed=1.0, chunk_rows=4096, default_dt=0.05):
+        self.path = path
+        self.chunk_rows = int(chunk_rows)
+        self.default_dt = float(default_dt)
+        self.pacer = Pacer(speed)
+
+        header = read_header(path)
+        if "t" not in header:
+            raise ValueError(f"CSV kolon eksik: t ({path})")
+        if "imu_gz" in header:
+            self._gz_col = "imu_gz"
+        elif "r" in header:
+            self._gz_col = "r"
+        else:
+            raise ValueError(f"CSV'de gyro kolonu yok (imu_gz / r): {path}")
+        self._v_col = "odo_v" if "odo_v" in header else None
+        self._w_col = "odo_w" if "odo_w" in header else None
+        self.has_gt = all(c in header for c in ("gt_x", "gt_y", "gt_yaw"))
+
+        cols = ["t", self._gz_col]
+        if self._v_col:
+            cols.append(self._v_col)
+        if self._w_col:
+            cols.append(self._w_col)
+        if self.has_gt:
+            cols += ["gt_x", "gt_y", "gt_yaw"]
+        self._cols = cols
+
+        self.count = 0
+        self._open()
+
+    def _open(self):
+        self._chunks = iter_csv_chunks(self.path, self.chunk_rows, columns=self._cols)
+        self._chunk = None
+        self._i = 0
+        self._n = 0
+        self._t_prev = None
+        self.count = 0
+        self.pacer.reset()
+
+    def _next_chunk(self):
+        for chunk in self._chunks:
+            n = len(chunk["t"])
+            if n == 0:
+                continue
+            # Satır başına dict erişimini önlemek için kolonları Python listesine indir
+            t = chunk["t"].tolist()
+            gz = chunk[self._gz_col].tolist()
+            v = chunk[self._v_col].tolist() if self._v_col else [0.0] * n
+            w = chunk[self._w_col].tolist() if self._w_col else gz
+            if self.has_gt:
+                gt = (chunk["gt_x"].tolist(), chunk["gt_y"].tolist(), chunk["gt_yaw"].tolist())
+            else:
+                nan = [math.nan] * n
+                gt = (nan, nan, nan)
+            self._chunk = (t, gz, v, w) + gt
+            self._i = 0
+            self._n = n
+            return True
+        return False
+
+    def wait_next(self):
+        """Sıradaki örneğin zamanı gelene kadar bekler (Pacer); dosya bittiyse hemen döner."""
+        if self._i >= self._n and not self._next_chunk():
+            return
+        self.pacer.wait(self._chunk[0][self._i])
+
+    def next_sample(self, pace=True):
+        if self._i >= self._n and not self._next_chunk():
+            return None
+        i = self._i
+        t, gz, v, w, gx, gy, gyaw = self._chunk
+        self._i += 1
+        self.count += 1
+
+        ts = t[i]
+        dt = ts - self._t_prev if self._t_prev is not None else self.default_dt
+        if not (dt > 0.0):
+            dt = self.default_dt
+        self._t_prev = ts
+
+        if pace:
+            self.pacer.wait(ts)
+        return {
+            "t": ts, "dt": dt,
+            "gz": gz[i], "v_odo": v[i], "w_odo": w[i],
+            "gt_x": gx[i], "gt_y": gy[i], "gt_yaw": gyaw[i],
+        }
+
+    def rewind(self):
+        self._open()
+
+
+def run_replay(path, speed=0.0, out=None, chunk_rows=4096, verbose=False, profile=False):
+    """Kaydı baştan sona LiveSim'den geçirir; tüm koşu boyunca RMSE özetini döndürür."""
+    from sim_core import LiveSim
+
+    src = ReplaySource(path, speed=speed, chunk_rows=chunk_rows)
+    sim = LiveSim(source=src, record=out is not None, verbose=verbose, profile=profile)
+
+    # Pencere (keep) dışına taşan örnekler için tüm koşu boyunca biriken toplamlar
+    n = 0
+    se_n = 0.0
+    se_e = 0.0
+    wall0 = time.perf_counter()
+    while sim.step():
+        n += 1
+        se_n += sim.err_naive[-1] ** 2
+        se_e += sim.err_ekf[-1] ** 2
+    wall = time.perf_counter() - wall0
+
+    summary = {
+        "samples": n,
+        "t_end": sim.t[-1] if sim.t else 0.0,
+        "rmse_naive": math.sqrt(se_n / n) if n else math.nan,
+        "rmse_ekf": math.sqrt(se_e / n) if n else math.nan,
+        "wall_s": wall,
+        "steps_per_s": n / wall if wall > 0 else math.inf,
+        "ekf_final": np.array(sim.ekf.X, dtype=float).tolist(),
+        "profile": sim.prof.summary() if sim.prof is not None else None,
+    }
+    if out is not None:
+        sim.save_csv(out)
+    return summary
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Kayıtlı sensör verisini LiveSim/EKF üzerinden oynat")
+    ap.add_argument("--csv", help="Kaynak CSV (varsayılan: ../data/runs/run_latest.csv)")
+    ap.add_argument("--speed", type=float, default=1.0, help="Oynatma hızı çarpanı (1=gerçek zaman)")
+    ap.add_argument("--max", action="store_true", help="Bekleme yok, olabildiğince hızlı")
+    ap.add_argument("--chunk", type=int, default=4096, help="Parça başına satır sayısı")
+    ap.add_argument("--out", default=None, help="Sonucu bu CSV'ye yaz (LiveSim formatı)")
+    ap.add_argument("-v", "--verbose", action="store_true", help="LiveSim ~1 Hz terminal logu")
+    ap.add_argument("--profile", action="store_true", help="LiveSim.step faz profilini yazdır")
+    args = ap.parse_args()
+
+    path = args.csv
+    if not path:
+        base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+        path = os.path.join(base_dir, "data", "runs", "run_latest.csv")
+    speed = 0.0 if args.max else args.speed
+
+    s = run_replay(path, speed=speed, out=args.out, chunk_rows=args.chunk,
+                   verbose=args.verbose, profile=args.profile)
+    print(f"Replay: {path}")
+    print(f"  örnek={s['samples']}  t_son={s['t_end']:.2f}s  "
+          f"RMSE(N/E)={s['rmse_naive']:.3f}/{s['rmse_ekf']:.3f} m")
+    print(f"  süre={s['wall_s']:.3f}s  ({s['steps_per_s']:.0f} adım/s)")
+    if s["profile"]:
+        print(s["profile"])
+
+
+if __name__ == "__main__":
+    main()
@@ -6,14 +6,29 @@ rt1553.py — MIL-STD-1553 Remote Terminal (RT)
 - T/R=1 (RT Transmit): RT -> STATUS, RT -> DATA (wc)
 
 IMU ve EKF akışları 14-word sabit frame üretir.
+Bus'a attach_rt ile bağlanır; komutlar yalnızca bu adrese (ve yayın adresi 31'e) gelir.
+run_forever olay güdümlüdür: sabit uyku yok, bekleyen komutlar hemen boşaltılır, stop() WAKE ile uyandırır.
+Kuyruktan kelime düzeyi mesajlar da işlem düzeyi istekler de (BusRequest) gelir; istek tek yanıt
+çerçevesiyle (durum + veri) Bus1553.rt_reply üzerinden cevaplanır.
+
+Füzyon döngüsü (fusion_hz verilirse): RT kendi thread'inde sabit frekansta (DeadlineScheduler, drop)
+ImuSim.step + EKF.step koşar, IMU ve EKF çerçevelerini paketleyip çift tampona yayınlar: arka yuva
+doldurulur, sonra yayınlanan yuva indeksi çevrilir. Transmit komutu sim/filtre/paketleme yapmadan
+ön yuvadaki hazır çerçeveyi kopyalar (O(1)); yanıt süresi filtre maliyetine bağlı kalmaz. Yuva kopyası
+ve yazımı GIL altında tek C çağrısıdır (yarım çerçeve okunmaz). Döngüden hızlı okuyan BC aynı çerçeveyi
+(aynı seq) tekrar alır; gerçek RT alt adres tamponundaki gibi. fusion_hz=None: eski davranış
+(her transmit komutunda anında üretim, EKF adımlanmaz).
 """
 
 import time
+import array
+import threading
 from typing import Callable, List, Optional, Tuple, Union
 
 from bus1553 import (
-    Bus1553, make_word, unpack_word,
-    SYNC_CMD, SYNC_DATA, SYNC_STATUS
+    Bus1553, BusRequest, Frame, WAKE, recv_fields,
+    SYNC_CMD, SYNC_DATA, SYNC_STATUS,
+    BROADCAST_ADDR, STATUS_BCR,
 )
 from sensor1553 import (
     FRAME_WORDS,
@@ -21,6 +36,7 @@ from sensor1553 import (
     pack_ekf_words, unpack_ekf_words,
     SA_IMU, SA_EKF,
 )
+from scheduler import DeadlineScheduler
 
 # ---------- Command/Status helpers ----------
 
@@ -55,9 +71,12 @@ class RT1553:
         sensor_cb: Optional[Callable[[int], List[int]]] = None,
         sim=None,
         ekf=None,
+        fusion_hz: Optional[float] = None,
     ):
         self.bus = bus
         self.addr = rt_addr & 0x1F
+        # bus bu adrese gelen komutları doğrudan bu RT'nin kuyruğuna koyar
+        bus.attach_rt(self.addr)
 
         # dış komponentler
         self.sensor_cb = sensor_cb  # istenirse dış IMU üreticisi
@@ -73,9 +92,22 @@ class RT1553:
         self.last_v_odo = 0.0
         self.last_w_odo = 0.0
 
+        # yayın (adres 31) alındı: sıradaki durum kelimesinde STATUS_BCR
+        self._bcr = False
+        self.broadcasts = 0
+
         # stop bayrağı
         self._stop = False
 
+        # füzyon döngüsü: çift tampon yuvaları (imu, ekf) ve yayınlanan yuva (-1: henüz yok)
+        self.fusion_hz = fusion_hz
+        self.sched = None           # DeadlineScheduler: döngü jitter'ı / adım süresi
+        self.cycles = 0
+        self._slots = [(array.array("H", bytes(2 * FRAME_WORDS)), array.array("H", bytes(2 * FRAME_WORDS)))
+                       for _ in range(2)]
+        self._front = -1
+        self._fusion_thread = None
+
     # ---- default dummy ----
     def _default_sensor_cb(self, wc: int) -> List[int]:
         out: List[int] = []
@@ -115,9 +147,9 @@ class RT1553:
             return {k: 0.0 for k in keys}
 
     # ---- payload generators ----
-    def _payload_imu(self) -> List[int]:
+    def _sample_imu(self, dt: float = 0.02) -> dict:
         sample = (
-            self.sim.step(dt=0.02)  # sim varsa
+            self.sim.step(dt=dt)  # sim varsa
             if self.sim and hasattr(self.sim, "step")
             else {
                 "roll": 0.0, "pitch": 0.0, "yaw": 0.0,
@@ -130,7 +162,11 @@ class RT1553:
         self.last_gz = float(sample.get("r", 0.0))   # varsayım: gz = r
         self.last_v_odo = self._to_scalar(sample.get("v_odo", 0.0))
         self.last_w_odo = self._to_scalar(sample.get("w_odo", 0.0))
+        return sample
 
+    def _payload_imu(self, sample: Optional[dict] = None) -> List[int]:
+        if sample is None:
+            sample = self._sample_imu()
         self._seq["imu"] = (self._seq["imu"] + 1) & 0xFFFF
         return pack_imu_words(sample, self._seq["imu"])
 
@@ -165,20 +201,85 @@ class RT1553:
         self._seq["ekf"] = (self._seq["ekf"] + 1) & 0xFFFF
         return pack_ekf_words(state, self._seq["ekf"])
 
+    def _payload(self, sa: int):
+        """Transmit yanıtının veri kelimeleri: füzyon döngüsü varsa ön yuvadaki hazır çerçeve, yoksa anında üretim."""
+        front = self._front
+        if sa == SA_IMU:
+            return self._slots[front][0] if front >= 0 else self._payload_imu()
+        if sa == SA_EKF:
+            return self._slots[front][1] if front >= 0 else self._payload_ekf()
+        return []
+
+    # ---- füzyon döngüsü ----
+    def _fusion_step(self, dt: float):
+        sample = self._sample_imu(dt)
+        if self.ekf is not None and hasattr(self.ekf, "step"):
+            # Odometri yoksa açısal hız jiroyla tutarlı kabul edilir (yalnız yaw bias'ı sabit kalır)
+            w_odo = self.last_w_odo if "w_odo" in sample else self.last_gz
+            self.ekf.step(dt, self.last_gz, self.last_v_odo, w_odo)
+        imu = array.array("H", self._payload_imu(sample))
+        ekf = array.array("H", self._payload_ekf())
+        back = 1 - self._front if self._front >= 0 else 0
+        slot = self._slots[back]
+        slot[0][:] = imu
+        slot[1][:] = ekf
+        self._front = back          # yayın: okuyucular bundan sonra bu yuvayı görür
+        self.cycles += 1
+
+    def start_fusion(self):
+        """Füzyon thread'ini başlatır (run_forever fusion_hz verilmişse kendisi çağırır)."""
+        if not self.fusion_hz or self._fusion_thread is not None:
+            return self
+        period = 1.0 / float(self.fusion_hz)
+        self._fusion_step(period)   # ilk çerçeveler hazır: yanıt yolu hiç anında üretime düşmez
+        self.sched = DeadlineScheduler(period, policy="drop").start()
+        self._fusion_thread = threading.Thread(target=self._fusion_loop, name=f"rt{self.addr}-fusion", daemon=True)
+        self._fusion_thread.start()
+        return self
+
+    def _fusion_loop(self):
+        sched = self.sched
+        period = sched.period
+        while not self._stop:
+            for _ in range(sched.due()):
+                t0 = time.perf_counter()
+                self._fusion_step(period)
+                sched.note_step(time.perf_counter() - t0)
+            sched.wait(max_wait=period)
+
+    def fusion_line(self) -> str:
+        if self.sched is None:
+            return "RT füzyon kapalı"
+        e = self.sched.exec.stats_us()
+        j = self.sched.jitter.stats_us()
+        return (f"RT füzyon {self.sched.rate_hz():.1f}/{self.fusion_hz:g} Hz  döngü {self.cycles}  "
+                f"adım p50/p99 {e['p50_us'] / 1e3:.2f}/{e['p99_us'] / 1e3:.2f} ms  "
+                f"jitter p99 {j['p99_us'] / 1e3:.2f} ms  düşürülen {self.sched.dropped}")
+
     # ---- send/recv helpers ----
+    def _status_field(self, bits: int = 0) -> int:
+        if self._bcr:
+            bits |= STATUS_BCR
+            self._bcr = False
+        return make_status_field(self.addr, bits)
+
     def _send_status(self, bits: int = 0):
-        self.bus.rt_send([make_word(SYNC_STATUS, make_status_field(self.addr, bits))])
+        self.bus.rt_send(self.bus.pool.acquire(SYNC_STATUS, (self._status_field(bits),)), self.addr)
 
     def _send_data_block(self, data_words: List[int]):
-        packet = [make_word(SYNC_DATA, (w & 0xFFFF)) for w in data_words]
-        if packet:
-            self.bus.rt_send(packet)
+        # Havuzlu çerçeve: sync/field maskeleri vektörel, liste üretilmez
+        if len(data_words):
+            self.bus.rt_send(self.bus.pool.acquire(SYNC_DATA, data_words), self.addr)
 
     # ---- receive helpers ----
     def _normalize_recv_object(self, obj) -> List[int]:
-        """bus.rt_recv(...) bazen tek kelime (int), bazen list[int] döndürebilir."""
+        """bus.rt_recv(...) bazen tek kelime (int), bazen list[int] ya da Frame döndürebilir."""
         if not obj:
             return []
+        if isinstance(obj, Frame):
+            words = obj.tolist()
+            obj.release()
+            return words
         if isinstance(obj, list):
             return obj
         return [obj]
@@ -188,59 +289,96 @@ class RT1553:
         deadline = time.time() + timeout
         collected: List[int] = []
         while time.time() < deadline and len(collected) < n:
-            obj = self.bus.rt_recv(timeout=timeout)
-            words = self._normalize_recv_object(obj)
-            for w in words:
-                sync, field = unpack_word(w)
-                if sync != SYNC_DATA:
-                    continue
-                collected.append(field & 0xFFFF)
-                if len(collected) >= n:
-                    return collected
+            obj = self.bus.rt_recv(timeout=timeout, addr=self.addr)
+            if obj is WAKE:
+                break   # stop() sırasında yarım kalan yazma
+            if not obj:
+                continue
+            fields = recv_fields(obj, SYNC_DATA)
+            if not collected and len(fields) == n:
+                return fields   # olağan durum: tamamı tek mesajda
+            collected.extend(fields)
+            if len(collected) >= n:
+                return collected[:n]
         return collected if len(collected) == n else None
 
     # ---- ana döngü ----
-    def run_forever(self, sleep: float = 0.01):
+    def run_forever(self, sleep: float = 0.0, idle_timeout: float = 0.5):
+        """
+        Olay güdümlü servis döngüsü: komut gelene kadar rt_recv'de bloklanır, gelince kuyrukta
+        bekleyen tüm komutları uyumadan işler, sonra yeniden bloklanır. stop() bus'a WAKE koyar,
+        döngü hemen çıkar. idle_timeout yalnızca _stop bayrağının doğrudan set edildiği durum için
+        üst sınırdır. sleep geriye uyum için kabul edilir; > 0 ise her boşaltma turundan sonra uyur.
+        """
         print(f"[RT] up. addr=0x{self.addr:02X}")
         self._stop = getattr(self, "_stop", False)
+        self.start_fusion()
         while not self._stop:
-            obj = self.bus.rt_recv(timeout=0.5)
-            if not obj:
-                time.sleep(sleep); continue
-
-            # Bus bazı durumlarda bir seferde 'list[int]' döndürebilir.
-            words = self._normalize_recv_object(obj)
-
-            for w in words:
-                sync, field = unpack_word(w)
-                if sync != SYNC_CMD:
-                    continue
-
-                rt, tr, sa, wc = parse_command_field(field)
-                if rt != self.addr:
-                    continue
-
-                # Transmit: RT -> STATUS, RT -> DATA
-                if tr == 1:
-                    self._send_status(0)
-                    if sa == SA_IMU:
-                        payload = self._payload_imu()
-                    elif sa == SA_EKF:
-                        payload = self._payload_ekf()
-                    else:
-                        payload = []
-                    count = wc if wc > 0 else FRAME_WORDS
-                    self._send_data_block(payload[:count])
-
-                # Receive: BC -> DATA (wc), RT -> STATUS
-                else:
-                    count = wc if wc > 0 else FRAME_WORDS
-                    rx = self._recv_n_data(count, timeout=1.0)
-                    self._send_status(0 if rx is not None else 0x01)
-
+            obj = self.bus.rt_recv(timeout=idle_timeout, addr=self.addr)
+            while obj is not None and obj is not WAKE:
+                self._handle(obj)
+                obj = self.bus.rt_recv_nowait(addr=self.addr)
             if sleep > 0:
                 time.sleep(sleep)
 
+    def _handle(self, obj):
+        if obj.__class__ is BusRequest:
+            self._serve(obj)
+            return
+        # Komut alanları maskeyle çıkarılır (Frame havuza döner); list[int] de kabul edilir.
+        for field in recv_fields(obj, SYNC_CMD):
+
+            rt, tr, sa, wc = parse_command_field(field)
+            if rt == BROADCAST_ADDR:
+                # Yayın yalnızca alma (T/R=0) için geçerli; durum kelimesi gönderilmez
+                if tr == 0:
+                    count = wc if wc > 0 else FRAME_WORDS
+                    if self._recv_n_data(count, timeout=1.0) is not None:
+                        self._bcr = True
+                        self.broadcasts += 1
+                continue
+            if rt != self.addr:
+                continue
+
+            # Transmit: RT -> STATUS, RT -> DATA
+            if tr == 1:
+                self._send_status(0)
+                payload = self._payload(sa)
+                count = wc if wc > 0 else FRAME_WORDS
+                self._send_data_block(payload[:count])
+
+            # Receive: BC -> DATA (wc), RT -> STATUS
+            else:
+                count = wc if wc > 0 else FRAME_WORDS
+                rx = self._recv_n_data(count, timeout=1.0)
+                self._send_status(0 if rx is not None else 0x01)
+
+    def _serve(self, req: BusRequest):
+        """İşlem düzeyi istek: komut + (varsa) veri tek çerçevede; yanıt tek çerçeve (durum + veri)."""
+        fields = req.frame.fields()
+        req.frame.release()
+        rt, tr, sa, wc = parse_command_field(fields[0])
+        count = wc if wc > 0 else FRAME_WORDS
+        if rt == BROADCAST_ADDR:
+            if tr == 0 and len(fields) - 1 >= count:
+                self._bcr = True
+                self.broadcasts += 1
+            return
+        if rt != self.addr:
+            return
+        pool = self.bus.pool
+        if tr == 1:
+            status = self._status_field(0)
+            reply = pool.acquire_msg(SYNC_STATUS, status, SYNC_DATA, self._payload(sa)[:count])
+        else:
+            reply = pool.acquire_msg(SYNC_STATUS, self._status_field(0 if len(fields) - 1 >= count else 0x01))
+        self.bus.rt_reply(req, reply)
+
     def stop(self):
-        """Temiz kapanış için durdurma bayrağı."""
+        """Temiz kapanış: durdurma bayrağı + bekleyen rt_recv'i uyandır; füzyon thread'i en geç bir periyotta çıkar."""
         self._stop = True
+        self.bus.rt_wake(self.addr)
+        th = self._fusion_thread
+        if th is not None and th is not threading.current_thread():
+            th.join(timeout=2.0)
+            self._fusion_thread = None
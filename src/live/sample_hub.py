@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+sample_hub.py — Bus sahibi thread'den çözülmüş örnekleri abonelere dağıtan yayın/abone merkezi
+
+Bus'a tek sahip (bc_schedule.BcScheduleRunner) erişir; çözülmüş örnekler publish() ile her aboneye
+ayrı, sınırlı bir kuyruk üzerinden iletilir. Her abonenin kendi thread'i vardır, yavaş bir abone
+(CSV yazıcı, HUD callback'i, EKF tüketicisi) bus işlemlerini ya da diğer aboneleri bekletmez.
+
+Kuyruk doluyken politika (abone başına):
+  drop_oldest : en eski örnek atılır, yenisi eklenir (HUD gibi "son değer" tüketicileri)
+  drop_newest : yeni örnek atılır (kuyruktakiler sırayla işlenir)
+  block       : yayıncı en fazla block_timeout bekler, yer açılmazsa yeni örnek atılır
+                (kayıpsız olması istenen CSV gibi aboneler; bus sahibi sınırsız bloklanmaz)
+
+İstatistik (abone başına): iletilen / atılan / hata, kuyruk derinliği (anlık, en yüksek),
+gecikme = publish -> handler başlangıcı (Histogram), handler süresi.
+
+Kullanım:
+    hub = SampleHub()
+    hub.subscribe("csv", write_row, maxlen=4096, policy="block")
+    hub.subscribe("hud", on_sample, maxlen=8, policy="drop_oldest", topics=("imu",))
+    hub.start()
+    hub.publish("imu", {"seq": 1, ...})        # bus sahibi thread
+    ...
+    hub.stop(); print(hub.summary())
+"""
+
+import time
+import threading
+import collections
+
+from profiling import Histogram
+
+DROP_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+
+class Subscriber:
+    """
+    Tek abone: sınırlı kuyruk + handler'ı çağıran thread. topics verilirse yalnızca bu konulardaki
+    örnekler iletilir. handler istisnası sayılır, thread'i durdurmaz.
+    """
+    def __init__(self, name, handler, maxlen=256, policy="drop_oldest", topics=None, block_timeout=0.05):
+        if policy not in DROP_POLICIES:
+            raise ValueError(f"Bilinmeyen politika: {policy} (seçenekler: {', '.join(DROP_POLICIES)})")
+        if maxlen < 1:
+            raise ValueError(f"Kuyruk boyu en az 1 olmalı: {maxlen}")
+        self.name = name
+        self.handler = handler
+        self.maxlen = int(maxlen)
+        self.policy = policy
+        self.topics = frozenset(topics) if topics else None
+        self.block_timeout = float(block_timeout)
+
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.lag = Histogram()        # publish -> handler başlangıcı
+        self.handle = Histogram()     # handler süresi
+
+        self._q = collections.deque()
+        self._cv = threading.Condition()
+        self._stop = False
+        self._thread = None
+
+    # ---- yayıncı tarafı (bus sahibi thread) ----
+    def put(self, topic, sample, t_ns):
+        q = self._q
+        with self._cv:
+            if len(q) >= self.maxlen:
+                if self.policy == "drop_oldest":
+                    q.popleft()
+                    self.dropped += 1
+                else:
+                    if self.policy == "block":
+                        self._cv.wait_for(lambda: len(q) < self.maxlen or self._stop, self.block_timeout)
+                    if len(q) >= self.maxlen:
+                        self.dropped += 1
+                        return False
+            q.append((topic, sample, t_ns))
+            if len(q) > self.max_depth:
+                self.max_depth = len(q)
+            self._cv.notify_all()
+        return True
+
+    # ---- abone thread'i ----
+    def start(self):
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name=f"sub-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        """Kuyrukta kalanlar işlendikten sonra thread durur."""
+        with self._cv:
+            self._stop = True
+            self._cv.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _run(self):
+        q = self._q
+        while True:
+            with self._cv:
+                while not q and not self._stop:
+                    self._cv.wait()
+                if not q:
+                    return
+                items = list(q)
+                q.clear()
+                self._cv.notify_all()     # block politikasında bekleyen yayıncı
+            for topic, sample, t_ns in items:
+                t = time.perf_counter_ns()
+                self.lag.record(t - t_ns)
+                try:
+                    self.handler(topic, sample)
+                except Exception:
+                    self.errors += 1
+                self.handle.record(time.perf_counter_ns() - t)
+                self.delivered += 1
+
+    def depth(self):
+        return len(self._q)
+
+
+class SampleHub:
+    """Konu (ör. "imu", "ekf") + örnek yayınlar; her abone kendi kuyruğundan kendi thread'inde tüketir."""
+    def __init__(self):
+        self.subscribers = []
+        self.published = 0
+        self._started = False
+
+    def subscribe(self, name, handler, maxlen=256, policy="drop_oldest", topics=None, block_timeout=0.05):
+        """handler(topic, sample). Örnek tüm abonelerle paylaşılır; abone değiştirmemelidir."""
+        if any(s.name == name for s in self.subscribers):
+            raise ValueError(f"Abone adı kullanımda: {name}")
+        sub = Subscriber(name, handler, maxlen, policy, topics, block_timeout)
+        self.subscribers.append(sub)
+        if self._started:
+            sub.start()
+        return sub
+
+    def start(self):
+        self._started = True
+        for s in self.subscribers:
+            s.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        self._started = False
+        for s in self.subscribers:
+            s.stop(timeout)
+
+    def publish(self, topic, sample):
+        t_ns = time.perf_counter_ns()
+        self.published += 1
+        for s in self.subscribers:
+            if s.topics is None or topic in s.topics:
+                s.put(topic, sample, t_ns)
+
+    # ---- raporlama ----
+    def hud_line(self):
+        parts = []
+        for s in self.subscribers:
+            parts.append(f"{s.name} {s.lag.percentile_ns(0.99) / 1e6:.1f} ms p99 q{s.depth()} ✗{s.dropped}")
+        return "SUB " + "  ".join(parts) if parts else "SUB yok"
+
+    def summary(self):
+        lines = [
+            "Örnek dağıtımı (abone başına)",
+            "=============================",
+            f"Yayınlanan: {self.published}",
+            "Abone       politika      kuyruk(en yüksek/boy)  iletilen   atılan  hata  gecikme[ms] p50/p99/max  handler[ms] p99",
+        ]
+        for s in self.subscribers:
+            lag = s.lag.stats_us()
+            h = s.handle.stats_us()
+            lines.append(f"{s.name:<11} {s.policy:<12}  {s.max_depth:8d}/{s.maxlen:<8d}     {s.delivered:8d} {s.dropped:8d} "
+                         f"{s.errors:5d}  {lag['p50_us'] / 1e3:.2f}/{lag['p99_us'] / 1e3:.2f}/{lag['max_us'] / 1e3:.2f}"
+                         f"       {h['p99_us'] / 1e3:.2f}")
+        return "\n".join(lines)
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+scheduler.py — Mutlak deadline'lı sabit frekans zamanlayıcı (monotonic saat) + jitter istatistikleri
+
+Döngü kalıbı:
+    sched = DeadlineScheduler(dt, policy="catchup")
+    while ...:
+        for _ in range(sched.due()):
+            t = time.perf_counter(); sim.step(); sched.note_step(time.perf_counter() - t)
+        if sched.slack() > render_estimate: ... çizim ...
+        sched.wait()
+
+Politikalar (geç kalınan deadline'lar için):
+  catchup : kaçırılan adımlar hemen arka arkaya koşulur (en fazla max_catchup); fazlası düşürülür
+  drop    : yalnızca bir adım koşulur, kaçırılan deadline'lar düşürülür (dropped)
+
+İstatistikler:
+  jitter   : adımın serbest bırakıldığı an - deadline (Histogram, ns)
+  late     : en az bir periyot geç serbest bırakılan (catchup ile yetişilen) deadline sayısı
+  dropped  : hiç koşulmayan deadline sayısı
+  overrun  : adım süresi > periyot
+"""
+
+import time
+
+from profiling import Histogram
+
+POLICIES = ("catchup", "drop")
+
+
+class DeadlineScheduler:
+    def __init__(self, period_s, policy="catchup", max_catchup=5, clock=time.monotonic):
+        if policy not in POLICIES:
+            raise ValueError(f"Bilinmeyen politika: {policy} (seçenekler: {', '.join(POLICIES)})")
+        self.period = float(period_s)
+        self.policy = policy
+        self.max_catchup = max(1, int(max_catchup))
+        self.clock = clock
+
+        self.jitter = Histogram()
+        self.exec = Histogram()
+        self.released = 0
+        self.late = 0
+        self.dropped = 0
+        self.overruns = 0
+
+        self._next = None
+        self._t_start = None
+
+    def start(self):
+        now = self.clock()
+        self._next = now
+        self._t_start = now
+        return self
+
+    def rebase(self):
+        """Duraklatma sonrası: sıradaki deadline'ı şimdiye çek (bekleme süresi kaçırılmış sayılmaz)."""
+        self._next = self.clock()
+        if self._t_start is None:
+            self._t_start = self._next
+
+    def reset_stats(self):
+        self.__init__(self.period, self.policy, self.max_catchup, self.clock)
+
+    def due(self):
+        """Şu an serbest bırakılması gereken adım sayısı (0 = deadline henüz gelmedi)."""
+        if self._next is None:
+            self.start()
+        now = self.clock()
+        if now < self._next:
+            return 0
+
+        late_s = now - self._next
+        missed = int(late_s // self.period)  # bu deadline'dan sonra geçmiş olanlar
+        self.jitter.record(int(late_s * 1e9))
+
+        if self.policy == "catchup":
+            n = 1 + min(missed, self.max_catchup - 1)
+            self.late += n - 1
+            self.dropped += missed - (n - 1)
+        else:
+            n = 1
+            self.dropped += missed
+
+        self._next += (missed + 1) * self.period
+        self.released += n
+        return n
+
+    def note_step(self, exec_s):
+        """Koşulan adımın süresi (s); periyodu aşarsa overrun sayılır."""
+        self.exec.record(int(exec_s * 1e9))
+        if exec_s > self.period:
+            self.overruns += 1
+
+    def slack(self):
+        """Sıradaki deadline'a kalan süre (s); negatifse gecikmedeyiz."""
+        if self._next is None:
+            return self.period
+        return self._next - self.clock()
+
+    def wait(self, max_wait=None):
+        """Sıradaki deadline'a kadar uyur (max_wait ile sınırlanabilir)."""
+        delay = self.slack()
+        if max_wait is not None:
+            delay = min(delay, max_wait)
+        if delay > 0:
+            time.sleep(delay)
+
+    # ---- raporlama ----
+    def rate_hz(self):
+        if self._t_start is None:
+            return 0.0
+        el = self.clock() - self._t_start
+        return self.released / el if el > 0 else 0.0
+
+    def hud_line(self):
+        j = self.jitter.stats_us()
+        return (f"SCHED {self.rate_hz():.1f}/{1.0 / self.period:.1f} Hz  "
+                f"| jitter p50/p99/max={j['p50_us'] / 1e3:.2f}/{j['p99_us'] / 1e3:.2f}/{j['max_us'] / 1e3:.2f} ms  "
+                f"| late={self.late} drop={self.dropped} overrun={self.overruns}")
+
+    def summary(self):
+        j = self.jitter.stats_us()
+        e = self.exec.stats_us()
+        total = self.released + self.dropped
+        pct = 100.0 * self.dropped / total if total else 0.0
+        return "\n".join([
+            "Deadline zamanlayıcı",
+            "====================",
+            f"Periyot: {self.period * 1e3:.2f} ms ({1.0 / self.period:.1f} Hz)  |  politika: {self.policy}",
+            f"Gerçekleşen frekans: {self.rate_hz():.2f} Hz",
+            f"Serbest bırakılan adım: {self.released}  |  geç (catch-up): {self.late}  "
+            f"|  düşürülen: {self.dropped} ({pct:.2f}%)",
+            f"Jitter [ms] ort/p50/p99/max: {j['mean_us'] / 1e3:.3f}/{j['p50_us'] / 1e3:.3f}/"
+            f"{j['p99_us'] / 1e3:.3f}/{j['max_us'] / 1e3:.3f}",
+            f"Adım süresi [ms] ort/p99/max: {e['mean_us'] / 1e3:.3f}/{e['p99_us'] / 1e3:.3f}/{e['max_us'] / 1e3:.3f}"
+            f"  |  overrun: {self.overruns}",
+        ])
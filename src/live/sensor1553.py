@@ -1,4 +1,10 @@
 # sensor1553.py — IMU/INS ve EKF verilerini 1553 DATA kelimelerine paketleme/çözme
+# Toplu (batch) sürümler: pack_*_batch / unpack_*_batch — (N, 14) uint16 dizileri, vektörel doygunluk,
+# ölçek, işaret ve checksum; kare başına geçerlilik maskesi döner (tekli sürümlerle bit-bit aynı).
+
+
+
+import numpy as np
 
 
 
@@ -374,3 +380,103 @@ def unpack_ekf_words(words: list) -> dict:
 
     }
 
+
+
+
+
+# ---------------- Toplu (batch) codec ---------------- #
+
+IMU_COLS = ("roll", "pitch", "yaw", "p", "q", "r", "ax", "ay", "az", "temp_c")
+EKF_COLS = ("x", "y", "z", "vx", "vy", "vz", "roll", "pitch", "yaw")
+
+_G = 9.80665
+
+
+def _i16_batch(x, ok):
+    """round + doygunluk (_sat_i16) -> uint16 kelimeler; sonlu olmayan değerler 0 ve ok=False."""
+    finite = np.isfinite(x)
+    ok &= finite
+    v = np.clip(np.rint(np.where(finite, x, 0.0)), -32768, 32767).astype(np.int16)
+    return v.view(np.uint16)
+
+
+def _seq_batch(seq, n):
+    """seq: tek int (ilk kare; sonrakiler +1) ya da N uzunlukta dizi."""
+    if np.ndim(seq) == 0:
+        return (int(seq) + np.arange(n, dtype=np.int64)) & 0xFFFF
+    return np.asarray(seq, dtype=np.int64) & 0xFFFF
+
+
+def _frames_batch(header, seq, n):
+    w = np.zeros((n, FRAME_WORDS), dtype=np.uint16)
+    w[:, 0] = header
+    w[:, 1] = _seq_batch(seq, n)
+    return w
+
+
+def _finish_batch(w):
+    w[:, -1] = (w[:, :-1].sum(axis=1, dtype=np.uint32) & 0xFFFF).astype(np.uint16)
+    return w
+
+
+def _check_batch(words, header):
+    """(N, 14) kelimeler -> (uint16 dizi, geçerlilik maskesi: başlık + checksum)."""
+    w = np.asarray(words)
+    if w.ndim != 2 or w.shape[1] != FRAME_WORDS:
+        raise ValueError(f"(N, {FRAME_WORDS}) dizi bekleniyor, gelen {w.shape}")
+    w = w.astype(np.uint16, copy=False)
+    cks = (w[:, :-1].sum(axis=1, dtype=np.uint32) & 0xFFFF).astype(np.uint16)
+    valid = (w[:, 0] == header) & (w[:, -1] == cks)
+    return w, valid
+
+
+def pack_imu_batch(cols, seq=0):
+    """
+    {kolon: dizi} (IMU_COLS) -> ((N, 14) uint16 kareler, geçerlilik maskesi).
+    Sonlu olmayan değer içeren kareler 0 ile paketlenir ve maskede False olur.
+    """
+    n = len(cols["roll"])
+    ok = np.ones(n, dtype=bool)
+    w = _frames_batch(FRAME_ID_IMU, seq, n)
+    for j, k in enumerate(("roll", "pitch", "yaw", "p", "q", "r")):
+        w[:, 2 + j] = _i16_batch(np.asarray(cols[k], dtype=float) * 1000, ok)
+    for j, k in enumerate(("ax", "ay", "az")):
+        w[:, 8 + j] = _i16_batch(np.asarray(cols[k], dtype=float) / _G * 1000, ok)
+    w[:, 11] = _i16_batch(np.asarray(cols["temp_c"], dtype=float) * 100, ok)
+    return _finish_batch(w), ok
+
+
+def unpack_imu_batch(words):
+    """
+    (N, 14) kareler -> ({seq, roll, ..., temp_c: dizi}, geçerlilik maskesi).
+    Geçersiz (başlık/checksum hatalı) karelerin değerleri de çözülür; maske ile süzülmelidir.
+    """
+    w, valid = _check_batch(words, FRAME_ID_IMU)
+    s = w.view(np.int16)
+    out = {"seq": w[:, 1].astype(np.int64)}
+    for j, k in enumerate(("roll", "pitch", "yaw", "p", "q", "r")):
+        out[k] = s[:, 2 + j] / 1000.0
+    for j, k in enumerate(("ax", "ay", "az")):
+        out[k] = s[:, 8 + j] / 1000.0 * _G
+    out["temp_c"] = s[:, 11] / 100.0
+    return out, valid
+
+
+def pack_ekf_batch(cols, seq=0):
+    """{kolon: dizi} (EKF_COLS) -> ((N, 14) uint16 kareler, geçerlilik maskesi)."""
+    n = len(cols["x"])
+    ok = np.ones(n, dtype=bool)
+    w = _frames_batch(FRAME_ID_EKF, seq, n)
+    for j, k in enumerate(EKF_COLS):
+        w[:, 2 + j] = _i16_batch(np.asarray(cols[k], dtype=float) / 1e-3, ok)
+    return _finish_batch(w), ok
+
+
+def unpack_ekf_batch(words):
+    """(N, 14) kareler -> ({seq, x, ..., yaw: dizi}, geçerlilik maskesi)."""
+    w, valid = _check_batch(words, FRAME_ID_EKF)
+    s = w.view(np.int16)
+    out = {"seq": w[:, 1].astype(np.int64)}
+    for j, k in enumerate(EKF_COLS):
+        out[k] = s[:, 2 + j] * 1e-3
+    return out, valid
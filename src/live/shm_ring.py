@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+shm_ring.py — multiprocessing.shared_memory üzerinde trajektori/metrik halka tamponu (tek yazar)
+
+Yerleşim (tek blok):
+  header  int64[8]     : seq, count, capacity, generation, ...
+  rows    float64[C,9] : t, gt_x, gt_y, nv_x, nv_y, ek_x, ek_y, err_naive, err_ekf
+  metrics float64[16]  : M_* indeksleri (RMSE, t, durum bayrakları ...)
+  text    uint8[512]   : HUD ek satırları (utf-8, NUL ile biter)
+
+Eşzamanlılık: seqlock. Yazar her yayında seq'i tek sayıya çeker, yazar, tekrar çift yapar.
+Okuyucu kilit almaz; seq okur -> kopyalar -> seq'i tekrar okur, değiştiyse yeniden dener.
+Veri yolu pickle kullanmaz; okuyucu numpy görünümlerinden kopya alır.
+"""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+
+ROW_COLS = ("t", "gt_x", "gt_y", "nv_x", "nv_y", "ek_x", "ek_y", "err_naive", "err_ekf")
+NCOL = len(ROW_COLS)
+
+H_SEQ, H_COUNT, H_CAP, H_GEN = 0, 1, 2, 3
+NHDR = 8
+
+M_T, M_RMSE_N, M_RMSE_E, M_PAUSED, M_FINISHED, M_STEPS = range(6)
+NMET = 16
+
+TEXT_BYTES = 512
+
+
+class TrajRing:
+    def __init__(self, shm, capacity, owner):
+        self.shm = shm
+        self.capacity = int(capacity)
+        self.owner = owner
+        buf = shm.buf
+        off = 0
+        self.hdr = np.ndarray((NHDR,), dtype=np.int64, buffer=buf, offset=off)
+        off += NHDR * 8
+        self.rows = np.ndarray((self.capacity, NCOL), dtype=np.float64, buffer=buf, offset=off)
+        off += self.capacity * NCOL * 8
+        self.metrics = np.ndarray((NMET,), dtype=np.float64, buffer=buf, offset=off)
+        off += NMET * 8
+        self.text = np.ndarray((TEXT_BYTES,), dtype=np.uint8, buffer=buf, offset=off)
+
+    @staticmethod
+    def nbytes(capacity):
+        return NHDR * 8 + int(capacity) * NCOL * 8 + NMET * 8 + TEXT_BYTES
+
+    @classmethod
+    def create(cls, capacity):
+        shm = shared_memory.SharedMemory(create=True, size=cls.nbytes(capacity))
+        ring = cls(shm, capacity, owner=True)
+        ring.hdr[:] = 0
+        ring.hdr[H_CAP] = ring.capacity
+        ring.metrics[:] = 0.0
+        ring.text[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name):
+        # Not: çocuk süreç ebeveynin resource_tracker'ını paylaşır; segmenti yalnızca
+        # create eden taraf (owner) unlink eder.
+        shm = shared_memory.SharedMemory(name=name)
+        capacity = int(np.ndarray((NHDR,), dtype=np.int64, buffer=shm.buf)[H_CAP])
+        return cls(shm, capacity, owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    # ---------------- yazar ----------------
+    def _begin(self):
+        self.hdr[H_SEQ] += 1          # tek: yazım sürüyor
+
+    def _end(self):
+        self.hdr[H_SEQ] += 1          # çift: tutarlı
+
+    def publish(self, row=None, metrics=None, text=None):
+        """Tek satır + (isteğe bağlı) metrik/HUD metni yayınla."""
+        self._begin()
+        if row is not None:
+            n = int(self.hdr[H_COUNT])
+            self.rows[n % self.capacity] = row
+            self.hdr[H_COUNT] = n + 1
+        if metrics is not None:
+            for k, v in metrics.items():
+                self.metrics[k] = v
+        if text is not None:
+            raw = text.encode("utf-8")[:TEXT_BYTES - 1]
+            self.text[:len(raw)] = np.frombuffer(raw, dtype=np.uint8)
+            self.text[len(raw)] = 0
+        self._end()
+
+    def clear(self):
+        """Reset: geçmiş silinir, generation artar (okuyucu yerel geçmişini atar)."""
+        self._begin()
+        self.hdr[H_COUNT] = 0
+        self.hdr[H_GEN] += 1
+        self._end()
+
+    # ---------------- okuyucu ----------------
+    def read_since(self, last_count, last_gen, retries=8):
+        """
+        last_count'tan sonra eklenen satırları kopyalar.
+        Dönüş: (rows[k,NCOL], count, gen, metrics kopyası, text)
+        gen != last_gen ise geçmiş sıfırlanmıştır; rows baştan itibaren verilir.
+        """
+        for _ in range(retries):
+            s0 = int(self.hdr[H_SEQ])
+            if s0 & 1:
+                continue
+            count = int(self.hdr[H_COUNT])
+            gen = int(self.hdr[H_GEN])
+            start = last_count if gen == last_gen else 0
+            start = max(start, count - self.capacity, 0)
+            idx = np.arange(start, count) % self.capacity
+            rows = self.rows[idx]                      # fancy index -> kopya
+            metrics = self.metrics.copy()
+            raw = self.text.tobytes()
+            if int(self.hdr[H_SEQ]) == s0:
+                text = raw.split(b"\0", 1)[0].decode("utf-8", "replace")
+                return rows, count, gen, metrics, text
+        return np.empty((0, NCOL)), last_count, last_gen, None, None
+
+    def close(self):
+        # numpy görünümleri bırakılmadan SharedMemory.close() BufferError verir
+        self.hdr = self.rows = self.metrics = self.text = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
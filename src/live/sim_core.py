@@ -10,6 +10,9 @@ from sensors import SensorSim
 
 from ekf import EKF
 
+from profiling import (PhaseProfiler, perf_counter_ns,
+                       PH_COMMAND, PH_MEASURE, PH_NAIVE, PH_EKF, PH_METRICS, PH_LOG)
+
 
 
 class LiveSim:
@@ -20,14 +23,32 @@ class LiveSim:
 
     Çizim yok; onu live_stream.py yapıyor.
 
+    source verilirse (ör. replay.ReplaySource) GT/komut/ölçüm simülasyonu yerine
+    kayıtlı imu_gz/odo_v/odo_w (ve varsa GT) kullanılır; Naive/EKF/metrik yolu aynıdır.
+
+    profile=True (veya bir PhaseProfiler) ile step fazları ölçülür; self.prof None ise maliyet yok.
+
     """
 
-    def __init__(self, dt=0.05, total_keep=3000):
+    def __init__(self, dt=0.05, total_keep=3000, source=None, record=True, verbose=True,
+                 profile=False):
 
         self.dt = float(dt)
 
         self.keep = int(total_keep)
 
+        self.source = source      # None -> SensorSim ile canlı simülasyon
+        self.record = bool(record)  # False -> log_rows tutulmaz (uzun replay'ler için)
+        self.verbose = bool(verbose)
+        self.finished = False
+        self.steps = 0            # toplam adım (ring buffer kırpmasından bağımsız)
+        self.generation = getattr(self, "generation", 0)   # reset() her çağrıda artırır
+
+        if isinstance(profile, PhaseProfiler):
+            self.prof = profile
+        else:
+            self.prof = PhaseProfiler(budget_s=self.dt) if profile else None
+
 
 
         # GT durumu
@@ -81,30 +102,58 @@ class LiveSim:
 
 
     def step(self):
+        """Bir adım ilerler. Replay kaynağı bittiyse False döner (finished=True)."""
+
+        prof = self.prof
 
-        dt = self.dt
+        if self.source is not None:
+            # Pacer beklemesi profile dahil edilmez
+            self.source.wait_next()
+            if prof is not None:
+                t_step = t0 = perf_counter_ns()
+            s = self.source.next_sample(pace=False)
+            if s is None:
+                self.finished = True
+                return False
+            dt = s["dt"]
+            self.x, self.y, self.psi = s["gt_x"], s["gt_y"], s["gt_yaw"]
+            gz, v_odo, w_odo = s["gz"], s["v_odo"], s["w_odo"]
+            t_now = s["t"]
+            if prof is not None:
+                t0 = prof.lap(PH_MEASURE, t0)
+        else:
+            dt = self.dt
 
+            if prof is not None:
+                t_step = t0 = perf_counter_ns()
 
 
-        # Komutlar (sensörden; eve dönüş mantığı için GT pozisyonunu ver)
 
-        v_cmd, w_cmd = self.sens.command(self.x, self.y, self.psi)
+            # Komutlar (sensörden; eve dönüş mantığı için GT pozisyonunu ver)
 
+            v_cmd, w_cmd = self.sens.command(self.x, self.y, self.psi)
+            if prof is not None:
+                t0 = prof.lap(PH_COMMAND, t0)
 
 
-        # GT entegrasyon
 
-        self.psi = wrap_pi(self.psi + w_cmd*dt)
+            # GT entegrasyon
 
-        self.x   = self.x + v_cmd*dt*np.cos(self.psi)
+            self.psi = wrap_pi(self.psi + w_cmd*dt)
 
-        self.y   = self.y + v_cmd*dt*np.sin(self.psi)
+            self.x   = self.x + v_cmd*dt*np.cos(self.psi)
 
+            self.y   = self.y + v_cmd*dt*np.sin(self.psi)
 
 
-        # Sensör ölçümleri
 
-        gz, v_odo, w_odo = self.sens.measure(v_cmd, w_cmd)
+            # Sensör ölçümleri
+
+            gz, v_odo, w_odo = self.sens.measure(v_cmd, w_cmd)
+
+            t_now = self.t[-1]+dt if self.t else 0.0
+            if prof is not None:
+                t0 = prof.lap(PH_MEASURE, t0)
 
 
 
@@ -115,12 +164,16 @@ class LiveSim:
         self.nx   = self.nx + v_odo*dt*np.cos(self.npsi)
 
         self.ny   = self.ny + v_odo*dt*np.sin(self.npsi)
+        if prof is not None:
+            t0 = prof.lap(PH_NAIVE, t0)
 
 
 
         # EKF
 
         Xk, _ = self.ekf.step(dt, gz, v_odo, w_odo)
+        if prof is not None:
+            t0 = prof.lap(PH_EKF, t0)
 
 
 
@@ -132,7 +185,9 @@ class LiveSim:
 
         self.ek.append([Xk[0],Xk[1]])
 
-        self.t.append(self.t[-1]+dt if self.t else 0.0)
+        self.t.append(t_now)
+
+        self.steps += 1
 
         self.sens.t = self.t  # eve dönüş mantığı için sensöre aktar
 
@@ -147,18 +202,20 @@ class LiveSim:
         self.err_naive.append(err_n)
 
         self.err_ekf.append(err_e)
+        if prof is not None:
+            t0 = prof.lap(PH_METRICS, t0)
 
 
 
         # terminal log ~1 Hz
 
-        if int(self.t[-1]) != int(self._last_print_s):
+        if self.verbose and int(self.t[-1]) != int(self._last_print_s):
 
             self._last_print_s = self.t[-1]
 
-            rmse_nv = np.sqrt(np.mean(np.square(self.err_naive)))
+            rmse_nv = np.sqrt(np.nanmean(np.square(self.err_naive)))
 
-            rmse_ek = np.sqrt(np.mean(np.square(self.err_ekf)))
+            rmse_ek = np.sqrt(np.nanmean(np.square(self.err_ekf)))
 
             import numpy as _np
 
@@ -174,19 +231,21 @@ class LiveSim:
 
         # CSV ham log
 
-        self.log_rows.append([
+        if self.record:
 
-            self.t[-1],
+            self.log_rows.append([
 
-            self.x, self.y, self.psi,
+                self.t[-1],
 
-            gz, v_odo, w_odo,
+                self.x, self.y, self.psi,
 
-            self.nx, self.ny, self.npsi,
+                gz, v_odo, w_odo,
 
-            self.ekf.X[0], self.ekf.X[1], self.ekf.X[2], self.ekf.X[3], self.ekf.X[4]
+                self.nx, self.ny, self.npsi,
 
-        ])
+                self.ekf.X[0], self.ekf.X[1], self.ekf.X[2], self.ekf.X[3], self.ekf.X[4]
+
+            ])
 
 
 
@@ -197,6 +256,11 @@ class LiveSim:
             if len(arr) > self.keep:
 
                 del arr[0]
+        if prof is not None:
+            prof.lap(PH_LOG, t0)
+            prof.end_step(t_step)
+
+        return True
 
 
 
@@ -248,7 +312,15 @@ class LiveSim:
 
     def reset(self):
 
-        print("↺ Resetlendi (yeni rastgele akış).")
-
-        self.__init__(dt=self.dt, total_keep=self.keep)
+        source = self.source
+        if source is not None:
+            source.rewind()
+            print("↺ Resetlendi (replay baştan).")
+        else:
+            print("↺ Resetlendi (yeni rastgele akış).")
+
+        self.__init__(dt=self.dt, total_keep=self.keep, source=source,
+                      record=self.record, verbose=self.verbose,
+                      profile=self.prof if self.prof is not None else False)
+        self.generation += 1
 
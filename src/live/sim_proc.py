@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+"""
+sim_proc.py — LiveSim + DeadlineScheduler döngüsünü ayrı bir süreçte koşturur
+
+- Her adım TrajRing'e (shared memory) bir satır olarak yayınlanır; metrik/HUD metni ~20 Hz.
+- Çizim süreci halkayı kilitsiz okur; GUI takılmaları filtre döngüsünü yavaşlatmaz.
+- Kontrol kanalı: multiprocessing.Pipe üzerinden tek karakterlik komutlar
+    'p' durdur/devam, 'r' reset, 'c' CSV kaydet, 'q' çık
+"""
+
+import os
+import time
+import multiprocessing as mp
+
+import numpy as np
+
+from shm_ring import TrajRing, M_T, M_RMSE_N, M_RMSE_E, M_PAUSED, M_FINISHED, M_STEPS
+
+
+def sim_process_main(ring_name, ctrl, dt, keep, sched_policy, profile, replay, speed, summary_path):
+    # Süreç içi importlar (spawn: çocuk bu modülü sıfırdan yükler)
+    from sim_core import LiveSim
+    from scheduler import DeadlineScheduler
+
+    ring = TrajRing.attach(ring_name)
+    if replay:
+        from replay import ReplaySource
+        sim = LiveSim(dt=dt, total_keep=keep, profile=profile,
+                      source=ReplaySource(replay, speed=speed, default_dt=dt))
+        sched = None
+    else:
+        sim = LiveSim(dt=dt, total_keep=keep, profile=profile)
+        sched = DeadlineScheduler(dt, policy=sched_policy).start()
+
+    pub_period = 0.05
+    last_pub = 0.0
+    steps = 0
+    running = True
+
+    def do_step():
+        nonlocal steps
+        if not sim.step():
+            return
+        steps += 1
+        gt, nv, ek = sim.gt[-1], sim.nv[-1], sim.ek[-1]
+        ring.publish((sim.t[-1], gt[0], gt[1], nv[0], nv[1], ek[0], ek[1],
+                      sim.err_naive[-1], sim.err_ekf[-1]))
+
+    try:
+        while running:
+            # --- kontrol kanalı (bloklamadan) ---
+            while ctrl.poll():
+                try:
+                    key = ctrl.recv()
+                except EOFError:
+                    running = False
+                    break
+                if key == "p":
+                    sim.paused = not sim.paused
+                    print("⏸️  Pause" if sim.paused else "▶️  Devam")
+                elif key == "r":
+                    # Yeni koşu: geçmiş, adım sayacı, faz profili ve zamanlayıcı istatistikleri birlikte
+                    # sıfırlanır (HUD/özet eski koşuyla karışmaz); metrikler hemen yeniden yayınlanır.
+                    sim.reset()
+                    steps = 0
+                    if sim.prof is not None:
+                        sim.prof.reset()
+                    if sched is not None:
+                        sched.reset_stats()
+                        sched.start()
+                    ring.clear()
+                    last_pub = 0.0
+                elif key == "c":
+                    try:
+                        sim.save_csv()
+                    except Exception as e:
+                        print("⚠️ CSV kaydı başarısız:", e)
+                elif key == "q":
+                    running = False
+            if not running:
+                break
+
+            idle = sim.paused or sim.finished
+            if sched is not None:
+                if idle:
+                    sched.rebase()
+                else:
+                    for _ in range(sched.due()):
+                        t0 = time.perf_counter()
+                        do_step()
+                        sched.note_step(time.perf_counter() - t0)
+            elif not idle:
+                do_step()
+
+            # --- metrik + HUD metni (~20 Hz) ---
+            now = time.monotonic()
+            if now - last_pub > pub_period:
+                last_pub = now
+                rmse_n = float(np.sqrt(np.mean(np.square(sim.err_naive)))) if sim.err_naive else 0.0
+                rmse_e = float(np.sqrt(np.mean(np.square(sim.err_ekf)))) if sim.err_ekf else 0.0
+                lines = []
+                if sched is not None:
+                    lines.append(sched.hud_line())
+                if sim.prof is not None:
+                    lines.append(sim.prof.hud_line())
+                ring.publish(metrics={
+                    M_T: sim.t[-1] if sim.t else 0.0,
+                    M_RMSE_N: rmse_n, M_RMSE_E: rmse_e,
+                    M_PAUSED: float(sim.paused), M_FINISHED: float(sim.finished),
+                    M_STEPS: float(steps),
+                }, text="\n".join(lines))
+
+            if idle:
+                time.sleep(min(dt, pub_period))
+            elif sched is not None:
+                sched.wait(max_wait=pub_period)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sections = []
+        if sched is not None:
+            sections.append(sched.summary())
+        if sim.prof is not None:
+            sections.append(sim.prof.summary())
+        if sections and summary_path:
+            text = "\n\n".join(sections)
+            print(text)
+            try:
+                os.makedirs(os.path.dirname(summary_path), exist_ok=True)
+                with open(summary_path, "w") as f:
+                    f.write(text + "\n")
+                print("📈 Özet:", summary_path)
+            except Exception as e:
+                print("⚠️ Koşu özeti yazılamadı:", e)
+        ring.close()
+
+
+class SimProcess:
+    """Çizim tarafı için tutamaç: halkayı oluşturur, çocuğu başlatır, komut gönderir."""
+    def __init__(self, dt=0.05, keep=3000, sched_policy="catchup", profile=False,
+                 replay=None, speed=1.0, summary_path=None):
+        self.ring = TrajRing.create(keep)
+        ctx = mp.get_context("spawn")
+        self._rx, self._tx = ctx.Pipe(duplex=False)
+        self.proc = ctx.Process(
+            target=sim_process_main,
+            args=(self.ring.name, self._rx, dt, keep, sched_policy, profile, replay, speed, summary_path),
+            daemon=True,
+        )
+
+    def start(self):
+        self.proc.start()
+        return self
+
+    def send(self, key):
+        try:
+            self._tx.send(key)
+        except (BrokenPipeError, OSError):
+            pass
+
+    def alive(self):
+        return self.proc.is_alive()
+
+    def stop(self, timeout=3.0):
+        if self.proc.is_alive():
+            self.send("q")
+            self.proc.join(timeout=timeout)
+            if self.proc.is_alive():
+                self.proc.terminate()
+                self.proc.join(timeout=1.0)
+        self.ring.close()
@@ -0,0 +1,487 @@
+# -*- coding: utf-8 -*-
+"""
+stream_align.py — Asenkron IMU/EKF akışlarını (imu_stream.csv / ekf_stream.csv) ortak zaman eksenine hizalama
+
+İki bağımsız poll thread'i farklı anlarda yazar; t kolonları örtüşmez, seq'lerde boşluk/tekrar olur.
+- seq kontrolü: 16-bit sarma açılır (unwrap), tekrar/geri giden örnekler atılır, boşluklar sayılır.
+- merge_asof: sol akışın her zamanına sağ akışın en yakın (backward/forward/nearest) örneği,
+  np.searchsorted ile vektörel; tolerance dışı eşleşmeler NaN.
+- resample: hedef frekanstaki mutlak ızgaraya (k / rate) doğrusal ya da en yakın örnek
+  interpolasyonu. Açılar (yaw/roll/pitch) unwrap -> interp -> wrap_pi; seq sıfırıncı derece tutulur.
+  max_gap'ten uzun veri boşluklarına denk gelen ızgara noktaları NaN.
+- Parçalı mod (align_files): dosyalar csv_io.iter_csv_chunks ile okunur, yalnızca hizalama için
+  gereken kuyruk örnekleri bellekte tutulur; bellekten büyük dosyalar için.
+
+Kullanım:
+  python stream_align.py --imu data/streams/imu_stream.csv --ekf data/streams/ekf_stream.csv --rate 50 \\
+      --out data/streams/aligned.csv
+  python stream_align.py --bench 2000000
+"""
+
+import time
+import argparse
+
+import numpy as np
+
+from utils import wrap_pi
+from csv_io import read_header, load_columns, iter_csv_chunks
+
+SEQ_BITS = 16
+ANGLE_COLS = ("roll", "pitch", "yaw")
+HOLD_COLS = ("seq",)
+DIRECTIONS = ("backward", "forward", "nearest")
+
+
+# ---------------- seq: sarma, tekrar, boşluk ----------------
+
+def unwrap_seq(seq, bits=SEQ_BITS, prev=None):
+    """
+    bits genişliğinde sarmalı sayacı monoton int64'e açar.
+    prev: önceki parçanın son açılmış değeri (parçalar arası süreklilik için).
+    Yarım aralıktan büyük adımlar geri gitme olarak yorumlanır.
+    """
+    mod = 1 << bits
+    half = mod >> 1
+    s = np.asarray(seq).astype(np.int64) & (mod - 1)
+    if not len(s):
+        return s
+    first = int(s[0]) if prev is None else int(prev)
+    d = np.diff(s, prepend=first & (mod - 1))
+    d = (d + half) % mod - half
+    return first + np.cumsum(d)
+
+
+class SeqTracker:
+    """Bir akışın seq sayacını parçalar boyunca izler; tekrar/geri/boşluk istatistiği tutar."""
+    def __init__(self, name="", bits=SEQ_BITS):
+        self.name = name
+        self.bits = bits
+        self.prev = None            # son açılmış seq
+        self.top = None             # şimdiye kadarki en büyük açılmış seq
+        self.n_in = 0
+        self.n_keep = 0
+        self.duplicates = 0
+        self.backwards = 0
+        self.gap_events = 0
+        self.missing = 0
+        self.t_unsorted = 0
+
+    def update(self, seq):
+        """Parçanın seq dizisi -> tutulacak satırlar için bool maske."""
+        u = unwrap_seq(seq, self.bits, self.prev)
+        n = len(u)
+        self.n_in += n
+        if not n:
+            return np.zeros(0, dtype=bool)
+        self.prev = int(u[-1])
+
+        ref = np.empty(n, dtype=np.int64)
+        ref[0] = self.top if self.top is not None else u[0] - 1
+        if n > 1:
+            np.maximum.accumulate(u[:-1], out=ref[1:])
+            np.maximum(ref[1:], ref[0], out=ref[1:])
+        keep = u > ref
+        self.duplicates += int(np.count_nonzero(u == ref))
+        self.backwards += int(np.count_nonzero(u < ref))
+
+        kept = u[keep]
+        if len(kept):
+            start = self.top if self.top is not None else kept[0] - 1
+            step = np.diff(kept, prepend=start)
+            gaps = step[step > 1]
+            self.gap_events += len(gaps)
+            self.missing += int(np.sum(gaps - 1))
+            self.top = int(kept[-1])
+        self.n_keep += len(kept)
+        return keep
+
+    def report(self):
+        return {
+            "stream": self.name, "rows": self.n_in, "kept": self.n_keep,
+            "duplicates": self.duplicates, "backwards": self.backwards,
+            "gap_events": self.gap_events, "missing": self.missing,
+            "t_unsorted": self.t_unsorted,
+        }
+
+    def summary_line(self):
+        return report_line(self.report())
+
+
+def report_line(r):
+    expected = r["kept"] + r["missing"]
+    loss = 100.0 * r["missing"] / expected if expected else 0.0
+    return (f"{r['stream']:>4}: satır={r['rows']}  tutulan={r['kept']}  tekrar={r['duplicates']}  "
+            f"geri={r['backwards']}  boşluk={r['gap_events']} (kayıp seq={r['missing']}, {loss:.2f}%)")
+
+
+def clean_stream(cols, tracker, on="t"):
+    """seq tekrarlarını/geri gidenleri atar; t sırası bozuksa kararlı sıralar."""
+    if "seq" in cols:
+        keep = tracker.update(cols["seq"])
+        if not keep.all():
+            cols = {k: v[keep] for k, v in cols.items()}
+    else:
+        tracker.n_in += len(cols[on])
+        tracker.n_keep += len(cols[on])
+    t = cols[on]
+    if len(t) > 1 and np.any(t[1:] < t[:-1]):
+        tracker.t_unsorted += int(np.count_nonzero(t[1:] < t[:-1]))
+        order = np.argsort(t, kind="stable")
+        cols = {k: v[order] for k, v in cols.items()}
+    return cols
+
+
+# ---------------- as-of birleştirme ----------------
+
+def asof_index(t_left, t_right, tolerance=None, direction="backward"):
+    """
+    t_left'in her elemanı için t_right'taki eşleşen örneğin indeksi (yoksa -1).
+    t_right artan sırada olmalı.
+      backward: t_right <= t,  forward: t_right >= t,  nearest: en yakın (eşitlikte geri)
+    """
+    if direction not in DIRECTIONS:
+        raise ValueError(f"Bilinmeyen yön: {direction} (seçenekler: {', '.join(DIRECTIONS)})")
+    t_left = np.asarray(t_left, dtype=float)
+    t_right = np.asarray(t_right, dtype=float)
+    n = len(t_right)
+    if n == 0:
+        return np.full(len(t_left), -1, dtype=np.int64)
+
+    # Tek ikili arama; yönler bu indeksten türetilir
+    if direction == "backward":
+        idx = np.searchsorted(t_right, t_left, side="right") - 1
+    else:
+        fwd = np.searchsorted(t_right, t_left, side="left")
+        if direction == "forward":
+            idx = fwd
+            idx[fwd >= n] = -1
+        else:
+            fc = np.minimum(fwd, n - 1)
+            bc = np.maximum(fwd - 1, 0)
+            df = np.where(fwd < n, t_right[fc] - t_left, np.inf)
+            db = np.where(fwd > 0, t_left - t_right[bc], np.inf)
+            idx = np.where(df < db, fc, np.where(fwd > 0, bc, -1))
+    idx = idx.astype(np.int64, copy=False)
+
+    if tolerance is not None:
+        dist = np.abs(t_left - t_right[np.maximum(idx, 0)])
+        idx[(idx >= 0) & (dist > tolerance)] = -1
+    return idx
+
+
+def take_or_nan(cols, idx):
+    """Her kolon için col[idx]; idx < 0 olan yerler NaN. İndeks bir kez hazırlanır."""
+    miss = idx < 0
+    j = np.where(miss, 0, idx)
+    out = {}
+    for k, v in cols.items():
+        v = np.asarray(v, dtype=float)
+        if not len(v):
+            out[k] = np.full(len(idx), np.nan)
+            continue
+        col = v[j]
+        col[miss] = np.nan
+        out[k] = col
+    return out
+
+
+def merge_asof(left, right, on="t", tolerance=None, direction="backward", prefix="ekf_"):
+    """
+    left'in her satırına right'ın as-of eşleşmesini ekler.
+    Sağ kolonlar prefix ile adlandırılır; eşleşmeyenler NaN. prefix+'age' = t_left - t_right.
+    """
+    idx = asof_index(left[on], right[on], tolerance, direction)
+    out = dict(left)
+    for k, v in take_or_nan(right, idx).items():
+        out[prefix + k] = v
+    out[prefix + "age"] = left[on] - out[prefix + on]
+    return out
+
+
+# ---------------- yeniden örnekleme ----------------
+
+def make_grid(t0, t1, rate_hz):
+    """[t0, t1] aralığındaki mutlak ızgara noktaları k / rate_hz (parçalar arası hizalı)."""
+    if not np.isfinite(t0) or not np.isfinite(t1) or t1 < t0:
+        return np.empty(0)
+    k0 = int(np.ceil(t0 * rate_hz - 1e-9))
+    k1 = int(np.floor(t1 * rate_hz + 1e-9))
+    return np.arange(k0, k1 + 1, dtype=np.int64) / float(rate_hz)
+
+
+def resample(cols, t_new, on="t", method="linear", max_gap=None, angles=ANGLE_COLS, hold=HOLD_COLS):
+    """
+    cols'u t_new zamanlarına örnekler. Kapsam dışı ve max_gap'ten uzun boşluklara düşen
+    noktalar NaN. angles: açısal kolonlar (kısa yoldan, sarma güvenli), hold: sıfırıncı
+    derece tutulanlar. Komşu indeksleri ve ağırlıklar bir kez hesaplanıp tüm kolonlara uygulanır.
+    """
+    if method not in ("linear", "nearest"):
+        raise ValueError(f"Bilinmeyen yöntem: {method} (linear | nearest)")
+    t = np.asarray(cols[on], dtype=float)
+    t_new = np.asarray(t_new, dtype=float)
+    out = {on: t_new}
+    n = len(t)
+    if n == 0:
+        for k in cols:
+            if k != on:
+                out[k] = np.full(len(t_new), np.nan)
+        return out
+
+    back = np.searchsorted(t, t_new, side="right") - 1
+    valid = (back >= 0) & (t_new <= t[-1])
+    i0 = np.clip(back, 0, max(n - 2, 0))
+    i1 = np.minimum(i0 + 1, n - 1)
+    span = t[i1] - t[i0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        w = np.where(span > 0, (t_new - t[i0]) / span, 0.0)
+    if max_gap is not None:
+        valid &= (span <= max_gap) | (w == 0.0) | (w == 1.0)
+    if method == "nearest":
+        pick = np.where(w > 0.5, i1, i0)
+    hold_idx = np.maximum(back, 0)
+
+    for k, v in cols.items():
+        if k == on:
+            continue
+        v = np.asarray(v, dtype=float)
+        if k in hold:
+            y = v[hold_idx]
+        elif method == "nearest":
+            y = v[pick]
+        else:
+            v0 = v[i0]
+            y = v[i1]
+            y -= v0
+            if k in angles:
+                _wrap_inplace(y)          # kısa yoldan: +pi/-pi sınırında ters yöne dolanmaz
+            y *= w
+            y += v0
+            if k in angles:
+                _wrap_inplace(y)
+        y[~valid] = np.nan
+        out[k] = y
+    return out
+
+
+def _wrap_inplace(a):
+    """wrap_pi'nin yerinde hali; yalnızca [-pi, pi) dışındaki elemanlara dokunur."""
+    bad = (a < -np.pi) | (a >= np.pi)
+    if bad.any():
+        a[bad] = wrap_pi(a[bad])
+    return a
+
+
+def _prefixed(cols, prefix, on="t"):
+    return {(k if k == on else prefix + k): v for k, v in cols.items()}
+
+
+def align(imu, ekf, rate_hz=None, tolerance=None, direction="backward", method="linear",
+          max_gap=None, on="t"):
+    """
+    Bellekteki iki akışı hizalar.
+      rate_hz=None : IMU zamanlarına EKF as-of birleştirme (merge_asof)
+      rate_hz=R    : iki akış ortak R Hz ızgaraya yeniden örneklenir (örtüşen aralık)
+    Dönüş: (kolon sözlüğü, {"imu": rapor, "ekf": rapor})
+    """
+    ti, te = SeqTracker("imu"), SeqTracker("ekf")
+    imu = clean_stream(imu, ti, on)
+    ekf = clean_stream(ekf, te, on)
+    if rate_hz is None:
+        out = merge_asof(imu, ekf, on, tolerance, direction, prefix="ekf_")
+    else:
+        t0 = max(imu[on][0], ekf[on][0]) if len(imu[on]) and len(ekf[on]) else np.nan
+        t1 = min(imu[on][-1], ekf[on][-1]) if len(imu[on]) and len(ekf[on]) else np.nan
+        grid = make_grid(t0, t1, rate_hz)
+        out = {on: grid}
+        out.update(_prefixed(resample(imu, grid, on, method, max_gap), "imu_", on))
+        out.update(_prefixed(resample(ekf, grid, on, method, max_gap), "ekf_", on))
+    return out, {"imu": ti.report(), "ekf": te.report()}
+
+
+# ---------------- parçalı (bellekten büyük dosyalar) ----------------
+
+class _ChunkedStream:
+    """Dosyayı parça parça çeken, temizleyen ve yalnızca hizalama penceresini tutan tampon."""
+    def __init__(self, path, name, chunk_rows, on="t"):
+        self.on = on
+        self.tracker = SeqTracker(name)
+        self.columns = read_header(path)
+        self._it = iter_csv_chunks(path, chunk_rows)
+        self._last = -np.inf        # şimdiye kadar verilen en büyük t
+        self.buf = self.empty()
+        self.eof = False
+
+    def empty(self):
+        return {k: np.empty(0) for k in self.columns}
+
+    def next_chunk(self):
+        """Sıradaki temizlenmiş parça; dosya bitince None."""
+        for chunk in self._it:
+            chunk = clean_stream(chunk, self.tracker, self.on)
+            # Parça sınırında t geri gidiyorsa (nadiren) önceki parçadan küçükleri at
+            ok = chunk[self.on] >= self._last
+            if not ok.all():
+                self.tracker.t_unsorted += int(np.count_nonzero(~ok))
+                chunk = {k: v[ok] for k, v in chunk.items()}
+            if len(chunk[self.on]):
+                self._last = chunk[self.on][-1]
+                return chunk
+        self.eof = True
+        return None
+
+    def first_t(self):
+        if not len(self.buf[self.on]):
+            self.fill_until(-np.inf)
+        return self.buf[self.on][0] if len(self.buf[self.on]) else np.nan
+
+    def last_t(self):
+        return self.buf[self.on][-1] if len(self.buf[self.on]) else -np.inf
+
+    def fill_until(self, t):
+        """Tampon t'yi geçen bir örnek içerene kadar (ya da dosya bitene kadar) okur."""
+        while not self.eof and self.last_t() <= t:
+            chunk = self.next_chunk()
+            if chunk is not None:
+                self.buf = {k: np.concatenate([self.buf[k], chunk[k]]) for k in self.buf}
+
+    def trim_before(self, t):
+        """t'den önceki son örnek hariç eskileri atar (interp/as-of için bir örnek geride kalır)."""
+        i = int(np.searchsorted(self.buf[self.on], t, side="right")) - 1
+        if i > 0:
+            self.buf = {k: v[i:] for k, v in self.buf.items()}
+
+
+def _write_chunk(f, cols, header_done):
+    names = list(cols.keys())
+    if not header_done:
+        f.write(",".join(names) + "\n")
+    if len(cols[names[0]]):
+        np.savetxt(f, np.column_stack([cols[n] for n in names]), fmt="%.6f", delimiter=",")
+    return True
+
+
+def align_files(imu_path, ekf_path, out_path, rate_hz=None, tolerance=None, direction="backward",
+                method="linear", max_gap=None, chunk_rows=1 << 18, on="t"):
+    """
+    Dosyaları parça parça hizalayıp out_path'e yazar; bellek kullanımı chunk_rows ile sınırlı.
+    Dönüş: {"rows_out", "imu", "ekf", "elapsed_s"}
+    """
+    t_start = time.perf_counter()
+    imu = _ChunkedStream(imu_path, "imu", chunk_rows, on)
+    ekf = _ChunkedStream(ekf_path, "ekf", chunk_rows, on)
+    rows_out = 0
+    header_done = False
+
+    with open(out_path, "w") as f:
+        if rate_hz is None:
+            # Sol akış (IMU) parça parça; sağ akıştan yalnızca gereken pencere tutulur
+            tol = tolerance if tolerance is not None else 0.0
+            while True:
+                left = imu.next_chunk()
+                if left is None:
+                    break
+                t_hi = left[on][-1]
+                ekf.fill_until(t_hi + (tol if direction != "backward" else 0.0))
+                out = merge_asof(left, ekf.buf, on, tolerance, direction, prefix="ekf_")
+                header_done = _write_chunk(f, out, header_done)
+                rows_out += len(left[on])
+                ekf.trim_before(t_hi - tol)
+        else:
+            t0 = max(imu.first_t(), ekf.first_t())
+            if np.isfinite(t0):
+                k = int(np.ceil(t0 * rate_hz - 1e-9))
+                while True:
+                    t_lo = k / float(rate_hz)
+                    t_hi = (k + chunk_rows - 1) / float(rate_hz)
+                    imu.fill_until(t_hi)
+                    ekf.fill_until(t_hi)
+                    t_end = min(t_hi, imu.last_t(), ekf.last_t())
+                    grid = make_grid(t_lo, t_end, rate_hz)
+                    if not len(grid):
+                        break
+                    out = {on: grid}
+                    out.update(_prefixed(resample(imu.buf, grid, on, method, max_gap), "imu_", on))
+                    out.update(_prefixed(resample(ekf.buf, grid, on, method, max_gap), "ekf_", on))
+                    header_done = _write_chunk(f, out, header_done)
+                    rows_out += len(grid)
+                    k += len(grid)
+                    imu.trim_before(grid[-1])
+                    ekf.trim_before(grid[-1])
+                    if t_end < t_hi:
+                        break
+
+    return {"rows_out": rows_out, "imu": imu.tracker.report(), "ekf": ekf.tracker.report(),
+            "elapsed_s": time.perf_counter() - t_start}
+
+
+# ---------------- ölçüm ----------------
+
+def _synthetic(n, rate_hz, jitter, drop, dup, seed, cols):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / rate_hz + rng.uniform(0.0, jitter, n)
+    seq = (np.arange(1, n + 1) & 0xFFFF).astype(float)
+    keep = rng.random(n) >= drop
+    t, seq = t[keep], seq[keep]
+    d = np.flatnonzero(rng.random(len(t)) < dup)
+    t = np.insert(t, d + 1, t[d])
+    seq = np.insert(seq, d + 1, seq[d])
+    out = {"t": t, "seq": seq}
+    for c in cols:
+        out[c] = wrap_pi(np.cumsum(rng.normal(0.0, 0.01, len(t)))) if c in ANGLE_COLS else rng.normal(size=len(t))
+    return out
+
+
+def bench(n, rate_hz=100.0):
+    imu = _synthetic(n, rate_hz, 0.004, 0.01, 0.002, 1, ("yaw", "p", "q", "r", "ax", "ay", "az"))
+    ekf = _synthetic(n, rate_hz * 0.97, 0.006, 0.02, 0.002, 2, ("x", "y", "vx", "vy", "roll", "pitch", "yaw"))
+    lines = [f"Sentetik akış: imu={len(imu['t'])}  ekf={len(ekf['t'])} satır"]
+    for label, kw in (("merge_asof (backward, tol=50 ms)", dict(tolerance=0.05)),
+                      ("merge_asof (nearest)", dict(direction="nearest")),
+                      (f"resample linear @ {rate_hz:.0f} Hz", dict(rate_hz=rate_hz, max_gap=0.1)),
+                      (f"resample nearest @ {rate_hz:.0f} Hz", dict(rate_hz=rate_hz, method="nearest"))):
+        t0 = time.perf_counter()
+        out, rep = align(imu, ekf, **kw)
+        ms = (time.perf_counter() - t0) * 1e3
+        lines.append(f"{label:<34}: {ms:8.1f} ms  -> {len(out['t'])} satır")
+    tr = SeqTracker("imu")
+    clean_stream(dict(imu), tr)
+    lines.append(tr.summary_line())
+    return "\n".join(lines)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="IMU/EKF akışlarını ortak zaman eksenine hizala")
+    ap.add_argument("--imu", default="data/streams/imu_stream.csv")
+    ap.add_argument("--ekf", default="data/streams/ekf_stream.csv")
+    ap.add_argument("--out", default="data/streams/aligned.csv")
+    ap.add_argument("--rate", type=float, default=None, help="Hedef ızgara [Hz]; verilmezse IMU zamanlarına as-of")
+    ap.add_argument("--method", choices=("linear", "nearest"), default="linear")
+    ap.add_argument("--direction", choices=DIRECTIONS, default="backward")
+    ap.add_argument("--tol", type=float, default=None, help="As-of tolerans [s]")
+    ap.add_argument("--max-gap", type=float, default=None, help="Bundan uzun veri boşluğunda NaN [s]")
+    ap.add_argument("--chunk", type=int, default=0, help="Parçalı mod satır sayısı (0: tümü bellekte)")
+    ap.add_argument("--bench", type=int, default=0, help="N satırlık sentetik akışla süre ölç")
+    args = ap.parse_args()
+
+    if args.bench:
+        print(bench(args.bench))
+        return
+
+    t0 = time.perf_counter()
+    if args.chunk > 0:
+        res = align_files(args.imu, args.ekf, args.out, args.rate, args.tol, args.direction,
+                          args.method, args.max_gap, chunk_rows=args.chunk)
+        rows, rep = res["rows_out"], {"imu": res["imu"], "ekf": res["ekf"]}
+    else:
+        out, rep = align(load_columns(args.imu), load_columns(args.ekf), args.rate, args.tol,
+                         args.direction, args.method, args.max_gap)
+        with open(args.out, "w") as f:
+            _write_chunk(f, out, False)
+        rows = len(out["t"])
+    for name in ("imu", "ekf"):
+        print(report_line(rep[name]))
+    print(f"✅ {rows} satır -> {args.out}  ({(time.perf_counter() - t0) * 1e3:.0f} ms)")
+
+
+if __name__ == "__main__":
+    main()
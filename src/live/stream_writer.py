@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+"""
+stream_writer.py — Live1553Bridge için blok halinde, ayrı thread'de yazan akış yazıcı (CSV / ikili sütunsal)
+
+Bus sahibi thread yalnızca ham 14 kelimelik kareyi ve zamanı önceden ayrılmış bir bloğa kopyalar
+(push); çözme, biçimlendirme ve disk G/Ç yazıcı thread'inde yapılır:
+  - blok dolunca (block satır) ya da flush_s geçince kısmi blok yazıcıya devredilir
+  - kareler toplu çözülür (sensor1553.unpack_*_batch), blok tek seferde yazılır ve flush edilir
+    (okuyucular veriyi stop()'u beklemeden görür); fsync_s'de bir os.fsync (kalıcı)
+  - döndürme: etkin segment rotate_bytes'ı ya da rotate_s'yi aşınca kapatılır, <ad>.<NNNNNN>.<uzantı>
+    olarak yeniden adlandırılır ve aynı adla yenisi açılır (tail_follow inode değişiminden anlar)
+Bloklar akış başına havuzdan gelir (pool_blocks); yazıcı geride kalıp havuz boşalırsa bus thread'i
+beklemez, örnek düşürülür ve 'dropped' sayılır. Başlık/checksum hatalı kareler yazılmaz ('invalid').
+
+Biçimler:
+  csv : köprünün eski satır satır CSV'leriyle aynı kolonlar ve hassasiyet (imu_stream.csv / ekf_stream.csv)
+  col : ikili sütunsal: <ad>.col/ dizini, kolon başına ham little-endian dosya (t.f8, seq.i8, yaw.f8, ...);
+        read_columnar() ile okunur (np.fromfile)
+
+Kullanım:
+    w = StreamWriter("data/streams", fmt="csv", rotate_bytes=64 << 20).start()
+    w.push("imu", t, words)          # bus sahibi thread, words: 14 kelimelik kare
+    ...
+    w.stop(); print(w.summary())
+"""
+
+import os
+import time
+import threading
+
+import numpy as np
+
+from profiling import Histogram
+from sensor1553 import FRAME_WORDS, unpack_imu_batch, unpack_ekf_batch
+
+FORMATS = ("csv", "col")
+_CSV_CHUNK = 64     # satır; tek biçimleme adımında GIL'in tutulduğu süreyi sınırlar (~0.15 ms)
+
+
+class StreamSpec:
+    """Akış tanımı: dosya adı kökü, toplu çözücü, yazılacak kolonlar ve CSV biçimleri."""
+    def __init__(self, name, stem, decode_batch, columns, fmts):
+        self.name = name
+        self.stem = stem
+        self.decode_batch = decode_batch
+        self.columns = tuple(columns)       # "t" ve "seq" dahil
+        self.fmts = tuple(fmts)
+
+
+IMU_STREAM = StreamSpec("imu", "imu_stream", unpack_imu_batch,
+                        ("t", "seq", "yaw", "p", "q", "r", "ax", "ay", "az", "temp_c"),
+                        ("%.3f", "%d") + ("%.6f",) * 7 + ("%.2f",))
+EKF_STREAM = StreamSpec("ekf", "ekf_stream", unpack_ekf_batch,
+                        ("t", "seq", "x", "y", "z", "vx", "vy", "vz", "roll", "pitch", "yaw"),
+                        ("%.3f", "%d") + ("%.6f",) * 9)
+
+
+class _Block:
+    __slots__ = ("t", "w", "n")
+
+    def __init__(self, rows):
+        self.t = np.empty(rows, dtype=np.float64)
+        self.w = np.empty((rows, FRAME_WORDS), dtype=np.uint16)
+        self.n = 0
+
+
+class _Stream:
+    def __init__(self, spec, block, pool_blocks):
+        self.spec = spec
+        self.free = [_Block(block) for _ in range(pool_blocks)]
+        self.cur = None
+        self.seg = None
+        self.segments = 0       # döndürülüp kapatılan segment sayısı
+        self.index = 0          # son kullanılan segment numarası
+        self.rows = 0
+        self.dropped = 0
+        self.invalid = 0
+
+
+class _CsvSegment:
+    def __init__(self, path, spec):
+        self.path = path
+        self.fp = open(path, "w", newline="")
+        self.fp.write(",".join(spec.columns) + "\n")
+        self.bytes = self.fp.tell()
+        self.t_open = time.monotonic()
+
+    def write(self, spec, t, cols):
+        data = np.column_stack([t] + [cols[k] for k in spec.columns[1:]])
+        row = ",".join(spec.fmts) + "\n"
+        for i in range(0, len(data), _CSV_CHUNK):
+            part = data[i:i + _CSV_CHUNK]
+            s = (row * len(part)) % tuple(part.ravel().tolist())   # parça tek % işlemiyle biçimlenir
+            self.fp.write(s)
+            self.bytes += len(s)
+            time.sleep(0)   # GIL'i bırak: bus sahibi thread switch interval (5 ms) beklemesin
+        self.fp.flush()
+
+    def fsync(self):
+        os.fsync(self.fp.fileno())
+
+    def close(self):
+        self.fp.close()
+
+
+class _ColSegment:
+    def __init__(self, path, spec):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.fps = {}
+        for k in spec.columns:
+            ext = "i8" if k == "seq" else "f8"
+            self.fps[k] = open(os.path.join(path, f"{k}.{ext}"), "wb")
+        self.bytes = 0
+        self.t_open = time.monotonic()
+
+    def write(self, spec, t, cols):
+        for k, fp in self.fps.items():
+            a = t if k == "t" else cols[k]
+            a = np.ascontiguousarray(a, dtype="<i8" if k == "seq" else "<f8")
+            fp.write(a.tobytes())
+            fp.flush()
+            self.bytes += a.nbytes
+
+    def fsync(self):
+        for fp in self.fps.values():
+            os.fsync(fp.fileno())
+
+    def close(self):
+        for fp in self.fps.values():
+            fp.close()
+
+
+def read_columnar(path):
+    """<ad>.col dizini -> {kolon: dizi}; kolonların ortak uzunluğuna kırpılır (yarım yazılmış blok)."""
+    out = {}
+    for fn in sorted(os.listdir(path)):
+        k, ext = os.path.splitext(fn)
+        if ext in (".f8", ".i8"):
+            out[k] = np.fromfile(os.path.join(path, fn), dtype="<" + ext[1:])
+    n = min((len(v) for v in out.values()), default=0)
+    return {k: v[:n] for k, v in out.items()}
+
+
+class StreamWriter:
+    """
+    Akış başına önceden ayrılmış blok havuzu + tek yazıcı thread'i. push() bus sahibi thread'den
+    çağrılır ve G/Ç yapmaz; stop() kalan blokları yazar ve dosyaları kapatır.
+    """
+    def __init__(self, outdir, streams=(IMU_STREAM, EKF_STREAM), fmt="csv", block=256, pool_blocks=8,
+                 flush_s=1.0, fsync_s=5.0, rotate_bytes=None, rotate_s=None):
+        if fmt not in FORMATS:
+            raise ValueError(f"Bilinmeyen biçim: {fmt} (seçenekler: {', '.join(FORMATS)})")
+        self.outdir = outdir
+        self.fmt = fmt
+        self.block = int(block)
+        self.flush_s = float(flush_s)
+        self.fsync_s = float(fsync_s) if fsync_s else 0.0
+        self.rotate_bytes = int(rotate_bytes) if rotate_bytes else 0
+        self.rotate_s = float(rotate_s) if rotate_s else 0.0
+        self._streams = {s.name: _Stream(s, self.block, max(2, int(pool_blocks))) for s in streams}
+
+        self.blocks = 0
+        self.fsyncs = 0
+        self.errors = 0
+        self.write_ns = Histogram()      # blok başına çözme + biçimlendirme + yazma
+
+        self._ready = []
+        self._cv = threading.Condition()
+        self._stop = False
+        self._thread = None
+
+    # ---- yaşam döngüsü ----
+    def start(self):
+        os.makedirs(self.outdir, exist_ok=True)
+        for s in self._streams.values():
+            s.seg = self._open(s)
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="stream-writer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=5.0):
+        with self._cv:
+            self._stop = True
+            self._cv.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+        for s in self._streams.values():
+            if s.seg is not None:
+                s.seg.fsync()
+                s.seg.close()
+                s.seg = None
+
+    # ---- bus sahibi thread ----
+    def push(self, name, t, words):
+        """Kareyi (14 kelime) zamanıyla bloğa kopyalar; havuz boşsa False (örnek düşürüldü)."""
+        s = self._streams[name]
+        with self._cv:
+            b = s.cur
+            if b is None:
+                if not s.free:
+                    s.dropped += 1
+                    return False
+                b = s.cur = s.free.pop()
+            i = b.n
+            b.t[i] = t
+            b.w[i] = words
+            b.n = i + 1
+            if b.n == len(b.t):
+                self._ready.append((s, b))
+                s.cur = None
+                self._cv.notify()
+        return True
+
+    # ---- yazıcı thread'i ----
+    def _run(self):
+        now = time.monotonic()
+        next_flush = now + self.flush_s
+        next_fsync = now + self.fsync_s if self.fsync_s else None
+        while True:
+            with self._cv:
+                if not self._ready and not self._stop:
+                    self._cv.wait(max(0.0, next_flush - time.monotonic()))
+                ready, self._ready = self._ready, []
+                stopping = self._stop
+                now = time.monotonic()
+                if stopping or now >= next_flush:
+                    for s in self._streams.values():
+                        if s.cur is not None and s.cur.n:
+                            ready.append((s, s.cur))
+                            s.cur = None
+                    next_flush = now + self.flush_s
+            for s, b in ready:
+                try:
+                    self._write(s, b)
+                except Exception:
+                    self.errors += 1
+            if ready:
+                with self._cv:
+                    for s, b in ready:
+                        b.n = 0
+                        s.free.append(b)
+            if next_fsync is not None and time.monotonic() >= next_fsync:
+                for s in self._streams.values():
+                    s.seg.fsync()
+                self.fsyncs += 1
+                next_fsync = time.monotonic() + self.fsync_s
+            if stopping:
+                return
+
+    def _write(self, s, b):
+        t0 = time.perf_counter_ns()
+        n = b.n
+        cols, valid = s.spec.decode_batch(b.w[:n])
+        t = b.t[:n]
+        if not valid.all():
+            s.invalid += int(n - valid.sum())
+            t = t[valid]
+            cols = {k: v[valid] for k, v in cols.items()}
+        if self._due_rotation(s):
+            self._rotate(s)
+        s.seg.write(s.spec, t, cols)
+        s.rows += len(t)
+        self.blocks += 1
+        self.write_ns.record(time.perf_counter_ns() - t0)
+
+    # ---- segmentler ----
+    def _path(self, s, index=None):
+        ext = ".csv" if self.fmt == "csv" else ".col"
+        mid = "" if index is None else f".{index:06d}"
+        return os.path.join(self.outdir, s.spec.stem + mid + ext)
+
+    def _open(self, s):
+        path = self._path(s)
+        if self.fmt == "csv":
+            return _CsvSegment(path, s.spec)
+        if os.path.isdir(path):
+            for fn in os.listdir(path):
+                os.remove(os.path.join(path, fn))
+        return _ColSegment(path, s.spec)
+
+    def _due_rotation(self, s):
+        seg = s.seg
+        return ((self.rotate_bytes and seg.bytes >= self.rotate_bytes)
+                or (self.rotate_s and time.monotonic() - seg.t_open >= self.rotate_s))
+
+    def _rotate(self, s):
+        seg = s.seg
+        seg.fsync()
+        seg.close()
+        k = s.index + 1
+        while os.path.exists(self._path(s, k)):
+            k += 1
+        s.index = k
+        s.segments += 1
+        os.replace(seg.path, self._path(s, k))
+        s.seg = self._open(s)
+
+    # ---- raporlama ----
+    def dropped(self):
+        return sum(s.dropped for s in self._streams.values())
+
+    def hud_line(self):
+        w = self.write_ns.stats_us()
+        return (f"WR {self.fmt} blok p99 {w['p99_us'] / 1e3:.1f} ms  ✗{self.dropped()}  "
+                f"seg {sum(s.segments for s in self._streams.values())}")
+
+    def summary(self):
+        w = self.write_ns.stats_us()
+        lines = [
+            f"Akış yazıcı ({self.fmt}, blok {self.block} satır)",
+            "==========================",
+            f"Blok: {self.blocks}  yazma[ms] ort/p99/max {w['mean_us'] / 1e3:.2f}/{w['p99_us'] / 1e3:.2f}/"
+            f"{w['max_us'] / 1e3:.2f}  |  fsync: {self.fsyncs}  |  flush: {self.flush_s:g} s  |  hata: {self.errors}",
+        ]
+        for s in self._streams.values():
+            lines.append(f"  {s.spec.name:<4} satır {s.rows:8d}  düşürülen {s.dropped:6d}  geçersiz {s.invalid:5d}  "
+                         f"döndürülen segment {s.segments}")
+        return "\n".join(lines)
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+tail_follow.py — Büyüyen CSV akışlarını (Live1553Bridge: imu_stream.csv / ekf_stream.csv) takip eden artımlı okuyucu
+
+- Bayt ofsetini hatırlar; her poll() yalnızca yeni eklenen TAM satırları ayrıştırır.
+- Yarım kalmış son satır bir sonraki poll'a kadar tamponda bekler.
+- Dosya kısalırsa (truncate) ya da yeniden oluşturulursa (inode değişimi; köprü yeniden
+  başlatıldığında 'w' ile açar) baştan okunur, başlık tekrar alınır ve generation artar.
+  Aynı inode üzerinde kesilip eski ofseti aşacak kadar yeniden yazılmışsa da, ofsetten
+  önceki son baytların (çapa) değişmesinden anlaşılır.
+- Dönüş: {kolon: float64 dizisi} parçaları; iş yükü yalnızca yeni veriyle orantılıdır.
+
+Kullanım:
+    f = CsvFollower("data/streams/imu_stream.csv")
+    for chunk in f.follow(interval=0.2):
+        ...  # chunk["t"], chunk["yaw"], ...
+"""
+
+import io
+import os
+import time
+import argparse
+
+import numpy as np
+
+
+class CsvFollower:
+    def __init__(self, path, columns=None, max_read=16 << 20):
+        self.path = path
+        self.columns = list(columns) if columns is not None else None
+        self.max_read = int(max_read)   # tek poll'da okunacak en fazla bayt
+
+        self.header = None
+        self.offset = 0
+        self.generation = 0             # her yeniden başlatmada artar
+        self.rows = 0                   # bu generation'da okunan satır
+        self.skipped = 0                # ayrıştırılamayan satır
+        self._partial = b""
+        self._ident = None
+        self._anchor = b""              # ofsetten önceki son ANCHOR bayt
+
+    ANCHOR = 32
+
+    def _restart(self):
+        self.header = None
+        self.offset = 0
+        self.rows = 0
+        self._partial = b""
+        self._anchor = b""
+        self.generation += 1
+
+    def poll(self):
+        """Yeni tam satırları döndürür; yoksa None."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+
+        ident = (st.st_dev, st.st_ino)
+        if self._ident is not None and (ident != self._ident or st.st_size < self.offset):
+            self._restart()
+        self._ident = ident
+
+        if st.st_size <= self.offset:
+            return None
+        with open(self.path, "rb") as f:
+            if self._anchor:
+                f.seek(self.offset - len(self._anchor))
+                if f.read(len(self._anchor)) != self._anchor:
+                    self._restart()
+                    f.seek(0)
+            data = f.read(min(st.st_size - self.offset, self.max_read))
+        self.offset += len(data)
+        self._anchor = (self._anchor + data)[-self.ANCHOR:]
+
+        buf = self._partial + data
+        cut = buf.rfind(b"\n")
+        if cut < 0:
+            self._partial = buf
+            return None
+        complete, self._partial = buf[:cut + 1], buf[cut + 1:]
+
+        if self.header is None:
+            nl = complete.find(b"\n")
+            self.header = [h.strip() for h in complete[:nl].decode("utf-8").strip().split(",")]
+            complete = complete[nl + 1:]
+            if self.columns is not None:
+                missing = [c for c in self.columns if c not in self.header]
+                if missing:
+                    raise ValueError(f"CSV kolon eksik: {', '.join(missing)}")
+        if not complete.strip():
+            return None
+        return self._parse(complete)
+
+    def _parse(self, blob):
+        ncol = len(self.header)
+        text = blob.decode("utf-8", "replace")
+        try:
+            arr = np.loadtxt(io.StringIO(text), delimiter=",", ndmin=2, dtype=float)
+            if arr.shape[1] != ncol:
+                raise ValueError("kolon sayısı")
+        except ValueError:
+            # Bozuk satır(lar): satır satır süz
+            good = []
+            for line in text.splitlines():
+                parts = line.split(",")
+                if len(parts) != ncol:
+                    self.skipped += 1
+                    continue
+                try:
+                    good.append([float(p) for p in parts])
+                except ValueError:
+                    self.skipped += 1
+            if not good:
+                return None
+            arr = np.array(good, dtype=float)
+        self.rows += len(arr)
+        names = self.columns if self.columns is not None else self.header
+        return {n: np.ascontiguousarray(arr[:, self.header.index(n)]) for n in names}
+
+    def follow(self, interval=0.2, stop_event=None, idle_timeout=None):
+        """
+        Yeni veri geldikçe parçaları üretir. stop_event (threading.Event) set edilince ya da
+        idle_timeout saniye boyunca veri gelmezse durur.
+        """
+        last_data = time.monotonic()
+        while stop_event is None or not stop_event.is_set():
+            chunk = self.poll()
+            if chunk is not None:
+                last_data = time.monotonic()
+                yield chunk
+                continue   # birikmiş veri varsa beklemeden devam
+            if idle_timeout is not None and time.monotonic() - last_data > idle_timeout:
+                return
+            time.sleep(interval)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Büyüyen stream CSV'sini takip et")
+    ap.add_argument("path", nargs="?", default=os.path.join("data", "streams", "imu_stream.csv"))
+    ap.add_argument("--interval", type=float, default=0.2)
+    ap.add_argument("--idle", type=float, default=None, help="Bu kadar saniye veri gelmezse çık")
+    args = ap.parse_args()
+
+    f = CsvFollower(args.path)
+    gen = f.generation
+    try:
+        for chunk in f.follow(interval=args.interval, idle_timeout=args.idle):
+            if f.generation != gen:
+                print(f"↺ Dosya yeniden başladı (generation={f.generation})")
+                gen = f.generation
+            n = len(next(iter(chunk.values())))
+            t = chunk.get("t")
+            span = f"t={t[0]:.3f}..{t[-1]:.3f}" if t is not None else ""
+            print(f"+{n:5d} satır  toplam={f.rows:8d}  {span}  ofset={f.offset}")
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()